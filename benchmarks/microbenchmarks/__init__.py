@@ -1,10 +1,21 @@
+from .algorithms import AlgorithmsPlan
 from .atomic_ops import AtomicOpsPlan
+from .autodiff_tape import AutodiffTapePlan
+from .cpu_vectorize import CpuVectorizePlan
 from .fill import FillPlan
+from .frontend_compile import FrontendCompilePlan
+from .launch_overhead import LaunchOverheadPlan
 from .math_opts import MathOpsPlan
 from .memcpy import MemcpyPlan
+from .parallel_loops import ParallelLoopsPlan
 from .saxpy import SaxpyPlan
+from .sort import SortPlan
+from .sparse_occupancy import SparseOccupancyPlan
 from .stencil2d import Stencil2DPlan
 
 benchmark_plan_list = [
-    AtomicOpsPlan, FillPlan, MathOpsPlan, MemcpyPlan, SaxpyPlan, Stencil2DPlan
+    AlgorithmsPlan, AtomicOpsPlan, AutodiffTapePlan, CpuVectorizePlan,
+    FillPlan, FrontendCompilePlan, LaunchOverheadPlan, MathOpsPlan,
+    MemcpyPlan, ParallelLoopsPlan, SaxpyPlan, SortPlan, SparseOccupancyPlan,
+    Stencil2DPlan
 ]
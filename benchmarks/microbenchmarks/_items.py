@@ -5,6 +5,8 @@ import taichi as ti
 
 class BenchmarkItem:
     name = 'item'
+    # An option passed to ti.init instead of the benchmark functions
+    init_option = False
 
     def __init__(self):
         self._items = {}  # {'tag': impl, ...}
@@ -114,3 +116,91 @@ class AtomicOps(BenchmarkItem):
             return False
         else:
             return True
+
+
+class FuncCalls(BenchmarkItem):
+    name = 'num_calls'
+
+    def __init__(self):
+        self._items = {}
+        for i in range(4, 10, 2):  # [16,64,256]
+            self._items[f'{2**i}calls'] = 2**i
+
+
+class KernelSignature(BenchmarkItem):
+    name = 'signature'
+
+    def __init__(self):
+        # None: implement by feature
+        self._items = {
+            'no_args': None,
+            'scalar_args': None,
+            'template_args': None,
+            'ndarray_args': None
+        }
+
+
+class SortAlgorithm(BenchmarkItem):
+    name = 'algorithm'
+
+    def __init__(self):
+        self._items = {
+            'radix_sort': ti.algorithms.radix_sort,
+            'odd_even_merge_sort': ti._kernels.parallel_sort
+        }
+
+
+class ParallelAlgorithm(BenchmarkItem):
+    name = 'algorithm'
+
+    def __init__(self):
+        self._items = {
+            'exclusive_scan': ti.algorithms.exclusive_scan,
+            'reduce': ti.algorithms.reduce,
+            'compact': ti.algorithms.compact,
+            'histogram': ti.algorithms.histogram,
+            'unique': ti.algorithms.unique
+        }
+
+
+class TapeCheckpoint(BenchmarkItem):
+    name = 'checkpoint_every'
+
+    def __init__(self):
+        # None: the plain tape, relying on the fields to keep all the states
+        self._items = {'no_checkpoint': None, 'checkpoint_every_32': 32}
+
+
+class SparseContainer(BenchmarkItem):
+    name = 'container'
+
+    def __init__(self):
+        # Each impl adds to |parent| a sparse node of |num_cells| cells, of
+        # which at most |max_num_active| are activated
+        self._items = {'pointer': self.pointer, 'hash': self.hash}
+
+    @staticmethod
+    def pointer(parent, num_cells, max_num_active):
+        return parent.pointer(ti.i, num_cells)
+
+    @staticmethod
+    def hash(parent, num_cells, max_num_active):
+        # Keep the load factor of the hash table below 1/2
+        capacity = 1 << (2 * max_num_active - 1).bit_length()
+        return parent.hash(ti.i, num_cells, capacity=max(capacity, 2))
+
+
+class LoopWorkload(BenchmarkItem):
+    name = 'workload'
+
+    def __init__(self):
+        # None: implement by feature
+        self._items = {'empty': None, 'uniform': None, 'imbalanced': None}
+
+
+class CpuLoopVectorize(BenchmarkItem):
+    name = 'cpu_loop_vectorize'
+    init_option = True
+
+    def __init__(self):
+        self._items = {'vectorized': True, 'scalar': False}
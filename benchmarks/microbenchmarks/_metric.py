@@ -1,3 +1,5 @@
+import tracemalloc
+
 from microbenchmarks._items import BenchmarkItem
 from microbenchmarks._utils import End2EndTimer, get_ti_arch
 
@@ -27,6 +29,19 @@ def kernel_executor(repeat, func, *args):
     return ti.kernel_profiler_total_time() * 1000 / repeat  #ms
 
 
+def peak_memory_executor(repeat, func, *args):
+    # The peak memory allocated on the device, e.g., for fields and ndarrays,
+    # plus the peak host memory allocated by Python while |func| runs, e.g.,
+    # for NumPy copies of fields
+    tracemalloc.start()
+    func(*args)
+    _, host_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    device_bytes = ti.profiler.get_memory_info()['device'][
+        'peak_allocated_bytes']
+    return (device_bytes + host_bytes) / (1024 * 1024)  #MB
+
+
 class MetricType(BenchmarkItem):
     name = 'get_metric'
 
@@ -37,11 +52,14 @@ class MetricType(BenchmarkItem):
         }
 
     @staticmethod
-    def init_taichi(arch: str, tag_list: list):
+    def init_taichi(arch: str, tag_list: list, **init_kwargs):
         if set(['kernel_elapsed_time_ms']).issubset(tag_list):
-            ti.init(kernel_profiler=True, arch=get_ti_arch(arch))
-        elif set(['end2end_time_ms']).issubset(tag_list):
-            ti.init(kernel_profiler=False, arch=get_ti_arch(arch))
+            ti.init(kernel_profiler=True, arch=get_ti_arch(arch), **init_kwargs)
+        elif set(['end2end_time_ms']).issubset(tag_list) or set(
+            ['peak_memory_mb']).issubset(tag_list):
+            ti.init(kernel_profiler=False,
+                    arch=get_ti_arch(arch),
+                    **init_kwargs)
         else:
             return False
         return True
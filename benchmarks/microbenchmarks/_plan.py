@@ -48,7 +48,8 @@ class BenchmarkPlan:
     def run(self):
         for case, plan in self.plan.items():
             tag_list = plan['tags']
-            MetricType.init_taichi(self.arch, tag_list)
+            MetricType.init_taichi(self.arch, tag_list,
+                                   **self._get_init_kwargs(tag_list))
             _ms = self.funcs.get_func(tag_list)(self.arch,
                                                 self.basic_repeat_times,
                                                 **self._get_kwargs(tag_list))
@@ -62,9 +63,19 @@ class BenchmarkPlan:
         kwargs = {}
         tags = tags[1:]  # tags = [case_name, item1_tag, item2_tag, ...]
         for item, tag in zip(self.items.values(), tags):
+            if item.init_option:
+                continue
             kwargs[item.name] = item.impl(tag) if impl == True else tag
         return kwargs
 
+    def _get_init_kwargs(self, tags):
+        kwargs = {}
+        tags = tags[1:]
+        for item, tag in zip(self.items.values(), tags):
+            if item.init_option:
+                kwargs[item.name] = item.impl(tag)
+        return kwargs
+
     def _remove_conflict_items(self):
         remove_list = []
         #logical_atomic with float_type
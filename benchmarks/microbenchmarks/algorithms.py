@@ -0,0 +1,54 @@
+import numpy as np
+from microbenchmarks._items import Container, DataSize, ParallelAlgorithm
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks._utils import dtype_size, scaled_repeat_times
+
+import taichi as ti
+
+_NUM_BINS = 256
+
+
+def _init_input(container, dsize, values):
+    num_elements = dsize // dtype_size(ti.i32)
+    x = container(ti.i32, num_elements)
+    x.from_numpy(values(num_elements).astype(np.int32))
+    return x
+
+
+def scan_reduce(arch, repeat, container, algorithm, dsize, get_metric):
+    repeat = scaled_repeat_times(arch, dsize, repeat)
+    x = _init_input(container, dsize, np.ones)
+    # Scans run in place, every repetition does the same amount of work
+    return get_metric(repeat, algorithm, x)
+
+
+def compact_unique(arch, repeat, container, algorithm, dsize, get_metric):
+    repeat = scaled_repeat_times(arch, dsize, repeat)
+    # Half of the elements are selected by compact and kept by unique
+    x = _init_input(container, dsize, lambda n: np.arange(n) // 2)
+    out = container(ti.i32, x.shape[0])
+    if algorithm is ti.algorithms.compact:
+        mask = _init_input(container, dsize, lambda n: np.arange(n) % 2)
+        return get_metric(repeat, algorithm, x, mask, out)
+    return get_metric(repeat, algorithm, x, out)
+
+
+def histogram(arch, repeat, container, algorithm, dsize, get_metric):
+    repeat = scaled_repeat_times(arch, dsize, repeat)
+    x = _init_input(container, dsize,
+                    lambda n: np.random.randint(0, _NUM_BINS, n))
+    counts = container(ti.i32, _NUM_BINS)
+    return get_metric(repeat, algorithm, x, counts)
+
+
+class AlgorithmsPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('algorithms', arch, basic_repeat_times=10)
+        self.create_plan(ParallelAlgorithm(), Container(), DataSize(),
+                         MetricType())
+        self.add_func(['exclusive_scan'], scan_reduce)
+        self.add_func(['reduce'], scan_reduce)
+        self.add_func(['compact'], compact_unique)
+        self.add_func(['unique'], compact_unique)
+        self.add_func(['histogram'], histogram)
@@ -0,0 +1,64 @@
+from microbenchmarks._items import DataSize, TapeCheckpoint
+from microbenchmarks._metric import MetricType, peak_memory_executor
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks._utils import dtype_size
+
+import taichi as ti
+
+_NUM_STEPS = 256
+# Size of the per-step scratch data relative to the state, e.g., the grid of
+# a particle simulation
+_NUM_CHANNELS = 4
+
+
+def tape_rollout(arch, repeat, checkpoint_every, dsize, get_metric):
+    n = dsize // dtype_size(ti.f32)
+    # Without checkpointing, the states and the scratch data of all the steps
+    # must be kept, while with it they can be overwritten
+    num_rows = _NUM_STEPS + 1 if checkpoint_every is None else 2
+    num_slots = _NUM_STEPS if checkpoint_every is None else 1
+    s = ti.field(ti.f32, shape=(num_rows, n), needs_grad=True)
+    scratch = ti.field(ti.f32, shape=(num_slots, n, _NUM_CHANNELS))
+    loss = ti.field(ti.f32, shape=(), needs_grad=True)
+
+    @ti.kernel
+    def prepare(t: ti.i32, slot: ti.i32):
+        for i, c in ti.ndrange(n, _NUM_CHANNELS):
+            scratch[slot, i, c] = ti.sin(0.01 * t * (i + c))
+
+    @ti.kernel
+    def step(t: ti.i32, slot: ti.i32):
+        for i in range(n):
+            f = 0.0
+            for c in ti.static(range(_NUM_CHANNELS)):
+                f += scratch[slot, i, c]
+            cur = s[t % num_rows, i]
+            s[(t + 1) % num_rows, i] = cur * (0.99 + 0.001 * f)
+
+    @ti.kernel
+    def compute_loss():
+        for i in range(n):
+            loss[None] += s[_NUM_STEPS % num_rows, i]
+
+    def rollout():
+        with ti.Tape(loss, checkpoint_every=checkpoint_every):
+            for t in range(_NUM_STEPS):
+                slot = t % num_slots
+                prepare(t, slot)
+                step(t, slot)
+            compute_loss()
+
+    return get_metric(repeat, rollout)
+
+
+class AutodiffTapePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('autodiff_tape', arch, basic_repeat_times=1)
+        dsize = DataSize()
+        dsize.remove(['4MB', '64MB'])
+        metric = MetricType()
+        metric.remove(['kernel_elapsed_time_ms'])
+        metric.update({'peak_memory_mb': peak_memory_executor})
+        self.create_plan(TapeCheckpoint(), dsize, metric)
+        self.add_func(['no_checkpoint'], tape_rollout)
+        self.add_func(['checkpoint_every_32'], tape_rollout)
@@ -0,0 +1,48 @@
+from microbenchmarks._items import BenchmarkItem, CpuLoopVectorize, DataType
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks.fill import fill_default
+from microbenchmarks.math_opts import unary_ops_throughput_default
+from microbenchmarks.saxpy import saxpy_default
+
+import taichi as ti
+
+# Fits in the last level cache, so that the loops are not memory-bound
+_DATA_SIZE = 1024 * 1024
+
+
+class VectorizedKernel(BenchmarkItem):
+    name = 'kernel'
+
+    def __init__(self):
+        # None: implement by feature
+        self._items = {'saxpy': None, 'fill': None, 'math_ops': None}
+
+
+def saxpy(arch, repeat, kernel, dtype, get_metric):
+    return saxpy_default(arch, repeat, ti.field, dtype, _DATA_SIZE,
+                         get_metric)
+
+
+def fill(arch, repeat, kernel, dtype, get_metric):
+    return fill_default(arch, repeat, ti.field, dtype, _DATA_SIZE, get_metric)
+
+
+def math_ops(arch, repeat, kernel, dtype, get_metric):
+    return unary_ops_throughput_default(arch, repeat, ti.sqrt, dtype, 16384,
+                                        8, get_metric)
+
+
+class CpuVectorizePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('cpu_vectorize', arch, basic_repeat_times=10)
+        vectorize_dtype = DataType()
+        vectorize_dtype.remove_integer()
+        self.create_plan(VectorizedKernel(), vectorize_dtype,
+                         CpuLoopVectorize(), MetricType())
+        self.add_func(['saxpy'], saxpy)
+        self.add_func(['fill'], fill)
+        self.add_func(['math_ops'], math_ops)
+        if arch != 'x64':
+            # Only loops on CPUs are vectorized
+            self.remove_cases_with_tags([self.name])
@@ -0,0 +1,44 @@
+from microbenchmarks._items import FuncCalls
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+import taichi as ti
+
+
+def frontend_compile_default(arch, repeat, num_calls, get_metric):
+    x = ti.field(ti.f32, shape=16)
+
+    @ti.func
+    def clamp(v, lo, hi):
+        r = v
+        if v < lo:
+            r = lo
+        elif v > hi:
+            r = hi
+        return r
+
+    def compile_kernel():
+        # A new kernel every time, so that it is never found in the cache of
+        # compiled kernels.
+        @ti.kernel
+        def many_calls():
+            for i in x:
+                v = x[i]
+                for _ in ti.static(range(num_calls)):
+                    v = clamp(v + 0.5, 0.0, 1.0)
+                x[i] = v
+
+        # Only the frontend runs here, code generation is deferred to the
+        # first launch.
+        many_calls._primal.ensure_compiled()
+
+    return get_metric(repeat, compile_kernel)
+
+
+class FrontendCompilePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('frontend_compile', arch, basic_repeat_times=2)
+        metric = MetricType()
+        metric.remove(['kernel_elapsed_time_ms'])
+        self.create_plan(FuncCalls(), metric)
+        self.add_func(['frontend_compile'], frontend_compile_default)
@@ -0,0 +1,61 @@
+from microbenchmarks._items import KernelSignature
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+import taichi as ti
+
+# The kernels do (almost) nothing, so what is measured is the cost of a launch
+
+
+def launch_no_args(arch, repeat, signature, get_metric):
+    x = ti.field(ti.f32, shape=())
+
+    @ti.kernel
+    def empty():
+        x[None] += 1
+
+    return get_metric(repeat, empty)
+
+
+def launch_scalar_args(arch, repeat, signature, get_metric):
+    x = ti.field(ti.f32, shape=())
+
+    @ti.kernel
+    def scalars(a: ti.f32, b: ti.i32, c: ti.f32, d: ti.i32):
+        x[None] += a * b + c * d
+
+    return get_metric(repeat, scalars, 1.0, 2, 3.0, 4)
+
+
+def launch_template_args(arch, repeat, signature, get_metric):
+    x = ti.field(ti.f32, shape=())
+    y = ti.field(ti.f32, shape=())
+
+    @ti.kernel
+    def templates(x: ti.template(), y: ti.template(), a: ti.f32):
+        x[None] += y[None] * a
+
+    return get_metric(repeat, templates, x, y, 1.0)
+
+
+def launch_ndarray_args(arch, repeat, signature, get_metric):
+    x = ti.ndarray(ti.f32, shape=1)
+    y = ti.ndarray(ti.f32, shape=1)
+
+    @ti.kernel
+    def ndarrays(x: ti.any_arr(), y: ti.any_arr()):
+        x[0] += y[0]
+
+    return get_metric(repeat, ndarrays, x, y)
+
+
+class LaunchOverheadPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('launch_overhead', arch, basic_repeat_times=10000)
+        metric = MetricType()
+        metric.remove(['kernel_elapsed_time_ms'])
+        self.create_plan(KernelSignature(), metric)
+        self.add_func(['no_args'], launch_no_args)
+        self.add_func(['scalar_args'], launch_scalar_args)
+        self.add_func(['template_args'], launch_template_args)
+        self.add_func(['ndarray_args'], launch_ndarray_args)
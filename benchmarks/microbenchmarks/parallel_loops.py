@@ -0,0 +1,63 @@
+from microbenchmarks._items import LoopWorkload
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+import taichi as ti
+
+_NUM_ITERATIONS = 4096
+# The average number of inner iterations of each loop iteration
+_WORK = 256
+
+
+def empty_loop(arch, repeat, workload, get_metric):
+    x = ti.field(ti.f32, shape=64)
+
+    # Too few iterations to amortize the launch of a parallel loop, so what is
+    # measured is the latency of waking up the threads
+    @ti.kernel
+    def empty():
+        for i in range(64):
+            x[i] += 1
+
+    return get_metric(repeat * 100, empty)
+
+
+def uniform_loop(arch, repeat, workload, get_metric):
+    x = ti.field(ti.f32, shape=_NUM_ITERATIONS)
+
+    @ti.kernel
+    def uniform():
+        for i in range(_NUM_ITERATIONS):
+            s = 0.0
+            for j in range(_WORK):
+                s += ti.sin(s + j)
+            x[i] = s
+
+    return get_metric(repeat, uniform)
+
+
+def imbalanced_loop(arch, repeat, workload, get_metric):
+    x = ti.field(ti.f32, shape=_NUM_ITERATIONS)
+
+    # The same amount of work as |uniform_loop|, most of which is in the
+    # last iterations
+    @ti.kernel
+    def imbalanced():
+        for i in range(_NUM_ITERATIONS):
+            s = 0.0
+            for j in range(i * 2 * _WORK // _NUM_ITERATIONS):
+                s += ti.sin(s + j)
+            x[i] = s
+
+    return get_metric(repeat, imbalanced)
+
+
+class ParallelLoopsPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('parallel_loops', arch, basic_repeat_times=10)
+        metric = MetricType()
+        metric.remove(['kernel_elapsed_time_ms'])
+        self.create_plan(LoopWorkload(), metric)
+        self.add_func(['empty'], empty_loop)
+        self.add_func(['uniform'], uniform_loop)
+        self.add_func(['imbalanced'], imbalanced_loop)
@@ -0,0 +1,25 @@
+from microbenchmarks._items import DataSize, DataType, SortAlgorithm
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks._utils import (dtype_size, fill_random,
+                                    scaled_repeat_times)
+
+import taichi as ti
+
+
+def sort_key_value(arch, repeat, algorithm, dtype, dsize, get_metric):
+    repeat = scaled_repeat_times(arch, dsize, repeat)
+    num_elements = dsize // dtype_size(dtype)
+    keys = ti.field(dtype, num_elements)
+    values = ti.field(ti.i32, num_elements)
+    fill_random(keys, dtype, ti.field)
+    # Both sorts do the same amount of work on sorted and unsorted keys
+    return get_metric(repeat, algorithm, keys, values)
+
+
+class SortPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('sort', arch, basic_repeat_times=1)
+        self.create_plan(SortAlgorithm(), DataType(), DataSize(), MetricType())
+        self.add_func(['radix_sort'], sort_key_value)
+        self.add_func(['odd_even_merge_sort'], sort_key_value)
@@ -0,0 +1,57 @@
+from microbenchmarks._items import DataSize, SparseContainer
+from microbenchmarks._metric import MetricType, peak_memory_executor
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks._utils import dtype_size, scaled_repeat_times
+
+import taichi as ti
+
+_BLOCK_SIZE = 8
+# One block out of every 100 is active
+_BLOCK_STRIDE = 100
+
+
+def _allocated_bytes():
+    info = ti.profiler.get_memory_info()
+    return sum(tree['root_bytes'] +
+               sum(snode['allocated_bytes'] for snode in tree['snodes'])
+               for tree in info['snode_trees'])
+
+
+def sparse_occupancy(arch, repeat, container, dsize, get_metric):
+    repeat = scaled_repeat_times(arch, dsize, repeat)
+    # |dsize| is the size of the domain if it were dense
+    num_blocks = dsize // dtype_size(ti.f32) // _BLOCK_SIZE
+    num_active = max(num_blocks // _BLOCK_STRIDE, 1)
+    x = ti.field(ti.f32)
+    block = container(ti.root, num_blocks, num_active)
+    block.dense(ti.i, _BLOCK_SIZE).place(x)
+
+    @ti.kernel
+    def activate():
+        for b in range(num_active):
+            x[b * _BLOCK_STRIDE * _BLOCK_SIZE] = 1.0
+
+    @ti.kernel
+    def update():
+        for i in x:
+            x[i] = x[i] * 0.5 + 1.0
+
+    def step():
+        activate()
+        update()
+        return _allocated_bytes()
+
+    return get_metric(repeat, step)
+
+
+class SparseOccupancyPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__('sparse_occupancy', arch, basic_repeat_times=10)
+        metric = MetricType()
+        metric.update({'peak_memory_mb': peak_memory_executor})
+        self.create_plan(SparseContainer(), DataSize(), metric)
+        self.add_func(['pointer'], sparse_occupancy)
+        self.add_func(['hash'], sparse_occupancy)
+        if arch != 'x64':
+            # hash SNodes are only supported on CPU
+            self.remove_cases_with_tags(['hash'])
@@ -1,14 +1,17 @@
+import weakref
+
 from taichi._lib.utils import get_os_name
-from taichi.lang import ops
+from taichi.lang import impl, ops
+from taichi.lang._ndarray import ScalarNdarray
 from taichi.lang._ndrange import ndrange
 from taichi.lang.expr import Expr
 from taichi.lang.field import ScalarField
-from taichi.lang.impl import grouped, static, static_assert
-from taichi.lang.kernel_impl import kernel
-from taichi.lang.runtime_ops import sync
+from taichi.lang.impl import grouped, static
+from taichi.lang.kernel_impl import func, kernel
+from taichi.lang.matrix import Vector
 from taichi.lang.snode import deactivate
 from taichi.types.annotations import any_arr, ext_arr, template
-from taichi.types.primitive_types import f16, f32, f64, u8
+from taichi.types.primitive_types import f16, f32, f64, u16, u32, u64, u8
 
 
 # A set of helper (meta)functions
@@ -54,48 +57,107 @@ def ndarray_matrix_to_ext_arr(ndarray: any_arr(), arr: ext_arr(),
                     arr[I, p, q] = ndarray[I][p, q]
 
 
+def image_scale(dtype):
+    """Gets the factor normalizing the values of an image into [0, 1]."""
+    for int_type, max_value in [(u8, 255), (u16, 65535), (u32, 4294967295),
+                                (u64, 18446744073709551615)]:
+        if dtype == int_type:
+            return 1 / max_value
+    return 1.0
+
+
+@func
+def _image_channel(img: template(), i, j, c: template(), kind: template()):
+    # |kind| is 'vector' for vector elements, 'channels' if the channels are
+    # the last dimension, or 'scalar' for greyscale images
+    res = ops.cast(0, f32)
+    if static(kind == 'vector'):
+        res = ops.cast(img[i, j][c], f32)
+    elif static(kind == 'channels'):
+        res = ops.cast(img[i, j, c], f32)
+    else:
+        res = ops.cast(img[i, j], f32)
+    return res
+
+
+@func
+def _write_image_pixel(img: template(), arr: template(), i, j,
+                       kind: template(), num_channels: template(),
+                       scale: template()):
+    # Greyscale values are written to all the channels of the RGBA canvas,
+    # and the missing channels of RG or RGB images are zeroed
+    for c in static(range(4)):
+        if static(num_channels == 1 or c < num_channels):
+            arr[i, j, c] = _image_channel(img, i, j,
+                                          static(min(c, num_channels - 1)),
+                                          kind) * scale
+        else:
+            arr[i, j, c] = 0
+
+
+@func
+def _fast_image_channel(img: template(), i, j, c: template(), kind: template(),
+                        is_float: template()):
+    value = _image_channel(img, i, j, c, kind)
+    res = 0
+    if static(is_float):
+        res = min(255, max(0, int(value * 255)))
+    else:
+        res = int(value)
+    return res
+
+
+@func
+def _write_fast_image_pixel(img: template(), out: template(), i, j, width,
+                            height, kind: template(), is_float: template()):
+    y = height - 1 - j
+    r = _fast_image_channel(img, i, y, 0, kind, is_float)
+    g = _fast_image_channel(img, i, y, 1, kind, is_float)
+    b = _fast_image_channel(img, i, y, 2, kind, is_float)
+    idx = j * width + i
+    # We use i32 for |out| since OpenGL and Metal doesn't support u8 types
+    if static(get_os_name() != 'osx'):
+        out[idx] = (r << 16) + (g << 8) + b
+    else:
+        # What's -16777216?
+        #
+        # On Mac, we need to set the alpha channel to 0xff. Since Mac's GUI
+        # is big-endian, the color is stored in ABGR order, and we need to
+        # add 0xff000000, which is -16777216 in I32's legit range. (Albeit
+        # the clarity, adding 0xff000000 doesn't work.)
+        alpha = -16777216
+        out[idx] = (b << 16) + (g << 8) + r + alpha
+
+
 @kernel
-def vector_to_fast_image(img: template(), out: ext_arr()):
+def tensor_to_fast_image(img: template(), out: ext_arr(), kind: template()):
     # FIXME: Why is ``for i, j in img:`` slower than:
-    for i, j in ndrange(*img.shape):
-        r, g, b = 0, 0, 0
-        color = img[i, img.shape[1] - 1 - j]
-        if static(img.dtype in [f16, f32, f64]):
-            r, g, b = min(255, max(0, int(color * 255)))
-        else:
-            static_assert(img.dtype == u8)
-            r, g, b = color
-        idx = j * img.shape[0] + i
-        # We use i32 for |out| since OpenGL and Metal doesn't support u8 types
-        if static(get_os_name() != 'osx'):
-            out[idx] = (r << 16) + (g << 8) + b
-        else:
-            # What's -16777216?
-            #
-            # On Mac, we need to set the alpha channel to 0xff. Since Mac's GUI
-            # is big-endian, the color is stored in ABGR order, and we need to
-            # add 0xff000000, which is -16777216 in I32's legit range. (Albeit
-            # the clarity, adding 0xff000000 doesn't work.)
-            alpha = -16777216
-            out[idx] = (b << 16) + (g << 8) + r + alpha
+    for i, j in ndrange(img.shape[0], img.shape[1]):
+        _write_fast_image_pixel(img, out, i, j, img.shape[0], img.shape[1],
+                                kind, static(img.dtype in [f16, f32, f64]))
 
 
 @kernel
-def tensor_to_image(tensor: template(), arr: ext_arr()):
-    for I in grouped(tensor):
-        t = ops.cast(tensor[I], f32)
-        arr[I, 0] = t
-        arr[I, 1] = t
-        arr[I, 2] = t
+def ndarray_to_fast_image(img: any_arr(), out: ext_arr(), kind: template(),
+                          is_float: template()):
+    for i, j in ndrange(img.shape[0], img.shape[1]):
+        _write_fast_image_pixel(img, out, i, j, img.shape[0], img.shape[1],
+                                kind, is_float)
 
 
 @kernel
-def vector_to_image(mat: template(), arr: ext_arr()):
-    for I in grouped(mat):
-        for p in static(range(mat.n)):
-            arr[I, p] = ops.cast(mat[I][p], f32)
-            if static(mat.n <= 2):
-                arr[I, 2] = 0
+def tensor_to_image(img: template(), arr: ext_arr(), kind: template(),
+                    num_channels: template()):
+    for i, j in ndrange(img.shape[0], img.shape[1]):
+        _write_image_pixel(img, arr, i, j, kind, num_channels,
+                           static(image_scale(img.dtype)))
+
+
+@kernel
+def ndarray_to_image(img: any_arr(), arr: ext_arr(), kind: template(),
+                     num_channels: template(), scale: template()):
+    for i, j in ndrange(img.shape[0], img.shape[1]):
+        _write_image_pixel(img, arr, i, j, kind, num_channels, scale)
 
 
 @kernel
@@ -156,6 +218,211 @@ def ext_arr_to_matrix(arr: ext_arr(), mat: template(), as_vector: template()):
                     mat[I][p, q] = arr[I, p, q]
 
 
+@kernel
+def field_gather(field: template(), indices: ext_arr(), out: ext_arr()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(len(field.shape)))])
+        out[i] = field[I]
+
+
+@kernel
+def field_scatter(field: template(), indices: ext_arr(), values: ext_arr()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(len(field.shape)))])
+        field[I] = values[i]
+
+
+@kernel
+def matrix_field_gather(mat: template(), indices: ext_arr(), out: ext_arr(),
+                        as_vector: template()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(len(mat.shape)))])
+        for p in static(range(mat.n)):
+            for q in static(range(mat.m)):
+                if static(as_vector):
+                    out[i, p] = mat[I][p]
+                else:
+                    out[i, p, q] = mat[I][p, q]
+
+
+@kernel
+def matrix_field_scatter(mat: template(), indices: ext_arr(),
+                         values: ext_arr(), as_vector: template()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(len(mat.shape)))])
+        for p in static(range(mat.n)):
+            for q in static(range(mat.m)):
+                if static(as_vector):
+                    mat[I][p] = values[i, p]
+                else:
+                    mat[I][p, q] = values[i, p, q]
+
+
+@kernel
+def ndarray_gather(ndarray: any_arr(), indices: ext_arr(), out: ext_arr(),
+                   dim: template()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(dim))])
+        out[i] = ndarray[I]
+
+
+@kernel
+def ndarray_scatter(ndarray: any_arr(), indices: ext_arr(), values: ext_arr(),
+                    dim: template()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(dim))])
+        ndarray[I] = values[i]
+
+
+@kernel
+def ndarray_matrix_gather(ndarray: any_arr(), indices: ext_arr(),
+                          out: ext_arr(), dim: template(),
+                          as_vector: template()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(dim))])
+        for p in static(range(ndarray[I].n)):
+            for q in static(range(ndarray[I].m)):
+                if static(as_vector):
+                    out[i, p] = ndarray[I][p]
+                else:
+                    out[i, p, q] = ndarray[I][p, q]
+
+
+@kernel
+def ndarray_matrix_scatter(ndarray: any_arr(), indices: ext_arr(),
+                           values: ext_arr(), dim: template(),
+                           as_vector: template()):
+    for i in range(indices.shape[0]):
+        I = Vector([indices[i, k] for k in static(range(dim))])
+        for p in static(range(ndarray[I].n)):
+            for q in static(range(ndarray[I].m)):
+                if static(as_vector):
+                    ndarray[I][p] = values[i, p]
+                else:
+                    ndarray[I][p, q] = values[i, p, q]
+
+
+def _make_csr_spmv(x_annotation, y_annotation):
+    @kernel
+    def csr_spmv(offsets: any_arr(), cols: any_arr(), vals: any_arr(),
+                 x: x_annotation, y: y_annotation, num_rows: int,
+                 dtype: template()):
+        for r in range(num_rows):
+            acc = ops.cast(0, dtype)
+            for k in range(offsets[r], offsets[r + 1]):
+                acc += vals[k] * x[cols[k]]
+            y[r] = acc
+
+    return csr_spmv
+
+
+# Row-parallel products of CSR sparse matrices and vectors, y = A @ x, keyed by
+# whether x and y are fields. Template arguments cannot be ndarrays, so the
+# kernel is instantiated for each combination of fields and ndarrays.
+csr_spmv = {(x_is_field, y_is_field):
+            _make_csr_spmv(template() if x_is_field else any_arr(),
+                           template() if y_is_field else any_arr())
+            for x_is_field in (False, True) for y_is_field in (False, True)}
+
+
+@func
+def _flat_index(tensor: template(), I):
+    j = 0
+    for k in static(range(len(tensor.shape))):
+        j = j * tensor.shape[k] + I[k]
+    return j
+
+
+# Copies between fields and slices of 1-D ndarrays, e.g., the replay buffers of
+# ti.Tape
+@kernel
+def tensor_to_ndarray_slice(tensor: template(), ndarray: any_arr(),
+                            offset: int):
+    for I in grouped(tensor):
+        ndarray[offset + _flat_index(tensor, I)] = tensor[I]
+
+
+@kernel
+def ndarray_slice_to_tensor(ndarray: any_arr(), offset: int,
+                            tensor: template()):
+    for I in grouped(tensor):
+        tensor[I] = ndarray[offset + _flat_index(tensor, I)]
+
+
+# Scratch buffers of each program, dropped together with it on ti.reset()
+_buffer_pools = weakref.WeakKeyDictionary()
+
+
+def get_buffer(name, dtype, size):
+    """Gets a scratch 1-D ndarray with at least `size` elements.
+
+    Buffers are cached per program and grow geometrically, so that repeated
+    calls with similar sizes do not allocate device memory.
+
+    Args:
+        name (str): Name of the buffer, distinct for buffers used at the same time.
+        dtype (DataType): Data type of the buffer.
+        size (int): The minimum number of elements.
+
+    Returns:
+        ScalarNdarray: The buffer, whose contents are unspecified.
+    """
+    pool = _buffer_pools.setdefault(impl.get_runtime(), {})
+    key = (name, dtype)
+    buf = pool.get(key)
+    if buf is None or buf.shape[0] < size:
+        capacity = 1
+        while capacity < size:
+            capacity *= 2
+        buf = ScalarNdarray(dtype, (capacity, ))
+        pool[key] = buf
+    return buf
+
+
+@kernel
+def _copy_field_to_ndarray(src: template(), dst: any_arr(), n: int):
+    for i in range(n):
+        dst[i] = src[i]
+
+
+@kernel
+def _copy_ndarray_to_ndarray(src: any_arr(), dst: any_arr(), n: int):
+    for i in range(n):
+        dst[i] = src[i]
+
+
+@kernel
+def _copy_ndarray_to_field(src: any_arr(), dst: template(), n: int):
+    for i in range(n):
+        dst[i] = src[i]
+
+
+def copy(src, dst, n):
+    """Copies the first `n` elements of `src` to `dst`, at least one of which is an ndarray."""
+    if isinstance(src, ScalarField):
+        _copy_field_to_ndarray(src, dst, n)
+    elif isinstance(dst, ScalarField):
+        _copy_ndarray_to_field(src, dst, n)
+    else:
+        _copy_ndarray_to_ndarray(src, dst, n)
+
+
+def as_ndarray(arr, n, name=None):
+    """Gets `arr` itself if it is an ndarray, or a copy of the field otherwise.
+
+    The copy is the scratch buffer `name`, or a new ndarray of exactly `n`
+    elements if `name` is None.
+    """
+    if isinstance(arr, ScalarNdarray):
+        return arr
+    if name is None:
+        buf = ScalarNdarray(arr.dtype, (n, ))
+    else:
+        buf = get_buffer(name, arr.dtype, n)
+    copy(arr, buf, n)
+    return buf
+
+
 @kernel
 def clear_gradients(_vars: template()):
     for I in grouped(ScalarField(Expr(_vars[0]))):
@@ -218,7 +485,7 @@ def sort_stage(keys: template(), use_values: int, values: template(), N: int,
 def parallel_sort(keys, values=None):
     N = keys.shape[0]
 
-    num_stages = 0
+    # Kernel launches are ordered, so the stages do not need to be synchronized
     p = 1
     while p < N:
         k = p
@@ -228,8 +495,5 @@ def parallel_sort(keys, values=None):
                 sort_stage(keys, 0, keys, N, p, k, invocations)
             else:
                 sort_stage(keys, 1, values, N, p, k, invocations)
-            num_stages += 1
-            sync()
             k = int(k / 2)
         p = int(p * 2)
-    print(num_stages)
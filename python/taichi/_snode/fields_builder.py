@@ -94,9 +94,14 @@ class FieldsBuilder:
         self._empty = False
         return self._root.pointer(indices, dimensions)
 
-    def hash(self, indices, dimensions):
+    def hash(self,
+             indices: Union[Sequence[_Axis], _Axis],
+             dimensions: Union[Sequence[int], int],
+             capacity: Optional[int] = None):
         """Same as :func:`taichi.lang.snode.SNode.hash`"""
-        raise NotImplementedError()
+        self._check_not_finalized()
+        self._empty = False
+        return self._root.hash(indices, dimensions, capacity)
 
     def dynamic(self,
                 index: Union[Sequence[_Axis], _Axis],
@@ -15,7 +15,12 @@ class SNodeTree:
     def destroy(self):
         if self.destroyed:
             raise TaichiRuntimeError('SNode tree has been destroyed')
-        self.ptr.destroy_snode_tree(impl.get_runtime().prog)
+        runtime = impl.get_runtime()
+        if any(view.tree_id == self.ptr.id() for view in runtime.numpy_views):
+            raise TaichiRuntimeError(
+                'SNode tree cannot be destroyed while numpy views of its fields are alive'
+            )
+        self.ptr.destroy_snode_tree(runtime.prog)
         self.destroyed = True
 
     @property
@@ -0,0 +1,4 @@
+from taichi.algorithms.compact import compact, unique
+from taichi.algorithms.histogram import histogram
+from taichi.algorithms.scan import exclusive_scan, inclusive_scan, reduce
+from taichi.algorithms.sort import radix_sort, segmented_sort
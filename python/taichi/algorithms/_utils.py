@@ -0,0 +1,31 @@
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.field import ScalarField
+
+# Block-level algorithms process contiguous blocks of elements serially in
+# each thread. The block size grows with the input to bound the number of
+# blocks, and thus the size of per-block intermediate results.
+_MIN_BLOCK_SIZE = 256
+_MAX_NUM_BLOCKS = 4096
+
+
+def get_block_partition(n):
+    """Splits `n` elements into blocks.
+
+    Returns:
+        Tuple[int, int]: The block size and the number of blocks.
+    """
+    block_size = max(_MIN_BLOCK_SIZE, -(-n // _MAX_NUM_BLOCKS))
+    return block_size, -(-n // block_size)
+
+
+def get_length(arr, name):
+    """Gets the number of elements of a 1-D scalar field or ndarray.
+
+    Raises:
+        TypeError: If `arr` is not a 1-D scalar field or ndarray.
+    """
+    if isinstance(arr, (ScalarField, ScalarNdarray)) and len(arr.shape) == 1:
+        return arr.shape[0]
+    raise TypeError(
+        f'{name} must be a 1-D scalar field or ndarray, but {type(arr)} provided'
+    )
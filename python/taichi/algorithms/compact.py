@@ -0,0 +1,108 @@
+from taichi._kernels import as_ndarray, copy, get_buffer
+from taichi.algorithms._utils import get_length
+from taichi.algorithms.scan import scan_inplace
+from taichi.lang import impl
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.kernel_impl import kernel
+from taichi.types.annotations import any_arr
+from taichi.types.primitive_types import i32
+
+
+@kernel
+def _flag_nonzero(mask: any_arr(), flags: any_arr(), n: int):
+    for i in range(n):
+        flag = 0
+        if mask[i] != 0:
+            flag = 1
+        flags[i] = flag
+
+
+@kernel
+def _flag_run_heads(arr: any_arr(), flags: any_arr(), n: int):
+    for i in range(n):
+        flag = 1
+        if i > 0:
+            if arr[i] == arr[i - 1]:
+                flag = 0
+        flags[i] = flag
+
+
+@kernel
+def _scatter_selected(src: any_arr(), pos: any_arr(), dst: any_arr(),
+                      n: int):
+    # pos holds the inclusive prefix sums of the selection flags
+    for i in range(n):
+        prev = 0
+        if i > 0:
+            prev = pos[i - 1]
+        if pos[i] != prev:
+            dst[prev] = src[i]
+
+
+def _gather_selected(arr, src, pos, out, n):
+    """Moves the selected elements to the front of `out` and returns their count."""
+    scan_inplace(pos, n, inclusive=True)
+    if out is None:
+        out = arr
+    elif get_length(out, 'out') < n:
+        raise ValueError(
+            f'out must hold at least {n} elements, but {out.shape[0]} provided'
+        )
+    direct = isinstance(out, ScalarNdarray) and out is not arr
+    dst = out if direct else get_buffer('compact_out', out.dtype, n)
+    _scatter_selected(src, pos, dst, n)
+    impl.get_runtime().sync()
+    count = pos[n - 1]
+    if not direct and count > 0:
+        copy(dst, out, count)
+    return count
+
+
+def compact(arr, mask, out=None):
+    """Moves the elements of `arr` whose `mask` is nonzero to the front of `out`, keeping their order.
+
+    Elements of `out` past the selected ones are left unchanged.
+
+    Args:
+        arr (Union[ScalarField, ScalarNdarray]): The input.
+        mask (Union[ScalarField, ScalarNdarray]): The selection, of the same length as `arr`.
+        out (Union[ScalarField, ScalarNdarray], optional): The result, at least as long as `arr`. Defaults to `arr` itself.
+
+    Returns:
+        int: The number of selected elements.
+    """
+    n = get_length(arr, 'arr')
+    if get_length(mask, 'mask') != n:
+        raise ValueError(
+            f'Mismatch length: {n} elements, but {mask.shape[0]} mask values provided'
+        )
+    if n == 0:
+        return 0
+    src = as_ndarray(arr, n, 'compact_input')
+    flags = get_buffer('compact_flags', i32, n)
+    _flag_nonzero(as_ndarray(mask, n, 'compact_mask'), flags, n)
+    return _gather_selected(arr, src, flags, out, n)
+
+
+def unique(arr, out=None):
+    """Keeps the first element of each run of equal consecutive elements of `arr`.
+
+    Apply it to sorted arrays (see :func:`radix_sort`) to get distinct values.
+
+    Args:
+        arr (Union[ScalarField, ScalarNdarray]): The input.
+        out (Union[ScalarField, ScalarNdarray], optional): The result, see :func:`compact`.
+
+    Returns:
+        int: The number of elements kept.
+    """
+    n = get_length(arr, 'arr')
+    if n == 0:
+        return 0
+    src = as_ndarray(arr, n, 'compact_input')
+    flags = get_buffer('compact_flags', i32, n)
+    _flag_run_heads(src, flags, n)
+    return _gather_selected(arr, src, flags, out, n)
+
+
+__all__ = ['compact', 'unique']
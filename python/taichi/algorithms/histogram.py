@@ -0,0 +1,78 @@
+from taichi._kernels import as_ndarray, copy, get_buffer
+from taichi.algorithms._utils import get_block_partition, get_length
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.kernel_impl import kernel
+from taichi.types.annotations import any_arr
+from taichi.types.primitive_types import i32
+
+
+@kernel
+def _count_bins_per_block(bins: any_arr(), partial: any_arr(), n: int,
+                          block_size: int, num_blocks: int, num_bins: int):
+    for b in range(num_blocks):
+        for j in range(num_bins):
+            partial[j * num_blocks + b] = 0
+        begin = b * block_size
+        end = min(begin + block_size, n)
+        for i in range(begin, end):
+            k = bins[i]
+            if 0 <= k < num_bins:
+                partial[k * num_blocks + b] = partial[k * num_blocks + b] + 1
+
+
+@kernel
+def _sum_blocks(partial: any_arr(), counts: any_arr(), num_blocks: int,
+                num_bins: int):
+    for k in range(num_bins):
+        total = 0
+        for b in range(num_blocks):
+            total += partial[k * num_blocks + b]
+        counts[k] = total
+
+
+@kernel
+def _clear(counts: any_arr(), num_bins: int):
+    for k in range(num_bins):
+        counts[k] = 0
+
+
+@kernel
+def _count_bins_atomic(bins: any_arr(), counts: any_arr(), n: int,
+                       num_bins: int):
+    for i in range(n):
+        k = bins[i]
+        if 0 <= k < num_bins:
+            counts[k] += 1
+
+
+def histogram(bins, counts):
+    """Counts the occurrences of each bin index.
+
+    With few bins, each thread counts a block of indices privately and the
+    counts of the blocks are summed up afterwards, so that no atomics are
+    needed. With many bins, contention is low and atomics are used instead.
+
+    Args:
+        bins (Union[ScalarField, ScalarNdarray]): 1-D integer bin indices. Indices outside [0, len(counts)) are ignored.
+        counts (Union[ScalarField, ScalarNdarray]): The result, overwritten with the number of occurrences of each bin index.
+    """
+    n = get_length(bins, 'bins')
+    num_bins = get_length(counts, 'counts')
+    src = as_ndarray(bins, n, 'histogram_input')
+    dst = counts
+    if not isinstance(counts, ScalarNdarray):
+        dst = get_buffer('histogram_counts', counts.dtype, num_bins)
+    block_size, num_blocks = get_block_partition(n)
+    if n > 0 and num_bins <= block_size:
+        partial = get_buffer('histogram_partial', i32, num_bins * num_blocks)
+        _count_bins_per_block(src, partial, n, block_size, num_blocks,
+                              num_bins)
+        _sum_blocks(partial, dst, num_blocks, num_bins)
+    else:
+        _clear(dst, num_bins)
+        _count_bins_atomic(src, dst, n, num_bins)
+    if dst is not counts:
+        copy(dst, counts, num_bins)
+
+
+__all__ = ['histogram']
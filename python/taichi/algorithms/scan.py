@@ -0,0 +1,160 @@
+from taichi._kernels import as_ndarray, copy, get_buffer
+from taichi.algorithms._utils import get_length
+from taichi.lang import impl, ops
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.impl import static
+from taichi.lang.kernel_impl import kernel
+from taichi.types.annotations import any_arr, template
+
+# Number of elements scanned or reduced serially by each thread
+_CHUNK_SIZE = 256
+
+_REDUCE_OPS = {
+    'add': ops.add,
+    'mul': ops.mul,
+    'min': ops.min,
+    'max': ops.max,
+    'and': ops.bit_and,
+    'or': ops.bit_or,
+    'xor': ops.bit_xor
+}
+
+
+@kernel
+def _scan_chunks(arr: any_arr(), sums: any_arr(), n: int, chunk_size: int,
+                 inclusive: template()):
+    for c in range((n + chunk_size - 1) // chunk_size):
+        begin = c * chunk_size
+        end = min(begin + chunk_size, n)
+        acc = arr[begin] * 0
+        for i in range(begin, end):
+            val = arr[i]
+            if static(inclusive):
+                acc += val
+                arr[i] = acc
+            else:
+                arr[i] = acc
+                acc += val
+        sums[c] = acc
+
+
+@kernel
+def _add_chunk_sums(arr: any_arr(), sums: any_arr(), n: int, chunk_size: int):
+    for i in range(n):
+        arr[i] = arr[i] + sums[i // chunk_size]
+
+
+@kernel
+def _reduce_chunks(src: any_arr(), dst: any_arr(), n: int, chunk_size: int,
+                   op: template()):
+    for c in range((n + chunk_size - 1) // chunk_size):
+        begin = c * chunk_size
+        end = min(begin + chunk_size, n)
+        acc = src[begin]
+        for i in range(begin + 1, end):
+            acc = static(_REDUCE_OPS[op])(acc, src[i])
+        dst[c] = acc
+
+
+def scan_inplace(arr, n, inclusive=False, level=0):
+    """Computes the prefix sums of the first `n` elements of a 1-D ndarray in place.
+
+    Chunks are scanned in parallel and their sums are scanned recursively,
+    so no host synchronization happens in between the kernel launches.
+
+    Args:
+        arr (ScalarNdarray): The array to scan.
+        n (int): The number of elements to scan.
+        inclusive (bool): Whether the i-th sum includes the i-th element.
+        level (int): Recursion depth, selects the scratch buffer of the chunk sums.
+    """
+    if n == 0:
+        return
+    num_chunks = (n + _CHUNK_SIZE - 1) // _CHUNK_SIZE
+    sums = get_buffer(f'scan_sums_{level}', arr.dtype, num_chunks)
+    _scan_chunks(arr, sums, n, _CHUNK_SIZE, inclusive)
+    if num_chunks > 1:
+        scan_inplace(sums, num_chunks, False, level + 1)
+        _add_chunk_sums(arr, sums, n, _CHUNK_SIZE)
+
+
+def _scan(arr, out, inclusive):
+    n = get_length(arr, 'arr')
+    if out is None:
+        out = arr
+    elif get_length(out, 'out') != n:
+        raise ValueError(
+            f'Mismatch length: {n} elements expected, but {out.shape[0]} provided'
+        )
+    if isinstance(out, ScalarNdarray):
+        if out is not arr:
+            copy(arr, out, n)
+        scan_inplace(out, n, inclusive)
+    else:
+        buf = get_buffer('scan', out.dtype, n)
+        copy(arr, buf, n)
+        scan_inplace(buf, n, inclusive)
+        copy(buf, out, n)
+
+
+def exclusive_scan(arr, out=None):
+    """Computes the exclusive prefix sums of a 1-D field or ndarray.
+
+    The i-th result is the sum of the elements before the i-th one, which is
+    where the i-th group starts when `arr` holds the sizes of groups laid out
+    one after another. Sums are computed in the data type of the result.
+
+    Args:
+        arr (Union[ScalarField, ScalarNdarray]): The input.
+        out (Union[ScalarField, ScalarNdarray], optional): The result, of the same length as `arr`. Defaults to `arr` itself.
+    """
+    _scan(arr, out, False)
+
+
+def inclusive_scan(arr, out=None):
+    """Computes the inclusive prefix sums of a 1-D field or ndarray.
+
+    The i-th result is the sum of the elements up to and including the i-th one.
+
+    Args:
+        arr (Union[ScalarField, ScalarNdarray]): The input.
+        out (Union[ScalarField, ScalarNdarray], optional): The result, see :func:`exclusive_scan`.
+    """
+    _scan(arr, out, True)
+
+
+def reduce(arr, op='add'):
+    """Reduces a 1-D field or ndarray to a single value.
+
+    Partial results of chunks are combined in a tree, so the order of
+    floating-point additions differs from a sequential sum.
+
+    Args:
+        arr (Union[ScalarField, ScalarNdarray]): The input, with at least one element.
+        op (str): One of 'add', 'mul', 'min', 'max', 'and', 'or' and 'xor'.
+
+    Returns:
+        Union[int, float]: The result, computed in the data type of `arr`.
+    """
+    if op not in _REDUCE_OPS:
+        raise ValueError(
+            f'Unsupported reduction {op}, expected one of {list(_REDUCE_OPS)}'
+        )
+    n = get_length(arr, 'arr')
+    if n == 0:
+        raise ValueError('Cannot reduce an empty array')
+    src = as_ndarray(arr, n, 'reduce_input')
+    level = 0
+    while True:
+        num_chunks = (n + _CHUNK_SIZE - 1) // _CHUNK_SIZE
+        dst = get_buffer(f'reduce_{level % 2}', arr.dtype, num_chunks)
+        _reduce_chunks(src, dst, n, _CHUNK_SIZE, op)
+        if num_chunks == 1:
+            break
+        src, n = dst, num_chunks
+        level += 1
+    impl.get_runtime().sync()
+    return dst[0]
+
+
+__all__ = ['exclusive_scan', 'inclusive_scan', 'reduce']
@@ -0,0 +1,252 @@
+import numpy as np
+from taichi._kernels import copy, get_buffer
+from taichi._lib import core as _ti_core
+from taichi.algorithms._utils import get_block_partition, get_length
+from taichi.algorithms.scan import scan_inplace
+from taichi.lang import ops
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.field import ScalarField
+from taichi.lang.impl import static
+from taichi.lang.kernel_impl import func, kernel
+from taichi.types.annotations import any_arr, template
+from taichi.types.primitive_types import f32, f64, i32, i64, u32, u64
+
+_RADIX_BITS = 8
+_RADIX = 1 << _RADIX_BITS
+
+
+@func
+def _encode_key(key, key_type: template(), bits_type: template()):
+    # Maps keys to integers whose unsigned order is the order of the keys
+    top = static(_ti_core.data_type_size(key_type) * 8 - 1)
+    bits = ops.bit_cast(key, bits_type)
+    mask = ops.cast(0, bits_type)
+    if static(_ti_core.is_real(key_type)):
+        # Flip all bits of negative numbers and the sign bit of the others
+        mask = (bits >> top) | (ops.cast(1, bits_type) << top)
+    elif static(_ti_core.is_signed(key_type)):
+        mask = ops.cast(1, bits_type) << top
+    return bits ^ mask
+
+
+@func
+def _decode_key(bits, key_type: template(), bits_type: template()):
+    top = static(_ti_core.data_type_size(key_type) * 8 - 1)
+    mask = ops.cast(0, bits_type)
+    if static(_ti_core.is_real(key_type)):
+        mask = (~bits >> top) | (ops.cast(1, bits_type) << top)
+    elif static(_ti_core.is_signed(key_type)):
+        mask = ops.cast(1, bits_type) << top
+    return ops.bit_cast(bits ^ mask, key_type)
+
+
+@kernel
+def _load_field_keys(keys: template(), bits: any_arr(), index: any_arr(),
+                     n: int, key_type: template(), bits_type: template()):
+    for i in range(n):
+        bits[i] = _encode_key(keys[i], key_type, bits_type)
+        index[i] = i
+
+
+@kernel
+def _load_ndarray_keys(keys: any_arr(), bits: any_arr(), index: any_arr(),
+                       n: int, key_type: template(), bits_type: template()):
+    for i in range(n):
+        bits[i] = _encode_key(keys[i], key_type, bits_type)
+        index[i] = i
+
+
+@kernel
+def _store_field_keys(keys: template(), bits: any_arr(), n: int,
+                      key_type: template(), bits_type: template()):
+    for i in range(n):
+        keys[i] = _decode_key(bits[i], key_type, bits_type)
+
+
+@kernel
+def _store_ndarray_keys(keys: any_arr(), bits: any_arr(), n: int,
+                        key_type: template(), bits_type: template()):
+    for i in range(n):
+        keys[i] = _decode_key(bits[i], key_type, bits_type)
+
+
+@kernel
+def _permute_to_field(dst: template(), src: any_arr(), index: any_arr(),
+                      n: int):
+    for i in range(n):
+        dst[i] = src[index[i]]
+
+
+@kernel
+def _permute_to_ndarray(dst: any_arr(), src: any_arr(), index: any_arr(),
+                        n: int):
+    for i in range(n):
+        dst[i] = src[index[i]]
+
+
+@kernel
+def _count_digits(bits: any_arr(), hist: any_arr(), n: int, block_size: int,
+                  num_blocks: int, shift: int):
+    # Each thread counts the digits of a block of keys. The histogram is
+    # digit-major, so that its exclusive prefix sums are the positions of the
+    # first key of each digit of each block.
+    for b in range(num_blocks):
+        for d in range(_RADIX):
+            hist[d * num_blocks + b] = 0
+        begin = b * block_size
+        end = min(begin + block_size, n)
+        for i in range(begin, end):
+            d = ops.cast((bits[i] >> shift) & (_RADIX - 1), i32)
+            hist[d * num_blocks + b] = hist[d * num_blocks + b] + 1
+
+
+@kernel
+def _scatter_digits(bits: any_arr(), index: any_arr(), bits_out: any_arr(),
+                    index_out: any_arr(), hist: any_arr(), n: int,
+                    block_size: int, num_blocks: int, shift: int):
+    for b in range(num_blocks):
+        begin = b * block_size
+        end = min(begin + block_size, n)
+        for i in range(begin, end):
+            d = ops.cast((bits[i] >> shift) & (_RADIX - 1), i32)
+            pos = hist[d * num_blocks + b]
+            hist[d * num_blocks + b] = pos + 1
+            bits_out[pos] = bits[i]
+            index_out[pos] = index[i]
+
+
+@kernel
+def _fill_segment_ids(segment_ids: any_arr(), offsets: any_arr(),
+                      num_segments: int):
+    for s in range(num_segments):
+        for i in range(offsets[s], offsets[s + 1]):
+            segment_ids[i] = s
+
+
+def _get_bits_type(key_type):
+    if key_type in (i32, u32, f32):
+        return i32
+    if key_type in (i64, u64, f64):
+        return i64
+    raise TypeError(f'Sorting keys of type {key_type} is not supported')
+
+
+def _radix_passes(bits, index, bits_out, index_out, n, num_bits):
+    """Stably sorts (bits, index) pairs by the lowest `num_bits` bits.
+
+    The pairs are moved back and forth between the two pairs of buffers.
+
+    Returns:
+        Tuple[ScalarNdarray]: The buffers holding the sorted pairs, followed by the other two buffers.
+    """
+    block_size, num_blocks = get_block_partition(n)
+    hist = get_buffer('radix_sort_histogram', i32, _RADIX * num_blocks)
+    for shift in range(0, num_bits, _RADIX_BITS):
+        _count_digits(bits, hist, n, block_size, num_blocks, shift)
+        scan_inplace(hist, _RADIX * num_blocks)
+        _scatter_digits(bits, index, bits_out, index_out, hist, n, block_size,
+                        num_blocks, shift)
+        bits, index, bits_out, index_out = bits_out, index_out, bits, index
+    return bits, index, bits_out, index_out
+
+
+def _sort_keys(keys, n):
+    """Loads the keys into scratch buffers and sorts them by value.
+
+    Returns:
+        Tuple[ScalarNdarray]: The sorted encoded keys and their original indices, followed by two spare buffers.
+    """
+    key_type = keys.dtype
+    bits_type = _get_bits_type(key_type)
+    bits = get_buffer('radix_sort_bits', bits_type, n)
+    index = get_buffer('radix_sort_index', i32, n)
+    bits_out = get_buffer('radix_sort_bits_out', bits_type, n)
+    index_out = get_buffer('radix_sort_index_out', i32, n)
+    if isinstance(keys, ScalarField):
+        _load_field_keys(keys, bits, index, n, key_type, bits_type)
+    else:
+        _load_ndarray_keys(keys, bits, index, n, key_type, bits_type)
+    return _radix_passes(bits, index, bits_out, index_out, n,
+                         _ti_core.data_type_size(key_type) * 8)
+
+
+def _permute(arr, index, n):
+    """Reorders `arr` in place so that its i-th element becomes arr[index[i]]."""
+    tmp = get_buffer('radix_sort_permute', arr.dtype, n)
+    copy(arr, tmp, n)
+    if isinstance(arr, ScalarField):
+        _permute_to_field(arr, tmp, index, n)
+    else:
+        _permute_to_ndarray(arr, tmp, index, n)
+
+
+def radix_sort(keys, values=None):
+    """Sorts `keys` in ascending order in place, reordering `values` along with them.
+
+    The sort is a stable parallel LSD radix sort with 8 bits per pass. All its
+    kernels are launched without synchronizing with the host in between.
+
+    Args:
+        keys (Union[ScalarField, ScalarNdarray]): A 1-D dense field or ndarray of i32, u32, f32, i64, u64 or f64 keys.
+        values (Union[ScalarField, ScalarNdarray], optional): A 1-D field or ndarray with as many elements as `keys`.
+    """
+    n = get_length(keys, 'keys')
+    if values is not None and get_length(values, 'values') != n:
+        raise ValueError(
+            f'Mismatch length: {n} keys, but {values.shape[0]} values provided'
+        )
+    _get_bits_type(keys.dtype)
+    if n <= 1:
+        return
+    bits, index, _, _ = _sort_keys(keys, n)
+    if isinstance(keys, ScalarField):
+        _store_field_keys(keys, bits, n, keys.dtype, bits.dtype)
+    else:
+        _store_ndarray_keys(keys, bits, n, keys.dtype, bits.dtype)
+    if values is not None:
+        _permute(values, index, n)
+
+
+def segmented_sort(keys, segment_offsets, values=None):
+    """Sorts each segment of `keys` in ascending order in place, reordering `values` along with them.
+
+    Segment `s` consists of the keys in [segment_offsets[s], segment_offsets[s + 1]).
+    The segments must cover all the keys, i.e., segment_offsets[0] is 0 and
+    segment_offsets[-1] is the number of keys.
+
+    Args:
+        keys (Union[ScalarField, ScalarNdarray]): The keys, see :func:`radix_sort`.
+        segment_offsets (Union[numpy.ndarray, ScalarNdarray]): Non-decreasing 1-D integer offsets of the segments.
+        values (Union[ScalarField, ScalarNdarray], optional): A 1-D field or ndarray with as many elements as `keys`.
+    """
+    n = get_length(keys, 'keys')
+    if values is not None and get_length(values, 'values') != n:
+        raise ValueError(
+            f'Mismatch length: {n} keys, but {values.shape[0]} values provided'
+        )
+    if isinstance(segment_offsets, ScalarNdarray):
+        if segment_offsets.dtype != i32:
+            raise TypeError('segment_offsets must be an i32 ndarray')
+    else:
+        segment_offsets = np.ascontiguousarray(segment_offsets,
+                                               dtype=np.int32)
+    num_segments = segment_offsets.shape[0] - 1
+    if num_segments <= 1:
+        radix_sort(keys, values)
+        return
+    _get_bits_type(keys.dtype)
+    if n <= 1:
+        return
+    # Sort by key, then stably by segment
+    bits, index, bits_out, index_out = _sort_keys(keys, n)
+    segment_ids = get_buffer('segmented_sort_ids', i32, n)
+    _fill_segment_ids(segment_ids, segment_offsets, num_segments)
+    _permute_to_ndarray(bits, segment_ids, index, n)
+    _, index, _, _ = _radix_passes(bits, index, bits_out, index_out, n,
+                                   (num_segments - 1).bit_length())
+    _permute(keys, index, n)
+    if values is not None:
+        _permute(values, index, n)
+
+
+__all__ = ['radix_sort', 'segmented_sort']
@@ -8,6 +8,7 @@ from taichi.lang.enums import Layout
 from taichi.lang.exception import *
 from taichi.lang.field import *
 from taichi.lang.impl import *
+from taichi.lang.kernel_graph import *
 from taichi.lang.kernel_impl import *
 from taichi.lang.matrix import *
 from taichi.lang.mesh import *
@@ -25,8 +26,8 @@ from taichi import _logging, _snode
 __all__ = [
     s for s in dir() if not s.startswith('_') and s not in [
         'any_array', 'ast', 'common_ops', 'enums', 'exception', 'expr', 'impl',
-        'inspect', 'kernel_arguments', 'kernel_impl', 'matrix', 'mesh', 'misc',
-        'ops', 'platform', 'runtime_ops', 'shell', 'snode', 'source_builder',
-        'struct', 'tape', 'util'
+        'inspect', 'kernel_arguments', 'kernel_graph', 'kernel_impl', 'matrix',
+        'mesh', 'misc', 'ops', 'platform', 'runtime_ops', 'shell', 'snode',
+        'source_builder', 'struct', 'tape', 'util'
     ]
 ]
@@ -0,0 +1,335 @@
+"""Generates the patches and the metadata of a ti.Mesh from its cells.
+
+The cells are partitioned into patches along a Morton curve. Each patch owns
+its cells, and every lower-order element is owned by the patch with the
+smallest index among its cells. The elements of a patch are the ones it owns,
+followed by the ghost elements accessed through the relations of its owned
+elements. The global relations are computed once with vectorized NumPy; the
+patch-local mappings and relations are built by a pool of threads, each of
+which handles a contiguous range of patches. The sorts and gathers that
+dominate the work release the GIL, so the threads run mostly in parallel.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Local vertex indices of the edges and faces of a tetrahedron, and of the
+# edges of a triangle, matching the relation sizes assumed by the codegen
+_TET_EDGES = [[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]]
+_TET_FACES = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+_TRI_EDGES = [[0, 1], [1, 2], [2, 0]]
+
+# The number of elements of each type in a patch is padded to a multiple of
+# this for the block local storage
+_PATCH_ELEMENT_ALIGNMENT = 32
+# Meshes with fewer patches are handled in the calling thread
+_MIN_PATCHES_PER_WORKER = 64
+
+
+def _csr(rows, cols, num_rows):
+    order = np.argsort(rows, kind='stable')
+    offsets = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=offsets[1:])
+    return offsets, cols[order]
+
+
+def _unique(keys):
+    keys = np.sort(keys)
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+
+def _gather(relation, rows):
+    """Returns the index into `rows` and the value of each related element."""
+    offsets, values = relation
+    counts = offsets[rows + 1] - offsets[rows]
+    row_index = np.repeat(np.arange(len(rows)), counts)
+    ends = np.cumsum(counts)
+    index = np.arange(ends[-1] if len(ends) else 0) + np.repeat(
+        offsets[rows] - ends + counts, counts)
+    return row_index, values[index]
+
+
+def _unique_elements(sub_elements, num_verts):
+    """Deduplicates the sub-elements, given by their vertices, of the cells.
+
+    Each unique element keeps the vertex order of its first occurrence.
+    """
+    flat = sub_elements.reshape(-1, sub_elements.shape[-1])
+    vertices = np.sort(flat, axis=1)
+    if num_verts**flat.shape[1] >= 2**63:
+        _, first, inverse = np.unique(vertices,
+                                      axis=0,
+                                      return_index=True,
+                                      return_inverse=True)
+        return flat[first], inverse.reshape(sub_elements.shape[:-1])
+    # Sorting integer keys is much faster than sorting the rows
+    keys = vertices[:, 0]
+    for column in range(1, flat.shape[1]):
+        keys = keys * num_verts + vertices[:, column]
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    is_first = np.concatenate([[True], keys[1:] != keys[:-1]])
+    inverse = np.empty(len(keys), dtype=np.int64)
+    inverse[order] = np.cumsum(is_first) - 1
+    return flat[order[is_first]], inverse.reshape(sub_elements.shape[:-1])
+
+
+def _edge_keys(edges, num_verts):
+    edges = np.sort(edges, axis=-1)
+    return edges[..., 0] * num_verts + edges[..., 1]
+
+
+def _build_relations(num_verts, cells):
+    """Builds the global relations between all the pairs of element orders.
+
+    Returns the number of elements of each order and a dict mapping
+    `(from_order, to_order)` to the relation in the CSR format.
+    """
+    top = cells.shape[1] - 1
+    down = {}
+    if top == 3:
+        edges, down[3, 1] = _unique_elements(cells[:, _TET_EDGES], num_verts)
+        faces, down[3, 2] = _unique_elements(cells[:, _TET_FACES], num_verts)
+        down[3, 0] = cells
+        edge_keys = _edge_keys(edges, num_verts)
+        order = np.argsort(edge_keys)
+        face_edge_keys = _edge_keys(faces[:, _TRI_EDGES], num_verts)
+        down[2, 1] = order[np.searchsorted(edge_keys,
+                                           face_edge_keys,
+                                           sorter=order)]
+    else:
+        faces = cells
+        edges, down[2, 1] = _unique_elements(cells[:, _TRI_EDGES], num_verts)
+    down[2, 0] = faces
+    down[1, 0] = edges
+    num_elements = [num_verts, len(edges), len(faces), len(cells)][:top + 1]
+
+    relations = {}
+    for (from_order, to_order), value in down.items():
+        num_from, width = value.shape
+        relations[from_order, to_order] = (np.arange(0, num_from * width + 1,
+                                                     width), value.ravel())
+        relations[to_order, from_order] = _csr(
+            value.ravel(), np.repeat(np.arange(num_from), width),
+            num_elements[to_order])
+    # Vertices are neighbors if they share an edge, and the other elements
+    # if they share an element of the next lower order
+    edges = down[1, 0]
+    relations[0, 0] = _csr(np.concatenate([edges[:, 0], edges[:, 1]]),
+                           np.concatenate([edges[:, 1], edges[:, 0]]),
+                           num_verts)
+    for order in range(1, top + 1):
+        num = num_elements[order]
+        rows = np.repeat(np.arange(num), down[order, order - 1].shape[1])
+        index, neighbors = _gather(relations[order - 1, order],
+                                   down[order, order - 1].ravel())
+        rows = rows[index]
+        keys = _unique(rows[rows != neighbors] * num +
+                         neighbors[rows != neighbors])
+        relations[order, order] = _csr(keys // num, keys % num, num)
+    return num_elements, relations
+
+
+def _partition(verts, cells, patch_size):
+    """Assigns the cells to patches of `patch_size` along a Morton curve."""
+    centers = verts[cells].mean(axis=1)
+    lower = centers.min(axis=0)
+    extent = max((centers.max(axis=0) - lower).max(), 1e-30)
+    grid = ((centers - lower) / extent * 1023).astype(np.int64)
+    codes = np.zeros(len(cells), dtype=np.int64)
+    for bit in range(10):
+        for axis in range(grid.shape[1]):
+            codes |= ((grid[:, axis] >> bit) & 1) << (3 * bit + axis)
+    patches = np.empty(len(cells), dtype=np.int64)
+    patches[np.argsort(codes, kind='stable')] = np.arange(
+        len(cells)) // patch_size
+    return patches
+
+
+def _build_patches(context, begin, end):
+    """Builds the patch-local mappings and relations of a range of patches.
+
+    The relation offsets are relative to the first value of the range.
+    """
+    num_patches = end - begin
+    num_elements = context['num_elements']
+    relations = context['relations']
+    orders = range(len(num_elements))
+
+    owned = {}
+    for order in orders:
+        owned_offsets = context['owned_offsets'][order]
+        owned[order] = (np.repeat(
+            np.arange(num_patches),
+            np.diff(owned_offsets[begin:end + 1])), context['r2g'][order]
+                        [owned_offsets[begin]:owned_offsets[end]])
+
+    # Higher-order elements first, as the fixed relations of the ghost
+    # elements also need to be local
+    local = {}
+    # The sorted keys of the local elements, with their local indices
+    local_keys = {}
+    for order in reversed(orders):
+        patches, elements = [owned[order][0]], [owned[order][1]]
+        for from_order in orders:
+            rows = local[from_order] if from_order > order else owned[
+                from_order]
+            index, related = _gather(relations[from_order, order], rows[1])
+            patches.append(rows[0][index])
+            elements.append(related)
+        keys = _unique(
+            np.concatenate(patches) * num_elements[order] +
+            np.concatenate(elements))
+        patches, elements = keys // num_elements[order], keys % num_elements[
+            order]
+        # The owned elements come first, in the reordered order
+        is_ghost = context['owner'][order][elements] != patches + begin
+        sort = np.lexsort(
+            (context['g2r'][order][elements], is_ghost, patches))
+        local[order] = (patches[sort], elements[sort])
+        counts = np.bincount(patches, minlength=num_patches)
+        local_index = np.empty(len(keys), dtype=np.int64)
+        local_index[sort] = np.arange(len(keys)) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        local_keys[order] = (keys, local_index)
+
+    def to_local(order, patches, elements):
+        keys, local_index = local_keys[order]
+        return local_index[np.searchsorted(
+            keys, patches * num_elements[order] + elements)]
+
+    result = {'elements': {}, 'relations': {}}
+    for order in orders:
+        result['elements'][order] = (local[order][1],
+                                     np.bincount(local[order][0],
+                                                 minlength=num_patches))
+    for from_order in orders:
+        for to_order in orders:
+            if from_order > to_order:
+                rows = local[from_order]
+            else:
+                rows = owned[from_order]
+            index, related = _gather(relations[from_order, to_order], rows[1])
+            value = to_local(to_order, rows[0][index], related)
+            offset = None
+            if from_order <= to_order:
+                # Each patch has an offset for each of its owned elements,
+                # followed by the end of its values
+                ends = np.zeros(len(rows[1]) + 1, dtype=np.int64)
+                np.cumsum(np.bincount(index, minlength=len(rows[1])),
+                          out=ends[1:])
+                counts = np.bincount(rows[0], minlength=num_patches) + 1
+                offset = ends[np.arange(counts.sum()) -
+                              np.repeat(np.arange(num_patches), counts)]
+            result['relations'][from_order, to_order] = (value, offset)
+    return result
+
+
+def _split(num_patches, num_workers):
+    if num_workers <= 1 or num_patches < 2 * _MIN_PATCHES_PER_WORKER:
+        return [(0, num_patches)]
+    num_ranges = min(4 * num_workers,
+                     num_patches // _MIN_PATCHES_PER_WORKER)
+    bounds = np.linspace(0, num_patches, num_ranges + 1).astype(np.int64)
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def build_metadata(verts, cells, patch_size, num_workers=None):
+    """Builds the mesh metadata in the layout of the JSON metadata files.
+
+    Args:
+        verts (numpy.ndarray): float64 positions of the vertices, of shape
+            (n, 3).
+        cells (numpy.ndarray): int64 vertex indices of the tetrahedra, of shape
+            (m, 4), or of the triangles, of shape (m, 3).
+        patch_size (int): the number of cells in each patch.
+        num_workers (int, optional): the number of threads building the
+            patches. Defaults to the number of CPUs.
+
+    Returns:
+        dict: the metadata, with NumPy arrays.
+    """
+    num_verts = len(verts)
+    num_elements, relations = _build_relations(num_verts, cells)
+    top = len(num_elements) - 1
+    num_patches = (len(cells) + patch_size - 1) // patch_size
+
+    owner = {top: _partition(verts, cells, patch_size)}
+    for order in range(top):
+        offsets, values = relations[order, top]
+        nonempty = np.diff(offsets) > 0
+        # Vertices outside of all the cells are owned by the first patch
+        owner[order] = np.zeros(num_elements[order], dtype=np.int64)
+        if nonempty.any():
+            owner[order][nonempty] = np.minimum.reduceat(
+                owner[top][values], offsets[:-1][nonempty])
+    context = {
+        'num_elements': num_elements,
+        'relations': relations,
+        'owner': owner,
+        'owned_offsets': {},
+        'r2g': {},
+        'g2r': {},
+    }
+    for order, num in enumerate(num_elements):
+        r2g = np.argsort(owner[order], kind='stable')
+        g2r = np.empty(num, dtype=np.int64)
+        g2r[r2g] = np.arange(num)
+        owned_offsets = np.zeros(num_patches + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner[order], minlength=num_patches),
+                  out=owned_offsets[1:])
+        context['owned_offsets'][order] = owned_offsets
+        context['r2g'][order] = r2g
+        context['g2r'][order] = g2r
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    ranges = _split(num_patches, num_workers)
+    if len(ranges) == 1:
+        results = [_build_patches(context, *ranges[0])]
+    else:
+        with ThreadPoolExecutor(num_workers) as pool:
+            results = list(
+                pool.map(lambda r: _build_patches(context, *r), ranges))
+
+    elements = []
+    for order, num in enumerate(num_elements):
+        l2g = np.concatenate([r['elements'][order][0] for r in results])
+        counts = np.concatenate([r['elements'][order][1] for r in results])
+        total_offsets = np.zeros(num_patches + 1, dtype=np.int64)
+        np.cumsum(counts, out=total_offsets[1:])
+        max_num = max(int(counts.max()), 1)
+        elements.append({
+            'order': order,
+            'num': num,
+            'max_num_per_patch':
+            -(-max_num // _PATCH_ELEMENT_ALIGNMENT) *
+            _PATCH_ELEMENT_ALIGNMENT,
+            'owned_offsets': context['owned_offsets'][order],
+            'total_offsets': total_offsets,
+            'l2g_mapping': l2g,
+            'l2r_mapping': context['g2r'][order][l2g],
+            'g2r_mapping': context['g2r'][order],
+        })
+
+    relations = []
+    for from_order in range(top + 1):
+        for to_order in range(top + 1):
+            relation = {'from_order': from_order, 'to_order': to_order}
+            parts = [r['relations'][from_order, to_order] for r in results]
+            relation['value'] = np.concatenate([value for value, _ in parts])
+            if from_order <= to_order:
+                bases = np.cumsum([0] + [len(value) for value, _ in parts])
+                relation['offset'] = np.concatenate(
+                    [offset + base for (_, offset), base in zip(parts, bases)])
+            relations.append(relation)
+
+    return {
+        'num_patches': num_patches,
+        'elements': elements,
+        'relations': relations,
+        'attrs': {
+            'x': verts.ravel()
+        },
+    }
@@ -2,7 +2,8 @@ import numpy as np
 from taichi._lib import core as _ti_core
 from taichi.lang import impl
 from taichi.lang.enums import Layout
-from taichi.lang.util import (cook_dtype, has_pytorch, python_scope,
+from taichi.lang.util import (check_batch_values, check_numpy_out, cook_dtype,
+                              has_pytorch, python_scope, to_index_array,
                               to_numpy_type, to_pytorch_type)
 from taichi.types import primitive_types
 
@@ -96,39 +97,61 @@ class Ndarray:
         else:
             self._fill_by_kernel(val)
 
-    def _ndarray_to_numpy(self):
+    def _ndarray_to_numpy(self, out=None):
         """Converts ndarray to a numpy array.
 
+        Args:
+            out (numpy.ndarray, optional): A preallocated array to write into.
+
         Returns:
             numpy.ndarray: The result numpy array.
         """
+        if out is not None:
+            check_numpy_out(out, self.arr.shape)
         if self.ndarray_use_torch:
-            return self.arr.cpu().numpy()
-
-        arr = np.zeros(shape=self.arr.shape, dtype=to_numpy_type(self.dtype))
+            if out is None:
+                return self.arr.cpu().numpy()
+            out[...] = self.arr.cpu().numpy()
+            return out
+
+        arr = out
+        if arr is None:
+            arr = np.empty(shape=self.arr.shape,
+                           dtype=to_numpy_type(self.dtype))
         from taichi._kernels import ndarray_to_ext_arr  # pylint: disable=C0415
         ndarray_to_ext_arr(self, arr)
         impl.get_runtime().sync()
         return arr
 
-    def _ndarray_matrix_to_numpy(self, as_vector):
+    def _ndarray_matrix_to_numpy(self, as_vector, out=None):
         """Converts matrix ndarray to a numpy array.
 
+        Args:
+            out (numpy.ndarray, optional): A preallocated array to write into.
+
         Returns:
             numpy.ndarray: The result numpy array.
         """
+        if out is not None:
+            check_numpy_out(out, self.arr.shape)
         if self.ndarray_use_torch:
-            return self.arr.cpu().numpy()
-
-        arr = np.zeros(shape=self.arr.shape, dtype=to_numpy_type(self.dtype))
+            if out is None:
+                return self.arr.cpu().numpy()
+            out[...] = self.arr.cpu().numpy()
+            return out
+
+        arr = out
+        if arr is None:
+            arr = np.empty(shape=self.arr.shape,
+                           dtype=to_numpy_type(self.dtype))
         from taichi._kernels import \
             ndarray_matrix_to_ext_arr  # pylint: disable=C0415
         ndarray_matrix_to_ext_arr(self, arr, as_vector)
         impl.get_runtime().sync()
         return arr
 
-    def _ndarray_from_numpy(self, arr):
-        """Loads all values from a numpy array.
+    def _check_numpy_source(self, arr):
+        """Checks that a numpy array can be loaded into the ndarray.
 
         Args:
             arr (numpy.ndarray): The source numpy array.
@@ -139,6 +162,16 @@ class Ndarray:
             raise ValueError(
                 f"Mismatch shape: {tuple(self.arr.shape)} expected, but {tuple(arr.shape)} provided"
             )
+
+    def _ndarray_from_numpy(self, arr, check=True):
+        """Loads all values from a numpy array.
+
+        Args:
+            arr (numpy.ndarray): The source numpy array.
+            check (bool, optional): Whether to validate the type and the shape of `arr`.
+        """
+        if check:
+            self._check_numpy_source(arr)
         if self.ndarray_use_torch:
             self.arr = torch.from_numpy(arr).to(self.arr.dtype)  # pylint: disable=E1101
             if impl.current_cfg().arch == _ti_core.Arch.cuda:
@@ -152,18 +185,15 @@ class Ndarray:
             ext_arr_to_ndarray(arr, self)
             impl.get_runtime().sync()
 
-    def _ndarray_matrix_from_numpy(self, arr, as_vector):
+    def _ndarray_matrix_from_numpy(self, arr, as_vector, check=True):
         """Loads all values from a numpy array.
 
         Args:
             arr (numpy.ndarray): The source numpy array.
+            check (bool, optional): Whether to validate the type and the shape of `arr`.
         """
-        if not isinstance(arr, np.ndarray):
-            raise TypeError(f"{np.ndarray} expected, but {type(arr)} provided")
-        if tuple(self.arr.shape) != tuple(arr.shape):
-            raise ValueError(
-                f"Mismatch shape: {tuple(self.arr.shape)} expected, but {tuple(arr.shape)} provided"
-            )
+        if check:
+            self._check_numpy_source(arr)
         if self.ndarray_use_torch:
             self.arr = torch.from_numpy(arr).to(self.arr.dtype)  # pylint: disable=E1101
             if impl.current_cfg().arch == _ti_core.Arch.cuda:
@@ -177,6 +207,57 @@ class Ndarray:
             ext_arr_to_ndarray_matrix(arr, self, as_vector)
             impl.get_runtime().sync()
 
+    @python_scope
+    def gather(self, indices):
+        """Reads a batch of elements in a single kernel launch.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements, of shape (N, len(self.shape)). Shape (N, ) is also accepted for 1-D ndarrays.
+
+        Returns:
+            numpy.ndarray: The values of the elements, of shape (N, ) + self.element_shape.
+        """
+        dim = len(self.shape)
+        indices = to_index_array(indices, dim)
+        element_shape = tuple(self.element_shape)
+        out = np.empty((indices.shape[0], ) + element_shape,
+                       dtype=to_numpy_type(self.dtype))
+        if element_shape:
+            from taichi._kernels import \
+                ndarray_matrix_gather  # pylint: disable=C0415
+            ndarray_matrix_gather(self, indices, out, dim,
+                                  len(element_shape) == 1)
+        else:
+            from taichi._kernels import ndarray_gather  # pylint: disable=C0415
+            ndarray_gather(self, indices, out, dim)
+        impl.get_runtime().sync()
+        return out
+
+    @python_scope
+    def scatter(self, indices, values):
+        """Writes a batch of elements in a single kernel launch.
+
+        When an index appears multiple times, which of the values is written is unspecified.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements, see :meth:`gather`.
+            values (numpy.ndarray): The values to write, of shape (N, ) + self.element_shape.
+        """
+        dim = len(self.shape)
+        indices = to_index_array(indices, dim)
+        element_shape = tuple(self.element_shape)
+        values = check_batch_values(values, indices.shape[0], element_shape)
+        if element_shape:
+            from taichi._kernels import \
+                ndarray_matrix_scatter  # pylint: disable=C0415
+            ndarray_matrix_scatter(self, indices, values, dim,
+                                   len(element_shape) == 1)
+        else:
+            from taichi._kernels import \
+                ndarray_scatter  # pylint: disable=C0415
+            ndarray_scatter(self, indices, values, dim)
+        impl.get_runtime().sync()
+
     @python_scope
     def _get_element_size(self):
         """Returns the size of one element in bytes.
@@ -272,12 +353,12 @@ class ScalarNdarray(Ndarray):
         return self.host_accessor.getter(*self._pad_key(key))
 
     @python_scope
-    def to_numpy(self):
-        return self._ndarray_to_numpy()
+    def to_numpy(self, out=None):
+        return self._ndarray_to_numpy(out)
 
     @python_scope
-    def from_numpy(self, arr):
-        self._ndarray_from_numpy(arr)
+    def from_numpy(self, arr, check=True):
+        self._ndarray_from_numpy(arr, check)
 
     def __deepcopy__(self, memo=None):
         ret_arr = ScalarNdarray(self.dtype, self.shape)
@@ -297,21 +378,26 @@ class NdarrayHostAccessor:
         if _ti_core.is_real(ndarray.dtype):
 
             def getter(*key):
+                impl.check_not_recording_kernel_graph()
                 return ndarray.read_float(key)
 
             def setter(value, *key):
+                impl.check_not_recording_kernel_graph()
                 ndarray.write_float(key, value)
         else:
             if _ti_core.is_signed(ndarray.dtype):
 
                 def getter(*key):
+                    impl.check_not_recording_kernel_graph()
                     return ndarray.read_int(key)
             else:
 
                 def getter(*key):
+                    impl.check_not_recording_kernel_graph()
                     return ndarray.read_uint(key)
 
             def setter(value, *key):
+                impl.check_not_recording_kernel_graph()
                 ndarray.write_int(key, value)
 
         self.getter = getter
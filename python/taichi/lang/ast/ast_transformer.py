@@ -1,5 +1,6 @@
 import ast
 import collections.abc
+import numbers
 import warnings
 from collections import ChainMap
 from sys import version_info
@@ -426,8 +427,10 @@ class ASTTransformer(Builder):
                     ctx.create_variable(arg.arg, ctx.global_vars[arg.arg])
                 elif isinstance(ctx.func.argument_annotations[i],
                                 linalg.sparse_matrix_builder):
-                    ctx.create_variable(arg.arg,
-                                        kernel_arguments.decl_sparse_matrix())
+                    ctx.create_variable(
+                        arg.arg,
+                        kernel_arguments.decl_sparse_matrix(
+                            ctx.func.argument_annotations[i].dtype))
                 elif isinstance(ctx.func.argument_annotations[i],
                                 annotations.any_arr):
                     ctx.create_variable(
@@ -769,6 +772,47 @@ class ASTTransformer(Builder):
                         ctx.set_loop_status(LoopStatus.Normal)
         return None
 
+    @staticmethod
+    def get_loop_index_type(*bounds):
+        """Range-fors on CPU use 64-bit loop indices if any of their bounds is
+        a 64-bit integer or a Python integer out of the range of i32."""
+        if impl.default_cfg().arch not in (_ti_core.x64, _ti_core.arm64):
+            return primitive_types.i32
+        for bound in bounds:
+            if isinstance(bound, expr.Expr):
+                if bound.ptr.get_ret_type() in (primitive_types.i64,
+                                                primitive_types.u64):
+                    return primitive_types.i64
+            elif isinstance(bound, numbers.Integral):
+                if not -2**31 <= bound < 2**31:
+                    return primitive_types.i64
+        return primitive_types.i32
+
+    @staticmethod
+    def cast_loop_bound(bound, index_type):
+        if isinstance(bound, numbers.Integral):
+            bound = expr.Expr(bound, dtype=index_type)
+        return ti_ops.cast(expr.Expr(bound), index_type)
+
+    @staticmethod
+    def get_ndrange_loop_bounds(ndrange_var):
+        """Returns the loop index type of an ndrange, with its accumulated
+        dimensions and the beginning of each axis in that type."""
+        acc_dimensions = list(ndrange_var.acc_dimensions)
+        begins = [bound[0] for bound in ndrange_var.bounds]
+        ends = [bound[1] for bound in ndrange_var.bounds]
+        index_type = ASTTransformer.get_loop_index_type(
+            acc_dimensions[0], *begins, *ends)
+        if index_type == primitive_types.i64:
+            acc_dimensions = [
+                ASTTransformer.cast_loop_bound(d, index_type)
+                for d in acc_dimensions
+            ]
+            begins = [
+                ASTTransformer.cast_loop_bound(b, index_type) for b in begins
+            ]
+        return index_type, acc_dimensions, begins
+
     @staticmethod
     def build_range_for(ctx, node):
         with ctx.variable_scope_guard():
@@ -781,17 +825,14 @@ class ASTTransformer(Builder):
                     f"Range should have 1 or 2 arguments, found {len(node.iter.args)}"
                 )
             if len(node.iter.args) == 2:
-                begin = ti_ops.cast(
-                    expr.Expr(build_stmt(ctx, node.iter.args[0])),
-                    primitive_types.i32)
-                end = ti_ops.cast(
-                    expr.Expr(build_stmt(ctx, node.iter.args[1])),
-                    primitive_types.i32)
+                begin = build_stmt(ctx, node.iter.args[0])
+                end = build_stmt(ctx, node.iter.args[1])
             else:
-                begin = ti_ops.cast(expr.Expr(0), primitive_types.i32)
-                end = ti_ops.cast(
-                    expr.Expr(build_stmt(ctx, node.iter.args[0])),
-                    primitive_types.i32)
+                begin = 0
+                end = build_stmt(ctx, node.iter.args[0])
+            index_type = ASTTransformer.get_loop_index_type(begin, end)
+            begin = ASTTransformer.cast_loop_bound(begin, index_type)
+            end = ASTTransformer.cast_loop_bound(end, index_type)
             ctx.ast_builder.begin_frontend_range_for(loop_var.ptr, begin.ptr,
                                                      end.ptr)
             build_stmts(ctx, node.body)
@@ -802,10 +843,11 @@ class ASTTransformer(Builder):
     def build_ndrange_for(ctx, node):
         with ctx.variable_scope_guard():
             ndrange_var = impl.expr_init(build_stmt(ctx, node.iter))
-            ndrange_begin = ti_ops.cast(expr.Expr(0), primitive_types.i32)
-            ndrange_end = ti_ops.cast(
-                expr.Expr(impl.subscript(ndrange_var.acc_dimensions, 0)),
-                primitive_types.i32)
+            index_type, acc_dimensions, begins = \
+                ASTTransformer.get_ndrange_loop_bounds(ndrange_var)
+            ndrange_begin = ASTTransformer.cast_loop_bound(0, index_type)
+            ndrange_end = ASTTransformer.cast_loop_bound(
+                acc_dimensions[0], index_type)
             ndrange_loop_var = expr.Expr(_ti_core.make_id_expr(''))
             ctx.ast_builder.begin_frontend_range_for(ndrange_loop_var.ptr,
                                                      ndrange_begin.ptr,
@@ -814,17 +856,13 @@ class ASTTransformer(Builder):
             targets = ASTTransformer.get_for_loop_targets(node)
             for i, target in enumerate(targets):
                 if i + 1 < len(targets):
-                    target_tmp = impl.expr_init(
-                        I // ndrange_var.acc_dimensions[i + 1])
+                    target_tmp = impl.expr_init(I // acc_dimensions[i + 1])
                 else:
                     target_tmp = impl.expr_init(I)
-                ctx.create_variable(
-                    target,
-                    impl.expr_init(target_tmp + impl.subscript(
-                        impl.subscript(ndrange_var.bounds, i), 0)))
+                ctx.create_variable(target,
+                                    impl.expr_init(target_tmp + begins[i]))
                 if i + 1 < len(targets):
-                    I._assign(I -
-                              target_tmp * ndrange_var.acc_dimensions[i + 1])
+                    I._assign(I - target_tmp * acc_dimensions[i + 1])
             build_stmts(ctx, node.body)
             ctx.ast_builder.end_frontend_range_for()
         return None
@@ -833,10 +871,11 @@ class ASTTransformer(Builder):
     def build_grouped_ndrange_for(ctx, node):
         with ctx.variable_scope_guard():
             ndrange_var = impl.expr_init(build_stmt(ctx, node.iter.args[0]))
-            ndrange_begin = ti_ops.cast(expr.Expr(0), primitive_types.i32)
-            ndrange_end = ti_ops.cast(
-                expr.Expr(impl.subscript(ndrange_var.acc_dimensions, 0)),
-                primitive_types.i32)
+            index_type, acc_dimensions, begins = \
+                ASTTransformer.get_ndrange_loop_bounds(ndrange_var)
+            ndrange_begin = ASTTransformer.cast_loop_bound(0, index_type)
+            ndrange_end = ASTTransformer.cast_loop_bound(
+                acc_dimensions[0], index_type)
             ndrange_loop_var = expr.Expr(_ti_core.make_id_expr(''))
             ctx.ast_builder.begin_frontend_range_for(ndrange_loop_var.ptr,
                                                      ndrange_begin.ptr,
@@ -850,19 +889,17 @@ class ASTTransformer(Builder):
             target = targets[0]
             target_var = impl.expr_init(
                 matrix.Vector([0] * len(ndrange_var.dimensions),
-                              dt=primitive_types.i32))
+                              dt=index_type))
             ctx.create_variable(target, target_var)
             I = impl.expr_init(ndrange_loop_var)
             for i in range(len(ndrange_var.dimensions)):
                 if i + 1 < len(ndrange_var.dimensions):
-                    target_tmp = I // ndrange_var.acc_dimensions[i + 1]
+                    target_tmp = I // acc_dimensions[i + 1]
                 else:
                     target_tmp = I
-                impl.subscript(target_var, i)._assign(target_tmp +
-                                                      ndrange_var.bounds[i][0])
+                impl.subscript(target_var, i)._assign(target_tmp + begins[i])
                 if i + 1 < len(ndrange_var.dimensions):
-                    I._assign(I -
-                              target_tmp * ndrange_var.acc_dimensions[i + 1])
+                    I._assign(I - target_tmp * acc_dimensions[i + 1])
             build_stmts(ctx, node.body)
             ctx.ast_builder.end_frontend_range_for()
         return None
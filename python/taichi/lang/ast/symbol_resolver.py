@@ -1,5 +1,6 @@
 """Provides helpers to resolve AST nodes."""
 import ast
+from collections.abc import Mapping
 
 
 class ASTResolver:
@@ -15,7 +16,7 @@ class ASTResolver:
         Args:
             node (Union[ast.Attribute, ast.Name]): an AST node to be resolved.
             wanted (Any): The expected python object.
-            scope (Dict[str, Any]): Maps from symbol names to objects, for
+            scope (Mapping[str, Any]): Maps from symbol names to objects, for
                 example, globals()
 
         Returns:
@@ -43,7 +44,7 @@ class ASTResolver:
 
         for attr in reversed(chain):
             try:
-                if isinstance(scope, dict):
+                if isinstance(scope, Mapping):
                     scope = scope[attr]
                 else:
                     scope = getattr(scope, attr)
@@ -1,6 +1,11 @@
+import itertools
+
 import taichi.lang
 from taichi._lib import core as _ti_core
-from taichi.lang.util import python_scope, to_numpy_type, to_pytorch_type
+from taichi.lang.exception import TaichiRuntimeError
+from taichi.lang.util import (check_batch_values, check_numpy_out,
+                              python_scope, to_index_array, to_numpy_type,
+                              to_pytorch_type)
 
 
 class Field:
@@ -100,17 +105,35 @@ class Field:
         raise NotImplementedError()
 
     @python_scope
-    def to_numpy(self, dtype=None):
+    def to_numpy(self, dtype=None, copy=True, out=None):
         """Converts `self` to a numpy array.
 
         Args:
             dtype (DataType, optional): The desired data type of returned numpy array.
+            copy (bool, optional): When False, returns a view of the field memory if possible (see :meth:`numpy_view`), and a copy otherwise.
+            out (numpy.ndarray, optional): A preallocated C-contiguous array to write the result into. Values are converted to its data type.
 
         Returns:
             numpy.ndarray: The result numpy array.
         """
         raise NotImplementedError()
 
+    @python_scope
+    def numpy_view(self):
+        """Gets a numpy array sharing memory with `self`.
+
+        Writes through the array are visible to subsequent kernels and vice versa.
+        Kernels launched after the view is created may still be running
+        asynchronously, call :func:`ti.sync` before reading the view again.
+
+        Only fields under dense SNodes on the CPU backends can be viewed.
+        The SNode tree of `self` cannot be destroyed while the view is alive.
+
+        Returns:
+            numpy.ndarray: The view.
+        """
+        raise NotImplementedError()
+
     @python_scope
     def to_torch(self, device=None):
         """Converts `self` to a torch tensor.
@@ -124,13 +147,39 @@ class Field:
         raise NotImplementedError()
 
     @python_scope
-    def from_numpy(self, arr):
+    def from_numpy(self, arr, check=True):
         """Loads all elements from a numpy array.
 
         The shape of the numpy array needs to be the same as `self`.
+        Values are converted to the data type of `self` while being copied.
 
         Args:
             arr (numpy.ndarray): The source numpy array.
+            check (bool, optional): Whether to validate the shape of `arr`. Disable it only when the caller guarantees the shape.
+        """
+        raise NotImplementedError()
+
+    @python_scope
+    def gather(self, indices):
+        """Reads a batch of elements in a single kernel launch.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements, of shape (N, len(self.shape)). Shape (N, ) is also accepted for 1-D fields.
+
+        Returns:
+            numpy.ndarray: The values of the elements, the i-th of which is `self[indices[i]]`.
+        """
+        raise NotImplementedError()
+
+    @python_scope
+    def scatter(self, indices, values):
+        """Writes a batch of elements in a single kernel launch.
+
+        When an index appears multiple times, which of the values is written is unspecified.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements, see :meth:`gather`.
+            values (numpy.ndarray): The values to write, the i-th of which goes to `self[indices[i]]`.
         """
         raise NotImplementedError()
 
@@ -210,6 +259,76 @@ class Field:
     def host_access(self, key):
         return [SNodeHostAccess(e, key) for e in self.host_accessors]
 
+    def _is_dense(self):
+        """Checks whether every cell of `self` is always active.
+
+        Returns:
+            bool: False if any field member is under a sparse SNode.
+        """
+        sparse_types = (_ti_core.SNodeType.pointer,
+                        _ti_core.SNodeType.bitmasked,
+                        _ti_core.SNodeType.dynamic, _ti_core.SNodeType.hash)
+        for var in self.vars:
+            node = var.ptr.snode()
+            while node is not None:
+                if node.type in sparse_types:
+                    return False
+                node = node.parent
+        return True
+
+    def _get_memory_layout(self):
+        """Gets the layout of `self` in the root buffer of its SNode tree.
+
+        Returns:
+            Union[None, Tuple[int, List[int], Tuple[int]]]: The SNode tree id, the byte offset of each field member and the byte strides along the field axes, or None if `self` is not a strided array in memory.
+        """
+        if taichi.lang.impl.current_cfg().arch not in (_ti_core.x64,
+                                                       _ti_core.arm64):
+            return None
+        if _ti_core.is_custom_type(self.dtype):
+            return None
+        tree_id = None
+        strides = None
+        offsets = []
+        for var in self.vars:
+            layout = _get_place_layout(var.ptr.snode(), len(self.shape))
+            if layout is None:
+                return None
+            if strides is None:
+                tree_id, _, strides = layout
+            elif layout[0] != tree_id or layout[2] != strides:
+                return None
+            offsets.append(layout[1])
+        return tree_id, offsets, strides
+
+    def _make_numpy_view(self, element_shape):
+        """Creates a numpy array aliasing the memory of `self`.
+
+        Args:
+            element_shape (Tuple[int]): Shape of each element, whose entries are the field members in row-major order.
+
+        Returns:
+            Union[None, numpy.ndarray]: The view, or None if `self` cannot be viewed.
+        """
+        taichi.lang.impl.check_not_recording_kernel_graph()
+        runtime = taichi.lang.impl.get_runtime()
+        runtime.sync()
+        layout = self._get_memory_layout()
+        if layout is None:
+            return None
+        tree_id, offsets, strides = layout
+        element_strides = _get_element_strides(offsets, element_shape)
+        if element_strides is None:
+            return None
+        base = runtime.prog.get_snode_tree_host_ptr(tree_id)
+        memory = _SNodeMemory(runtime.prog, tree_id, base + offsets[0],
+                              self.shape + element_shape,
+                              strides + element_strides,
+                              to_numpy_type(self.dtype))
+        runtime.numpy_views.add(memory)
+        import numpy as np  # pylint: disable=C0415
+        return np.asarray(memory)
+
 
 class ScalarField(Field):
     """Taichi scalar field with SNode implementation.
@@ -226,16 +345,37 @@ class ScalarField(Field):
         fill_tensor(self, val)
 
     @python_scope
-    def to_numpy(self, dtype=None):
-        if dtype is None:
-            dtype = to_numpy_type(self.dtype)
+    def to_numpy(self, dtype=None, copy=True, out=None):
         import numpy as np  # pylint: disable=C0415
-        arr = np.zeros(shape=self.shape, dtype=dtype)
+        if out is not None:
+            check_numpy_out(out, self.shape, dtype)
+            arr = out
+            if not self._is_dense():
+                arr.fill(0)
+        else:
+            if dtype is None:
+                dtype = to_numpy_type(self.dtype)
+            if not copy and np.dtype(dtype) == to_numpy_type(self.dtype):
+                arr = self._make_numpy_view(())
+                if arr is not None:
+                    return arr
+            # Cells of sparse fields that are not active are not written
+            alloc = np.empty if self._is_dense() else np.zeros
+            arr = alloc(shape=self.shape, dtype=dtype)
         from taichi._kernels import tensor_to_ext_arr  # pylint: disable=C0415
         tensor_to_ext_arr(self, arr)
         taichi.lang.runtime_ops.sync()
         return arr
 
+    @python_scope
+    def numpy_view(self):
+        arr = self._make_numpy_view(())
+        if arr is None:
+            raise TaichiRuntimeError(
+                'Only fields under dense SNodes on CPU can be viewed as numpy arrays'
+            )
+        return arr
+
     @python_scope
     def to_torch(self, device=None):
         import torch  # pylint: disable=C0415
@@ -250,20 +390,40 @@ class ScalarField(Field):
         return arr
 
     @python_scope
-    def from_numpy(self, arr):
-        if len(self.shape) != len(arr.shape):
-            raise ValueError(f"ti.field shape {self.shape} does not match"
-                             f" the numpy array shape {arr.shape}")
-        for i, _ in enumerate(self.shape):
-            if self.shape[i] != arr.shape[i]:
+    def from_numpy(self, arr, check=True):
+        if check:
+            if len(self.shape) != len(arr.shape):
                 raise ValueError(f"ti.field shape {self.shape} does not match"
                                  f" the numpy array shape {arr.shape}")
+            for i, _ in enumerate(self.shape):
+                if self.shape[i] != arr.shape[i]:
+                    raise ValueError(
+                        f"ti.field shape {self.shape} does not match"
+                        f" the numpy array shape {arr.shape}")
         if hasattr(arr, 'contiguous'):
             arr = arr.contiguous()
         from taichi._kernels import ext_arr_to_tensor  # pylint: disable=C0415
         ext_arr_to_tensor(arr, self)
         taichi.lang.runtime_ops.sync()
 
+    @python_scope
+    def gather(self, indices):
+        indices = to_index_array(indices, len(self.shape))
+        import numpy as np  # pylint: disable=C0415
+        out = np.empty(indices.shape[0], dtype=to_numpy_type(self.dtype))
+        from taichi._kernels import field_gather  # pylint: disable=C0415
+        field_gather(self, indices, out)
+        taichi.lang.runtime_ops.sync()
+        return out
+
+    @python_scope
+    def scatter(self, indices, values):
+        indices = to_index_array(indices, len(self.shape))
+        values = check_batch_values(values, indices.shape[0], ())
+        from taichi._kernels import field_scatter  # pylint: disable=C0415
+        field_scatter(self, indices, values)
+        taichi.lang.runtime_ops.sync()
+
     @python_scope
     def __setitem__(self, key, value):
         self.initialize_host_accessors()
@@ -279,30 +439,94 @@ class ScalarField(Field):
         return '<ti.field>'
 
 
+class _SNodeMemory:
+    """A strided region of SNode memory exposed through the numpy array interface.
+
+    Holding the program keeps the memory alive even after ``ti.reset()``.
+    """
+    def __init__(self, prog, tree_id, address, shape, strides, dtype):
+        import numpy as np  # pylint: disable=C0415
+        self.prog = prog
+        self.tree_id = tree_id
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': shape,
+            'strides': strides,
+            'typestr': np.dtype(dtype).str,
+            'data': (address, False),
+        }
+
+
+def _get_place_layout(place, dim):
+    """Gets the offset and the strides of a place SNode in its root buffer.
+
+    Every ancestor must be dense, and each axis may only be split by one of them.
+
+    Returns:
+        Union[None, Tuple[int, int, Tuple[int]]]: The SNode tree id, the byte offset of the first element and the byte strides along each axis.
+    """
+    physical_index_position = place.get_physical_index_position()
+    strides = [None] * dim
+    offset = place.offset_bytes_in_parent_cell
+    node = place.parent
+    while node.type != _ti_core.SNodeType.root:
+        if node.type != _ti_core.SNodeType.dense:
+            return None
+        for k in range(dim):
+            i = physical_index_position[k]
+            if node.get_extractor_shape(i) > 1:
+                if strides[k] is not None:
+                    return None
+                strides[k] = node.get_extractor_acc_shape(
+                    i) * node.cell_size_bytes
+        offset += node.offset_bytes_in_parent_cell
+        node = node.parent
+    return node.get_snode_tree_id(), offset, tuple(s or 0 for s in strides)
+
+
+def _get_element_strides(offsets, element_shape):
+    """Gets the byte strides along the element axes if the field members are evenly spaced."""
+    strides = []
+    step = len(offsets)
+    for n in element_shape:
+        step //= n
+        strides.append(offsets[step] - offsets[0] if n > 1 else 0)
+    indices = itertools.product(*(range(n) for n in element_shape))
+    for offset, index in zip(offsets, indices):
+        if offset != offsets[0] + sum(i * s for i, s in zip(index, strides)):
+            return None
+    return tuple(strides)
+
+
 class SNodeHostAccessor:
     def __init__(self, snode):
         if _ti_core.is_real(snode.data_type()):
 
             def getter(*key):
+                taichi.lang.impl.check_not_recording_kernel_graph()
                 assert len(key) == _ti_core.get_max_num_indices()
                 return snode.read_float(key)
 
             def setter(value, *key):
+                taichi.lang.impl.check_not_recording_kernel_graph()
                 assert len(key) == _ti_core.get_max_num_indices()
                 snode.write_float(key, value)
         else:
             if _ti_core.is_signed(snode.data_type()):
 
                 def getter(*key):
+                    taichi.lang.impl.check_not_recording_kernel_graph()
                     assert len(key) == _ti_core.get_max_num_indices()
                     return snode.read_int(key)
             else:
 
                 def getter(*key):
+                    taichi.lang.impl.check_not_recording_kernel_graph()
                     assert len(key) == _ti_core.get_max_num_indices()
                     return snode.read_uint(key)
 
             def setter(value, *key):
+                taichi.lang.impl.check_not_recording_kernel_graph()
                 assert len(key) == _ti_core.get_max_num_indices()
                 snode.write_int(key, value)
 
@@ -1,4 +1,5 @@
 import numbers
+import weakref
 from types import FunctionType, MethodType
 from typing import Iterable
 
@@ -269,6 +270,8 @@ class PyTaichi:
         self.default_fp = f32
         self.default_ip = i32
         self.target_tape = None
+        self.target_kernel_graph = None
+        self.numpy_views = weakref.WeakSet()
         self.grad_replaced = False
         self.kernels = kernels or []
         self._signal_handler_registry = None
@@ -367,8 +370,8 @@ class PyTaichi:
         self._signal_handler_registry = None
         self.materialized = False
 
-    def get_tape(self, loss=None):
-        return TapeImpl(self, loss)
+    def get_tape(self, loss=None, checkpoint_every=None):
+        return TapeImpl(self, loss, checkpoint_every)
 
     def sync(self):
         self.materialize()
@@ -382,6 +385,19 @@ def get_runtime():
     return pytaichi
 
 
+def check_not_recording_kernel_graph():
+    """Raises if a kernel graph is being recorded.
+
+    The recorded kernels have not run yet, so Python-scope operations on fields
+    and ndarrays would silently see or be overwritten by stale data.
+    """
+    if pytaichi.target_kernel_graph is not None:
+        raise TaichiRuntimeError(
+            'Python-scope operations on fields and ndarrays, e.g., to_numpy(), '
+            'fill() or element access, cannot be used while recording a kernel '
+            'graph.')
+
+
 def _check_in_range(npty, val):
     iif = np.iinfo(npty)
     if not iif.min <= val <= iif.max:
@@ -1,39 +1,42 @@
 import taichi.lang
 from taichi._lib import core as _ti_core
-from taichi.lang import impl
+from taichi.lang import impl, ops
 from taichi.lang.any_array import AnyArray
 from taichi.lang.enums import Layout
 from taichi.lang.expr import Expr
 from taichi.lang.matrix import Matrix
 from taichi.lang.util import cook_dtype
-from taichi.types.primitive_types import u64
+from taichi.types.primitive_types import f64, u64
 
 
 class SparseMatrixEntry:
-    def __init__(self, ptr, i, j):
+    def __init__(self, ptr, i, j, dtype):
         self.ptr = ptr
         self.i = i
         self.j = j
+        self.dtype = dtype
 
     def _augassign(self, value, op):
+        func_name = "insert_triplet"
+        if self.dtype == f64:
+            func_name = "insert_triplet_f64"
         if op == 'Add':
-            taichi.lang.impl.call_internal("insert_triplet", self.ptr, self.i,
-                                           self.j,
-                                           taichi.lang.impl.ti_float(value))
+            taichi.lang.impl.call_internal(func_name, self.ptr, self.i, self.j,
+                                           ops.cast(value, self.dtype))
         elif op == 'Sub':
-            taichi.lang.impl.call_internal("insert_triplet", self.ptr, self.i,
-                                           self.j,
-                                           -taichi.lang.impl.ti_float(value))
+            taichi.lang.impl.call_internal(func_name, self.ptr, self.i, self.j,
+                                           -ops.cast(value, self.dtype))
         else:
             assert False, "Only operations '+=' and '-=' are supported on sparse matrices."
 
 
 class SparseMatrixProxy:
-    def __init__(self, ptr):
+    def __init__(self, ptr, dtype):
         self.ptr = ptr
+        self.dtype = dtype
 
     def subscript(self, i, j):
-        return SparseMatrixEntry(self.ptr, i, j)
+        return SparseMatrixEntry(self.ptr, i, j, self.dtype)
 
 
 def decl_scalar_arg(dtype):
@@ -48,11 +51,12 @@ def decl_matrix_arg(matrixtype):
          for _ in range(matrixtype.n)])
 
 
-def decl_sparse_matrix():
+def decl_sparse_matrix(dtype):
     ptr_type = cook_dtype(u64)
     # Treat the sparse matrix argument as a scalar since we only need to pass in the base pointer
     arg_id = impl.get_runtime().prog.decl_arg(ptr_type, False)
-    return SparseMatrixProxy(_ti_core.make_arg_load_expr(arg_id, ptr_type))
+    return SparseMatrixProxy(_ti_core.make_arg_load_expr(arg_id, ptr_type),
+                             dtype)
 
 
 def decl_any_arr_arg(dtype, dim, element_shape, layout):
@@ -0,0 +1,106 @@
+from taichi._lib import core as _ti_core
+from taichi.lang import impl, runtime_ops
+from taichi.lang.exception import TaichiRuntimeError
+
+
+class KernelGraph:
+    """A sequence of kernel launches that is recorded once and then replayed
+    from C++ in a single Python call.
+
+    The arguments of every launch are marshalled when the launch is recorded,
+    so replaying the graph skips the Python dispatch of each kernel call
+    entirely. This helps most when a time step consists of many short
+    kernels.
+
+    Kernels called inside the ``with`` statement are recorded instead of
+    being launched. Recorded kernels must not return values, and the fields,
+    ndarrays and external arrays they take are captured by reference. Since
+    nothing runs while recording, Python-scope operations on fields and
+    ndarrays, e.g., ``to_numpy()``, ``fill()`` or element access, raise a
+    :class:`~taichi.lang.exception.TaichiRuntimeError` inside the ``with``
+    statement.
+
+    Example::
+
+        >>> @ti.kernel
+        >>> def substep(dt: ti.f32):
+        >>>     ...
+        >>>
+        >>> with ti.KernelGraph() as graph:
+        >>>     for _ in range(substeps):
+        >>>         substep(1e-4)
+        >>>
+        >>> for frame in range(num_frames):
+        >>>     graph.run()
+    """
+    def __init__(self):
+        self.runtime = impl.get_runtime()
+        self.graph = _ti_core.KernelGraph()
+        # Keeps the (possibly copied) external arrays alive
+        self.tmps = []
+        self.has_external_arrays = False
+
+    def __enter__(self):
+        if self.runtime is not impl.get_runtime():
+            raise TaichiRuntimeError(
+                'The Taichi runtime has been reset since the graph was created.'
+            )
+        if self.runtime.target_kernel_graph is not None:
+            raise TaichiRuntimeError('Kernel graphs cannot be nested.')
+        self.runtime.target_kernel_graph = self
+        return self
+
+    def __exit__(self, _type, value, tb):
+        self.runtime.target_kernel_graph = None
+
+    def __len__(self):
+        return self.graph.size()
+
+    def append(self, kernel, *args):
+        """Records one launch of ``kernel`` with ``args``.
+
+        This is the same as calling ``kernel(*args)`` inside the ``with``
+        statement.
+        """
+        with self:
+            kernel(*args)
+
+    def record(self, t_kernel, arg_setters, args, has_ret,
+               has_external_arrays):
+        if has_ret:
+            raise TaichiRuntimeError(
+                'Kernels with return values cannot be recorded in a kernel graph.'
+            )
+        callbacks = []
+        launch_ctx = self.graph.append(t_kernel)
+        try:
+            for i, setter in arg_setters:
+                setter(launch_ctx, args[i], self.tmps, callbacks)
+        except Exception:
+            self.graph.pop_back()
+            raise
+        if callbacks:
+            # The data would only be copied back once, at recording time.
+            self.graph.pop_back()
+            raise TaichiRuntimeError(
+                'Torch tensors on a device other than the Taichi arch cannot be recorded in a kernel graph.'
+            )
+        self.has_external_arrays |= has_external_arrays
+
+    def run(self, repeats=1):
+        """Launches all the recorded kernels in order, ``repeats`` times.
+
+        Args:
+            repeats (int): The number of times the whole sequence is replayed.
+        """
+        if self.runtime is not impl.get_runtime():
+            raise TaichiRuntimeError(
+                'The Taichi runtime has been reset since the graph was created.'
+            )
+        self.runtime.materialize()
+        self.graph.run(repeats)
+        if self.has_external_arrays and impl.current_cfg().async_mode:
+            runtime_ops.sync()
+
+
+__all__ = ['KernelGraph']
@@ -1,5 +1,7 @@
 import ast
+import collections
 import functools
+import hashlib
 import inspect
 import re
 import sys
@@ -87,16 +89,29 @@ def pyfunc(fn):
     return decorated
 
 
+def _get_source_info(self):
+    # Looking up and dedenting the source is far more expensive than parsing
+    # it, and an inlined ti.func gets here once per call site.
+    if self.source_info is None:
+        file = oinspect.getsourcefile(self.func)
+        src, start_lineno = oinspect.getsourcelines(self.func)
+        src = [textwrap.fill(line, tabsize=4, width=9999) for line in src]
+        self.source_info = (file, src, start_lineno,
+                            textwrap.dedent("\n".join(src)))
+    return self.source_info
+
+
 def _get_tree_and_ctx(self,
                       excluded_parameters=(),
                       is_kernel=True,
                       arg_features=None,
                       args=None,
                       ast_builder=None):
-    file = oinspect.getsourcefile(self.func)
-    src, start_lineno = oinspect.getsourcelines(self.func)
-    src = [textwrap.fill(line, tabsize=4, width=9999) for line in src]
-    tree = ast.parse(textwrap.dedent("\n".join(src)))
+    file, src, start_lineno, dedented_src = _get_source_info(self)
+    # The transformer annotates and rewrites the nodes in place, so every
+    # call site needs its own tree. Re-parsing the cached source is cheaper
+    # than deep-copying a parsed one.
+    tree = ast.parse(dedented_src)
 
     func_body = tree.body[0]
     func_body.decorator_list = []
@@ -139,6 +154,7 @@ class Func:
         self.compiled = None
         self.classfunc = _classfunc
         self.pyfunc = _pyfunc
+        self.source_info = None
         self.argument_annotations = []
         self.argument_names = []
         self.return_type = None
@@ -331,16 +347,17 @@ class TaichiCallableTemplateMapper:
 
 def _get_global_vars(_func):
     # Discussions: https://github.com/taichi-dev/taichi/issues/282
-    global_vars = _func.__globals__.copy()
-
+    # Module globals are looked up lazily instead of being copied: the first
+    # map receives the injected names, so |__globals__| is never written to.
+    closure_vars = {}
     freevar_names = _func.__code__.co_freevars
     closure = _func.__closure__
     if closure:
         freevar_values = list(map(lambda x: x.cell_contents, closure))
         for name, value in zip(freevar_names, freevar_values):
-            global_vars[name] = value
+            closure_vars[name] = value
 
-    return global_vars
+    return collections.ChainMap({}, closure_vars, _func.__globals__)
 
 
 class Kernel:
@@ -356,6 +373,11 @@ class Kernel:
         self.argument_names = []
         self.return_type = None
         self.classkernel = _classkernel
+        # Kernels of Taichi itself, e.g., those copying fields to NumPy arrays
+        module = getattr(_func, '__module__', None) or ''
+        self.is_internal = module.startswith(
+            'taichi.') and not module.startswith('taichi.examples.')
+        self.source_info = None
         self.extract_arguments()
         self.template_slot_locations = []
         for i, anno in enumerate(self.argument_annotations):
@@ -363,12 +385,16 @@ class Kernel:
                 self.template_slot_locations.append(i)
         self.mapper = TaichiCallableTemplateMapper(
             self.argument_annotations, self.template_slot_locations)
+        self.cache_last_instantiation = not any(
+            isinstance(anno, any_arr) for anno in self.argument_annotations)
+        self.last_instantiation = None
         impl.get_runtime().kernels.append(self)
         self.reset()
         self.kernel_cpp = None
 
     def reset(self):
         self.runtime = impl.get_runtime()
+        self.last_instantiation = None
         if self.is_grad:
             self.compiled_functions = self.runtime.compiled_grad_functions
         else:
@@ -471,11 +497,52 @@ class Kernel:
         taichi_kernel = impl.get_runtime().prog.create_kernel(
             taichi_ast_generator, kernel_name, self.is_grad)
 
+        if impl.current_cfg().offline_cache:
+            taichi_kernel.offline_cache_key = self.get_offline_cache_key(
+                args)
+
         self.kernel_cpp = taichi_kernel
 
         assert key not in self.compiled_functions
         self.compiled_functions[key] = self.get_function_body(taichi_kernel)
 
+    def get_offline_cache_key(self, args):
+        """Returns the frontend part of the offline cache key of this kernel.
+
+        The backend completes the key with the frontend IR, the compile config
+        and the SNode layout, so only features that are stable across
+        processes are hashed here.
+        """
+        def stable_feature(arg, anno):
+            if isinstance(anno, template):
+                if isinstance(arg, (taichi.lang.snode.SNode,
+                                    taichi.lang.expr.Expr, _ti_core.Expr)):
+                    return '<field>'
+                if isinstance(arg, tuple):
+                    return tuple(stable_feature(item, anno) for item in arg)
+                if isinstance(arg, (bool, int, float, str)):
+                    return repr(arg)
+                return type(arg).__qualname__
+            if isinstance(anno, any_arr):
+                dtype, dim, element_shape, layout = \
+                    TaichiCallableTemplateMapper.extract_arg(arg, anno)
+                return to_taichi_type(dtype).to_string(), dim, \
+                    element_shape, str(layout)
+            return '#'
+
+        src = _get_source_info(self)[3]
+        features = tuple(
+            stable_feature(arg, anno)
+            for arg, anno in zip(args or (), self.argument_annotations))
+        payload = '\n'.join([
+            _ti_core.get_version_string(),
+            _ti_core.get_commit_hash(), self.func.__qualname__,
+            str(self.is_grad), src,
+            repr(features)
+        ])
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        return f'{self.func.__name__}_{digest[:32]}'
+
     def get_torch_callbacks(self, v, has_torch, is_ndarray=True):
         callbacks = []
 
@@ -516,122 +583,191 @@ class Kernel:
                 callbacks.append(get_call_back(v, gpu_v))
         return tmp, callbacks
 
-    def get_function_body(self, t_kernel):
-        # The actual function body
-        def func__(*args):
-            assert len(args) == len(
-                self.argument_annotations
-            ), f'{len(self.argument_annotations)} arguments needed but {len(args)} provided'
+    def get_arg_setters(self):
+        """Compiles the argument signature into a list of setters.
+
+        Every setter has the signature ``setter(launch_ctx, v, tmps,
+        callbacks)`` and writes one Python argument into its precomputed
+        slot(s) of the launch context, so that the type dispatch happens
+        once per kernel instantiation rather than on every launch.
+
+        Returns:
+            List[Tuple[int, Callable]]: The setters, paired with the index of
+            the Python argument they consume. Template arguments are skipped.
+        """
+        has_torch = has_pytorch()
+        ndarray_use_torch = impl.get_runtime().ndarray_use_torch
+        get_torch_callbacks = self.get_torch_callbacks
+        match_ext_arr = self.match_ext_arr
+
+        def make_float_setter(i, slot, dtype):
+            def setter(launch_ctx, v, tmps, callbacks):
+                if not isinstance(v, (float, int)):
+                    raise TaichiRuntimeTypeError(i, dtype.to_string(),
+                                                 type(v))
+                launch_ctx.set_arg_float(slot, float(v))
+
+            return setter
+
+        def make_int_setter(i, slot, dtype):
+            def setter(launch_ctx, v, tmps, callbacks):
+                if not isinstance(v, int):
+                    raise TaichiRuntimeTypeError(i, dtype.to_string(),
+                                                 type(v))
+                launch_ctx.set_arg_int(slot, int(v))
+
+            return setter
+
+        def make_sparse_matrix_builder_setter(needed, slot):
+            def setter(launch_ctx, v, tmps, callbacks):
+                # The kernel writes triplets in the data type of the annotation
+                if v.dtype != needed.dtype:
+                    raise ValueError(
+                        f'Sparse matrix builder of type {v.dtype} passed to an argument annotated with {needed.dtype}'
+                    )
+                # Pass only the base pointer of the ti.linalg.sparse_matrix_builder() argument
+                launch_ctx.set_arg_int(slot, v._get_addr())
 
-            tmps = []
-            callbacks = []
-            has_external_arrays = False
-            has_torch = has_pytorch()
-            ndarray_use_torch = impl.get_runtime().ndarray_use_torch
+            return setter
 
-            actual_argument_slot = 0
-            launch_ctx = t_kernel.make_launch_context()
-            for i, v in enumerate(args):
-                needed = self.argument_annotations[i]
-                if isinstance(needed, template):
-                    continue
-                provided = type(v)
-                # Note: do not use sth like "needed == f32". That would be slow.
-                if id(needed) in primitive_types.real_type_ids:
-                    if not isinstance(v, (float, int)):
-                        raise TaichiRuntimeTypeError(i, needed.to_string(),
-                                                     provided)
-                    launch_ctx.set_arg_float(actual_argument_slot, float(v))
-                elif id(needed) in primitive_types.integer_type_ids:
-                    if not isinstance(v, int):
-                        raise TaichiRuntimeTypeError(i, needed.to_string(),
-                                                     provided)
-                    launch_ctx.set_arg_int(actual_argument_slot, int(v))
-                elif isinstance(needed, sparse_matrix_builder):
-                    # Pass only the base pointer of the ti.linalg.sparse_matrix_builder() argument
-                    launch_ctx.set_arg_int(actual_argument_slot, v._get_addr())
-                elif isinstance(needed, any_arr) and isinstance(
-                        v, taichi.lang._ndarray.Ndarray):
-                    has_external_arrays = True
+        def make_any_arr_setter(needed, slot):
+            def setter(launch_ctx, v, tmps, callbacks):
+                if isinstance(v, taichi.lang._ndarray.Ndarray):
                     v = v.arr
                     if ndarray_use_torch:
-                        is_ndarray = True
-                        tmp, torch_callbacks = self.get_torch_callbacks(
-                            v, has_torch, is_ndarray)
-                        callbacks += torch_callbacks
-                        launch_ctx.set_arg_external_array_with_shape(
-                            actual_argument_slot, int(tmp.data_ptr()),
-                            tmp.element_size() * tmp.nelement(), v.shape)
-                    else:
-                        launch_ctx.set_arg_ndarray(actual_argument_slot, v)
-                elif isinstance(needed, any_arr) and (self.match_ext_arr(v)):
-                    has_external_arrays = True
-                    is_numpy = isinstance(v, np.ndarray)
-                    if is_numpy:
-                        tmp = np.ascontiguousarray(v)
-                        # Purpose: DO NOT GC |tmp|!
-                        tmps.append(tmp)
-                        launch_ctx.set_arg_external_array_with_shape(
-                            actual_argument_slot, int(tmp.ctypes.data),
-                            tmp.nbytes, v.shape)
-                    else:
-                        is_ndarray = False
-                        tmp, torch_callbacks = self.get_torch_callbacks(
-                            v, has_torch, is_ndarray)
+                        tmp, torch_callbacks = get_torch_callbacks(
+                            v, has_torch, True)
                         callbacks += torch_callbacks
                         launch_ctx.set_arg_external_array_with_shape(
-                            actual_argument_slot, int(tmp.data_ptr()),
+                            slot, int(tmp.data_ptr()),
                             tmp.element_size() * tmp.nelement(), v.shape)
-
-                elif isinstance(needed, MatrixType):
-                    if id(needed.dtype) in primitive_types.real_type_ids:
-                        for a in range(needed.n):
-                            for b in range(needed.m):
-                                if not isinstance(v[a, b], (int, float)):
-                                    raise TaichiRuntimeTypeError(
-                                        i, needed.dtype.to_string(),
-                                        type(v[a, b]))
-                                launch_ctx.set_arg_float(
-                                    actual_argument_slot, float(v[a, b]))
-                                actual_argument_slot += 1
-                    elif id(needed.dtype) in primitive_types.integer_type_ids:
-                        for a in range(needed.n):
-                            for b in range(needed.m):
-                                if not isinstance(v[a, b], int):
-                                    raise TaichiRuntimeTypeError(
-                                        i, needed.dtype.to_string(),
-                                        type(v[a, b]))
-                                launch_ctx.set_arg_int(actual_argument_slot,
-                                                       int(v[a, b]))
-                                actual_argument_slot += 1
                     else:
-                        raise ValueError(
-                            f'Matrix dtype {needed.dtype} is not integer type or real type.'
-                        )
-                    continue
+                        launch_ctx.set_arg_ndarray(slot, v)
+                elif isinstance(v, np.ndarray):
+                    tmp = np.ascontiguousarray(v)
+                    # Purpose: DO NOT GC |tmp|!
+                    tmps.append(tmp)
+                    launch_ctx.set_arg_external_array_with_shape(
+                        slot, int(tmp.ctypes.data), tmp.nbytes, v.shape)
+                elif match_ext_arr(v):
+                    tmp, torch_callbacks = get_torch_callbacks(
+                        v, has_torch, False)
+                    callbacks += torch_callbacks
+                    launch_ctx.set_arg_external_array_with_shape(
+                        slot, int(tmp.data_ptr()),
+                        tmp.element_size() * tmp.nelement(), v.shape)
                 else:
                     raise ValueError(
                         f'Argument type mismatch. Expecting {needed}, got {type(v)}.'
                     )
-                actual_argument_slot += 1
+
+            return setter
+
+        def make_matrix_setter(i, slot, needed):
+            if id(needed.dtype) in primitive_types.real_type_ids:
+                convert, allowed_types = float, (int, float)
+                set_arg = 'set_arg_float'
+            elif id(needed.dtype) in primitive_types.integer_type_ids:
+                convert, allowed_types = int, int
+                set_arg = 'set_arg_int'
+            else:
+                convert, allowed_types, set_arg = None, None, None
+
+            def setter(launch_ctx, v, tmps, callbacks):
+                if convert is None:
+                    raise ValueError(
+                        f'Matrix dtype {needed.dtype} is not integer type or real type.'
+                    )
+                set_arg_func = getattr(launch_ctx, set_arg)
+                s = slot
+                for a in range(needed.n):
+                    for b in range(needed.m):
+                        if not isinstance(v[a, b], allowed_types):
+                            raise TaichiRuntimeTypeError(
+                                i, needed.dtype.to_string(), type(v[a, b]))
+                        set_arg_func(s, convert(v[a, b]))
+                        s += 1
+
+            return setter
+
+        def make_mismatch_setter(needed):
+            def setter(launch_ctx, v, tmps, callbacks):
+                raise ValueError(
+                    f'Argument type mismatch. Expecting {needed}, got {type(v)}.'
+                )
+
+            return setter
+
+        setters = []
+        actual_argument_slot = 0
+        for i, needed in enumerate(self.argument_annotations):
+            if isinstance(needed, template):
+                continue
+            # Note: do not use sth like "needed == f32". That would be slow.
+            if id(needed) in primitive_types.real_type_ids:
+                setter = make_float_setter(i, actual_argument_slot, needed)
+            elif id(needed) in primitive_types.integer_type_ids:
+                setter = make_int_setter(i, actual_argument_slot, needed)
+            elif isinstance(needed, sparse_matrix_builder):
+                setter = make_sparse_matrix_builder_setter(
+                    needed, actual_argument_slot)
+            elif isinstance(needed, any_arr):
+                setter = make_any_arr_setter(needed, actual_argument_slot)
+            elif isinstance(needed, MatrixType):
+                setter = make_matrix_setter(i, actual_argument_slot, needed)
+                actual_argument_slot += needed.n * needed.m - 1
+            else:
+                setter = make_mismatch_setter(needed)
+            setters.append((i, setter))
+            actual_argument_slot += 1
+        return setters
+
+    def get_function_body(self, t_kernel):
+        arg_setters = self.get_arg_setters()
+        num_args = len(self.argument_annotations)
+        has_external_arrays = any(
+            isinstance(needed, any_arr)
+            for needed in self.argument_annotations)
+        ret_dt = self.return_type
+        has_ret = ret_dt is not None
+        ret_is_int = has_ret and id(ret_dt) in primitive_types.integer_type_ids
+
+        # The actual function body
+        def func__(*args):
+            assert len(
+                args
+            ) == num_args, f'{num_args} arguments needed but {len(args)} provided'
+
+            tmps = []
+            callbacks = []
+            graph = self.runtime.target_kernel_graph
+            if graph is not None:
+                if self.is_internal:
+                    impl.check_not_recording_kernel_graph()
+                graph.record(t_kernel, arg_setters, args, has_ret,
+                             has_external_arrays)
+                return None
+            launch_ctx = t_kernel.make_launch_context()
+            for i, setter in arg_setters:
+                setter(launch_ctx, args[i], tmps, callbacks)
             # Both the class kernels and the plain-function kernels are unified now.
             # In both cases, |self.grad| is another Kernel instance that computes the
             # gradient. For class kernels, args[0] is always the kernel owner.
-            if not self.is_grad and self.runtime.target_tape and not self.runtime.grad_replaced:
-                self.runtime.target_tape.insert(self, args)
+            if not self.is_grad and self.runtime.target_tape:
+                if not self.runtime.grad_replaced:
+                    self.runtime.target_tape.insert(self, args)
+                self.runtime.target_tape.track_writes(t_kernel)
 
             t_kernel(launch_ctx)
 
             ret = None
-            ret_dt = self.return_type
-            has_ret = ret_dt is not None
 
-            if has_ret or (impl.current_cfg().async_mode
-                           and has_external_arrays):
+            if has_ret or (has_external_arrays
+                           and impl.current_cfg().async_mode):
                 runtime_ops.sync()
 
             if has_ret:
-                if id(ret_dt) in primitive_types.integer_type_ids:
+                if ret_is_int:
                     ret = t_kernel.get_ret_int(0)
                 else:
                     ret = t_kernel.get_ret_float(0)
@@ -652,9 +788,24 @@ class Kernel:
         return has_array
 
     def ensure_compiled(self, *args):
+        # Fast path: the template arguments are the very same objects as in
+        # the last call, so the instantiation is the same as well. Kernels
+        # with any_arr arguments always take the slow path, since their key
+        # depends on the shape and dtype of the arrays.
+        if self.last_instantiation is not None:
+            last_template_args, key = self.last_instantiation
+            if len(args) == self.mapper.num_args and all(
+                    args[i] is last_template_args[j]
+                    for j, i in enumerate(self.template_slot_locations)
+            ) and key in self.compiled_functions:
+                self.runtime.materialize()
+                return key
         instance_id, arg_features = self.mapper.lookup(args)
         key = (self.func, instance_id)
         self.materialize(key=key, args=args, arg_features=arg_features)
+        if self.cache_last_instantiation:
+            self.last_instantiation = (tuple(
+                args[i] for i in self.template_slot_locations), key)
         return key
 
     # For small kernels (< 3us), the performance can be pretty sensitive to overhead in __call__
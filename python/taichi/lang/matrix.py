@@ -9,11 +9,12 @@ from taichi.lang import runtime_ops
 from taichi.lang._ndarray import Ndarray, NdarrayHostAccess
 from taichi.lang.common_ops import TaichiOperations
 from taichi.lang.enums import Layout
-from taichi.lang.exception import TaichiSyntaxError
+from taichi.lang.exception import TaichiRuntimeError, TaichiSyntaxError
 from taichi.lang.field import Field, ScalarField, SNodeHostAccess
-from taichi.lang.util import (cook_dtype, in_python_scope, python_scope,
-                              taichi_scope, to_numpy_type, to_pytorch_type,
-                              warning)
+from taichi.lang.util import (check_batch_values, check_numpy_out,
+                              cook_dtype, in_python_scope, python_scope,
+                              taichi_scope, to_index_array, to_numpy_type,
+                              to_pytorch_type, warning)
 from taichi.types import primitive_types
 from taichi.types.compound_types import CompoundType
 
@@ -1179,7 +1180,7 @@ class MatrixField(Field):
         fill_matrix(self, val)
 
     @python_scope
-    def to_numpy(self, keep_dims=False, dtype=None):
+    def to_numpy(self, keep_dims=False, dtype=None, copy=True, out=None):
         """Converts the field instance to a NumPy array.
 
         Args:
@@ -1188,20 +1189,53 @@ class MatrixField(Field):
                 When keep_dims=False, the resulting numpy array should skip the matrix dims with size 1.
                 For example, a 4x1 or 1x4 matrix field with 5x6x7 elements results in an array of shape 5x6x7x4.
             dtype (DataType, optional): The desired data type of returned numpy array.
+            copy (bool, optional): When False, returns a view of the field memory if possible (see :meth:`numpy_view`), and a copy otherwise.
+            out (numpy.ndarray, optional): A preallocated C-contiguous array of the result shape to write into. Values are converted to its data type.
 
         Returns:
             numpy.ndarray: The result NumPy array.
         """
-        if dtype is None:
-            dtype = to_numpy_type(self.dtype)
         as_vector = self.m == 1 and not keep_dims
         shape_ext = (self.n, ) if as_vector else (self.n, self.m)
-        arr = np.zeros(self.shape + shape_ext, dtype=dtype)
+        if out is not None:
+            check_numpy_out(out, self.shape + shape_ext, dtype)
+            arr = out
+            if not self._is_dense():
+                arr.fill(0)
+        else:
+            if dtype is None:
+                dtype = to_numpy_type(self.dtype)
+            if not copy and np.dtype(dtype) == to_numpy_type(self.dtype):
+                arr = self._make_numpy_view(shape_ext)
+                if arr is not None:
+                    return arr
+            alloc = np.empty if self._is_dense() else np.zeros
+            arr = alloc(self.shape + shape_ext, dtype=dtype)
         from taichi._kernels import matrix_to_ext_arr  # pylint: disable=C0415
         matrix_to_ext_arr(self, arr, as_vector)
         runtime_ops.sync()
         return arr
 
+    @python_scope
+    def numpy_view(self, keep_dims=False):
+        """Gets a NumPy array sharing memory with the field instance.
+
+        Args:
+            keep_dims (bool, optional): Whether to keep the dimension of the view.
+                See :meth:`~taichi.lang.field.MatrixField.to_numpy` for more detailed explanation.
+
+        Returns:
+            numpy.ndarray: The view, see :meth:`~taichi.lang.field.Field.numpy_view`.
+        """
+        as_vector = self.m == 1 and not keep_dims
+        shape_ext = (self.n, ) if as_vector else (self.n, self.m)
+        arr = self._make_numpy_view(shape_ext)
+        if arr is None:
+            raise TaichiRuntimeError(
+                'Only fields under dense SNodes on CPU can be viewed as numpy arrays'
+            )
+        return arr
+
     def to_torch(self, device=None, keep_dims=False):
         """Converts the field instance to a PyTorch tensor.
 
@@ -1226,19 +1260,52 @@ class MatrixField(Field):
         return arr
 
     @python_scope
-    def from_numpy(self, arr):
-        if len(arr.shape) == len(self.shape) + 1:
-            as_vector = True
-            assert self.m == 1, "This is not a vector field"
-        else:
-            as_vector = False
-            assert len(arr.shape) == len(self.shape) + 2
-        dim_ext = 1 if as_vector else 2
-        assert len(arr.shape) == len(self.shape) + dim_ext
+    def from_numpy(self, arr, check=True):
+        as_vector = len(arr.shape) == len(self.shape) + 1
+        if check:
+            if as_vector:
+                assert self.m == 1, "This is not a vector field"
+            else:
+                assert len(arr.shape) == len(self.shape) + 2
         from taichi._kernels import ext_arr_to_matrix  # pylint: disable=C0415
         ext_arr_to_matrix(arr, self, as_vector)
         runtime_ops.sync()
 
+    @python_scope
+    def gather(self, indices, keep_dims=False):
+        """Reads a batch of elements in a single kernel launch.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements, see :meth:`~taichi.lang.field.Field.gather`.
+            keep_dims (bool, optional): Whether to keep the dimension of each element.
+                See :meth:`~taichi.lang.field.MatrixField.to_numpy` for more detailed explanation.
+
+        Returns:
+            numpy.ndarray: The values of the elements, of shape (N, n) or (N, n, m).
+        """
+        indices = to_index_array(indices, len(self.shape))
+        as_vector = self.m == 1 and not keep_dims
+        shape_ext = (self.n, ) if as_vector else (self.n, self.m)
+        out = np.empty((indices.shape[0], ) + shape_ext,
+                       dtype=to_numpy_type(self.dtype))
+        from taichi._kernels import matrix_field_gather  # pylint: disable=C0415
+        matrix_field_gather(self, indices, out, as_vector)
+        runtime_ops.sync()
+        return out
+
+    @python_scope
+    def scatter(self, indices, values):
+        indices = to_index_array(indices, len(self.shape))
+        as_vector = np.ndim(values) == 2
+        if as_vector:
+            assert self.m == 1, "This is not a vector field"
+        shape_ext = (self.n, ) if as_vector else (self.n, self.m)
+        values = check_batch_values(values, indices.shape[0], shape_ext)
+        from taichi._kernels import \
+            matrix_field_scatter  # pylint: disable=C0415
+        matrix_field_scatter(self, indices, values, as_vector)
+        runtime_ops.sync()
+
     @python_scope
     def __setitem__(self, key, value):
         self.initialize_host_accessors()
@@ -1353,12 +1420,12 @@ class MatrixNdarray(Ndarray):
              for i in range(self.n)])
 
     @python_scope
-    def to_numpy(self):
-        return self._ndarray_matrix_to_numpy(as_vector=0)
+    def to_numpy(self, out=None):
+        return self._ndarray_matrix_to_numpy(as_vector=0, out=out)
 
     @python_scope
-    def from_numpy(self, arr):
-        self._ndarray_matrix_from_numpy(arr, as_vector=0)
+    def from_numpy(self, arr, check=True):
+        self._ndarray_matrix_from_numpy(arr, as_vector=0, check=check)
 
     def __deepcopy__(self, memo=None):
         ret_arr = MatrixNdarray(self.n, self.m, self.dtype, self.shape,
@@ -1411,12 +1478,12 @@ class VectorNdarray(Ndarray):
             [NdarrayHostAccess(self, key, (i, )) for i in range(self.n)])
 
     @python_scope
-    def to_numpy(self):
-        return self._ndarray_matrix_to_numpy(as_vector=1)
+    def to_numpy(self, out=None):
+        return self._ndarray_matrix_to_numpy(as_vector=1, out=out)
 
     @python_scope
-    def from_numpy(self, arr):
-        self._ndarray_matrix_from_numpy(arr, as_vector=1)
+    def from_numpy(self, arr, check=True):
+        self._ndarray_matrix_from_numpy(arr, as_vector=1, check=check)
 
     def __deepcopy__(self, memo=None):
         ret_arr = VectorNdarray(self.n, self.dtype, self.shape, self.layout)
@@ -1,8 +1,10 @@
+import hashlib
 import json
+import os
 
 import numpy as np
 from taichi._lib import core as _ti_core
-from taichi.lang import impl
+from taichi.lang import _mesh_patcher, impl
 from taichi.lang.enums import Layout
 from taichi.lang.exception import TaichiSyntaxError
 from taichi.lang.field import Field, ScalarField
@@ -161,9 +163,9 @@ class MeshElementField:
         return self.field_dict[key]
 
     @python_scope
-    def from_numpy(self, array_dict):
+    def from_numpy(self, array_dict, check=True):
         for k, v in self.items:
-            v.from_numpy(array_dict[k])
+            v.from_numpy(array_dict[k], check=check)
 
     @python_scope
     def from_torch(self, array_dict):
@@ -171,7 +173,9 @@ class MeshElementField:
             v.from_torch(array_dict[k])
 
     @python_scope
-    def to_numpy(self):
+    def to_numpy(self, out=None):
+        if out is not None:
+            return {k: v.to_numpy(out=out[k]) for k, v in self.items}
         return {k: v.to_numpy() for k, v in self.items}
 
     @python_scope
@@ -296,11 +300,151 @@ class MeshInstance:
                                     reorder_type)
 
 
-class MeshMetadata:
-    def __init__(self, filename):
-        with open(filename, "r") as fi:
-            data = json.loads(fi.read())
+# The arrays of the mesh metadata and their data types in the binary format
+_META_ELEMENT_ARRAYS = {
+    "l2g_mapping": np.int32,
+    "l2r_mapping": np.int32,
+    "g2r_mapping": np.int32,
+    "owned_offsets": np.int32,
+    "total_offsets": np.int32,
+}
+_META_RELATION_ARRAYS = {"value": np.int32, "offset": np.int32}
+_META_ATTR_ARRAYS = {"x": np.float64}
+
+# The binary format is made of the magic number, the byte size of a JSON
+# header as a little-endian uint64, the header, then the raw arrays, each of
+# which is aligned to _BINARY_META_ALIGNMENT bytes. The header is the JSON
+# metadata with each array replaced by its dtype, shape and byte offset from
+# the first aligned position after the header.
+_BINARY_META_MAGIC = b"TIMESHB1"
+_BINARY_META_ALIGNMENT = 64
+
+
+def _align_up(offset):
+    return -(-offset // _BINARY_META_ALIGNMENT) * _BINARY_META_ALIGNMENT
+
+
+def _is_binary_meta(filename):
+    with open(filename, "rb") as fi:
+        return fi.read(len(_BINARY_META_MAGIC)) == _BINARY_META_MAGIC
+
+
+def _load_json_meta(filename):
+    with open(filename, "r") as fi:
+        data = json.loads(fi.read())
+    for element in data["elements"]:
+        for key in _META_ELEMENT_ARRAYS:
+            element[key] = np.array(element[key])
+    for relation in data["relations"]:
+        for key in _META_RELATION_ARRAYS:
+            if key in relation:
+                relation[key] = np.array(relation[key])
+    for key in _META_ATTR_ARRAYS:
+        if key in data["attrs"]:
+            data["attrs"][key] = np.array(data["attrs"][key])
+    return data
+
+
+def _load_binary_meta(filename):
+    with open(filename, "rb") as fi:
+        fi.seek(len(_BINARY_META_MAGIC))
+        header_size = int.from_bytes(fi.read(8), "little")
+        data = json.loads(fi.read(header_size).decode("utf-8"))
+    base = _align_up(len(_BINARY_META_MAGIC) + 8 + header_size)
+
+    def map_arrays(entries, keys):
+        for key in keys:
+            if key not in entries:
+                continue
+            desc = entries[key]
+            if np.prod(desc["shape"]) == 0:
+                # Empty files or ranges cannot be mapped
+                entries[key] = np.zeros(desc["shape"], dtype=desc["dtype"])
+            else:
+                # Mapped lazily, so that only the pages being copied to the
+                # fields are read
+                entries[key] = np.memmap(filename,
+                                         dtype=np.dtype(desc["dtype"]),
+                                         mode="r",
+                                         offset=base + desc["offset"],
+                                         shape=tuple(desc["shape"]))
+
+    for element in data["elements"]:
+        map_arrays(element, _META_ELEMENT_ARRAYS)
+    for relation in data["relations"]:
+        map_arrays(relation, _META_RELATION_ARRAYS)
+    map_arrays(data["attrs"], _META_ATTR_ARRAYS)
+    return data
+
+
+def _save_binary_meta(data, filename):
+    arrays = []
+    offset = 0
+
+    def add_arrays(entries, keys):
+        nonlocal offset
+        header = dict(entries)
+        for key, dtype in keys.items():
+            if key in entries:
+                arr = np.ascontiguousarray(entries[key], dtype=dtype)
+                offset = _align_up(offset)
+                header[key] = {
+                    "dtype": arr.dtype.str,
+                    "shape": list(arr.shape),
+                    "offset": offset,
+                }
+                arrays.append((offset, arr))
+                offset += arr.nbytes
+        return header
+
+    header = dict(data)
+    header["elements"] = [
+        add_arrays(element, _META_ELEMENT_ARRAYS)
+        for element in data["elements"]
+    ]
+    header["relations"] = [
+        add_arrays(relation, _META_RELATION_ARRAYS)
+        for relation in data["relations"]
+    ]
+    header["attrs"] = add_arrays(data["attrs"], _META_ATTR_ARRAYS)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    base = _align_up(len(_BINARY_META_MAGIC) + 8 + len(header_bytes))
+    with open(filename, "wb") as fo:
+        fo.write(_BINARY_META_MAGIC)
+        fo.write(len(header_bytes).to_bytes(8, "little"))
+        fo.write(header_bytes)
+        for arr_offset, arr in arrays:
+            fo.seek(base + arr_offset)
+            arr.tofile(fo)
+
+
+def _load_meta(filename):
+    if _is_binary_meta(filename):
+        return _load_binary_meta(filename)
+    return _load_json_meta(filename)
+
+
+# Bump when the generated metadata changes, so that stale caches are not used
+_PATCHER_CACHE_VERSION = 1
+
+
+def _default_mesh_cache_dir():
+    return os.path.join(os.path.expanduser('~'), '.taichi', 'ticache', 'mesh')
+
+
+def _mesh_cache_key(verts, cells, patch_size):
+    hasher = hashlib.sha256()
+    hasher.update(
+        f'{_PATCHER_CACHE_VERSION}:{patch_size}:{verts.shape}:{cells.shape}'.
+        encode('utf-8'))
+    hasher.update(verts.tobytes())
+    hasher.update(cells.tobytes())
+    return hasher.hexdigest()
 
+
+class MeshMetadata:
+    def __init__(self, data):
         self.num_patches = data["num_patches"]
 
         self.element_fields = {}
@@ -313,9 +457,6 @@ class MeshMetadata:
             self.num_elements[element_type] = element["num"]
             self.max_num_per_patch[element_type] = element["max_num_per_patch"]
 
-            element["l2g_mapping"] = np.array(element["l2g_mapping"])
-            element["l2r_mapping"] = np.array(element["l2r_mapping"])
-            element["g2r_mapping"] = np.array(element["g2r_mapping"])
             self.element_fields[element_type] = {}
             self.element_fields[element_type]["owned"] = impl.field(
                 dtype=i32, shape=self.num_patches + 1)
@@ -335,17 +476,17 @@ class MeshMetadata:
                 relation_by_orders(from_order, to_order))
             self.relation_fields[rel_type] = {}
             self.relation_fields[rel_type]["value"] = impl.field(
-                dtype=i32, shape=len(relation["value"]))
+                dtype=i32, shape=relation["value"].shape[0])
             if from_order <= to_order:
                 self.relation_fields[rel_type]["offset"] = impl.field(
-                    dtype=i32, shape=len(relation["offset"]))
+                    dtype=i32, shape=relation["offset"].shape[0])
 
         for element in data["elements"]:
             element_type = MeshElementType(element["order"])
             self.element_fields[element_type]["owned"].from_numpy(
-                np.array(element["owned_offsets"]))
+                element["owned_offsets"])
             self.element_fields[element_type]["total"].from_numpy(
-                np.array(element["total_offsets"]))
+                element["total_offsets"])
             self.element_fields[element_type]["l2g"].from_numpy(
                 element["l2g_mapping"])
             self.element_fields[element_type]["l2r"].from_numpy(
@@ -359,13 +500,13 @@ class MeshMetadata:
             rel_type = MeshRelationType(
                 relation_by_orders(from_order, to_order))
             self.relation_fields[rel_type]["value"].from_numpy(
-                np.array(relation["value"]))
+                relation["value"])
             if from_order <= to_order:
                 self.relation_fields[rel_type]["offset"].from_numpy(
-                    np.array(relation["offset"]))
+                    relation["offset"])
 
         self.attrs = {}
-        self.attrs["x"] = np.array(data["attrs"]["x"]).reshape(-1, 3)
+        self.attrs["x"] = data["attrs"]["x"].reshape(-1, 3)
 
 
 # Define the Mesh Type, stores the field type info
@@ -451,7 +592,132 @@ class Mesh:
 
     @staticmethod
     def load_meta(filename):
-        return MeshMetadata(filename)
+        """Loads the mesh metadata from a file in the JSON or binary format.
+
+        The arrays of a binary file, which is written by
+        :func:`~taichi.Mesh.convert_meta`, are memory-mapped and copied into
+        the fields without being parsed.
+
+        Args:
+            filename (str): path of the metadata.
+
+        Returns:
+            MeshMetadata: the metadata to build a mesh with.
+        """
+        return MeshMetadata(_load_meta(filename))
+
+    @staticmethod
+    def from_arrays(verts,
+                    cells,
+                    patch_size=256,
+                    cache=True,
+                    cache_dir=None,
+                    num_workers=None):
+        """Generates the mesh metadata from the vertices and the cells.
+
+        The cells are partitioned into patches, and the patch-local mappings
+        and relations are built by a pool of threads. The metadata is
+        cached on disk in the binary format, keyed by a hash of the mesh and
+        `patch_size`, so that it is only generated once for each mesh.
+
+        Args:
+            verts (numpy.ndarray): positions of the vertices, of shape (n, 3).
+            cells (numpy.ndarray): vertex indices of the tetrahedra, of shape
+                (m, 4), or of the triangles, of shape (m, 3).
+            patch_size (int): the number of cells in each patch.
+            cache (bool): whether to cache the metadata on disk.
+            cache_dir (str, optional): directory of the cache. Defaults to
+                ``~/.taichi/ticache/mesh``.
+            num_workers (int, optional): the number of threads generating
+                the patches. Defaults to the number of CPUs.
+
+        Returns:
+            MeshMetadata: the metadata to build a mesh with.
+
+        Example::
+
+            >>> meta = ti.Mesh.from_arrays(verts, tets, patch_size=128)
+            >>> model = mesh_builder.build(meta)
+        """
+        verts = np.ascontiguousarray(verts, dtype=np.float64)
+        cells = np.ascontiguousarray(cells, dtype=np.int64)
+        if verts.ndim != 2 or verts.shape[1] != 3:
+            raise ValueError(
+                f'verts must be of shape (n, 3), but {verts.shape} provided')
+        if cells.ndim != 2 or cells.shape[1] not in (3, 4):
+            raise ValueError(
+                f'cells must be of shape (m, 3) or (m, 4), but {cells.shape} provided'
+            )
+        if cells.shape[0] == 0:
+            raise ValueError('The mesh has no cells')
+        if cells.min() < 0 or cells.max() >= verts.shape[0]:
+            raise ValueError('cells contain out-of-range vertex indices')
+        if patch_size < 1:
+            raise ValueError(
+                f'patch_size must be positive, but {patch_size} provided')
+
+        if not cache:
+            return MeshMetadata(
+                _mesh_patcher.build_metadata(verts, cells, patch_size,
+                                             num_workers))
+        if cache_dir is None:
+            cache_dir = _default_mesh_cache_dir()
+        filename = os.path.join(
+            cache_dir,
+            _mesh_cache_key(verts, cells, patch_size) + '.timesh')
+        if not os.path.exists(filename):
+            data = _mesh_patcher.build_metadata(verts, cells, patch_size,
+                                                num_workers)
+            os.makedirs(cache_dir, exist_ok=True)
+            # Written under a unique name first, so that concurrent runs
+            # never load a partially written file
+            tmp_filename = f'{filename}.{os.getpid()}.tmp'
+            _save_binary_meta(data, tmp_filename)
+            os.replace(tmp_filename, filename)
+        return MeshMetadata(_load_binary_meta(filename))
+
+    @staticmethod
+    def load_meshio(filename, patch_size=256, **kwargs):
+        """Loads a mesh file with meshio, and generates its metadata.
+
+        The tetrahedra of the mesh are used if there are any, otherwise its
+        triangles. Requires the `meshio` package.
+
+        Args:
+            filename (str): path of the mesh, in any format meshio reads.
+            patch_size (int): the number of cells in each patch.
+            **kwargs: the other arguments of :func:`~taichi.Mesh.from_arrays`.
+
+        Returns:
+            MeshMetadata: the metadata to build a mesh with.
+        """
+        import meshio  # pylint: disable=C0415
+        mesh = meshio.read(filename)
+        cells = {}
+        for cell_block in mesh.cells:
+            cells.setdefault(cell_block.type, []).append(cell_block.data)
+        for cell_type in ('tetra', 'triangle'):
+            if cell_type in cells:
+                return Mesh.from_arrays(mesh.points,
+                                        np.concatenate(cells[cell_type]),
+                                        patch_size=patch_size,
+                                        **kwargs)
+        raise ValueError(f'{filename} has no tetrahedra or triangles')
+
+    @staticmethod
+    def convert_meta(filename, output_filename):
+        """Converts the mesh metadata from the JSON format into the binary format.
+
+        Args:
+            filename (str): path of the metadata in the JSON format.
+            output_filename (str): path of the metadata to write in the binary format.
+
+        Example::
+
+            >>> ti.Mesh.convert_meta('bunny.json', 'bunny.timesh')
+            >>> model = mesh_builder.build(ti.Mesh.load_meta('bunny.timesh'))
+        """
+        _save_binary_meta(_load_json_meta(filename), output_filename)
 
 
 def TriMesh():
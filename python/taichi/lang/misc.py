@@ -230,9 +230,14 @@ def init(arch=None,
             https://github.com/taichi-dev/taichi/blob/master/taichi/program/compile_config.h.
 
             * ``cpu_max_num_threads`` (int): Sets the number of threads used by the CPU thread pool.
+            * ``cpu_affinity`` (str or list of int): Pins the threads of the CPU thread pool to the given CPUs, e.g., ``"0-15,32-47"`` or ``[0, 2, 4]``.
+            * ``numa_aware`` (bool): Pins the threads of the CPU thread pool NUMA node by node, and places fields and ndarrays on the NUMA nodes of the threads working on them.
             * ``debug`` (bool): Enables the debug mode, under which Taichi does a few more things like boundary checks.
             * ``print_ir`` (bool): Prints the CHI IR of the Taichi kernels.
             * ``packed`` (bool): Enables the packed memory layout. See https://docs.taichi.graphics/lang/articles/advanced/layout.
+            * ``offline_cache`` (bool): Caches compiled kernels on disk so that later runs skip the LLVM compilation (CPU and CUDA only).
+            * ``offline_cache_path`` (str): Directory of the offline cache. Defaults to ``~/.taichi/ticache/llvm``.
+            * ``offline_cache_max_size_MB`` (int): Size limit of the offline cache. The least recently used kernels are evicted first.
     """
     # Check version for users every 7 days if not disabled by users.
     _version_check.start_version_check_thread()
@@ -247,6 +252,8 @@ def init(arch=None,
     default_fp = _deepcopy(default_fp)
     default_ip = _deepcopy(default_ip)
     kwargs = _deepcopy(kwargs)
+    if isinstance(kwargs.get('cpu_affinity'), (list, tuple)):
+        kwargs['cpu_affinity'] = ','.join(map(str, kwargs['cpu_affinity']))
     reset()
 
     spec_cfg = _SpecialConfig()
@@ -437,7 +444,7 @@ def mesh_patch_idx():
     )
 
 
-def Tape(loss, clear_gradients=True):
+def Tape(loss, clear_gradients=True, checkpoint_every=None):
     """Return a context manager of :class:`~taichi.lang.tape.TapeImpl`. The
     context manager would catching all of the callings of functions that
     decorated by :func:`~taichi.lang.kernel_impl.kernel` or
@@ -449,9 +456,21 @@ def Tape(loss, clear_gradients=True):
     See also :func:`~taichi.lang.kernel_impl.kernel` and
     :func:`~taichi.ad.grad_replaced` for gradient functions.
 
+    With `checkpoint_every=k`, the (dense) fields written by the kernels are
+    copied to the host before every k calls. When evaluating the gradients,
+    each segment of k calls is replayed from its checkpoint, keeping the
+    states before its calls in device buffers of k - 1 copies of the fields.
+    Fields, with or without gradients, can thus be overwritten, e.g., a
+    simulation state can be kept in a few rows used in turn instead of one
+    row per step. This trades a forward pass of recomputation for n / k host
+    copies and k - 1 device copies of the written fields, where n is the
+    number of calls. The fields are left in their final states afterwards.
+    Ndarrays are not checkpointed.
+
     Args:
         loss(:class:`~taichi.lang.expr.Expr`): The loss field, which shape should be ().
         clear_gradients(Bool): Before `with` body start, clear all gradients or not.
+        checkpoint_every(int, optional): The number of calls between two checkpoints, None to disable checkpointing.
 
     Returns:
         :class:`~taichi.lang.tape.TapeImpl`: The context manager.
@@ -479,7 +498,7 @@ def Tape(loss, clear_gradients=True):
     from taichi._kernels import clear_loss  # pylint: disable=C0415
     clear_loss(loss)
 
-    return impl.get_runtime().get_tape(loss)
+    return impl.get_runtime().get_tape(loss, checkpoint_every)
 
 
 def clear_all_gradients():
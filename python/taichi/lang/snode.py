@@ -52,15 +52,34 @@ class SNode:
             self.ptr.pointer(axes, dimensions,
                              impl.current_cfg().packed))
 
-    @staticmethod
-    def _hash(axes, dimensions):
-        # original code is #def hash(self,axes, dimensions) without #@staticmethod   before fix pylint R0201
-        """Not supported."""
-        raise RuntimeError('hash not yet supported')
-        # if isinstance(dimensions, int):
-        #     dimensions = [dimensions] * len(axes)
-        # return SNode(self.ptr.hash(axes, dimensions,
-        #                            impl.current_cfg().packed))
+    def hash(self, axes, dimensions, capacity=None):
+        """Adds a hash SNode as a child component of `self`.
+
+        A hash SNode stores its active cells in a hash table with `capacity`
+        slots, so its memory is proportional to the number of active cells
+        instead of the shape. It is only supported on CPU, and a container must
+        have fewer than 2**31 - 1 cells.
+
+        Args:
+            axes (List[Axis]): Axes to activate.
+            dimensions (Union[List[int], int]): Shape of each axis.
+            capacity (int): Number of slots of the hash table of each container,
+                which must be a power of two. Defaults to 1/8 of the cells of
+                a container, rounded up to a power of two.
+
+        Returns:
+            The added :class:`~taichi.lang.SNode` instance.
+        """
+        if isinstance(dimensions, int):
+            dimensions = [dimensions] * len(axes)
+        if capacity is None:
+            num_cells = 1
+            for d in dimensions:
+                num_cells *= d
+            capacity = max(2, 1 << max(num_cells // 8 - 1, 0).bit_length())
+        return SNode(
+            self.ptr.hash(axes, dimensions, capacity,
+                          impl.current_cfg().packed))
 
     def dynamic(self, axis, dimension, chunk_size=None):
         """Adds a dynamic SNode as a child component of `self`.
@@ -297,7 +316,8 @@ class SNode:
         for c in ch:
             c.deactivate_all()
         SNodeType = _ti_core.SNodeType
-        if self.ptr.type == SNodeType.pointer or self.ptr.type == SNodeType.bitmasked:
+        if self.ptr.type in (SNodeType.pointer, SNodeType.hash,
+                             SNodeType.bitmasked):
             from taichi._kernels import \
                 snode_deactivate  # pylint: disable=C0415
             snode_deactivate(self)
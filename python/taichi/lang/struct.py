@@ -7,7 +7,7 @@ from taichi.lang.exception import TaichiSyntaxError
 from taichi.lang.field import Field, ScalarField, SNodeHostAccess
 from taichi.lang.matrix import Matrix
 from taichi.lang.util import (cook_dtype, in_python_scope, is_taichi_class,
-                              python_scope, taichi_scope)
+                              python_scope, taichi_scope, to_index_array)
 from taichi.types import primitive_types
 from taichi.types.compound_types import CompoundType
 
@@ -406,9 +406,9 @@ class StructField(Field):
         return self.field_dict[key]
 
     @python_scope
-    def from_numpy(self, array_dict):
+    def from_numpy(self, array_dict, check=True):
         for k, v in self.items:
-            v.from_numpy(array_dict[k])
+            v.from_numpy(array_dict[k], check=check)
 
     @python_scope
     def from_torch(self, array_dict):
@@ -416,14 +416,41 @@ class StructField(Field):
             v.from_torch(array_dict[k])
 
     @python_scope
-    def to_numpy(self):
+    def gather(self, indices):
+        """Reads a batch of elements, see :meth:`~taichi.lang.field.Field.gather`.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements.
+        Returns:
+            Dict[str, Union[numpy.ndarray, Dict]]: The values of each member.
+        """
+        indices = to_index_array(indices, len(self.shape))
+        return {k: v.gather(indices) for k, v in self.items}
+
+    @python_scope
+    def scatter(self, indices, values_dict):
+        """Writes a batch of elements, see :meth:`~taichi.lang.field.Field.scatter`.
+
+        Args:
+            indices (numpy.ndarray): Integer indices of the elements.
+            values_dict (Dict[str, Union[numpy.ndarray, Dict]]): The values of each member.
+        """
+        indices = to_index_array(indices, len(self.shape))
+        for k, v in self.items:
+            v.scatter(indices, values_dict[k])
+
+    @python_scope
+    def to_numpy(self, out=None):
         """Converts the Struct field instance to a dictionary of NumPy arrays. The dictionary may be nested when converting
            nested structs.
 
         Args:
+            out (Dict[str, Union[numpy.ndarray, Dict]], optional): Preallocated arrays to write the members into, with the same structure as the result.
         Returns:
             Dict[str, Union[numpy.ndarray, Dict]]: The result NumPy array.
         """
+        if out is not None:
+            return {k: v.to_numpy(out=out[k]) for k, v in self.items}
         return {k: v.to_numpy() for k, v in self.items}
 
     @python_scope
@@ -1,10 +1,28 @@
+from contextlib import contextmanager
+
+import numpy as np
+from taichi.lang.expr import Expr
+from taichi.lang.field import ScalarField
+
+
 class TapeImpl:
-    def __init__(self, runtime, loss=None):
+    def __init__(self, runtime, loss=None, checkpoint_every=None):
         self.calls = []
         self.entered = False
         self.gradient_evaluated = False
         self.runtime = runtime
         self.eval_on_exit = loss is not None
+        if checkpoint_every is not None and checkpoint_every < 1:
+            raise ValueError(
+                f'checkpoint_every must be positive, but {checkpoint_every} provided'
+            )
+        self.checkpoint_every = checkpoint_every
+        # The fields written by the recorded kernels, keyed by SNode id
+        self.written_fields = {}
+        # The states of the written fields before every `checkpoint_every`
+        # calls, each mapping SNode ids to NumPy arrays
+        self.checkpoints = []
+        self.seen_kernels = set()
 
     def __enter__(self):
         self.runtime.target_tape = self
@@ -18,11 +36,105 @@ class TapeImpl:
             self.grad()
 
     def insert(self, func, args):
+        if self.checkpoint_every is not None and len(
+                self.calls) % self.checkpoint_every == 0:
+            self.checkpoints.append(self._snapshot())
         self.calls.append((func, args))
 
+    @contextmanager
+    def _paused(self):
+        """Stops recording the kernels launched by the tape itself, e.g., to copy the fields."""
+        target_tape = self.runtime.target_tape
+        self.runtime.target_tape = None
+        try:
+            yield
+        finally:
+            self.runtime.target_tape = target_tape
+
+    def track_writes(self, t_kernel):
+        """Starts checkpointing the fields written by a kernel about to be launched.
+
+        Nothing recorded before has written the new fields, so their current
+        state is also their state at all the previous checkpoints.
+        """
+        if self.checkpoint_every is None or t_kernel in self.seen_kernels:
+            return
+        self.seen_kernels.add(t_kernel)
+        writes, atomic_writes = t_kernel.get_snode_writes()
+        for snode in writes + atomic_writes:
+            if not snode.is_primal() or snode.id in self.written_fields:
+                continue
+            field = ScalarField(Expr(snode.get_expr()))
+            self.written_fields[snode.id] = field
+            with self._paused():
+                arr = field.to_numpy()
+            for checkpoint in self.checkpoints:
+                checkpoint[snode.id] = arr
+
+    def _snapshot(self):
+        with self._paused():
+            return {
+                key: field.to_numpy()
+                for key, field in self.written_fields.items()
+            }
+
+    def _restore(self, state):
+        with self._paused():
+            for key, arr in state.items():
+                self.written_fields[key].from_numpy(arr)
+
     def grad(self):
         assert self.entered, "Before evaluating gradients tape must be entered."
         assert not self.gradient_evaluated, "Gradients of grad can be evaluated only once."
-        for func, args in reversed(self.calls):
-            func.grad(*args)
+        if self.checkpoint_every is None:
+            for func, args in reversed(self.calls):
+                func.grad(*args)
+        else:
+            with self._paused():
+                self._grad_from_checkpoints()
         self.gradient_evaluated = True
+
+    def _grad_from_checkpoints(self):
+        """Evaluates the gradients segment by segment, from the last one.
+
+        Each segment is replayed from its checkpoint, saving the state before
+        each call but the last one into device buffers of
+        `checkpoint_every - 1` rows. The state is restored from them before
+        the gradient of the call is evaluated, so only the checkpoints are
+        copied through the host.
+        """
+        from taichi._kernels import (  # pylint: disable=C0415
+            ndarray_slice_to_tensor, tensor_to_ndarray_slice)
+        from taichi.lang._ndarray import \
+            ScalarNdarray  # pylint: disable=C0415
+        num_rows = self.checkpoint_every - 1
+        row_sizes = {
+            key: int(np.prod(field.shape))
+            for key, field in self.written_fields.items()
+        }
+        buffers = {}
+        if num_rows > 0:
+            buffers = {
+                key: ScalarNdarray(field.dtype,
+                                   (num_rows * row_sizes[key], ))
+                for key, field in self.written_fields.items()
+            }
+        final_state = self._snapshot()
+        for i in reversed(range(len(self.checkpoints))):
+            begin = i * self.checkpoint_every
+            segment = self.calls[begin:begin + self.checkpoint_every]
+            # The checkpoint is not needed any more once restored
+            self._restore(self.checkpoints.pop())
+            for row, (func, args) in enumerate(segment[:-1]):
+                for key, buf in buffers.items():
+                    tensor_to_ndarray_slice(self.written_fields[key], buf,
+                                            row * row_sizes[key])
+                func(*args)
+            for row in reversed(range(len(segment))):
+                func, args = segment[row]
+                if row < len(segment) - 1:
+                    for key, buf in buffers.items():
+                        ndarray_slice_to_tensor(buf, row * row_sizes[key],
+                                                self.written_fields[key])
+                func.grad(*args)
+        self._restore(final_state)
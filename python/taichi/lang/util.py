@@ -94,6 +94,68 @@ def to_numpy_type(dt):
     assert False
 
 
+def check_numpy_out(out, shape, dtype=None):
+    """Checks that a numpy array can be filled in place as the result of a conversion.
+
+    Args:
+        out (numpy.ndarray): The destination array.
+        shape (Tuple[int]): The expected shape.
+        dtype (DataType, optional): The expected data type, if explicitly requested.
+
+    """
+    if not isinstance(out, np.ndarray):
+        raise TypeError(f"{np.ndarray} expected, but {type(out)} provided")
+    if tuple(out.shape) != tuple(shape):
+        raise ValueError(
+            f"Mismatch shape: {tuple(shape)} expected, but {tuple(out.shape)} provided"
+        )
+    if dtype is not None and np.dtype(dtype) != out.dtype:
+        raise ValueError(
+            f"Mismatch dtype: {np.dtype(dtype)} requested, but the output array is {out.dtype}"
+        )
+    if not out.flags.c_contiguous or not out.flags.writeable:
+        raise ValueError("The output array must be C-contiguous and writeable")
+
+
+def to_index_array(indices, dim):
+    """Converts the indices of a batch of elements to a C-contiguous int32 array.
+
+    Args:
+        indices (numpy.ndarray): The indices, of shape (N, dim), or (N, ) when dim is 1.
+        dim (int): The number of dimensions of the container.
+
+    Returns:
+        numpy.ndarray: The indices of shape (N, dim).
+    """
+    indices = np.ascontiguousarray(indices, dtype=np.int32)
+    if indices.ndim == 1 and dim == 1:
+        indices = indices.reshape(-1, 1)
+    if indices.ndim != 2 or indices.shape[1] != dim:
+        raise ValueError(
+            f"Indices of shape (N, {dim}) expected, but {indices.shape} provided"
+        )
+    return indices
+
+
+def check_batch_values(values, num, element_shape):
+    """Checks the shape of the values of a batch of elements.
+
+    Args:
+        values (numpy.ndarray): The values.
+        num (int): The number of elements.
+        element_shape (Tuple[int]): The shape of each element.
+
+    Returns:
+        numpy.ndarray: `values` as a C-contiguous array.
+    """
+    values = np.ascontiguousarray(values)
+    if values.shape != (num, ) + tuple(element_shape):
+        raise ValueError(
+            f"Values of shape {(num, ) + tuple(element_shape)} expected, but {values.shape} provided"
+        )
+    return values
+
+
 def to_pytorch_type(dt):
     """Convert taichi data type to its counterpart in torch.
 
@@ -1,3 +1,4 @@
 from taichi.linalg.sparse_matrix import (SparseMatrix, SparseMatrixBuilder,
                                          sparse_matrix_builder)
 from taichi.linalg.sparse_solver import SparseSolver
+from taichi.linalg.krylov import bicgstab, cg
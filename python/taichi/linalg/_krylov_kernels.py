@@ -0,0 +1,196 @@
+"""Kernels of the Krylov solvers in :mod:`taichi.linalg.krylov`.
+
+All the vectors are 1-D ndarrays of `n` elements. The scalars of the
+iterations, e.g., the dot products and the step sizes, stay on the device in
+the small ndarray `s`, so that the kernels of an iteration are launched
+without synchronizing with the host. Each dot product is accumulated in the
+same kernel that computes one of its operands whenever possible.
+"""
+from taichi.lang import ops
+from taichi.lang.impl import static
+from taichi.lang.kernel_impl import kernel
+from taichi.types.annotations import any_arr, template
+
+# Preconditioning modes
+PRECOND_NONE = 0
+PRECOND_JACOBI = 1
+PRECOND_CUSTOM = 2
+
+# Slots of the scalars of the conjugate gradient method
+CG_RZ = 0  # r . z of the last iteration
+CG_RZ_NEW = 1  # r . z of the current iteration
+CG_PAP = 2  # p . A p
+CG_RR = 3  # r . r
+CG_BB = 4  # b . b
+CG_NUM_SCALARS = 5
+
+# Slots of the scalars of the BiCGSTAB method
+BICG_RHO = 0  # r_hat . r of the last iteration
+BICG_RHO_NEW = 1  # r_hat . r of the current iteration
+BICG_ALPHA = 2
+BICG_OMEGA = 3
+BICG_RV = 4  # r_hat . v
+BICG_TS = 5  # t . s
+BICG_TT = 6  # t . t
+BICG_RR = 7  # r . r
+BICG_BB = 8  # b . b
+BICG_NUM_SCALARS = 9
+
+
+@kernel
+def csr_inverse_diagonal(offsets: any_arr(), cols: any_arr(), vals: any_arr(),
+                         inv_diag: any_arr(), n: int, dtype: template()):
+    for r in range(n):
+        d = ops.cast(0, dtype)
+        for k in range(offsets[r], offsets[r + 1]):
+            if cols[k] == r:
+                d = vals[k]
+        # Rows without a diagonal entry are left unscaled
+        inv_diag[r] = ops.cast(1, dtype)
+        if d != 0:
+            inv_diag[r] = 1 / d
+
+
+@kernel
+def dot(a: any_arr(), b: any_arr(), s: any_arr(), slot: int, n: int):
+    s[slot] = 0
+    for i in range(n):
+        s[slot] += a[i] * b[i]
+
+
+@kernel
+def cg_init(b: any_arr(), ax: any_arr(), r: any_arr(), z: any_arr(),
+            inv_diag: any_arr(), s: any_arr(), n: int, precond: template()):
+    s[CG_RZ_NEW] = 0
+    s[CG_RR] = 0
+    s[CG_BB] = 0
+    for i in range(n):
+        ri = b[i] - ax[i]
+        r[i] = ri
+        s[CG_RR] += ri * ri
+        s[CG_BB] += b[i] * b[i]
+        if static(precond == PRECOND_JACOBI):
+            zi = ri * inv_diag[i]
+            z[i] = zi
+            s[CG_RZ_NEW] += ri * zi
+    if static(precond == PRECOND_NONE):
+        s[CG_RZ_NEW] = s[CG_RR]
+
+
+@kernel
+def cg_init_direction(z: any_arr(), p: any_arr(), s: any_arr(), n: int):
+    for i in range(n):
+        p[i] = z[i]
+    s[CG_RZ] = s[CG_RZ_NEW]
+
+
+@kernel
+def cg_update(x: any_arr(), r: any_arr(), z: any_arr(), p: any_arr(),
+              ap: any_arr(), inv_diag: any_arr(), s: any_arr(), n: int,
+              precond: template()):
+    s[CG_RZ_NEW] = 0
+    s[CG_RR] = 0
+    for i in range(n):
+        alpha = s[CG_RZ] * 0
+        if s[CG_PAP] != 0:
+            alpha = s[CG_RZ] / s[CG_PAP]
+        x[i] = x[i] + alpha * p[i]
+        ri = r[i] - alpha * ap[i]
+        r[i] = ri
+        s[CG_RR] += ri * ri
+        if static(precond == PRECOND_JACOBI):
+            zi = ri * inv_diag[i]
+            z[i] = zi
+            s[CG_RZ_NEW] += ri * zi
+    if static(precond == PRECOND_NONE):
+        s[CG_RZ_NEW] = s[CG_RR]
+
+
+@kernel
+def cg_update_direction(z: any_arr(), p: any_arr(), s: any_arr(), n: int):
+    for i in range(n):
+        beta = s[CG_RZ] * 0
+        if s[CG_RZ] != 0:
+            beta = s[CG_RZ_NEW] / s[CG_RZ]
+        p[i] = z[i] + beta * p[i]
+    s[CG_RZ] = s[CG_RZ_NEW]
+
+
+@kernel
+def bicgstab_init(b: any_arr(), ax: any_arr(), r: any_arr(),
+                  r_hat: any_arr(), p: any_arr(), v: any_arr(), s: any_arr(),
+                  n: int):
+    s[BICG_RHO] = 1
+    s[BICG_ALPHA] = 1
+    s[BICG_OMEGA] = 1
+    s[BICG_RHO_NEW] = 0
+    s[BICG_RR] = 0
+    s[BICG_BB] = 0
+    for i in range(n):
+        ri = b[i] - ax[i]
+        r[i] = ri
+        r_hat[i] = ri
+        p[i] = 0
+        v[i] = 0
+        s[BICG_RHO_NEW] += ri * ri
+        s[BICG_BB] += b[i] * b[i]
+    s[BICG_RR] = s[BICG_RHO_NEW]
+
+
+@kernel
+def bicgstab_update_direction(r: any_arr(), p: any_arr(), v: any_arr(),
+                              y: any_arr(), inv_diag: any_arr(), s: any_arr(),
+                              n: int, precond: template()):
+    for i in range(n):
+        beta = s[BICG_RHO] * 0
+        if s[BICG_RHO] != 0 and s[BICG_OMEGA] != 0:
+            beta = (s[BICG_RHO_NEW] / s[BICG_RHO]) * (s[BICG_ALPHA] /
+                                                      s[BICG_OMEGA])
+        pi = r[i] + beta * (p[i] - s[BICG_OMEGA] * v[i])
+        p[i] = pi
+        if static(precond == PRECOND_JACOBI):
+            y[i] = pi * inv_diag[i]
+    s[BICG_RHO] = s[BICG_RHO_NEW]
+
+
+@kernel
+def bicgstab_update_half(x: any_arr(), r: any_arr(), y: any_arr(),
+                         v: any_arr(), z: any_arr(), inv_diag: any_arr(),
+                         s: any_arr(), n: int, precond: template()):
+    # Moves half a step along y, the residual r becomes s of the textbook
+    s[BICG_ALPHA] = 0
+    if s[BICG_RV] != 0:
+        s[BICG_ALPHA] = s[BICG_RHO] / s[BICG_RV]
+    s[BICG_TS] = 0
+    s[BICG_TT] = 0
+    for i in range(n):
+        alpha = s[BICG_ALPHA]
+        x[i] = x[i] + alpha * y[i]
+        ri = r[i] - alpha * v[i]
+        r[i] = ri
+        if static(precond == PRECOND_JACOBI):
+            z[i] = ri * inv_diag[i]
+
+
+@kernel
+def bicgstab_dots(r: any_arr(), t: any_arr(), s: any_arr(), n: int):
+    for i in range(n):
+        s[BICG_TS] += t[i] * r[i]
+        s[BICG_TT] += t[i] * t[i]
+    s[BICG_OMEGA] = 0
+    if s[BICG_TT] != 0:
+        s[BICG_OMEGA] = s[BICG_TS] / s[BICG_TT]
+
+
+@kernel
+def bicgstab_update(x: any_arr(), r: any_arr(), r_hat: any_arr(),
+                    z: any_arr(), t: any_arr(), s: any_arr(), n: int):
+    s[BICG_RHO_NEW] = 0
+    s[BICG_RR] = 0
+    for i in range(n):
+        omega = s[BICG_OMEGA]
+        x[i] = x[i] + omega * z[i]
+        ri = r[i] - omega * t[i]
+        r[i] = ri
+        s[BICG_RHO_NEW] += r_hat[i] * ri
+        s[BICG_RR] += ri * ri
@@ -0,0 +1,240 @@
+import math
+
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.field import ScalarField
+from taichi.linalg.sparse_matrix import SparseMatrix
+
+
+class _KrylovProblem:
+    """The operands of a Krylov solver, with the vectors moved into ndarrays.
+
+    Vectors given as fields are copied into ndarrays once before the
+    iterations and the solution is copied back once after them, so that the
+    kernels of the iterations only operate on ndarrays.
+    """
+    def __init__(self, A, b, x, M):
+        for vec, name in ((b, 'b'), (x, 'x')):
+            if not isinstance(vec, (ScalarField, ScalarNdarray)) or len(
+                    vec.shape) != 1:
+                raise TypeError(
+                    f'{name} must be a 1-D scalar field or ndarray, but {type(vec)} provided'
+                )
+        if b.shape != x.shape:
+            raise ValueError(
+                f'Mismatch length: b has {b.shape[0]} elements, but x has {x.shape[0]}'
+            )
+        if b.dtype != x.dtype:
+            raise TypeError(
+                f'Mismatch data type: b is {b.dtype}, but x is {x.dtype}')
+        self.n = b.shape[0]
+        self.dtype = b.dtype
+        if isinstance(A, SparseMatrix):
+            if A.shape() != (self.n, self.n):
+                raise ValueError(
+                    f'Dimension mismatch between sparse matrix {A.shape()} and vector b ({self.n}, )'
+                )
+            if A.dtype != self.dtype:
+                raise TypeError(
+                    f'Mismatch data type: the matrix is {A.dtype}, but the vectors are {self.dtype}'
+                )
+            self.apply_A = A.spmv
+        elif callable(A):
+            self.apply_A = A
+        else:
+            raise TypeError(
+                f'A must be a SparseMatrix or a callable, but {type(A)} provided'
+            )
+        from taichi._kernels import as_ndarray  # pylint: disable=C0415
+        self.x_out = x
+        # Vectors passed to A and M have exactly n elements
+        self.b = as_ndarray(b, self.n)
+        self.x = as_ndarray(x, self.n)
+        self.setup_preconditioner(A, M)
+
+    def new_vector(self):
+        return ScalarNdarray(self.dtype, (self.n, ))
+
+    def setup_preconditioner(self, A, M):
+        from taichi.linalg import \
+            _krylov_kernels as kernels  # pylint: disable=C0415
+        self.apply_M = None
+        self.inv_diag = None
+        if M is None:
+            self.precond = kernels.PRECOND_NONE
+        elif isinstance(M, str) and M == 'jacobi':
+            if not isinstance(A, SparseMatrix):
+                raise ValueError(
+                    'The Jacobi preconditioner needs the diagonal of A, which must be a SparseMatrix'
+                )
+            self.precond = kernels.PRECOND_JACOBI
+            self.inv_diag = self.new_vector()
+            offsets, cols, vals = A._get_csr()
+            kernels.csr_inverse_diagonal(offsets, cols, vals, self.inv_diag,
+                                         self.n, self.dtype)
+        elif callable(M):
+            self.precond = kernels.PRECOND_CUSTOM
+            self.apply_M = M
+        else:
+            raise ValueError(
+                f"M must be None, 'jacobi' or a callable, but {M} provided")
+
+    def finish(self):
+        if self.x is not self.x_out:
+            from taichi._kernels import copy  # pylint: disable=C0415
+            copy(self.x, self.x_out, self.n)
+
+
+class _ConvergenceMonitor:
+    """Checks the residual norm on the host every `check_every` iterations."""
+    def __init__(self, s, rr_slot, bb_slot, tol, atol, check_every, max_iter):
+        if check_every < 1:
+            raise ValueError(
+                f'check_every must be positive, but {check_every} provided')
+        self.s = s
+        self.rr_slot = rr_slot
+        self.check_every = check_every
+        self.max_iter = max_iter
+        self.threshold = max(tol * math.sqrt(s[bb_slot]), atol)
+        self.residual = math.inf
+
+    def converged(self, iteration):
+        if iteration % self.check_every != 0 and iteration != self.max_iter:
+            return False
+        # Reading the residual synchronizes with the device
+        self.residual = math.sqrt(max(self.s[self.rr_slot], 0))
+        return self.residual <= self.threshold
+
+
+def cg(A, b, x, M=None, tol=1e-5, atol=0.0, max_iter=None, check_every=10):
+    """Solves `A x = b` with the (preconditioned) conjugate gradient method.
+
+    `A` must be symmetric positive definite, and so must the preconditioner.
+    The iterations run entirely on the device: the dot products are fused into
+    the vector updates and stay in device memory, and the residual is only
+    read back to check the convergence every `check_every` iterations.
+
+    Args:
+        A (Union[SparseMatrix, Callable]): The matrix, or a linear operator `A(u, v)` computing `v = A @ u` on two 1-D ndarrays, e.g., a `@ti.kernel` taking `ti.any_arr()` arguments.
+        b (Union[ScalarField, ScalarNdarray]): The 1-D right-hand side.
+        x (Union[ScalarField, ScalarNdarray]): The 1-D initial guess, overwritten by the solution.
+        M (Union[None, str, Callable]): The preconditioner: None, 'jacobi' (`A` must be a SparseMatrix), or an operator `M(r, z)` computing `z = M^-1 @ r` on two 1-D ndarrays.
+        tol (float): The tolerance of the residual norm relative to the norm of `b`.
+        atol (float): The absolute tolerance of the residual norm.
+        max_iter (int, optional): The maximum number of iterations, the length of `b` by default.
+        check_every (int): The number of iterations between two convergence checks.
+
+    Returns:
+        Tuple[bool, int]: Whether the solver converged, and the number of iterations run.
+    """
+    from taichi.linalg import \
+        _krylov_kernels as kernels  # pylint: disable=C0415
+    problem = _KrylovProblem(A, b, x, M)
+    n = problem.n
+    if max_iter is None:
+        max_iter = n
+    r = problem.new_vector()
+    z = r if problem.precond == kernels.PRECOND_NONE else problem.new_vector()
+    p = problem.new_vector()
+    ap = problem.new_vector()
+    inv_diag = problem.inv_diag if problem.inv_diag is not None else r
+    s = ScalarNdarray(problem.dtype, (kernels.CG_NUM_SCALARS, ))
+
+    problem.apply_A(problem.x, ap)
+    kernels.cg_init(problem.b, ap, r, z, inv_diag, s, n, problem.precond)
+    if problem.apply_M is not None:
+        problem.apply_M(r, z)
+        kernels.dot(r, z, s, kernels.CG_RZ_NEW, n)
+    kernels.cg_init_direction(z, p, s, n)
+
+    monitor = _ConvergenceMonitor(s, kernels.CG_RR, kernels.CG_BB, tol, atol,
+                                  check_every, max_iter)
+    converged = monitor.converged(0)
+    iteration = 0
+    while not converged and iteration < max_iter:
+        problem.apply_A(p, ap)
+        kernels.dot(p, ap, s, kernels.CG_PAP, n)
+        kernels.cg_update(problem.x, r, z, p, ap, inv_diag, s, n,
+                          problem.precond)
+        if problem.apply_M is not None:
+            problem.apply_M(r, z)
+            kernels.dot(r, z, s, kernels.CG_RZ_NEW, n)
+        kernels.cg_update_direction(z, p, s, n)
+        iteration += 1
+        converged = monitor.converged(iteration)
+    problem.finish()
+    return converged, iteration
+
+
+def bicgstab(A,
+             b,
+             x,
+             M=None,
+             tol=1e-5,
+             atol=0.0,
+             max_iter=None,
+             check_every=10):
+    """Solves `A x = b` with the (right preconditioned) BiCGSTAB method.
+
+    Unlike :func:`cg`, `A` can be any non-singular matrix. The iterations run
+    on the device the same way as those of :func:`cg`.
+
+    Args:
+        A (Union[SparseMatrix, Callable]): The matrix, or a linear operator `A(u, v)` computing `v = A @ u` on two 1-D ndarrays.
+        b (Union[ScalarField, ScalarNdarray]): The 1-D right-hand side.
+        x (Union[ScalarField, ScalarNdarray]): The 1-D initial guess, overwritten by the solution.
+        M (Union[None, str, Callable]): The preconditioner, see :func:`cg`.
+        tol (float): The tolerance of the residual norm relative to the norm of `b`.
+        atol (float): The absolute tolerance of the residual norm.
+        max_iter (int, optional): The maximum number of iterations, the length of `b` by default.
+        check_every (int): The number of iterations between two convergence checks.
+
+    Returns:
+        Tuple[bool, int]: Whether the solver converged, and the number of iterations run.
+    """
+    from taichi.linalg import \
+        _krylov_kernels as kernels  # pylint: disable=C0415
+    problem = _KrylovProblem(A, b, x, M)
+    n = problem.n
+    if max_iter is None:
+        max_iter = n
+    r = problem.new_vector()
+    r_hat = problem.new_vector()
+    p = problem.new_vector()
+    v = problem.new_vector()
+    t = problem.new_vector()
+    if problem.precond == kernels.PRECOND_NONE:
+        # Without preconditioning, y is p and z is r
+        y, z = p, r
+    else:
+        y, z = problem.new_vector(), problem.new_vector()
+    inv_diag = problem.inv_diag if problem.inv_diag is not None else r
+    s = ScalarNdarray(problem.dtype, (kernels.BICG_NUM_SCALARS, ))
+
+    problem.apply_A(problem.x, t)
+    kernels.bicgstab_init(problem.b, t, r, r_hat, p, v, s, n)
+
+    monitor = _ConvergenceMonitor(s, kernels.BICG_RR, kernels.BICG_BB, tol,
+                                  atol, check_every, max_iter)
+    converged = monitor.converged(0)
+    iteration = 0
+    while not converged and iteration < max_iter:
+        kernels.bicgstab_update_direction(r, p, v, y, inv_diag, s, n,
+                                          problem.precond)
+        if problem.apply_M is not None:
+            problem.apply_M(p, y)
+        problem.apply_A(y, v)
+        kernels.dot(r_hat, v, s, kernels.BICG_RV, n)
+        kernels.bicgstab_update_half(problem.x, r, y, v, z, inv_diag, s, n,
+                                     problem.precond)
+        if problem.apply_M is not None:
+            problem.apply_M(r, z)
+        problem.apply_A(z, t)
+        kernels.bicgstab_dots(r, t, s, n)
+        kernels.bicgstab_update(problem.x, r, r_hat, z, t, s, n)
+        iteration += 1
+        converged = monitor.converged(iteration)
+    problem.finish()
+    return converged, iteration
+
+
+__all__ = ['cg', 'bicgstab']
@@ -1,7 +1,9 @@
 import numpy as np
-from taichi.lang.field import Field
+from taichi.lang._ndarray import ScalarNdarray
+from taichi.lang.field import Field, ScalarField
 from taichi.lang.impl import get_runtime
-from taichi.types.primitive_types import f32
+from taichi.lang.util import cook_dtype
+from taichi.types.primitive_types import f32, i32
 
 
 class SparseMatrix:
@@ -13,16 +15,21 @@ class SparseMatrix:
         n (int): the first dimension of a sparse matrix.
         m (int): the second dimension of a sparse matrix.
         sm (SparseMatrix): another sparse matrix that will be built from.
+        dtype (DataType): the data type of the elements, either `ti.f32` or `ti.f64`.
     """
     def __init__(self, n=None, m=None, sm=None, dtype=f32):
         if sm is None:
             self.n = n
             self.m = m if m else n
-            self.matrix = get_runtime().prog.create_sparse_matrix(n, m)
+            self.matrix = get_runtime().prog.create_sparse_matrix(
+                self.n, self.m, cook_dtype(dtype))
         else:
             self.n = sm.num_rows()
             self.m = sm.num_cols()
             self.matrix = sm
+        self.dtype = self.matrix.get_data_type()
+        # Device copy of the matrix in the CSR format, see `_get_csr`
+        self._csr = None
 
     def __add__(self, other):
         """Addition operation for sparse matrix.
@@ -31,6 +38,7 @@ class SparseMatrix:
             The result sparse matrix of the addition.
         """
         assert self.n == other.n and self.m == other.m, f"Dimension mismatch between sparse matrices ({self.n}, {self.m}) and ({other.n}, {other.m})"
+        self._check_dtype(other)
         sm = self.matrix + other.matrix
         return SparseMatrix(sm=sm)
 
@@ -41,6 +49,7 @@ class SparseMatrix:
              The result sparse matrix of the subtraction.
         """
         assert self.n == other.n and self.m == other.m, f"Dimension mismatch between sparse matrices ({self.n}, {self.m}) and ({other.n}, {other.m})"
+        self._check_dtype(other)
         sm = self.matrix - other.matrix
         return SparseMatrix(sm=sm)
 
@@ -56,6 +65,7 @@ class SparseMatrix:
             sm = self.matrix * other
             return SparseMatrix(sm=sm)
         if isinstance(other, SparseMatrix):
+            self._check_dtype(other)
             assert self.n == other.n and self.m == other.m, f"Dimension mismatch between sparse matrices ({self.n}, {self.m}) and ({other.n}, {other.m})"
             sm = self.matrix * other.matrix
             return SparseMatrix(sm=sm)
@@ -89,29 +99,76 @@ class SparseMatrix:
         """Matrix multiplication.
 
         Args:
-            other (SparseMatrix, Field, or numpy.array): the other sparse matrix of the multiplication.
+            other (SparseMatrix, Field, Ndarray or numpy.array): the other sparse matrix or vector of the multiplication.
         Returns:
-            The result of matrix multiplication.
+            The result of matrix multiplication, a SparseMatrix or a numpy.array.
         """
         if isinstance(other, SparseMatrix):
             assert self.m == other.n, f"Dimension mismatch between sparse matrices ({self.n}, {self.m}) and ({other.n}, {other.m})"
+            self._check_dtype(other)
             sm = self.matrix.matmul(other.matrix)
             return SparseMatrix(sm=sm)
-        if isinstance(other, Field):
-            assert self.m == other.shape[
-                0], f"Dimension mismatch between sparse matrix ({self.n}, {self.m}) and vector ({other.shape})"
-            return self.matrix.mat_vec_mul(other.to_numpy())
+        if isinstance(other, (Field, ScalarNdarray)):
+            res = ScalarNdarray(self.dtype, (self.n, ))
+            self.spmv(other, res)
+            return res.to_numpy()
         if isinstance(other, np.ndarray):
             assert self.m == other.shape[
                 0], f"Dimension mismatch between sparse matrix ({self.n}, {self.m}) and vector ({other.shape})"
             return self.matrix.mat_vec_mul(other)
-        assert False, f"Sparse matrix-matrix/vector multiplication does not support {type(other)} for now. Supported types are SparseMatrix, ti.field, and numpy.ndarray."
+        assert False, f"Sparse matrix-matrix/vector multiplication does not support {type(other)} for now. Supported types are SparseMatrix, ti.field, ti.ndarray and numpy.ndarray."
+
+    def spmv(self, x, y):
+        """Computes the matrix-vector product `y = A @ x` without a round trip through NumPy.
+
+        The rows of the result are computed in parallel by a Taichi kernel.
+
+        Args:
+            x (Union[ScalarField, ScalarNdarray]): The 1-D input vector with `m` elements.
+            y (Union[ScalarField, ScalarNdarray]): The preallocated 1-D output vector with `n` elements, which must not be `x`.
+        """
+        from taichi._kernels import csr_spmv  # pylint: disable=C0415
+        for vec, size, name in ((x, self.m, 'x'), (y, self.n, 'y')):
+            if not isinstance(vec, (ScalarField, ScalarNdarray)):
+                raise TypeError(
+                    f'{name} must be a scalar field or ndarray, but {type(vec)} provided'
+                )
+            if vec.shape != (size, ):
+                raise ValueError(
+                    f"Dimension mismatch between sparse matrix ({self.n}, {self.m}) and vector {name} ({vec.shape})"
+                )
+        if x is y:
+            raise ValueError('The output vector of spmv cannot be its input')
+        offsets, cols, vals = self._get_csr()
+        func = csr_spmv[isinstance(x, ScalarField), isinstance(y, ScalarField)]
+        func(offsets, cols, vals, x, y, self.n, self.dtype)
+
+    def _get_csr(self):
+        """Gets the row offsets, column indices and values of the matrix as ndarrays.
+
+        They are cached until the matrix is modified.
+        """
+        if self._csr is None:
+            offsets, cols, vals = self.matrix.get_csr()
+            nnz = len(cols)
+            self._csr = (ScalarNdarray(i32, (self.n + 1, )),
+                         ScalarNdarray(i32, (max(nnz, 1), )),
+                         ScalarNdarray(self.dtype, (max(nnz, 1), )))
+            self._csr[0].from_numpy(offsets)
+            if nnz > 0:
+                self._csr[1].from_numpy(cols)
+                self._csr[2].from_numpy(vals)
+        return self._csr
+
+    def _check_dtype(self, other):
+        assert self.dtype == other.dtype, f"Data type mismatch between sparse matrices ({self.dtype}) and ({other.dtype})"
 
     def __getitem__(self, indices):
         return self.matrix.get_element(indices[0], indices[1])
 
     def __setitem__(self, indices, value):
         self.matrix.set_element(indices[0], indices[1], value)
+        self._csr = None
 
     def __str__(self):
         """Python scope matrix print support."""
@@ -134,6 +191,8 @@ class SparseMatrixBuilder:
         num_rows (int): the first dimension of a sparse matrix.
         num_cols (int): the second dimension of a sparse matrix.
         max_num_triplets (int): the maximum number of triplets.
+        dtype (DataType): the data type of the elements, either `ti.f32` or `ti.f64`. \
+            When used as the annotation of a kernel argument, the data type of the builders passed to it.
     """
     def __init__(self,
                  num_rows=None,
@@ -142,9 +201,10 @@ class SparseMatrixBuilder:
                  dtype=f32):
         self.num_rows = num_rows
         self.num_cols = num_cols if num_cols else num_rows
+        self.dtype = cook_dtype(dtype)
         if num_rows is not None:
             self.ptr = get_runtime().prog.create_sparse_matrix_builder(
-                num_rows, num_cols, max_num_triplets)
+                num_rows, self.num_cols, max_num_triplets, self.dtype)
 
     def _get_addr(self):
         """Get the address of the sparse matrix"""
@@ -159,6 +219,22 @@ class SparseMatrixBuilder:
         sm = self.ptr.build()
         return SparseMatrix(sm=sm)
 
+    def refill(self, sm):
+        """Overwrite the values of a sparse matrix using the triplets, keeping its sparsity pattern.
+
+        This skips sorting and merging the triplets, which :func:`build` does
+        to create a new pattern. Since the pattern is kept, a
+        :class:`SparseSolver` that has analyzed the matrix only factorizes it
+        again in :func:`SparseSolver.compute`.
+
+        Args:
+            sm (SparseMatrix): A matrix of the same shape and data type, whose pattern contains all the triplets, \
+                e.g., the one built from the triplets filled by the same kernel.
+        """
+        assert (self.num_rows, self.num_cols) == sm.shape(), f"Dimension mismatch between sparse matrix builder ({self.num_rows}, {self.num_cols}) and sparse matrix ({sm.n}, {sm.m})"
+        self.ptr.refill(sm.matrix)
+        sm._csr = None
+
 
 sparse_matrix_builder = SparseMatrixBuilder
 # Alias for :class:`SparseMatrixBuilder`
@@ -2,8 +2,9 @@ import numpy as np
 import taichi.lang
 from taichi._lib import core as _ti_core
 from taichi.lang.field import Field
+from taichi.lang.util import cook_dtype
 from taichi.linalg import SparseMatrix
-from taichi.types.primitive_types import f32
+from taichi.types.primitive_types import f32, f64
 
 
 class SparseSolver:
@@ -12,16 +13,18 @@ class SparseSolver:
     Use this class to solve linear systems represented by sparse matrices.
 
     Args:
+        dtype (DataType): The data type of the sparse matrices, either `ti.f32` or `ti.f64`.
         solver_type (str): The factorization type.
         ordering (str): The method for matrices re-ordering.
     """
     def __init__(self, dtype=f32, solver_type="LLT", ordering="AMD"):
+        self.dtype = cook_dtype(dtype)
         solver_type_list = ["LLT", "LDLT", "LU"]
         solver_ordering = ['AMD', 'COLAMD']
         if solver_type in solver_type_list and ordering in solver_ordering:
             taichi_arch = taichi.lang.impl.get_runtime().prog.config.arch
             assert taichi_arch == _ti_core.Arch.x64 or taichi_arch == _ti_core.Arch.arm64, "SparseSolver only supports CPU for now."
-            self.solver = _ti_core.make_sparse_solver(dtype, solver_type,
+            self.solver = _ti_core.make_sparse_solver(self.dtype, solver_type,
                                                       ordering)
         else:
             assert False, f"The solver type {solver_type} with {ordering} is not supported for now. Only {solver_type_list} with {solver_ordering} are supported."
@@ -33,6 +36,10 @@ class SparseSolver:
     def compute(self, sparse_matrix):
         """This method is equivalent to calling both `analyze_pattern` and then `factorize`.
 
+        The analysis is skipped if the sparsity pattern of the matrix is the
+        same as that of the last analyzed matrix, e.g., after its values are
+        refilled with :func:`SparseMatrixBuilder.refill`.
+
         Args:
             sparse_matrix (SparseMatrix): The sparse matrix to be computed.
         """
@@ -71,10 +78,13 @@ class SparseSolver:
         Returns:
             numpy.array: The solution of linear systems.
         """
+        solve = self.solver.solve
+        if self.dtype == f64:
+            solve = self.solver.solve_f64
         if isinstance(b, Field):
-            return self.solver.solve(b.to_numpy())
+            return solve(b.to_numpy())
         if isinstance(b, np.ndarray):
-            return self.solver.solve(b)
+            return solve(b)
         assert False, f"The parameter type: {type(b)} is not supported in linear solvers for now."
 
     def info(self):
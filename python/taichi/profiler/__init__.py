@@ -1,3 +1,4 @@
+from taichi.profiler.cpu_topology import *
 from taichi.profiler.kernel_metrics import *
 from taichi.profiler.kernel_profiler import *
 from taichi.profiler.memory_profiler import *
@@ -0,0 +1,44 @@
+from taichi._lib import core as _ti_core
+from taichi.lang.impl import get_runtime
+
+
+def get_cpu_topology():
+    """Get the NUMA topology of the CPUs, and where the threads of the CPU thread pool run.
+
+    The returned dict contains:
+
+    * ``'numa_nodes'``: a list with a dict for each NUMA node, which has its ``'id'``
+      and the list of its ``'cpus'``. Without NUMA information (e.g., not on Linux),
+      all CPUs are reported as a single node.
+    * ``'thread_cpus'``: the CPU each thread of the CPU thread pool is pinned to, or
+      ``-1`` if it is not pinned. Thread 0 is the Python thread launching the kernels,
+      which is never pinned. This list is empty on backends without a CPU thread pool.
+
+    The threads are pinned with ``ti.init(cpu_affinity=...)`` or ``ti.init(numa_aware=True)``.
+
+    Returns:
+        dict: the CPU topology.
+
+    Example::
+
+        >>> import taichi as ti
+
+        >>> ti.init(ti.cpu, numa_aware=True)
+        >>> topology = ti.profiler.get_cpu_topology()
+        >>> for node in topology['numa_nodes']:
+        >>>     print(node['id'], node['cpus'])
+        >>> print(topology['thread_cpus'])
+    """
+    get_runtime().materialize()
+    topology = _ti_core.detect_cpu_topology()
+    return {
+        'numa_nodes': [{
+            'id': node.id,
+            'cpus': list(node.cpus),
+        } for node in topology.numa_nodes],
+        'thread_cpus':
+        list(get_runtime().prog.get_thread_cpus()),
+    }
+
+
+__all__ = ['get_cpu_topology']
@@ -10,6 +10,8 @@ class StatisticalResult:
 
     Profiling records with the same kernel name will be counted in a ``StatisticalResult`` instance via function ``insert_record(time)``.
     Currently, only the kernel elapsed time is counted, other statistics related to the kernel will be added in the feature.
+    The results of :class:`~taichi.profiler.kernel_profiler.KernelProfiler` are counted by the backend,
+    which also estimates the percentiles of the kernel elapsed time.
     """
     def __init__(self, name):
         self.name = name
@@ -17,6 +19,20 @@ class StatisticalResult:
         self.min_time = 0.0
         self.max_time = 0.0
         self.total_time = 0.0
+        self.median_time = 0.0
+        self.p99_time = 0.0
+
+    @staticmethod
+    def from_backend(result):
+        """Converts a result counted by the backend ``KernelProfilerBase``."""
+        res = StatisticalResult(result.name)
+        res.counter = result.counter
+        res.min_time = result.min
+        res.max_time = result.max
+        res.total_time = result.total
+        res.median_time = result.percentile(0.5)
+        res.p99_time = result.percentile(0.99)
+        return res
 
     def __lt__(self, other):
         # For sorted()
@@ -39,8 +55,11 @@ class StatisticalResult:
 class KernelProfiler:
     """Kernel profiler of Taichi.
 
-    Kernel profiler acquires kernel profiling records from backend, counts records in Python scope,
+    Kernel profiler acquires kernel profiling records and their statistics from backend,
     and prints the results to the console by :func:`~taichi.profiler.kernel_profiler.KernelProfiler.print_info`.
+    The backend counts the statistics of every launch as it happens, and keeps the latest
+    ``kernel_profiler_max_records`` records if this option of ``ti.init()`` is not negative,
+    so that the profiler can stay on in long-running programs.
 
     ``KernelProfiler`` now support detailed low-level performance metrics (such as memory bandwidth consumption) in its advanced mode.
     This mode is only available for the CUDA backend with CUPTI toolkit, i.e. you need ``ti.init(kernel_profiler=True, arch=ti.cuda)``.
@@ -96,6 +115,14 @@ class KernelProfiler:
         self._count_statistics()  # _total_time_ms is counted here
         return self._total_time_ms / 1000  # ms to s
 
+    def export_trace(self, filename):
+        """For docstring of this function, see :func:`~taichi.profiler.export_kernel_profiler_trace`."""
+        if self._check_not_turned_on_with_warning_message():
+            return None
+        impl.get_runtime().prog.sync_kernel_profiler()
+        impl.get_runtime().prog.save_kernel_profiler_trace(filename)
+        return None
+
     def clear_info(self):
         """Clear all records both in front-end :class:`~taichi.profiler.kernel_profiler.KernelProfiler` and back-end instance ``KernelProfilerBase``.
 
@@ -204,17 +231,16 @@ class KernelProfiler:
         ).prog.get_kernel_profiler_records()
 
     def _count_statistics(self):
-        """Counts the statistics of launched kernels during the profiling period.
+        """Acquires the statistics of launched kernels during the profiling period from a backend.
 
-        The profiling records with the same kernel name are counted as a profiling result.
+        The profiling records with the same kernel name are counted as a profiling result,
+        including the records that are no longer kept.
         """
-        for record in self._traced_records:
-            if self._statistical_results.get(record.name) is None:
-                self._statistical_results[record.name] = StatisticalResult(
-                    record.name)
-            self._statistical_results[record.name].insert_record(
-                record.kernel_time)
-            self._total_time_ms += record.kernel_time
+        prog = impl.get_runtime().prog
+        for result in prog.get_kernel_profiler_statistics():
+            self._statistical_results[
+                result.name] = StatisticalResult.from_backend(result)
+        self._total_time_ms = prog.kernel_profiler_total_time() * 1000
         self._statistical_results = {
             k: v
             for k, v in sorted(self._statistical_results.items(),
@@ -235,7 +261,7 @@ class KernelProfiler:
 
         # headers
         table_header = table_header = self._make_table_header('count')
-        column_header = '[      %     total   count |      min       avg       max   ] Kernel name'
+        column_header = '[      %     total   count |      min       avg       p50       p99       max   ] Kernel name'
         # partition line
         line_length = max(len(column_header), len(table_header))
         outer_partition_line = '=' * line_length
@@ -248,13 +274,16 @@ class KernelProfiler:
             result = self._statistical_results[key]
             fraction = result.total_time / self._total_time_ms * 100.0
             string_list.append(
-                '[{:6.2f}% {:7.3f} s {:6d}x |{:9.3f} {:9.3f} {:9.3f} ms] {}')
+                '[{:6.2f}% {:7.3f} s {:6d}x |{:9.3f} {:9.3f} {:9.3f} {:9.3f} {:9.3f} ms] {}'
+            )
             values_list.append([
                 fraction,
                 result.total_time / 1000.0,
                 result.counter,
                 result.min_time,
                 result.total_time / result.counter,  # avg_time
+                result.median_time,
+                result.p99_time,
                 result.max_time,
                 result.name
             ])
@@ -279,6 +308,10 @@ class KernelProfiler:
 
     def _print_kernel_info(self):
         """Print a list of launched kernels during the profiling period."""
+        if len(self._traced_records) == 0:
+            print('No kernel profiling records are kept, '
+                  'see `kernel_profiler_max_records` of `ti.init()`.')
+            return
         metric_list = self._metric_list
         values_num = len(self._traced_records[0].metric_values)
 
@@ -451,6 +484,36 @@ def get_kernel_profiler_total_time():
     return get_default_kernel_profiler().get_total_time()
 
 
+def export_kernel_profiler_trace(filename):
+    """Save the kept kernel profiling records in the Chrome trace event format.
+
+    The records are saved together with the events of :func:`~taichi.timeline_save`,
+    and the file can be loaded in ``chrome://tracing`` or https://ui.perfetto.dev.
+    Set ``kernel_profiler_max_records`` in ``ti.init()`` to keep only the latest records.
+
+    Args:
+        filename (str): path of the JSON file to save.
+
+    Example::
+
+        >>> import taichi as ti
+
+        >>> ti.init(ti.cpu, kernel_profiler=True, kernel_profiler_max_records=1000)
+        >>> x = ti.field(ti.f32, shape=1024*1024)
+
+        >>> @ti.kernel
+        >>> def fill():
+        >>>     for i in x:
+        >>>         x[i] = i
+
+        >>> for i in range(10000):
+        >>>     fill()
+        >>> # The last 1000 launches of fill()
+        >>> ti.profiler.export_kernel_profiler_trace('kernels.json')
+    """
+    get_default_kernel_profiler().export_trace(filename)
+
+
 def set_kernel_profiler_toolkit(toolkit_name='default'):
     """Set the toolkit used by KernelProfiler.
 
@@ -586,7 +649,7 @@ def collect_kernel_profiler_metrics(metric_list=default_cupti_metrics):
 
 __all__ = [
     'clear_kernel_profiler_info', 'collect_kernel_profiler_metrics',
-    'get_kernel_profiler_total_time', 'print_kernel_profiler_info',
-    'query_kernel_profiler_info', 'set_kernel_profiler_metrics',
-    'set_kernel_profiler_toolkit'
+    'export_kernel_profiler_trace', 'get_kernel_profiler_total_time',
+    'print_kernel_profiler_info', 'query_kernel_profiler_info',
+    'set_kernel_profiler_metrics', 'set_kernel_profiler_toolkit'
 ]
@@ -10,4 +10,129 @@ def print_memory_profiler_info():
     get_runtime().prog.print_memory_profiler_info()
 
 
-__all__ = ['print_memory_profiler_info']
+def _snode_memory_info(info):
+    return {
+        'id': info.snode_id,
+        'name': info.name,
+        'num_active_elements': info.num_active_elements,
+        'element_size': info.element_size,
+        'num_chunks': info.num_chunks,
+        'chunk_num_elements': info.chunk_num_elements,
+        'allocated_bytes': info.allocated_bytes,
+        'num_used_elements': info.num_used_elements,
+        'num_free_elements': info.num_free_elements,
+        'num_recycled_elements': info.num_recycled_elements,
+        'peak_num_used_elements': info.peak_num_used_elements,
+        'fragmentation': info.fragmentation,
+    }
+
+
+def _device_memory_stats(stats):
+    return {
+        'allocated_bytes': stats.allocated_bytes,
+        'peak_allocated_bytes': stats.peak_allocated_bytes,
+        'num_allocations': stats.num_allocations,
+        'cached_bytes': stats.cached_bytes,
+    }
+
+
+def get_memory_info():
+    """Get the memory allocated by Taichi as a dict of plain values.
+
+    The returned dict contains:
+
+    * ``'snode_trees'``: a list with a dict for each SNode tree, which has its ``'id'``,
+      the bytes of its root buffer ``'root_bytes'`` and a list of ``'snodes'``.
+      For each SNode with an active element list, the dict in ``'snodes'`` has the
+      length of the list ``'num_active_elements'`` and the statistics of the node
+      allocator of its children: the chunks (``'num_chunks'`` of ``'chunk_num_elements'``
+      cells of ``'element_size'`` bytes, ``'allocated_bytes'`` in total), the cells in
+      use (``'num_used_elements'`` and ``'peak_num_used_elements'``), the cells free for
+      reuse (``'num_free_elements'`` and ``'num_recycled_elements'``) and the fraction of
+      the chunks not in use (``'fragmentation'``). The chunks are never released, so
+      ``'allocated_bytes'`` is also the peak. This list is only filled on the CPU and
+      CUDA backends.
+    * ``'runtime_requested_bytes'``: the memory requested by the LLVM runtime.
+    * ``'device'``: the allocations of the compute device, e.g., ndarrays and the
+      memory pool buffers, with ``'allocated_bytes'``, ``'peak_allocated_bytes'``,
+      ``'num_allocations'`` and the bytes kept by the caching allocator for reuse
+      ``'cached_bytes'``.
+
+    Returns:
+        dict: the memory info.
+
+    Example::
+
+        >>> import taichi as ti
+
+        >>> ti.init(ti.cpu)
+        >>> x = ti.field(ti.f32)
+        >>> ti.root.pointer(ti.i, 64).dense(ti.i, 16).place(x)
+
+        >>> @ti.kernel
+        >>> def activate():
+        >>>     for i in range(256):
+        >>>         x[i] = i
+
+        >>> activate()
+        >>> info = ti.profiler.get_memory_info()
+        >>> for snode in info['snode_trees'][0]['snodes']:
+        >>>     print(snode['name'], snode['num_used_elements'], snode['allocated_bytes'])
+    """
+    get_runtime().materialize()
+    info = get_runtime().prog.get_memory_info()
+    return {
+        'snode_trees': [{
+            'id': tree.tree_id,
+            'root_bytes': tree.root_bytes,
+            'snodes': [_snode_memory_info(snode) for snode in tree.snodes],
+        } for tree in info.snode_trees],
+        'runtime_requested_bytes':
+        info.runtime_requested_bytes,
+        'device':
+        _device_memory_stats(info.device),
+    }
+
+
+def start_memory_sampling(interval=1e-3):
+    """Start sampling the memory allocated on the compute device.
+
+    The allocated bytes are sampled every ``interval`` seconds in a background
+    thread while the kernels run. Only host-side counters are read, so the
+    kernels are not synchronized. Call :func:`stop_memory_sampling` to get the samples.
+
+    Args:
+        interval (float): the sampling interval in seconds.
+
+    Example::
+
+        >>> import taichi as ti
+
+        >>> ti.init(ti.cuda)
+        >>> ti.profiler.start_memory_sampling(interval=1e-3)
+        >>> run_simulation()
+        >>> samples = ti.profiler.stop_memory_sampling()
+        >>> peak = max(s['allocated_bytes'] for s in samples)
+    """
+    get_runtime().materialize()
+    get_runtime().prog.start_memory_sampling(interval)
+
+
+def stop_memory_sampling():
+    """Stop sampling the memory allocated on the compute device.
+
+    Returns:
+        list: a dict for each sample, with the ``'time'`` in seconds, and the
+        ``'allocated_bytes'`` and ``'cached_bytes'`` of the device.
+    """
+    return [{
+        'time': sample.time,
+        'allocated_bytes': sample.allocated_bytes,
+        'cached_bytes': sample.cached_bytes,
+    } for sample in get_runtime().prog.stop_memory_sampling()]
+
+
+__all__ = [
+    'get_memory_info', 'print_memory_profiler_info', 'start_memory_sampling',
+    'stop_memory_sampling'
+]
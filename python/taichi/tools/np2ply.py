@@ -1,5 +1,6 @@
 # convert numpy array to ply files
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
@@ -42,6 +43,7 @@ class PLYWriter:
         elif face_type == "quad":
             self.face_indices = -np.ones((self.num_faces, 4), dtype=np.int32)
         self.comment = comment
+        self._pending = []
 
     def add_vertex_channel(self, key: str, data_type: str, data: np.array):
         if data_type not in self.ply_supported_types:
@@ -200,83 +202,188 @@ class PLYWriter:
         assert "y" in self.vertex_channels, "The vertex pos channel is missing"
         assert "z" in self.vertex_channels, "The vertex pos channel is missing"
         if self.num_faces > 0:
-            for idx in self.face_indices.flatten():
-                assert idx >= 0 and idx < self.num_vertices, "The face indices are invalid"
+            valid = (self.face_indices >= 0) & (self.face_indices <
+                                                 self.num_vertices)
+            assert valid.all(), "The face indices are invalid"
+
+    def _header(self, _format: str):
+        lines = [
+            "ply", "format " + _format + " 1.0", "comment " + self.comment,
+            "element vertex " + str(self.num_vertices)
+        ]
+        for i in range(self.num_vertex_channels):
+            lines.append("property " + self.vertex_data_type[i] + " " +
+                         self.vertex_channels[i])
+        if self.num_faces != 0:
+            lines.append("element face " + str(self.num_faces))
+            lines.append("property list uchar int vertex_indices")
+            for i in range(self.num_face_channels):
+                lines.append("property " + self.face_data_type[i] + " " +
+                             self.face_channels[i])
+        lines.append("end_header\n")
+        return "\n".join(lines)
 
     def print_header(self, path: str, _format: str):
         with open(path, "w") as f:
-            f.writelines([
-                "ply\n", "format " + _format + " 1.0\n",
-                "comment " + self.comment + "\n"
-            ])
-            f.write("element vertex " + str(self.num_vertices) + "\n")
-            for i in range(self.num_vertex_channels):
-                f.write("property " + self.vertex_data_type[i] + " " +
-                        self.vertex_channels[i] + "\n")
-            if self.num_faces != 0:
-                f.write("element face " + str(self.num_faces) + "\n")
-                f.write("property list uchar int vertex_indices\n")
-                for i in range(self.num_face_channels):
-                    f.write("property " + self.face_data_type[i] + " " +
-                            self.face_channels[i] + "\n")
-            f.write("end_header\n")
+            f.write(self._header(_format))
 
-    def export(self, path):
+    def _vertex_records(self):
+        # Channel names may repeat, so the record fields are named by position
+        records = np.empty(self.num_vertices,
+                           dtype=[(f"c{i}", self.type_map[t])
+                                  for i, t in enumerate(self.vertex_data_type)])
+        for i, data in enumerate(self.vertex_data):
+            records[f"c{i}"] = data
+        return records
+
+    def _face_records(self):
+        vert_per_face = self.face_indices.shape[1]
+        records = np.empty(self.num_faces,
+                           dtype=[("count", np.uint8),
+                                  ("indices", np.int32, (vert_per_face, ))] +
+                           [(f"c{i}", self.type_map[t])
+                            for i, t in enumerate(self.face_data_type)])
+        records["count"] = vert_per_face
+        records["indices"] = self.face_indices
+        for i, data in enumerate(self.face_data):
+            records[f"c{i}"] = data
+        return records
+
+    def _serialize(self):
         self.sanity_check()
-        self.print_header(path, "binary_" + sys.byteorder + "_endian")
-        with open(path, "ab") as f:
-            for i in range(self.num_vertices):
-                for j in range(self.num_vertex_channels):
-                    f.write(self.vertex_data[j][i])
-            if self.face_type == "tri":
-                vert_per_face = np.uint8(3)
-            else:
-                vert_per_face = np.uint8(4)
-            for i in range(self.num_faces):
-                f.write(vert_per_face)
-                for j in range(vert_per_face):
-                    f.write(self.face_indices[i, j])
-                for j in range(self.num_face_channels):
-                    f.write(self.face_data[j][i])
+        # Fields of structured dtypes are packed, so each record matches the
+        # layout of a PLY element in the native byte order
+        chunks = [
+            self._header("binary_" + sys.byteorder + "_endian").encode(),
+            self._vertex_records()
+        ]
+        if self.num_faces != 0:
+            chunks.append(self._face_records())
+        return chunks
 
-    def export_ascii(self, path):
+    def _serialize_ascii(self):
         self.sanity_check()
-        self.print_header(path, "ascii")
-        with open(path, "a") as f:
-            for i in range(self.num_vertices):
-                for j in range(self.num_vertex_channels):
-                    f.write(str(self.vertex_data[j][i]) + " ")
-                f.write("\n")
-            if self.face_type == "tri":
-                vert_per_face = 3
+        chunks = [self._header("ascii")]
+        chunks.append(_format_rows(self.vertex_data, self.vertex_data_type))
+        if self.num_faces != 0:
+            vert_per_face = self.face_indices.shape[1]
+            counts = np.full(self.num_faces, vert_per_face, dtype=np.int32)
+            face_data = [counts] + [
+                self.face_indices[:, i] for i in range(vert_per_face)
+            ] + self.face_data
+            face_data_type = ["int"] * (vert_per_face + 1) + self.face_data_type
+            chunks.append(_format_rows(face_data, face_data_type))
+        return ["".join(chunks)]
+
+    def export(self, path):
+        _write_chunks(path, self._serialize(), "wb")
+
+    def export_ascii(self, path):
+        _write_chunks(path, self._serialize_ascii(), "w")
+
+    def _collect(self, max_pending):
+        """Forgets the written frames, after waiting for the oldest ones until
+        at most `max_pending` frames are pending.
+
+        Raises:
+            OSError: If writing any of the forgotten frames failed.
+        """
+        num_waited = len(self._pending) - max_pending
+        error = None
+        pending = []
+        for i, future in enumerate(self._pending):
+            if i < num_waited or future.done():
+                if future.exception() is not None and error is None:
+                    error = future.exception()
             else:
-                vert_per_face = 4
-            for i in range(self.num_faces):
-                f.writelines([
-                    str(vert_per_face) + " ",
-                    " ".join(map(str, self.face_indices[i, :])), " "
-                ])
-                for j in range(self.num_face_channels):
-                    f.write(str(self.face_data[j][i]) + " ")
-                f.write("\n")
-
-    def export_frame_ascii(self, series_num: int, path: str):
-        # if path has ply ending
-        last_4_char = path[-4:]
-        if last_4_char == ".ply":
-            path = path[:-4]
-
-        real_path = path + "_" + f"{series_num:0=6d}" + ".ply"
-        self.export_ascii(real_path)
-
-    def export_frame(self, series_num: int, path: str):
-        # if path has ply ending
-        last_4_char = path[-4:]
-        if last_4_char == ".ply":
-            path = path[:-4]
-
-        real_path = path + "_" + f"{series_num:0=6d}" + ".ply"
-        self.export(real_path)
+                pending.append(future)
+        self._pending = pending
+        if error is not None:
+            raise error
+
+    def _submit(self, path, serialize, mode):
+        # Files are written by a single thread in submission order, while the
+        # data are serialized on the calling thread, so that later changes to
+        # the channels do not affect pending frames. The serialized data of at
+        # most _MAX_PENDING_FRAMES frames are kept, so a producer faster than
+        # the disk is blocked here instead of piling them up.
+        self._collect(_MAX_PENDING_FRAMES - 1)
+        chunks = serialize()
+
+        def write():
+            _write_chunks(path, chunks, mode)
+
+        self._pending.append(_get_background_executor().submit(write))
+
+    def wait(self):
+        """Waits until all frames exported in the background are written.
+
+        Raises:
+            OSError: If writing any of the frames failed.
+        """
+        self._collect(0)
+
+    def export_frame_ascii(self, series_num: int, path: str,
+                           background=False):
+        real_path = _get_frame_path(series_num, path)
+        if background:
+            self._submit(real_path, self._serialize_ascii, "w")
+        else:
+            self.export_ascii(real_path)
+
+    def export_frame(self, series_num: int, path: str, background=False):
+        """Exports the current data to `{path}_{series_num:06d}.ply` in binary format.
+
+        Args:
+            series_num (int): The frame number.
+            path (str): The path prefix, with or without the ".ply" suffix.
+            background (bool): Whether to write the file on a background thread and return immediately. At most a few frames are pending at a time, beyond which this waits for the oldest ones. A failure to write an earlier frame is raised here or by :func:`wait`, which makes sure that all such frames are written.
+        """
+        real_path = _get_frame_path(series_num, path)
+        if background:
+            self._submit(real_path, self._serialize, "wb")
+        else:
+            self.export(real_path)
+
+
+# The number of frames exported in the background whose data may be kept in
+# memory while waiting to be written
+_MAX_PENDING_FRAMES = 4
+
+_background_executor = None
+
+
+def _get_background_executor():
+    global _background_executor
+    if _background_executor is None:
+        _background_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="PLYWriter")
+    return _background_executor
+
+
+def _write_chunks(path, chunks, mode):
+    with open(path, mode) as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _get_frame_path(series_num, path):
+    # if path has ply ending
+    if path[-4:] == ".ply":
+        path = path[:-4]
+    return path + "_" + f"{series_num:0=6d}" + ".ply"
+
+
+def _format_rows(columns, data_types):
+    if not columns:
+        return ""
+    # Integers are printed exactly, floats with enough digits to round-trip
+    fmt = " ".join("%.9g" if t == "float" else "%.17g" if t ==
+                   "double" else "%d" for t in data_types) + "\n"
+    table = np.empty((len(columns[0]), len(columns)), dtype=object)
+    for i, column in enumerate(columns):
+        table[:, i] = column
+    return "".join(fmt % tuple(row) for row in table.tolist())
 
 
 __all__ = ['PLYWriter']
@@ -1,8 +1,12 @@
 import os
+import queue
 import shutil
+import subprocess
+import threading
 
+import numpy as np
 from taichi._lib.utils import get_os_name
-from taichi.tools.image import imwrite
+from taichi.tools.image import cook_image_to_bytes, imwrite
 
 FRAME_FN_TEMPLATE = '%06d.png'
 FRAME_DIR = 'frames'
@@ -54,20 +58,45 @@ def mp4_to_gif(input_fn, output_fn, framerate):
 
 
 class VideoManager:
+    """Records frames into mp4 and gif videos.
+
+    By default, each frame is saved as a PNG file and the videos are encoded
+    from the files by :func:`make_video`. In streaming mode, a single ffmpeg
+    process is kept open instead, and raw RGB frames are piped to it from a
+    background thread as they are written, so that no intermediate image is
+    compressed and the video is ready as soon as :func:`close` returns.
+
+    Args:
+        output_dir (str): The directory of the frames and the videos.
+        width (int, optional): Width of the videos. Defaults to the width of the first frame.
+        height (int, optional): Height of the videos. Defaults to the height of the first frame.
+        post_processor (optional): An object whose `process(img)` is applied to each frame.
+        framerate (int): Frames per second of the videos.
+        automatic_build (bool): Whether to rebuild the videos whenever the number of frames doubles. Ignored in streaming mode.
+        streaming (bool): Whether to pipe the frames to ffmpeg while they are written.
+        dump_frames (bool, optional): Whether to save the frames as PNG files. Defaults to `not streaming`.
+        max_queued_frames (int): In streaming mode, the number of frames that can be waiting to be encoded before :func:`write_frame` blocks.
+    """
     def __init__(self,
                  output_dir,
                  width=None,
                  height=None,
                  post_processor=None,
                  framerate=24,
-                 automatic_build=True):
+                 automatic_build=True,
+                 streaming=False,
+                 dump_frames=None,
+                 max_queued_frames=8):
         assert (width is None) == (height is None)
         self.width = width
         self.height = height
         self.directory = output_dir
         self.frame_directory = os.path.join(self.directory, FRAME_DIR)
+        self.streaming = streaming
+        self.dump_frames = not streaming if dump_frames is None else dump_frames
         try:
-            os.makedirs(self.frame_directory)
+            os.makedirs(self.frame_directory if self.dump_frames else self.
+                        directory)
         except:
             pass
         self.next_video_checkpoint = 4
@@ -75,7 +104,9 @@ class VideoManager:
         self.post_processor = post_processor
         self.frame_counter = 0
         self.frame_fns = []
-        self.automatic_build = automatic_build
+        self.automatic_build = automatic_build and not streaming
+        self.max_queued_frames = max_queued_frames
+        self._encoder = None
 
     def get_output_filename(self, suffix):
         return os.path.join(self.directory, 'video' + suffix)
@@ -93,9 +124,17 @@ class VideoManager:
             self.width = img.shape[0]
             self.height = img.shape[1]
         assert os.path.exists(self.directory)
-        fn = FRAME_FN_TEMPLATE % self.frame_counter
-        self.frame_fns.append(fn)
-        imwrite(img, os.path.join(self.frame_directory, fn))
+        if self.dump_frames:
+            fn = FRAME_FN_TEMPLATE % self.frame_counter
+            self.frame_fns.append(fn)
+            imwrite(img, os.path.join(self.frame_directory, fn))
+        if self.streaming:
+            if self._encoder is None:
+                self._encoder = _StreamingEncoder(
+                    img.shape[0], img.shape[1], self.width, self.height,
+                    self.framerate, self.get_output_filename('.mp4'),
+                    self.max_queued_frames)
+            self._encoder.write(img)
         self.frame_counter += 1
         if self.frame_counter % self.next_video_checkpoint == 0:
             if self.automatic_build:
@@ -114,14 +153,25 @@ class VideoManager:
             if fn.endswith('.png') and fn in self.frame_fns:
                 os.remove(fn)
 
+    def close(self):
+        """Waits for all frames to be encoded and finalizes the mp4 video in streaming mode.
+
+        No more frames can be written afterwards.
+        """
+        if self._encoder is not None:
+            self._encoder.close()
+
     def make_video(self, mp4=True, gif=True):
         fn = self.get_output_filename('.mp4')
-        command = (get_ffmpeg_path() + f" -loglevel panic -framerate {self.framerate} -i ") + os.path.join(
-            self.frame_directory, FRAME_FN_TEMPLATE) + \
-                  " -s:v " + str(self.width) + 'x' + str(self.height) + \
-                  " -c:v libx264 -profile:v high -crf 1 -pix_fmt yuv420p -y " + fn
+        if self.streaming:
+            self.close()
+        else:
+            command = (get_ffmpeg_path() + f" -loglevel panic -framerate {self.framerate} -i ") + os.path.join(
+                self.frame_directory, FRAME_FN_TEMPLATE) + \
+                      " -s:v " + str(self.width) + 'x' + str(self.height) + \
+                      " -c:v libx264 -profile:v high -crf 1 -pix_fmt yuv420p -y " + fn
 
-        os.system(command)
+            os.system(command)
 
         if gif:
             mp4_to_gif(self.get_output_filename('.mp4'),
@@ -131,6 +181,70 @@ class VideoManager:
             os.remove(fn)
 
 
+class _StreamingEncoder:
+    """Pipes raw RGB24 frames of a fixed size to an ffmpeg process."""
+    def __init__(self, frame_width, frame_height, width, height, framerate,
+                 output_fn, max_queued_frames):
+        self.frame_shape = (frame_width, frame_height)
+        command = [
+            get_ffmpeg_path(), '-y', '-loglevel', 'error', '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24', '-s:v', f'{frame_width}x{frame_height}',
+            '-framerate',
+            str(framerate), '-i', '-', '-s:v', f'{width}x{height}', '-c:v',
+            'libx264', '-profile:v', 'high', '-crf', '1', '-pix_fmt',
+            'yuv420p', output_fn
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        # Bounds the memory held by frames waiting to be encoded
+        self.queue = queue.Queue(maxsize=max_queued_frames)
+        self.error = None
+        self.closed = False
+        self.thread = threading.Thread(target=self._pipe_frames, daemon=True)
+        self.thread.start()
+
+    def _pipe_frames(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                self.process.stdin.write(frame)
+            except OSError as e:
+                self.error = e
+
+    def _check_error(self):
+        if self.error is not None:
+            raise RuntimeError(
+                f'ffmpeg stopped accepting frames: {self.error}')
+
+    def write(self, img):
+        assert not self.closed, 'Cannot write frames to a closed video'
+        self._check_error()
+        if img.shape[:2] != self.frame_shape:
+            raise ValueError(
+                f'All frames must be {self.frame_shape[0]}x{self.frame_shape[1]}, '
+                f'but a {img.shape[0]}x{img.shape[1]} frame is provided')
+        # Converted on the calling thread, which may reuse `img` right away
+        img = cook_image_to_bytes(img)
+        if img.shape[2] == 1:
+            img = np.repeat(img, 3, axis=2)
+        self.queue.put(np.ascontiguousarray(img[:, :, :3]).tobytes())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        self.process.stdin.close()
+        ret = self.process.wait()
+        self._check_error()
+        if ret != 0:
+            raise RuntimeError(f'ffmpeg exited with code {ret}')
+
+
 def interpolate_frames(frame_dir, mul=4):
     # TODO: remove dependency on cv2 here
     import cv2  # pylint: disable=C0415
@@ -3,11 +3,13 @@ import numbers
 import os
 
 import numpy as np
-import taichi.lang
-from taichi._kernels import (tensor_to_image, vector_to_fast_image,
-                             vector_to_image)
+from taichi._kernels import (image_scale, ndarray_to_fast_image,
+                             ndarray_to_image, tensor_to_fast_image,
+                             tensor_to_image)
 from taichi._lib import core as _ti_core
-from taichi.lang.field import Field, ScalarField
+from taichi.lang._ndarray import Ndarray
+from taichi.lang.field import Field
+from taichi.lang.matrix import MatrixField, MatrixNdarray, VectorNdarray
 
 import taichi as ti
 
@@ -200,11 +202,24 @@ class GUI:
             color = self.background_color
         self.canvas.clear(color)
 
-    def cook_image(self, img):
+    def cook_image(self, img, out=None):
+        """Converts a NumPy image into the RGBA float32 layout of the canvas.
+
+        The values are converted in place into `out`, without temporary
+        full-resolution arrays.
+
+        Args:
+            img (numpy.ndarray): the image, see :func:`set_image`.
+            out (numpy.ndarray, optional): the RGBA float32 array to write into.
+                A new one is created if not specified.
+
+        Returns:
+            numpy.ndarray: the RGBA float32 image.
+        """
         if img.dtype in [np.uint8, np.uint16, np.uint32, np.uint64]:
-            img = img.astype(np.float32) * (1 / np.iinfo(img.dtype).max)
+            scale = np.float32(1 / np.iinfo(img.dtype).max)
         elif img.dtype in [np.float16, np.float32, np.float64]:
-            img = img.astype(np.float32)
+            scale = None
         else:
             raise ValueError(
                 f'Data type {img.dtype} not supported in GUI.set_image')
@@ -212,20 +227,47 @@ class GUI:
         if len(img.shape) == 2:
             img = img[..., None]
 
-        if img.shape[2] == 1:
-            img = img + np.zeros((1, 1, 4), np.float32)
-        if img.shape[2] == 3:
-            zeros = np.zeros((img.shape[0], img.shape[1], 1), np.float32)
-            img = np.concatenate([img, zeros], axis=2)
-        if img.shape[2] == 2:
-            zeros = np.zeros((img.shape[0], img.shape[1], 2), np.float32)
-            img = np.concatenate([img, zeros], axis=2)
-
-        assert img.shape[2] == 4, "Image must be grayscale, RG, RGB or RGBA"
+        assert img.shape[2] in [1, 2, 3,
+                                4], "Image must be grayscale, RG, RGB or RGBA"
 
         res = img.shape[:2]
         assert res == self.res, "Image resolution does not match GUI resolution"
-        return np.ascontiguousarray(img)
+
+        if out is None:
+            out = np.empty(res + (4, ), np.float32)
+        if img.shape[2] == 1:
+            # Broadcast to all the channels
+            channels = out
+        else:
+            channels = out[..., :img.shape[2]]
+            out[..., img.shape[2]:] = 0
+        if scale is None:
+            np.copyto(channels, img, casting='unsafe')
+        else:
+            np.multiply(img, scale, out=channels, casting='unsafe')
+        return out
+
+    def _image_format(self, img):
+        """Gets the kind of the elements of a Taichi image and its number of channels."""
+        if isinstance(img, (MatrixField, MatrixNdarray)):
+            assert img.m == 1, \
+                "Only greyscale, RG, RGB or RGBA images are supported in GUI.set_image"
+            kind, num_channels = 'vector', img.n
+        elif isinstance(img, VectorNdarray):
+            kind, num_channels = 'vector', img.n
+        elif len(img.shape) == 2:
+            kind, num_channels = 'scalar', 1
+        elif len(img.shape) == 3:
+            kind, num_channels = 'channels', img.shape[2]
+        else:
+            raise ValueError(
+                f'Images of shape {img.shape} are not supported in GUI.set_image'
+            )
+        assert tuple(img.shape[:2]) == self.res, \
+            "Image resolution does not match GUI resolution"
+        assert num_channels in [1, 2, 3, 4], \
+            "Only greyscale, RG, RGB or RGBA images are supported in GUI.set_image"
+        return kind, num_channels
 
     def get_image(self):
         """Get the image data.
@@ -251,6 +293,10 @@ class GUI:
                 - `np.ndarray(shape=(x, y))`
                 - `np.ndarray(shape=(x, y, 3))`
                 - `np.ndarray(shape=(x, y, 2))`
+                - `ti.ndarray` and `ti.Vector.ndarray` of the same shapes as the fields
+            RGBA images, with a last dimension or a vector of `4`, are also accepted.
+            A C-contiguous `float32` NumPy array of shape `(x, y, 4)` is passed to the
+            canvas without any copy, and the other images are converted in place.
             The data type of `img` must be one of:
                 - `uint8`, range `[0, 255]`
                 - `uint16`, range `[0, 65535]`
@@ -258,57 +304,60 @@ class GUI:
                 - `float32`, range `[0, 1]`
                 - `float64`, range `[0, 1]`
         Args:
-            img (Union[ti.field, numpy.array]): The color array representing the
+            img (Union[ti.field, ti.ndarray, numpy.array]): The color array representing the
                 image to be drawn. Support greyscale, RG, RGB, and RGBA color
                 representations. Its shape must match GUI resolution.
 
         """
 
+        if isinstance(img, np.ndarray):
+            if self.fast_gui:
+                assert len(img.shape) == 3 and img.shape[2] in [3, 4], \
+                    "Only RGB images are supported in GUI.set_image when fast_gui=True"
+                assert img.shape[:2] == self.res, \
+                    "Image resolution does not match GUI resolution"
+                assert img.dtype in [np.float32, np.float64, np.uint8], \
+                    "Only f32, f64, u8 are supported in GUI.set_image when fast_gui=True"
+                ndarray_to_fast_image(img, self.img, 'channels',
+                                      img.dtype != np.uint8)
+            elif img.dtype == np.float32 and img.shape == self.res + (
+                    4, ) and img.flags.c_contiguous:
+                # Already in the layout of the canvas, no conversion needed
+                self.core.set_img(img.ctypes.data)
+            else:
+                self.cook_image(img, out=self.img)
+                self.core.set_img(self.img.ctypes.data)
+            return
+
+        if not isinstance(img, (Field, Ndarray)):
+            raise ValueError(
+                f"GUI.set_image only takes a Taichi field, Taichi ndarray or NumPy array, not {type(img)}"
+            )
+        kind, num_channels = self._image_format(img)
+
         if self.fast_gui:
-            assert isinstance(img, taichi.lang.matrix.MatrixField), \
-                "Only ti.Vector.field is supported in GUI.set_image when fast_gui=True"
-            assert img.shape == self.res, \
-                "Image resolution does not match GUI resolution"
-            assert img.n in [3, 4] and img.m == 1, \
+            assert num_channels in [3, 4], \
                 "Only RGB images are supported in GUI.set_image when fast_gui=True"
             assert img.dtype in [ti.f32, ti.f64, ti.u8], \
                 "Only f32, f64, u8 are supported in GUI.set_image when fast_gui=True"
-
-            vector_to_fast_image(img, self.img)
-            return
-
-        if isinstance(img, ScalarField):
-            if _ti_core.is_integral(img.dtype) or len(img.shape) != 2:
-                # Images of uint is not optimized by xxx_to_image
-                self.img = self.cook_image(img.to_numpy())
+            if isinstance(img, Field):
+                tensor_to_fast_image(img, self.img, kind)
             else:
-                # Type matched! We can use an optimized copy kernel.
-                assert img.shape \
-                    == self.res, "Image resolution does not match GUI resolution"
-                tensor_to_image(img, self.img)
-                ti.sync()
-
-        elif isinstance(img, taichi.lang.matrix.MatrixField):
-            if _ti_core.is_integral(img.dtype):
-                self.img = self.cook_image(img.to_numpy())
-            else:
-                # Type matched! We can use an optimized copy kernel.
-                assert img.shape == self.res, \
-                    "Image resolution does not match GUI resolution"
-                assert img.n in [2, 3, 4] and img.m == 1, \
-                    "Only greyscale, RG, RGB or RGBA images are supported in GUI.set_image"
-
-                vector_to_image(img, self.img)
-                ti.sync()
-
-        elif isinstance(img, np.ndarray):
-            self.img = self.cook_image(img)
+                ndarray_to_fast_image(img, self.img, kind, img.dtype != ti.u8)
+            return
 
-        else:
+        if not (_ti_core.is_real(img.dtype)
+                or _ti_core.is_unsigned(img.dtype)):
             raise ValueError(
-                f"GUI.set_image only takes a Taichi field or NumPy array, not {type(img)}"
-            )
-
+                f'Data type {img.dtype} not supported in GUI.set_image')
+        # The values are converted in a kernel, so that no temporary arrays
+        # are created
+        if isinstance(img, Field):
+            tensor_to_image(img, self.img, kind, num_channels)
+        else:
+            ndarray_to_image(img, self.img, kind, num_channels,
+                             image_scale(img.dtype))
+        ti.sync()
         self.core.set_img(self.img.ctypes.data)
 
     def circle(self, pos, color=0xFFFFFF, radius=1):
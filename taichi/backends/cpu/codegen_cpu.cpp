@@ -32,30 +32,76 @@ class CodeGenLLVMCPU : public CodeGenLLVM {
 
     auto *tls_prologue = create_xlogue(stmt->tls_prologue);
 
-    // The loop body
+    // The loop body, for a single iteration
     llvm::Function *body;
     {
       auto guard = get_function_creation_guard(
           {llvm::PointerType::get(get_runtime_type("RuntimeContext"), 0),
            llvm::Type::getInt8PtrTy(*llvm_context),
-           tlctx->get_data_type<int>()});
+           tlctx->get_data_type(stmt->index_type)});
 
-      auto loop_var = create_entry_block_alloca(PrimitiveType::i32);
+      auto loop_var = create_entry_block_alloca(stmt->index_type);
       loop_vars_llvm[stmt].push_back(loop_var);
       builder->CreateStore(get_arg(2), loop_var);
       stmt->body->accept(this);
 
       body = guard.body;
     }
+    // Inlined into the loop below, where a continue in the body becomes a
+    // jump to the next iteration
+    body->addFnAttr(llvm::Attribute::AlwaysInline);
+
+    // The loop over the iterations of a block, which the runtime calls once
+    // per block instead of calling the body once per iteration. This lets
+    // LLVM vectorize the loop.
+    llvm::Function *block_body;
+    {
+      auto index_type = tlctx->get_data_type(stmt->index_type);
+      auto guard = get_function_creation_guard(
+          {llvm::PointerType::get(get_runtime_type("RuntimeContext"), 0),
+           llvm::Type::getInt8PtrTy(*llvm_context), index_type, index_type});
+
+      auto block_begin = get_arg(2);
+      auto block_end = get_arg(3);
+      auto one = tlctx->get_constant(stmt->index_type, 1);
+      auto loop_index = create_entry_block_alloca(stmt->index_type);
+      builder->CreateStore(
+          step == 1 ? block_begin : builder->CreateSub(block_end, one),
+          loop_index);
+
+      auto loop_test_bb =
+          llvm::BasicBlock::Create(*llvm_context, "block_loop_test", func);
+      auto loop_body_bb =
+          llvm::BasicBlock::Create(*llvm_context, "block_loop_body", func);
+      auto func_exit =
+          llvm::BasicBlock::Create(*llvm_context, "block_loop_exit", func);
+      builder->CreateBr(loop_test_bb);
+
+      builder->SetInsertPoint(loop_test_bb);
+      auto i = builder->CreateLoad(loop_index);
+      auto cond = step == 1 ? builder->CreateICmpSLT(i, block_end)
+                            : builder->CreateICmpSGE(i, block_begin);
+      builder->CreateCondBr(cond, loop_body_bb, func_exit);
+
+      builder->SetInsertPoint(loop_body_bb);
+      builder->CreateCall(body, {get_arg(0), get_arg(1), i});
+      create_increment(loop_index, step == 1 ? one : builder->CreateNeg(one));
+      set_loop_vectorize_hints(builder->CreateBr(loop_test_bb));
+
+      builder->SetInsertPoint(func_exit);
+      block_body = guard.body;
+    }
 
     llvm::Value *epilogue = create_xlogue(stmt->tls_epilogue);
 
     auto [begin, end] = get_range_for_bounds(stmt);
+    bool index_64 = stmt->index_type->is_primitive(PrimitiveTypeID::i64);
     create_call(
-        "cpu_parallel_range_for",
+        index_64 ? "cpu_parallel_range_for_i64" : "cpu_parallel_range_for",
         {get_arg(0), tlctx->get_constant(stmt->num_cpu_threads), begin, end,
          tlctx->get_constant(step), tlctx->get_constant(stmt->block_dim),
-         tls_prologue, body, epilogue, tlctx->get_constant(stmt->tls_size)});
+         tls_prologue, block_body, epilogue,
+         tlctx->get_constant(stmt->tls_size)});
   }
 
   void create_offload_mesh_for(OffloadedStmt *stmt) override {
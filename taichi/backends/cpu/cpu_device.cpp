@@ -17,6 +17,7 @@ DeviceAllocation CpuDevice::allocate_memory(const AllocParams &params) {
   info.ptr = vm->ptr;
   info.size = vm->size;
   info.use_cached = false;
+  record_allocation(info.size);
 
   DeviceAllocation alloc;
   alloc.alloc_id = allocations_.size();
@@ -34,6 +35,7 @@ DeviceAllocation CpuDevice::allocate_memory_runtime(
   // TODO: Add caching allocator
   info.size = params.size;
   info.use_cached = params.use_cached;
+  record_allocation(info.size);
   DeviceAllocation alloc;
   alloc.alloc_id = allocations_.size();
   alloc.device = this;
@@ -53,6 +55,7 @@ void CpuDevice::dealloc_memory(DeviceAllocation handle) {
     virtual_memories_.at(handle.alloc_id).reset();
     info.ptr = nullptr;
   }
+  record_deallocation(info.size);
 }
 
 DeviceAllocation CpuDevice::import_memory(void *ptr, size_t size) {
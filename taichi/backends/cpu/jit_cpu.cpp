@@ -49,6 +49,10 @@ using namespace llvm;
 using namespace llvm::orc;
 #endif
 
+// Set on modules that went through global_optimize_module_cpu, so that they
+// are not optimized twice.
+constexpr char kOptimizedModuleFlag[] = "taichi.optimized";
+
 std::pair<JITTargetMachineBuilder, llvm::DataLayout> get_host_target_info() {
 #if defined(TI_PLATFORM_OSX) and defined(TI_ARCH_ARM)
   // JITTargetMachineBuilder::detectHost() doesn't seem to work properly on
@@ -142,7 +146,10 @@ class JITSessionCPU : public JITSession {
   JITModule *add_module(std::unique_ptr<llvm::Module> M, int max_reg) override {
     TI_ASSERT(max_reg == 0);  // No need to specify max_reg on CPUs
     TI_ASSERT(M);
-    global_optimize_module_cpu(M.get());
+    // Modules loaded from the offline cache are already optimized
+    if (!M->getModuleFlag(kOptimizedModuleFlag)) {
+      global_optimize_module_cpu(M.get());
+    }
     std::lock_guard<std::mutex> _(mut_);
     auto &dylib = es_.createJITDylib(fmt::format("{}", module_counter_));
     dylib.addGenerator(
@@ -268,6 +275,8 @@ void JITSessionCPU::global_optimize_module_cpu(llvm::Module *module) {
     module_pass_manager.run(*module);
   }
 
+  module->addModuleFlag(llvm::Module::Override, kOptimizedModuleFlag, 1);
+
   if (this->llvm_prog()->config->print_kernel_llvm_ir_optimized) {
     if (false) {
       TI_INFO("Functions with > 100 instructions in optimized LLVM IR:");
@@ -24,6 +24,7 @@ uint64_t *CudaCachingAllocator::allocate(
     }
     ret = it_blk->second;
     mem_blocks_.erase(it_blk);
+    cached_bytes_ -= size_aligned;
   } else {
     ret = device_->allocate_llvm_runtime_memory_jit(params);
   }
@@ -32,6 +33,7 @@ uint64_t *CudaCachingAllocator::allocate(
 
 void CudaCachingAllocator::release(size_t sz, uint64_t *ptr) {
   mem_blocks_.insert({sz, ptr});
+  cached_bytes_ += sz;
 }
 
 }  // namespace cuda
@@ -4,6 +4,7 @@
 #include "taichi/common/core.h"
 #include "taichi/math/arithmetic.h"
 #include <stdint.h>
+#include <atomic>
 #include <map>
 
 namespace taichi {
@@ -17,8 +18,14 @@ class CudaCachingAllocator {
   uint64_t *allocate(const Device::LlvmRuntimeAllocParams &params);
   void release(size_t sz, uint64_t *ptr);
 
+  // Bytes of the released blocks kept for reuse
+  size_t get_cached_bytes() const {
+    return cached_bytes_.load();
+  }
+
  private:
   std::multimap<size_t, uint64_t *> mem_blocks_;
+  std::atomic<size_t> cached_bytes_{0};
   Device *device_{nullptr};
 };
 
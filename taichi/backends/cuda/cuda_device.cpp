@@ -25,6 +25,7 @@ DeviceAllocation CudaDevice::allocate_memory(const AllocParams &params) {
   info.is_imported = false;
   info.use_cached = false;
   info.use_preallocated = false;
+  record_allocation(info.size);
 
   DeviceAllocation alloc;
   alloc.alloc_id = allocations_.size();
@@ -52,6 +53,7 @@ DeviceAllocation CudaDevice::allocate_memory_runtime(
   info.is_imported = false;
   info.use_cached = params.use_cached;
   info.use_preallocated = true;
+  record_allocation(info.size);
 
   DeviceAllocation alloc;
   alloc.alloc_id = allocations_.size();
@@ -68,6 +70,7 @@ void CudaDevice::dealloc_memory(DeviceAllocation handle) {
     TI_ERROR("the DeviceAllocation is already deallocated");
   }
   TI_ASSERT(!info.is_imported);
+  record_deallocation(info.size);
   if (info.use_cached) {
     if (caching_allocator_ == nullptr) {
       TI_ERROR("the CudaCachingAllocator is not initialized");
@@ -79,6 +82,14 @@ void CudaDevice::dealloc_memory(DeviceAllocation handle) {
   }
 }
 
+Device::MemoryStats CudaDevice::get_memory_stats() const {
+  auto stats = Device::get_memory_stats();
+  if (caching_allocator_) {
+    stats.cached_bytes = caching_allocator_->get_cached_bytes();
+  }
+  return stats;
+}
+
 DeviceAllocation CudaDevice::import_memory(void *ptr, size_t size) {
   AllocInfo info;
   info.ptr = ptr;
@@ -123,6 +123,8 @@ class CudaDevice : public Device {
 
   Stream *get_compute_stream() override{TI_NOT_IMPLEMENTED};
 
+  MemoryStats get_memory_stats() const override;
+
  private:
   std::vector<AllocInfo> allocations_;
   void validate_device_alloc(const DeviceAllocation alloc) {
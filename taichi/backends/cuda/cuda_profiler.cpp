@@ -134,24 +134,6 @@ void KernelProfilerCUDA::stop(KernelProfilerBase::TaskHandle handle) {
     CUDADriver::get_instance().event_record(handle, 0);
 }
 
-bool KernelProfilerCUDA::statistics_on_traced_records() {
-  for (auto &record : traced_records_) {
-    auto it =
-        std::find_if(statistical_results_.begin(), statistical_results_.end(),
-                     [&](KernelProfileStatisticalResult &result) {
-                       return result.name == record.name;
-                     });
-    if (it == statistical_results_.end()) {
-      statistical_results_.emplace_back(record.name);
-      it = std::prev(statistical_results_.end());
-    }
-    it->insert_record(record.kernel_elapsed_time_in_ms);
-    total_time_ms_ += record.kernel_elapsed_time_in_ms;
-  }
-
-  return true;
-}
-
 void KernelProfilerCUDA::sync() {
   // sync
   CUDADriver::get_instance().stream_synchronize(nullptr);
@@ -159,14 +141,13 @@ void KernelProfilerCUDA::sync() {
   // update
   if (tool_ == ProfilingToolkit::event) {
     event_toolkit_->update_record(records_size_after_sync_, traced_records_);
-    event_toolkit_->update_timeline(traced_records_);
-    statistics_on_traced_records();  // TODO: deprecated
+    event_toolkit_->update_timeline(records_size_after_sync_, traced_records_);
     event_toolkit_->clear();
   } else if (tool_ == ProfilingToolkit::cupti) {
     cupti_toolkit_->update_record(records_size_after_sync_, traced_records_);
-    statistics_on_traced_records();  // TODO: deprecated
     this->reinit_with_metrics(metric_list_);
   }
+  commit_records(records_size_after_sync_);
 
   records_size_after_sync_ = traced_records_.size();
 }
@@ -326,15 +307,19 @@ void EventToolkit::update_record(
         record.kernel_elapsed_time_in_ms;
     traced_records[records_size_after_sync + idx].time_since_base =
         record.time_since_base;
+    traced_records[records_size_after_sync + idx].start_time =
+        base_time_ + record.time_since_base * 1e-3;
     idx++;
   }
 }
 
 void EventToolkit::update_timeline(
+    uint32_t records_size_after_sync,
     std::vector<KernelProfileTracedRecord> &traced_records) {
   if (Timelines::get_instance().get_enabled()) {
     auto &timeline = Timeline::get_this_thread_instance();
-    for (auto &record : traced_records) {
+    for (auto i = records_size_after_sync; i < traced_records.size(); i++) {
+      auto &record = traced_records[i];
       // param of insert_event() :
       // struct TimelineEvent @ taichi/taichi/system/timeline.h
       timeline.insert_event({record.name, /*param_name=begin*/ true,
@@ -360,6 +345,7 @@ void EventToolkit::update_record(
   TI_NOT_IMPLEMENTED;
 }
 void EventToolkit::update_timeline(
+    uint32_t records_size_after_sync,
     std::vector<KernelProfileTracedRecord> &traced_records) {
   TI_NOT_IMPLEMENTED;
 }
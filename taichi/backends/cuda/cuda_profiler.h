@@ -39,7 +39,9 @@ class KernelProfilerCUDA : public KernelProfilerBase {
 
   bool set_profiler_toolkit(std::string toolkit_name) override;
 
-  bool statistics_on_traced_records();
+  bool inserts_timeline_events() const override {
+    return tool_ == ProfilingToolkit::event;
+  }
 
   KernelProfilerBase::TaskHandle start_with_handle(
       const std::string &kernel_name) override;
@@ -67,7 +69,8 @@ class EventToolkit {
                      std::vector<KernelProfileTracedRecord> &traced_records);
   KernelProfilerBase::TaskHandle start_with_handle(
       const std::string &kernel_name);
-  void update_timeline(std::vector<KernelProfileTracedRecord> &traced_records);
+  void update_timeline(uint32_t records_size_after_sync,
+                       std::vector<KernelProfileTracedRecord> &traced_records);
   void clear() {
     event_records_.clear();
   }
@@ -140,6 +140,28 @@ void Device::print_all_cap() const {
   }
 }
 
+Device::MemoryStats Device::get_memory_stats() const {
+  MemoryStats stats;
+  stats.allocated_bytes = allocated_bytes_.load();
+  stats.peak_allocated_bytes = peak_allocated_bytes_.load();
+  stats.num_allocations = num_allocations_.load();
+  return stats;
+}
+
+void Device::record_allocation(uint64 size) {
+  num_allocations_++;
+  auto allocated = allocated_bytes_.fetch_add(size) + size;
+  auto peak = peak_allocated_bytes_.load();
+  while (peak < allocated &&
+         !peak_allocated_bytes_.compare_exchange_weak(peak, allocated)) {
+  }
+}
+
+void Device::record_deallocation(uint64 size) {
+  num_allocations_--;
+  allocated_bytes_ -= size;
+}
+
 uint64_t *Device::allocate_llvm_runtime_memory_jit(
     const LlvmRuntimeAllocParams &params) {
   params.runtime_jit->call<void *, std::size_t, std::size_t>(
@@ -3,6 +3,7 @@
 
 #include "taichi/jit/jit_module.h"
 #include "taichi/program/compile_config.h"
+#include <atomic>
 #include <string>
 #include <vector>
 
@@ -466,8 +467,29 @@ class Device {
   // Each thraed will acquire its own stream
   virtual Stream *get_compute_stream() = 0;
 
+  struct MemoryStats {
+    // Bytes of the live allocations, excluding the imported memory
+    uint64 allocated_bytes{0};
+    uint64 peak_allocated_bytes{0};
+    uint64 num_allocations{0};
+    // Bytes released to a caching allocator and kept for reuse
+    uint64 cached_bytes{0};
+  };
+
+  // The counters are updated on the host when memory is allocated or released,
+  // so they can be read at any time without synchronizing with the device.
+  virtual MemoryStats get_memory_stats() const;
+
+ protected:
+  void record_allocation(uint64 size);
+
+  void record_deallocation(uint64 size);
+
  private:
   std::unordered_map<DeviceCapability, uint32_t> caps_;
+  std::atomic<uint64> allocated_bytes_{0};
+  std::atomic<uint64> peak_allocated_bytes_{0};
+  std::atomic<uint64> num_allocations_{0};
 };
 
 class Surface {
@@ -459,6 +459,8 @@ DeviceAllocation GLDevice::allocate_memory(const AllocParams &params) {
   DeviceAllocation alloc;
   alloc.device = this;
   alloc.alloc_id = buffer;
+  buffer_to_size_[buffer] = params.size;
+  record_allocation(params.size);
 
   if (params.host_read && params.host_write) {
     buffer_to_access_[buffer] = GL_MAP_READ_BIT | GL_MAP_WRITE_BIT;
@@ -474,6 +476,11 @@ DeviceAllocation GLDevice::allocate_memory(const AllocParams &params) {
 void GLDevice::dealloc_memory(DeviceAllocation handle) {
   glDeleteBuffers(1, &handle.alloc_id);
   check_opengl_error("glDeleteBuffers");
+  auto it = buffer_to_size_.find(handle.alloc_id);
+  if (it != buffer_to_size_.end()) {
+    record_deallocation(it->second);
+    buffer_to_size_.erase(it);
+  }
 }
 
 std::unique_ptr<Pipeline> GLDevice::create_pipeline(
@@ -264,6 +264,7 @@ class GLDevice : public GraphicsDevice {
  private:
   GLStream stream_;
   std::unordered_map<GLuint, GLbitfield> buffer_to_access_;
+  std::unordered_map<GLuint, uint64_t> buffer_to_size_;
   std::unordered_map<GLuint, GLuint> image_to_dims_;
   std::unordered_map<GLuint, GLuint> image_to_int_format_;
 };
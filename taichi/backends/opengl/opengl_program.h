@@ -50,6 +50,10 @@ class OpenglProgramImpl : public ProgramImpl {
 
   std::shared_ptr<Device> get_device_shared() override;
 
+  Device *get_compute_device() override {
+    return opengl_runtime_ ? opengl_runtime_->device.get() : nullptr;
+  }
+
   std::unique_ptr<AotModuleBuilder> make_aot_module_builder() override;
 
   void destroy_snode_tree(SNodeTree *snode_tree) override {
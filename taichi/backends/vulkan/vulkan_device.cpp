@@ -1255,6 +1255,7 @@ DeviceAllocation VulkanDevice::allocate_memory(const AllocParams &params) {
       &alloc_info);
   vmaGetAllocationInfo(alloc.buffer->allocator, alloc.buffer->allocation,
                        &alloc.alloc_info);
+  record_allocation(alloc.alloc_info.size);
 
 #ifdef TI_VULKAN_DEBUG_ALLOCATIONS
   TI_TRACE("Allocate VK buffer {}, alloc_id={}", (void *)alloc.buffer,
@@ -1279,6 +1280,7 @@ void VulkanDevice::dealloc_memory(DeviceAllocation handle) {
                  "Invalid handle (double free?) {}", handle.alloc_id);
 
   AllocationInternal &alloc = map_pair->second;
+  record_deallocation(alloc.alloc_info.size);
 
 #ifdef TI_VULKAN_DEBUG_ALLOCATIONS
   TI_TRACE("Dealloc VK buffer {}, alloc_id={}", (void *)alloc.buffer,
@@ -4,10 +4,12 @@
 #include "taichi/ir/statements.h"
 #include "taichi/struct/struct_llvm.h"
 #include "taichi/util/file_sequence_writer.h"
+#include "taichi/llvm/llvm_offline_cache.h"
 
 #include "llvm/IR/Module.h"
 #include "llvm/Bitcode/BitcodeReader.h"
 #include "llvm/Linker/Linker.h"
+#include "llvm/Support/Host.h"
 
 TLANG_NAMESPACE_BEGIN
 
@@ -228,6 +230,10 @@ std::unique_ptr<RuntimeObject> CodeGenLLVM::emit_struct_meta_object(
   } else if (snode->type == SNodeType::pointer) {
     meta = std::make_unique<RuntimeObject>("PointerMeta", this, builder.get());
     emit_struct_meta_base("Pointer", meta->ptr, snode);
+  } else if (snode->type == SNodeType::hash) {
+    meta = std::make_unique<RuntimeObject>("HashMeta", this, builder.get());
+    emit_struct_meta_base("Hash", meta->ptr, snode);
+    meta->call("set_capacity", tlctx->get_constant(snode->hash_capacity));
   } else if (snode->type == SNodeType::root) {
     meta = std::make_unique<RuntimeObject>("RootMeta", this, builder.get());
     emit_struct_meta_base("Root", meta->ptr, snode);
@@ -256,7 +262,8 @@ void CodeGenLLVM::emit_struct_meta_base(const std::string &name,
         StructCompilerLLVM::get_llvm_body_type(module.get(), snode);
     auto element_ty = body_type->getArrayElementType();
     element_size = tlctx->get_type_size(element_ty);
-  } else if (snode->type == SNodeType::pointer) {
+  } else if (snode->type == SNodeType::pointer ||
+             snode->type == SNodeType::hash) {
     auto element_ty = StructCompilerLLVM::get_llvm_node_type(
         module.get(), snode->ch[0].get());
     element_size = tlctx->get_type_size(element_ty);
@@ -925,6 +932,9 @@ void CodeGenLLVM::emit_list_gen(OffloadedStmt *listgen) {
     // Since there's only one container to expand, we need a special kernel for
     // more parallelism.
     call("element_listgen_root", get_runtime(), meta_parent, meta_child);
+  } else if (snode_parent->type == SNodeType::hash) {
+    // Only the occupied slots of the hash tables are expanded
+    call("element_listgen_hash", get_runtime(), meta_parent, meta_child);
   } else {
     call("element_listgen_nonroot", get_runtime(), meta_parent, meta_child);
   }
@@ -952,6 +962,54 @@ void CodeGenLLVM::create_increment(llvm::Value *ptr, llvm::Value *value) {
                        ptr);
 }
 
+void CodeGenLLVM::set_loop_vectorize_hints(llvm::BranchInst *back_edge) {
+  if (!arch_is_cpu(current_arch())) {
+    return;
+  }
+  auto hint = [&](const char *name, llvm::Constant *value) {
+    return llvm::MDNode::get(
+        *llvm_context, {llvm::MDString::get(*llvm_context, name),
+                        llvm::ConstantAsMetadata::get(value)});
+  };
+  // The first operand of a loop ID is the loop ID itself
+  std::vector<llvm::Metadata *> operands{nullptr};
+  const int simd_width = prog->config.simd_width;
+  if (!prog->config.cpu_loop_vectorize) {
+    // The loop vectorizer runs on all loops, so it is disabled explicitly
+    operands.push_back(hint("llvm.loop.vectorize.width", builder->getInt32(1)));
+    operands.push_back(
+        hint("llvm.loop.interleave.count", builder->getInt32(1)));
+  } else {
+    if (simd_width > 0) {
+      // A width hint, unlike llvm.loop.vectorize.enable, does not make LLVM
+      // warn about the loops it cannot vectorize, e.g., those with atomics.
+      // Without it, the cost model chooses the width, e.g., narrower vectors
+      // for loops dominated by gathers or calls to math functions.
+      operands.push_back(hint("llvm.loop.vectorize.width",
+                              builder->getInt32(simd_width)));
+    }
+    static const bool masked_remainder = [] {
+      llvm::StringMap<bool> features;
+      return llvm::sys::getHostCPUFeatures(features) && features["avx512f"];
+    }();
+    if (masked_remainder) {
+      operands.push_back(
+          hint("llvm.loop.vectorize.predicate.enable", builder->getTrue()));
+    }
+  }
+  if (operands.size() == 1) {
+    return;
+  }
+  auto loop_id = llvm::MDNode::getDistinct(*llvm_context, operands);
+  loop_id->replaceOperandWith(0, loop_id);
+  back_edge->setMetadata(llvm::LLVMContext::MD_loop, loop_id);
+  if (prog->config.cpu_loop_vectorize && simd_width > 0) {
+    // Lets the backend use vector registers of the requested width, e.g.,
+    // 512-bit ones for 16 lanes of 32-bit values
+    func->addFnAttr("prefer-vector-width", std::to_string(simd_width * 32));
+  }
+}
+
 void CodeGenLLVM::create_naive_range_for(RangeForStmt *for_stmt) {
   using namespace llvm;
   BasicBlock *body = BasicBlock::Create(*llvm_context, "for_loop_body", func);
@@ -961,14 +1019,16 @@ void CodeGenLLVM::create_naive_range_for(RangeForStmt *for_stmt) {
   BasicBlock *loop_test =
       BasicBlock::Create(*llvm_context, "for_loop_test", func);
 
-  auto loop_var = create_entry_block_alloca(PrimitiveType::i32);
+  auto index_type = for_stmt->index_type();
+  auto loop_var = create_entry_block_alloca(index_type);
   loop_vars_llvm[for_stmt].push_back(loop_var);
 
   if (!for_stmt->reversed) {
     builder->CreateStore(llvm_val[for_stmt->begin], loop_var);
   } else {
     builder->CreateStore(
-        builder->CreateSub(llvm_val[for_stmt->end], tlctx->get_constant(1)),
+        builder->CreateSub(llvm_val[for_stmt->end],
+                           tlctx->get_constant(index_type, 1)),
         loop_var);
   }
   builder->CreateBr(loop_test);
@@ -1004,9 +1064,9 @@ void CodeGenLLVM::create_naive_range_for(RangeForStmt *for_stmt) {
     builder->SetInsertPoint(loop_inc);
 
     if (!for_stmt->reversed) {
-      create_increment(loop_var, tlctx->get_constant(1));
+      create_increment(loop_var, tlctx->get_constant(index_type, 1));
     } else {
-      create_increment(loop_var, tlctx->get_constant(-1));
+      create_increment(loop_var, tlctx->get_constant(index_type, -1));
     }
     builder->CreateBr(loop_test);
   }
@@ -1512,6 +1572,7 @@ void CodeGenLLVM::visit(SNodeLookupStmt *stmt) {
     llvm_val[stmt] = builder->CreateGEP(parent, llvm_val[stmt->input_index]);
   } else if (snode->type == SNodeType::dense ||
              snode->type == SNodeType::pointer ||
+             snode->type == SNodeType::hash ||
              snode->type == SNodeType::dynamic ||
              snode->type == SNodeType::bitmasked) {
     if (stmt->activate) {
@@ -1591,10 +1652,21 @@ void CodeGenLLVM::visit(ExternalPtrStmt *stmt) {
       llvm_val[stmt->base_ptrs[0]],
       llvm::PointerType::get(tlctx->get_data_type(dt), 0));
 
-  auto linear_index = tlctx->get_constant(0);
+  // Arrays indexed by 64-bit integers, e.g. the loop indices of range-fors
+  // with more than 2^31 iterations, are linearized in 64 bits.
+  DataType index_type = PrimitiveType::i32;
+  for (auto index : stmt->indices) {
+    if (index->ret_type->is_primitive(PrimitiveTypeID::i64))
+      index_type = PrimitiveType::i64;
+  }
+  auto index_llvm_type = tlctx->get_data_type(index_type);
+  auto linear_index = tlctx->get_constant(index_type, 0);
   for (int i = 0; i < num_indices; i++) {
-    linear_index = builder->CreateMul(linear_index, sizes[i]);
-    linear_index = builder->CreateAdd(linear_index, llvm_val[stmt->indices[i]]);
+    linear_index = builder->CreateMul(
+        linear_index, builder->CreateSExtOrTrunc(sizes[i], index_llvm_type));
+    linear_index = builder->CreateAdd(
+        linear_index, builder->CreateSExtOrTrunc(llvm_val[stmt->indices[i]],
+                                                 index_llvm_type));
   }
 
   llvm_val[stmt] = builder->CreateGEP(base, linear_index);
@@ -1664,20 +1736,20 @@ std::tuple<llvm::Value *, llvm::Value *> CodeGenLLVM::get_range_for_bounds(
     OffloadedStmt *stmt) {
   llvm::Value *begin, *end;
   if (stmt->const_begin) {
-    begin = tlctx->get_constant(stmt->begin_value);
+    begin = tlctx->get_constant(stmt->index_type, stmt->begin_value);
   } else {
     auto begin_stmt = Stmt::make<GlobalTemporaryStmt>(
         stmt->begin_offset,
-        TypeFactory::create_vector_or_scalar_type(1, PrimitiveType::i32));
+        TypeFactory::create_vector_or_scalar_type(1, stmt->index_type));
     begin_stmt->accept(this);
     begin = builder->CreateLoad(llvm_val[begin_stmt.get()]);
   }
   if (stmt->const_end) {
-    end = tlctx->get_constant(stmt->end_value);
+    end = tlctx->get_constant(stmt->index_type, stmt->end_value);
   } else {
     auto end_stmt = Stmt::make<GlobalTemporaryStmt>(
         stmt->end_offset,
-        TypeFactory::create_vector_or_scalar_type(1, PrimitiveType::i32));
+        TypeFactory::create_vector_or_scalar_type(1, stmt->index_type));
     end_stmt->accept(this);
     end = builder->CreateLoad(llvm_val[end_stmt.get()]);
   }
@@ -1828,11 +1900,18 @@ void CodeGenLLVM::create_offload_struct_for(OffloadedStmt *stmt, bool spmd) {
     // Begin loop_body_bb:
     builder->SetInsertPoint(loop_body_bb);
 
+    // The loop index of a hash node is a slot of its table, which holds the
+    // index of a cell or -1
+    llvm::Value *cell_index = builder->CreateLoad(loop_index);
+    if (leaf_block->type == SNodeType::hash) {
+      cell_index = call(leaf_block, element.get("element"), "slot_to_index",
+                        {cell_index});
+    }
+
     // initialize the coordinates
     auto new_coordinates = create_entry_block_alloca(physical_coordinate_ty);
 
-    create_call(refine, {parent_coordinates, new_coordinates,
-                         builder->CreateLoad(loop_index)});
+    create_call(refine, {parent_coordinates, new_coordinates, cell_index});
 
     // One more refine step is needed for bit_arrays to make final coordinates
     // non-consecutive, since each thread will process multiple
@@ -1856,6 +1935,7 @@ void CodeGenLLVM::create_offload_struct_for(OffloadedStmt *stmt, bool spmd) {
     //  - if non-POT field dim exists, make sure we don't go out of bounds
     //  - if leaf block is bitmasked, make sure we only loop over active
     //    voxels
+    //  - if leaf block is hash, make sure the slot holds an active cell
     auto exec_cond = tlctx->get_constant(true);
     auto snode = stmt->snode;
     if (snode->type == SNodeType::bit_array && snode->parent) {
@@ -1892,6 +1972,10 @@ void CodeGenLLVM::create_offload_struct_for(OffloadedStmt *stmt, bool spmd) {
       is_active =
           builder->CreateTrunc(is_active, llvm::Type::getInt1Ty(*llvm_context));
       exec_cond = builder->CreateAnd(exec_cond, is_active);
+    } else if (snode->type == SNodeType::hash) {
+      exec_cond = builder->CreateAnd(
+          exec_cond, builder->CreateICmp(llvm::CmpInst::ICMP_SGE, cell_index,
+                                         tlctx->get_constant(0)));
     }
 
     builder->CreateCondBr(exec_cond, struct_for_body_bb, body_tail_bb);
@@ -1914,7 +1998,10 @@ void CodeGenLLVM::create_offload_struct_for(OffloadedStmt *stmt, bool spmd) {
       } else {
         create_increment(loop_index, tlctx->get_constant(1));
       }
-      builder->CreateBr(loop_test_bb);
+      auto back_edge = builder->CreateBr(loop_test_bb);
+      if (!spmd && leaf_block->type == SNodeType::dense) {
+        set_loop_vectorize_hints(back_edge);
+      }
 
       builder->SetInsertPoint(func_exit);
     }
@@ -1930,7 +2017,11 @@ void CodeGenLLVM::create_offload_struct_for(OffloadedStmt *stmt, bool spmd) {
     }
   }
 
-  int list_element_size = std::min(leaf_block->max_num_elements(),
+  // The elements of a hash node are the slots of its table
+  auto leaf_block_num_elements = leaf_block->type == SNodeType::hash
+                                     ? (int64)leaf_block->hash_capacity
+                                     : leaf_block->max_num_elements();
+  int list_element_size = std::min(leaf_block_num_elements,
                                    (int64)taichi_listgen_max_element_size);
   int num_splits = std::max(1, list_element_size / stmt->block_dim);
 
@@ -2338,7 +2429,70 @@ void CodeGenLLVM::emit_to_module() {
 }
 
 FunctionType CodeGenLLVM::gen() {
+  auto *offline_cache = prog->get_llvm_program_impl()->get_offline_cache();
+  if (offline_cache == nullptr || kernel->offline_cache_key.empty() ||
+      ir != kernel->ir.get()) {
+    if (!kernel->lowered()) {
+      kernel->lower();
+    }
+    emit_to_module();
+    return compile_module_to_executable();
+  }
+
+  // The key is computed from the frontend IR, so this must happen before
+  // lowering.
+  const auto cache_key = LlvmOfflineCache::get_kernel_key(prog, kernel);
+  LlvmOfflineCache::KernelCacheData cached_data;
+  auto cached_module =
+      offline_cache->load_kernel(cache_key, llvm_context, cached_data);
+  if (cached_module) {
+    module = std::move(cached_module);
+    if (!kernel->grad) {
+      kernel->snode_writes =
+          LlvmOfflineCache::decode_snodes(prog, cached_data.snode_writes);
+      kernel->snode_atomic_writes = LlvmOfflineCache::decode_snodes(
+          prog, cached_data.snode_atomic_writes);
+      kernel->snode_writes_gathered = true;
+    }
+    kernel->activates_hash_snode = cached_data.activates_hash_snode;
+    for (const auto &cached_task : cached_data.offloaded_task_list) {
+      // Task functions are renamed so that they never collide with the
+      // symbols of other kernels in the same JIT session.
+      auto task_kernel_name =
+          fmt::format("{}_{}_cached", kernel_name, task_counter);
+      task_counter += 1;
+      auto *task_func = module->getFunction(cached_task.name);
+      TI_ASSERT(task_func);
+      task_func->setName(task_kernel_name);
+      OffloadedTask task(this);
+      task.begin(task_kernel_name);
+      task.block_dim = cached_task.block_dim;
+      task.grid_dim = cached_task.grid_dim;
+      task.end();
+    }
+    kernel->from_offline_cache = true;
+    return compile_module_to_executable();
+  }
+
+  kernel->lower();
   emit_to_module();
+  eliminate_unused_functions();
+  // CPU modules are stored after optimization, so that cache hits skip the
+  // optimization passes as well.
+  tlctx->jit->global_optimize_module(module.get());
+  LlvmOfflineCache::KernelCacheData data_to_cache;
+  for (const auto &task : offloaded_tasks) {
+    data_to_cache.offloaded_task_list.push_back(
+        {task.name, task.block_dim, task.grid_dim});
+  }
+  if (kernel->snode_writes_gathered) {
+    data_to_cache.snode_writes =
+        LlvmOfflineCache::encode_snodes(kernel->snode_writes);
+    data_to_cache.snode_atomic_writes =
+        LlvmOfflineCache::encode_snodes(kernel->snode_atomic_writes);
+  }
+  data_to_cache.activates_hash_snode = kernel->activates_hash_snode;
+  offline_cache->store_kernel(cache_key, module.get(), data_to_cache);
   return compile_module_to_executable();
 }
 
@@ -153,6 +153,12 @@ class CodeGenLLVM : public IRVisitor, public LLVMModuleBuilder {
 
   void create_increment(llvm::Value *ptr, llvm::Value *value);
 
+  // Asks the LLVM loop vectorizer to vectorize the loop closed by |back_edge|
+  // with config.simd_width lanes if it is set, and to mask the remainder
+  // iterations on CPUs with AVX-512. The loop is kept scalar without
+  // config.cpu_loop_vectorize. Only applies to CPUs.
+  void set_loop_vectorize_hints(llvm::BranchInst *back_edge);
+
   // Direct translation
   void create_naive_range_for(RangeForStmt *for_stmt);
 
@@ -43,11 +43,6 @@ SNode &SNode::create_node(std::vector<Axis> axes,
     sizes = std::vector<int>(axes.size(), sizes[0]);
   }
 
-  if (type == SNodeType::hash)
-    TI_ASSERT_INFO(depth == 0,
-                   "hashed node must be child of root due to initialization "
-                   "memset limitation.");
-
   auto &new_node = insert_children(type);
   for (int i = 0; i < (int)axes.size(); i++) {
     TI_ASSERT(sizes[i] > 0);
@@ -133,6 +128,29 @@ SNode &SNode::dynamic(const Axis &expr, int n, int chunk_size, bool packed) {
   return snode;
 }
 
+SNode &SNode::hash(const std::vector<Axis> &axes,
+                  const std::vector<int> &sizes,
+                  int capacity,
+                  bool packed) {
+  TI_ERROR_IF(capacity < 2 || !bit::is_power_of_two(capacity),
+              "The capacity of a hash SNode must be a power of two no less "
+              "than 2, but {} provided.",
+              capacity);
+  // Cell i is stored as key i + 1 in the table, where key 0 marks empty slots
+  int64 num_cells = 1;
+  for (int i = 0; i < (int)axes.size(); i++) {
+    int64 size = sizes.size() == 1 ? sizes[0] : sizes[i];
+    num_cells *= packed ? size : (int64)bit::least_pot_bound(size);
+  }
+  TI_ERROR_IF(num_cells >= std::numeric_limits<int32>::max(),
+              "A hash SNode must have fewer than 2^31 - 1 cells, but {} "
+              "provided.",
+              num_cells);
+  auto &snode = create_node(axes, sizes, SNodeType::hash, packed);
+  snode.hash_capacity = capacity;
+  return snode;
+}
+
 SNode &SNode::bit_struct(int num_bits, bool packed) {
   auto &snode = create_node({}, {}, SNodeType::bit_struct, packed);
   snode.physical_type =
@@ -125,6 +125,7 @@ class SNode {
   int total_num_bits{0};
   int total_bit_start{0};
   int chunk_size{0};
+  int hash_capacity{0};
   std::size_t cell_size_bytes{0};
   std::size_t offset_bytes_in_parent_cell{0};
   PrimitiveType *physical_type{nullptr};  // for bit_struct and bit_array only
@@ -226,17 +227,8 @@ class SNode {
 
   SNode &hash(const std::vector<Axis> &axes,
               const std::vector<int> &sizes,
-              bool packed) {
-    return create_node(axes, sizes, SNodeType::hash, packed);
-  }
-
-  SNode &hash(const std::vector<Axis> &axes, int sizes, bool packed) {
-    return create_node(axes, std::vector<int>{sizes}, SNodeType::hash, packed);
-  }
-
-  SNode &hash(const Axis &axis, int size, bool packed) {
-    return hash(std::vector<Axis>{axis}, size, packed);
-  }
+              int capacity,
+              bool packed);
 
   std::string type_name() {
     return snode_type_name(type);
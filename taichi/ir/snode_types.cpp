@@ -20,7 +20,8 @@ std::string snode_type_name(SNodeType t) {
 }
 
 bool is_gc_able(SNodeType t) {
-  return (t == SNodeType::pointer || t == SNodeType::dynamic);
+  return (t == SNodeType::pointer || t == SNodeType::hash ||
+          t == SNodeType::dynamic);
 }
 
 }  // namespace lang
@@ -254,6 +254,15 @@ RangeForStmt::RangeForStmt(Stmt *begin,
   TI_STMT_REG_FIELDS;
 }
 
+DataType RangeForStmt::index_type() const {
+  for (auto bound : {begin, end}) {
+    if (bound->ret_type->is_primitive(PrimitiveTypeID::i64) ||
+        bound->ret_type->is_primitive(PrimitiveTypeID::u64))
+      return PrimitiveType::i64;
+  }
+  return PrimitiveType::i32;
+}
+
 std::unique_ptr<Stmt> RangeForStmt::clone() const {
   auto new_stmt = std::make_unique<RangeForStmt>(
       begin, end, body->clone(), bit_vectorize, num_cpu_threads, block_dim,
@@ -377,6 +386,7 @@ std::unique_ptr<Stmt> OffloadedStmt::clone() const {
   new_stmt->const_end = const_end;
   new_stmt->begin_value = begin_value;
   new_stmt->end_value = end_value;
+  new_stmt->index_type = index_type;
   new_stmt->grid_dim = grid_dim;
   new_stmt->block_dim = block_dim;
   new_stmt->reversed = reversed;
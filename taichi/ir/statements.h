@@ -751,6 +751,10 @@ class RangeForStmt : public Stmt {
     reversed = !reversed;
   }
 
+  // The type of the loop index, which is i64 if a bound is a 64-bit integer
+  // and i32 otherwise.
+  DataType index_type() const;
+
   std::unique_ptr<Stmt> clone() const override;
 
   TI_STMT_DEF_FIELDS(begin,
@@ -1102,8 +1106,9 @@ class OffloadedStmt : public Stmt {
   std::size_t end_offset{0};
   bool const_begin{false};
   bool const_end{false};
-  int32 begin_value{0};
-  int32 end_value{0};
+  int64 begin_value{0};
+  int64 end_value{0};
+  DataType index_type{PrimitiveType::i32};  // range-for only
   int grid_dim{1};
   int block_dim{1};
   bool reversed{false};
@@ -1165,6 +1170,7 @@ class OffloadedStmt : public Stmt {
                      const_end,
                      begin_value,
                      end_value,
+                     index_type,
                      grid_dim,
                      block_dim,
                      reversed,
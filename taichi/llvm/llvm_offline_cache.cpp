@@ -0,0 +1,383 @@
+#include "taichi/llvm/llvm_offline_cache.h"
+
+#include <algorithm>
+#include <cctype>
+#include <chrono>
+#include <cstdio>
+#include <fstream>
+#include <functional>
+#include <sstream>
+
+#include "llvm/Bitcode/BitcodeReader.h"
+#include "llvm/Bitcode/BitcodeWriter.h"
+#include "llvm/IR/Module.h"
+#include "llvm/Support/Host.h"
+#include "llvm/Support/raw_ostream.h"
+
+#include "taichi/ir/snode.h"
+#include "taichi/ir/transforms.h"
+#include "taichi/ir/type_utils.h"
+#include "taichi/program/kernel.h"
+#include "taichi/program/program.h"
+#include "taichi/util/io.h"
+
+namespace taichi {
+namespace lang {
+namespace {
+
+uint64 now_ns() {
+  return (uint64)std::chrono::duration_cast<std::chrono::nanoseconds>(
+             std::chrono::system_clock::now().time_since_epoch())
+      .count();
+}
+
+bool file_exists(const std::string &fn) {
+  std::FILE *f = std::fopen(fn.c_str(), "rb");
+  if (f == nullptr) {
+    return false;
+  }
+  std::fclose(f);
+  return true;
+}
+
+std::string get_cache_version() {
+  return fmt::format("{}-{}", get_version_string(), get_commit_hash());
+}
+
+// Only the options that may change the generated code are listed here.
+void serialize_compile_config(const CompileConfig &config,
+                              std::ostringstream &oss) {
+  oss << "debug=" << config.debug << " cfg_optimization="
+      << config.cfg_optimization
+      << " check_out_of_bound=" << config.check_out_of_bound
+      << " opt_level=" << config.opt_level
+      << " external_optimization_level=" << config.external_optimization_level
+      << " packed=" << config.packed << " simd_width=" << config.simd_width
+      << " cpu_loop_vectorize=" << config.cpu_loop_vectorize
+      << " simplify_before_lower_access=" << config.simplify_before_lower_access
+      << " lower_access=" << config.lower_access
+      << " simplify_after_lower_access=" << config.simplify_after_lower_access
+      << " move_loop_invariant_outside_if="
+      << config.move_loop_invariant_outside_if
+      << " demote_dense_struct_fors=" << config.demote_dense_struct_fors
+      << " advanced_optimization=" << config.advanced_optimization
+      << " constant_folding=" << config.constant_folding
+      << " kernel_profiler=" << config.kernel_profiler
+      << " fast_math=" << config.fast_math
+      << " dynamic_index=" << config.dynamic_index
+      << " flatten_if=" << config.flatten_if
+      << " make_thread_local=" << config.make_thread_local
+      << " make_block_local=" << config.make_block_local
+      << " detect_read_only=" << config.detect_read_only
+      << " default_fp=" << data_type_name(config.default_fp)
+      << " default_ip=" << data_type_name(config.default_ip)
+      << " default_cpu_block_dim=" << config.default_cpu_block_dim
+      << " default_gpu_block_dim=" << config.default_gpu_block_dim
+      << " gpu_max_reg=" << config.gpu_max_reg
+      << " ad_stack_size=" << config.ad_stack_size
+      << " default_ad_stack_size=" << config.default_ad_stack_size
+      << " saturating_grid_dim=" << config.saturating_grid_dim
+      << " max_block_dim=" << config.max_block_dim
+      << " cpu_max_num_threads=" << config.cpu_max_num_threads
+      << " random_seed=" << config.random_seed
+      << " quant_opt_store_fusion=" << config.quant_opt_store_fusion
+      << " quant_opt_atomic_demotion=" << config.quant_opt_atomic_demotion
+      << " make_mesh_block_local=" << config.make_mesh_block_local
+      << " optimize_mesh_reordered_mapping="
+      << config.optimize_mesh_reordered_mapping
+      << " mesh_localize_to_end_mapping=" << config.mesh_localize_to_end_mapping
+      << " mesh_localize_from_end_mapping="
+      << config.mesh_localize_from_end_mapping
+      << " mesh_localize_all_attr_mappings="
+      << config.mesh_localize_all_attr_mappings
+      << " demote_no_access_mesh_fors=" << config.demote_no_access_mesh_fors
+      << " experimental_auto_mesh_local="
+      << config.experimental_auto_mesh_local
+      << " auto_mesh_local_default_occupacy="
+      << config.auto_mesh_local_default_occupacy << '\n';
+}
+
+void serialize_snode_layout(const SNode *snode, std::ostringstream &oss) {
+  oss << snode->get_node_type_name_hinted() << " n="
+      << snode->num_cells_per_container
+      << " cell_size=" << snode->cell_size_bytes
+      << " offset=" << snode->offset_bytes_in_parent_cell
+      << " chunk_size=" << snode->chunk_size
+      << " hash_capacity=" << snode->hash_capacity
+      << " bit_offset=" << snode->bit_offset << " shape=[";
+  for (int i = 0; i < taichi_max_num_indices; i++) {
+    const auto &e = snode->extractors[i];
+    oss << e.shape << '/' << e.acc_offset << '/' << e.active << ' ';
+  }
+  oss << "] {";
+  for (const auto &ch : snode->ch) {
+    serialize_snode_layout(ch.get(), oss);
+  }
+  oss << "}\n";
+}
+
+// Unnamed identifiers are printed as "@tmp<id>" where the id comes from a
+// global counter. Renumber them in order of appearance.
+std::string normalize_identifiers(const std::string &ir) {
+  static const std::string prefix = "@tmp";
+  std::unordered_map<std::string, int> renamed;
+  std::string result;
+  result.reserve(ir.size());
+  std::size_t i = 0;
+  while (i < ir.size()) {
+    auto pos = ir.find(prefix, i);
+    if (pos == std::string::npos) {
+      result.append(ir, i, std::string::npos);
+      break;
+    }
+    result.append(ir, i, pos - i);
+    auto end = pos + prefix.size();
+    while (end < ir.size() && std::isdigit((unsigned char)ir[end])) {
+      end++;
+    }
+    auto id = ir.substr(pos + prefix.size(), end - pos - prefix.size());
+    auto it = renamed.find(id);
+    if (it == renamed.end()) {
+      it = renamed.emplace(id, (int)renamed.size()).first;
+    }
+    result += fmt::format("{}{}", prefix, it->second);
+    i = end;
+  }
+  return result;
+}
+
+}  // namespace
+
+LlvmOfflineCache::LlvmOfflineCache(const std::string &path,
+                                   uint64 max_size_bytes)
+    : path_(path), max_size_bytes_(max_size_bytes) {
+  create_directories(path_);
+  index_ = read_index();
+}
+
+LlvmOfflineCache::~LlvmOfflineCache() {
+  if (dirty_) {
+    dump();
+  }
+}
+
+// static
+std::string LlvmOfflineCache::get_kernel_key(Program *prog, Kernel *kernel) {
+  std::ostringstream oss;
+  oss << get_cache_version() << ' ' << arch_name(kernel->arch) << ' '
+      << llvm::sys::getHostCPUName().str() << " grad=" << kernel->grad << '\n';
+  serialize_compile_config(prog->config, oss);
+  for (int i = 0; i < prog->get_snode_tree_size(); i++) {
+    if (auto *root = prog->get_snode_root(i)) {
+      serialize_snode_layout(root, oss);
+    }
+  }
+  // Statement and identifier ids come from global counters, renumber them so
+  // that the key does not depend on how many kernels were compiled before.
+  std::string ir;
+  irpass::re_id(kernel->ir.get());
+  irpass::print(kernel->ir.get(), &ir);
+  oss << normalize_identifiers(ir);
+  return fmt::format("{}_{:016x}", kernel->offline_cache_key,
+                     (uint64)std::hash<std::string>{}(oss.str()));
+}
+
+namespace {
+
+void visit_snodes_in_pre_order(SNode *snode,
+                               const std::function<void(SNode *)> &visit) {
+  visit(snode);
+  for (auto &ch : snode->ch) {
+    visit_snodes_in_pre_order(ch.get(), visit);
+  }
+}
+
+}  // namespace
+
+// static
+std::vector<LlvmOfflineCache::SNodeCacheData> LlvmOfflineCache::encode_snodes(
+    const std::vector<SNode *> &snodes) {
+  std::vector<SNodeCacheData> result;
+  for (auto *snode : snodes) {
+    auto *root = snode;
+    while (root->parent) {
+      root = root->parent;
+    }
+    int index = 0, found = -1;
+    visit_snodes_in_pre_order(root, [&](SNode *s) {
+      if (s == snode) {
+        found = index;
+      }
+      index++;
+    });
+    TI_ASSERT(found != -1);
+    result.push_back({snode->get_snode_tree_id(), found});
+  }
+  return result;
+}
+
+// static
+std::vector<SNode *> LlvmOfflineCache::decode_snodes(
+    Program *prog,
+    const std::vector<SNodeCacheData> &snodes) {
+  std::vector<SNode *> result;
+  for (const auto &data : snodes) {
+    auto *root = prog->get_snode_root(data.tree_id);
+    TI_ASSERT(root != nullptr);
+    SNode *found = nullptr;
+    int index = 0;
+    visit_snodes_in_pre_order(root, [&](SNode *s) {
+      if (index++ == data.index) {
+        found = s;
+      }
+    });
+    TI_ASSERT(found != nullptr);
+    result.push_back(found);
+  }
+  return result;
+}
+
+std::unique_ptr<llvm::Module> LlvmOfflineCache::load_kernel(
+    const std::string &key,
+    llvm::LLVMContext *ctx,
+    KernelCacheData &data) {
+  std::lock_guard<std::mutex> _(mut_);
+  auto it = index_.kernels.find(key);
+  if (it == index_.kernels.end()) {
+    return nullptr;
+  }
+  const auto fn = bitcode_path(key);
+  if (!file_exists(fn)) {
+    // Evicted by another process
+    index_.kernels.erase(it);
+    dirty_ = true;
+    return nullptr;
+  }
+  std::ifstream ifs(fn, std::ios::binary);
+  std::string bitcode(std::istreambuf_iterator<char>(ifs),
+                      (std::istreambuf_iterator<char>()));
+  auto module = llvm::parseBitcodeFile(
+      llvm::MemoryBufferRef(bitcode, "offline_cache_bitcode"), *ctx);
+  if (!module) {
+    llvm::consumeError(module.takeError());
+    TI_WARN("Failed to load kernel {} from the offline cache", key);
+    index_.kernels.erase(it);
+    dirty_ = true;
+    return nullptr;
+  }
+  it->second.last_used = now_ns();
+  data = it->second;
+  dirty_ = true;
+  TI_TRACE("Loaded kernel {} from the offline cache", key);
+  return std::move(module.get());
+}
+
+void LlvmOfflineCache::store_kernel(const std::string &key,
+                                    llvm::Module *module,
+                                    const KernelCacheData &data) {
+  std::string bitcode;
+  {
+    llvm::raw_string_ostream sos(bitcode);
+    llvm::WriteBitcodeToFile(*module, sos);
+    sos.flush();
+  }
+  {
+    std::lock_guard<std::mutex> _(mut_);
+    const auto fn = bitcode_path(key);
+    std::FILE *f = std::fopen(fn.c_str(), "wb");
+    if (f == nullptr) {
+      TI_WARN("Cannot write kernel {} to the offline cache at {}", key, path_);
+      return;
+    }
+    std::fwrite(bitcode.data(), 1, bitcode.size(), f);
+    std::fclose(f);
+
+    auto &entry = index_.kernels[key];
+    entry = data;
+    entry.size = bitcode.size();
+    entry.last_used = now_ns();
+    dirty_ = true;
+  }
+  // Write the index right away so that other processes see the new entry even
+  // if this one never finalizes.
+  dump();
+}
+
+void LlvmOfflineCache::dump() {
+  std::lock_guard<std::mutex> _(mut_);
+  auto merged = read_index();
+  for (auto &[key, data] : index_.kernels) {
+    auto it = merged.kernels.find(key);
+    if (it == merged.kernels.end() || it->second.last_used < data.last_used) {
+      merged.kernels[key] = data;
+    }
+  }
+  evict(merged);
+
+  // Write to a temporary file first so that a concurrent reader never sees a
+  // partially written index.
+  const auto fn = index_path();
+  const auto tmp_fn = fmt::format("{}/ticache.{}.tmp.tcb", path_, now_ns());
+  write_to_binary_file(merged, tmp_fn);
+  if (std::rename(tmp_fn.c_str(), fn.c_str()) != 0) {
+    // std::rename does not overwrite existing files on Windows
+    std::remove(fn.c_str());
+    if (std::rename(tmp_fn.c_str(), fn.c_str()) != 0) {
+      TI_WARN("Failed to update the offline cache index at {}", fn);
+      std::remove(tmp_fn.c_str());
+    }
+  }
+  index_ = std::move(merged);
+  dirty_ = false;
+}
+
+std::string LlvmOfflineCache::index_path() const {
+  return fmt::format("{}/ticache.tcb", path_);
+}
+
+std::string LlvmOfflineCache::bitcode_path(const std::string &key) const {
+  return fmt::format("{}/{}.bc", path_, key);
+}
+
+LlvmOfflineCache::Index LlvmOfflineCache::read_index() const {
+  Index index;
+  const auto fn = index_path();
+  if (file_exists(fn)) {
+    read_from_binary_file(index, fn);
+  }
+  const auto version = get_cache_version();
+  if (index.version != version) {
+    // Entries written by another Taichi version can never be hit.
+    for (const auto &[key, _] : index.kernels) {
+      std::remove(bitcode_path(key).c_str());
+    }
+    index.kernels.clear();
+    index.version = version;
+  }
+  return index;
+}
+
+void LlvmOfflineCache::evict(Index &index) const {
+  uint64 total_size = 0;
+  std::vector<std::pair<uint64, std::string>> entries;
+  for (const auto &[key, data] : index.kernels) {
+    total_size += data.size;
+    entries.emplace_back(data.last_used, key);
+  }
+  if (total_size <= max_size_bytes_) {
+    return;
+  }
+  std::sort(entries.begin(), entries.end());
+  for (const auto &[_, key] : entries) {
+    if (total_size <= max_size_bytes_) {
+      break;
+    }
+    TI_TRACE("Evicting kernel {} from the offline cache", key);
+    total_size -= index.kernels[key].size;
+    std::remove(bitcode_path(key).c_str());
+    index.kernels.erase(key);
+  }
+}
+
+}  // namespace lang
+}  // namespace taichi
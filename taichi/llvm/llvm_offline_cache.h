@@ -0,0 +1,131 @@
+#pragma once
+
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "taichi/common/core.h"
+#include "taichi/common/serialization.h"
+#include "taichi/llvm/llvm_fwd.h"
+
+namespace taichi {
+namespace lang {
+
+class Kernel;
+class Program;
+class SNode;
+
+/**
+ * An on-disk cache of the LLVM modules generated for Taichi kernels.
+ *
+ * Every kernel is stored as a bitcode file named after its key. An index file
+ * in the same directory records the offloaded tasks, the size and the last
+ * access time of each entry, so that the cache can be trimmed in LRU order
+ * once it grows beyond the configured size.
+ */
+class LlvmOfflineCache {
+ public:
+  struct OffloadedTaskCacheData {
+    std::string name;
+    int block_dim{0};
+    int grid_dim{0};
+
+    TI_IO_DEF(name, block_dim, grid_dim);
+  };
+
+  // An SNode, identified by its SNode tree and its position in the pre-order
+  // traversal of the tree, which the cache key guarantees to be the same.
+  struct SNodeCacheData {
+    int tree_id{0};
+    int index{0};
+
+    TI_IO_DEF(tree_id, index);
+  };
+
+  struct KernelCacheData {
+    std::vector<OffloadedTaskCacheData> offloaded_task_list;
+    // The SNodes written by the kernel, which ti.Tape checkpoints.
+    std::vector<SNodeCacheData> snode_writes;
+    std::vector<SNodeCacheData> snode_atomic_writes;
+    // Whether the kernel may insert cells into a hash SNode.
+    bool activates_hash_snode{false};
+    // Size of the bitcode file, in bytes.
+    uint64 size{0};
+    // Nanoseconds since epoch of the last store or load of this entry.
+    uint64 last_used{0};
+
+    TI_IO_DEF(offloaded_task_list,
+              snode_writes,
+              snode_atomic_writes,
+              activates_hash_snode,
+              size,
+              last_used);
+  };
+
+  LlvmOfflineCache(const std::string &path, uint64 max_size_bytes);
+
+  ~LlvmOfflineCache();
+
+  /**
+   * Computes the cache key of a whole (not yet lowered) kernel.
+   *
+   * The key combines the frontend key set by Python (kernel source and
+   * template argument features), the frontend IR, the compile config, the
+   * layout of all the SNode trees, the Taichi version and the host CPU.
+   */
+  static std::string get_kernel_key(Program *prog, Kernel *kernel);
+
+  static std::vector<SNodeCacheData> encode_snodes(
+      const std::vector<SNode *> &snodes);
+
+  static std::vector<SNode *> decode_snodes(
+      Program *prog,
+      const std::vector<SNodeCacheData> &snodes);
+
+  /**
+   * Loads the module of |key| into |ctx|, and its entry into |data|.
+   *
+   * @return The cached module, or nullptr on a cache miss.
+   */
+  std::unique_ptr<llvm::Module> load_kernel(const std::string &key,
+                                            llvm::LLVMContext *ctx,
+                                            KernelCacheData &data);
+
+  // Stores |module| with the tasks and the SNode writes of |data|
+  void store_kernel(const std::string &key,
+                    llvm::Module *module,
+                    const KernelCacheData &data);
+
+  /**
+   * Merges the in-memory index with the one on disk, evicts the least
+   * recently used entries beyond the size limit and writes the index back.
+   */
+  void dump();
+
+ private:
+  struct Index {
+    std::string version;
+    std::unordered_map<std::string, KernelCacheData> kernels;
+
+    TI_IO_DEF(version, kernels);
+  };
+
+  std::string index_path() const;
+
+  std::string bitcode_path(const std::string &key) const;
+
+  Index read_index() const;
+
+  void evict(Index &index) const;
+
+  std::string path_;
+  uint64 max_size_bytes_{0};
+  Index index_;
+  bool dirty_{false};
+  std::mutex mut_;
+};
+
+}  // namespace lang
+}  // namespace taichi
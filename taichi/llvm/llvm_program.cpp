@@ -11,6 +11,7 @@
 #include "taichi/ir/statements.h"
 #include "taichi/backends/cpu/cpu_device.h"
 #include "taichi/backends/cuda/cuda_device.h"
+#include "taichi/system/cpu_topology.h"
 
 #include "taichi/backends/cuda/cuda_device.h"
 
@@ -59,6 +60,10 @@ LlvmProgramImpl::LlvmProgramImpl(CompileConfig &config_,
   snode_tree_buffer_manager_ = std::make_unique<SNodeTreeBufferManager>(this);
 
   thread_pool_ = std::make_unique<ThreadPool>(config->cpu_max_num_threads);
+  if (arch_is_cpu(config->arch)) {
+    thread_pool_->pin_threads(
+        get_thread_cpus(config->cpu_affinity, config->numa_aware));
+  }
 
   preallocated_device_buffer_ = nullptr;
   llvm_runtime_ = nullptr;
@@ -113,6 +118,15 @@ LlvmProgramImpl::LlvmProgramImpl(CompileConfig &config_,
     device_ = std::make_shared<cuda::CudaDevice>();
   }
 #endif
+
+  if (config_.offline_cache && !config_.async_mode) {
+    auto path = config_.offline_cache_path;
+    if (path.empty()) {
+      path = get_repo_dir() + "ticache/llvm";
+    }
+    offline_cache_ = std::make_unique<LlvmOfflineCache>(
+        path, (uint64)config_.offline_cache_max_size_MB * 1024 * 1024);
+  }
 }
 
 void LlvmProgramImpl::initialize_host() {
@@ -131,7 +145,11 @@ void LlvmProgramImpl::maybe_initialize_cuda_llvm_context() {
 
 FunctionType LlvmProgramImpl::compile(Kernel *kernel,
                                       OffloadedStmt *offloaded) {
-  if (!kernel->lowered()) {
+  // With the offline cache, lowering is deferred to the codegen, which needs
+  // the frontend IR to look the kernel up.
+  const bool use_offline_cache = offline_cache_ && offloaded == nullptr &&
+                                 !kernel->offline_cache_key.empty();
+  if (!kernel->lowered() && !use_offline_cache) {
     kernel->lower();
   }
   auto codegen = KernelCodeGen::create(kernel->arch, kernel, offloaded);
@@ -195,6 +213,21 @@ void LlvmProgramImpl::initialize_llvm_runtime_snodes(const SNodeTree *tree,
 #endif
   } else {
     alloc = cpu_device()->import_memory(root_buffer, rounded_size);
+    if (config->numa_aware) {
+      // The children of the root are laid out one after another, and each of
+      // them is split among the threads by the loops over it
+      std::vector<std::size_t> offsets{scomp->root_size};
+      for (auto &ch : tree->root()->ch) {
+        offsets.push_back(ch->offset_bytes_in_parent_cell);
+      }
+      std::sort(offsets.begin(), offsets.end());
+      std::vector<std::pair<uint8 *, std::size_t>> ranges;
+      for (int i = 0; i + 1 < (int)offsets.size(); i++) {
+        ranges.emplace_back((uint8 *)root_buffer + offsets[i],
+                            offsets[i + 1] - offsets[i]);
+      }
+      first_touch_memory(ranges);
+    }
   }
 
   snode_tree_allocs_[tree->id()] = alloc;
@@ -218,8 +251,9 @@ void LlvmProgramImpl::initialize_llvm_runtime_snodes(const SNodeTree *tree,
       const auto snode_id = snodes[i]->id;
       std::size_t node_size;
       auto element_size = snodes[i]->cell_size_bytes;
-      if (snodes[i]->type == SNodeType::pointer) {
-        // pointer. Allocators are for single elements
+      if (snodes[i]->type == SNodeType::pointer ||
+          snodes[i]->type == SNodeType::hash) {
+        // pointer and hash. Allocators are for single elements
         node_size = element_size;
       } else {
         // dynamic. Allocators are for the chunks
@@ -480,6 +514,8 @@ void LlvmProgramImpl::check_runtime_error(uint64 *result_buffer) {
 }
 
 void LlvmProgramImpl::finalize() {
+  if (offline_cache_)
+    offline_cache_->dump();
   if (runtime_mem_info_)
     runtime_mem_info_->set_profiler(nullptr);
 #if defined(TI_WITH_CUDA)
@@ -561,6 +597,92 @@ void LlvmProgramImpl::print_memory_profiler_info(
       total_requested_memory);
 }
 
+void LlvmProgramImpl::get_memory_info(
+    std::vector<std::unique_ptr<SNodeTree>> &snode_trees_,
+    uint64 *result_buffer,
+    MemoryInfo &info) {
+  TI_ASSERT(arch_uses_llvm(config->arch));
+
+  auto list_length = [&](void *list_manager) {
+    return runtime_query<int32>("ListManager_get_num_elements", result_buffer,
+                                list_manager);
+  };
+
+  std::function<void(SNode *, SNodeTreeMemoryInfo &)> visit =
+      [&](SNode *snode, SNodeTreeMemoryInfo &tree_info) {
+        auto element_list =
+            runtime_query<void *>("LLVMRuntime_get_element_lists",
+                                  result_buffer, llvm_runtime_, snode->id);
+        if (snode->type != SNodeType::place && element_list) {
+          SNodeMemoryInfo snode_info;
+          snode_info.snode_id = snode->id;
+          snode_info.name = snode->get_node_type_name_hinted();
+          snode_info.num_active_elements = list_length(element_list);
+
+          auto node_allocator =
+              runtime_query<void *>("LLVMRuntime_get_node_allocators",
+                                    result_buffer, llvm_runtime_, snode->id);
+          if (node_allocator) {
+            auto data_list = runtime_query<void *>(
+                "NodeManager_get_data_list", result_buffer, node_allocator);
+            snode_info.element_size = runtime_query<int32>(
+                "ListManager_get_element_size", result_buffer, data_list);
+            snode_info.chunk_num_elements = runtime_query<int32>(
+                "ListManager_get_max_num_elements_per_chunk", result_buffer,
+                data_list);
+            snode_info.num_chunks = runtime_query<int32>(
+                "ListManager_get_num_active_chunks", result_buffer, data_list);
+            snode_info.allocated_bytes = uint64(snode_info.num_chunks) *
+                                         snode_info.chunk_num_elements *
+                                         snode_info.element_size;
+
+            auto free_list_used = runtime_query<int32>(
+                "NodeManager_get_free_list_used", result_buffer,
+                node_allocator);
+            auto free_list = runtime_query<void *>(
+                "NodeManager_get_free_list", result_buffer, node_allocator);
+            auto recycled_list = runtime_query<void *>(
+                "NodeManager_get_recycled_list", result_buffer, node_allocator);
+            // The cells are only taken from the data list when the free list
+            // runs out, so its length is the peak number of cells in use
+            snode_info.peak_num_used_elements = list_length(data_list);
+            snode_info.num_free_elements =
+                std::max(list_length(free_list) - free_list_used, 0);
+            snode_info.num_recycled_elements = list_length(recycled_list);
+            snode_info.num_used_elements = snode_info.peak_num_used_elements -
+                                           snode_info.num_free_elements -
+                                           snode_info.num_recycled_elements;
+            if (snode_info.allocated_bytes > 0) {
+              snode_info.fragmentation =
+                  1.0 - float64(snode_info.num_used_elements) *
+                            snode_info.element_size /
+                            snode_info.allocated_bytes;
+            }
+          }
+          tree_info.snodes.push_back(snode_info);
+        }
+        for (const auto &ch : snode->ch) {
+          visit(ch.get(), tree_info);
+        }
+      };
+
+  for (auto &tree : snode_trees_) {
+    auto root_bytes = snode_tree_buffer_manager_->get_size(tree->id());
+    if (root_bytes == 0) {
+      // Destroyed
+      continue;
+    }
+    SNodeTreeMemoryInfo tree_info;
+    tree_info.tree_id = tree->id();
+    tree_info.root_bytes = root_bytes;
+    visit(tree->root(), tree_info);
+    info.snode_trees.push_back(std::move(tree_info));
+  }
+
+  info.runtime_requested_bytes = runtime_query<std::size_t>(
+      "LLVMRuntime_get_total_requested_memory", result_buffer, llvm_runtime_);
+}
+
 cuda::CudaDevice *LlvmProgramImpl::cuda_device() {
   if (config->arch != Arch::cuda) {
     TI_ERROR("arch is not cuda");
@@ -588,13 +710,43 @@ DeviceAllocation LlvmProgramImpl::allocate_memory_ndarray(
     tlctx = llvm_context_host_.get();
   }
 
-  return get_compute_device()->allocate_memory_runtime(
+  auto alloc = get_compute_device()->allocate_memory_runtime(
       {{alloc_size, /*host_write=*/false, /*host_read=*/false,
         /*export_sharing=*/false, AllocUsage::Storage},
        config->ndarray_use_cached_allocator,
        tlctx->runtime_jit_module,
        get_llvm_runtime(),
        result_buffer});
+  if (arch_is_cpu(config->arch) && config->numa_aware) {
+    first_touch_memory(
+        {{(uint8 *)get_ndarray_alloc_info_ptr(alloc), alloc_size}});
+  }
+  return alloc;
+}
+
+void LlvmProgramImpl::first_touch_memory(
+    const std::vector<std::pair<uint8 *, std::size_t>> &ranges) {
+  struct Context {
+    const std::vector<std::pair<uint8 *, std::size_t>> *ranges;
+    int num_threads;
+  };
+  int num_threads = config->cpu_max_num_threads;
+  Context ctx{&ranges, num_threads};
+  thread_pool_->run_on_each_thread(
+      num_threads, &ctx, [](void *ctx_, int thread_id, int i) {
+        auto ctx = (Context *)ctx_;
+        for (auto &[begin, size] : *ctx->ranges) {
+          auto part_begin = (uint64)begin + size * i / ctx->num_threads;
+          auto part_end = (uint64)begin + size * (i + 1) / ctx->num_threads;
+          // Each page is touched by the thread whose part it starts in.
+          // Reading and writing back a byte keeps the existing content.
+          for (auto p = iroundup(part_begin, (uint64)taichi_page_size);
+               p < part_end; p += taichi_page_size) {
+            auto byte = (volatile uint8 *)p;
+            *byte = *byte;
+          }
+        }
+      });
 }
 
 std::shared_ptr<Device> LlvmProgramImpl::get_device_shared() {
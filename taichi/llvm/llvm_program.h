@@ -4,6 +4,7 @@
 #include "taichi/program/compile_config.h"
 #include "taichi/common/logging.h"
 #include "taichi/llvm/llvm_context.h"
+#include "taichi/llvm/llvm_offline_cache.h"
 #include "taichi/runtime/runtime.h"
 #include "taichi/system/threading.h"
 #include "taichi/struct/struct.h"
@@ -11,6 +12,7 @@
 #include "taichi/program/snode_expr_utils.h"
 #include "taichi/system/memory_pool.h"
 #include "taichi/program/program_impl.h"
+#include "taichi/program/memory_info.h"
 #define TI_RUNTIME_HOST
 #include "taichi/program/context.h"
 #undef TI_RUNTIME_HOST
@@ -94,12 +96,30 @@ class LlvmProgramImpl : public ProgramImpl {
       std::vector<std::unique_ptr<SNodeTree>> &snode_trees_,
       uint64 *result_buffer);
 
+  // Fills the SNode trees and the runtime memory of |info|
+  void get_memory_info(std::vector<std::unique_ptr<SNodeTree>> &snode_trees_,
+                       uint64 *result_buffer,
+                       MemoryInfo &info);
+
+  // The CPU each thread of the CPU thread pool is pinned to, or -1 if it is
+  // not pinned
+  std::vector<int> get_thread_cpus() const {
+    return thread_pool_->thread_cpus;
+  }
+
   void synchronize() override;
 
   void check_runtime_error(uint64 *result_buffer);
 
   void finalize();
 
+  /**
+   * Returns the on-disk kernel cache, or nullptr if offline_cache is off.
+   */
+  LlvmOfflineCache *get_offline_cache() {
+    return offline_cache_.get();
+  }
+
   DeviceAllocation allocate_memory_ndarray(std::size_t alloc_size,
                                            uint64 *result_buffer) override;
 
@@ -156,12 +176,19 @@ class LlvmProgramImpl : public ProgramImpl {
   DevicePtr get_snode_tree_device_ptr(int tree_id) override;
 
  private:
+  // Touches the pages of each of the |ranges| with the thread that a
+  // range-for over the range assigns them to, so that the first-touch policy
+  // of the OS places them on the NUMA node of that thread.
+  void first_touch_memory(
+      const std::vector<std::pair<uint8 *, std::size_t>> &ranges);
+
   std::unique_ptr<TaichiLLVMContext> llvm_context_host_{nullptr};
   std::unique_ptr<TaichiLLVMContext> llvm_context_device_{nullptr};
   std::unique_ptr<ThreadPool> thread_pool_{nullptr};
   std::unique_ptr<Runtime> runtime_mem_info_{nullptr};
   std::unique_ptr<SNodeTreeBufferManager> snode_tree_buffer_manager_{nullptr};
   std::unique_ptr<StructCompiler> struct_compiler_{nullptr};
+  std::unique_ptr<LlvmOfflineCache> offline_cache_{nullptr};
   void *llvm_runtime_{nullptr};
   void *preallocated_device_buffer_{nullptr};  // TODO: move to memory allocator
 
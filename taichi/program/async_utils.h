@@ -133,8 +133,8 @@ struct TaskFusionMeta {
   OffloadedTaskType type{OffloadedTaskType::serial};
   SNode *snode{nullptr};  // struct-for only
   int block_dim{0};       // struct-for only
-  int32 begin_value{0};   // range-for only
-  int32 end_value{0};     // range-for only
+  int64 begin_value{0};   // range-for only
+  int64 end_value{0};     // range-for only
 
   // Merging kernels with different signatures will break invariants.
   // E.g.
@@ -6,7 +6,8 @@ TLANG_NAMESPACE_BEGIN
 
 CompileConfig::CompileConfig() {
   arch = host_arch();
-  simd_width = default_simd_width(arch);
+  simd_width = 0;
+  cpu_loop_vectorize = true;
   opt_level = 1;
   external_optimization_level = 3;
   packed = false;
@@ -33,6 +34,7 @@ CompileConfig::CompileConfig() {
   default_ip = PrimitiveType::i32;
   verbose_kernel_launches = false;
   kernel_profiler = false;
+  kernel_profiler_max_records = -1;
   default_cpu_block_dim = 32;
   default_gpu_block_dim = 128;
   gpu_max_reg = 0;  // 0 means using the default value from the CUDA driver.
@@ -49,8 +51,15 @@ CompileConfig::CompileConfig() {
   saturating_grid_dim = 0;
   max_block_dim = 0;
   cpu_max_num_threads = std::thread::hardware_concurrency();
+  cpu_affinity = "";
+  numa_aware = false;
   random_seed = 0;
 
+  // Offline cache options:
+  offline_cache = false;
+  offline_cache_path = "";
+  offline_cache_max_size_MB = 1024;
+
   // LLVM backend options:
   print_struct_llvm_ir = false;
   print_kernel_llvm_ir = false;
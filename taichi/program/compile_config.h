@@ -10,7 +10,12 @@ struct CompileConfig {
   bool debug;
   bool cfg_optimization;
   bool check_out_of_bound;
+  // The number of lanes of the vectorized CPU loops, or 0 to let the cost
+  // model of LLVM choose it for each loop
   int simd_width;
+  // Vectorizes the offloaded range-fors and the struct-fors over dense SNodes
+  // (CPU only)
+  bool cpu_loop_vectorize;
   bool lazy_compilation;
   int opt_level;
   int external_optimization_level;
@@ -32,6 +37,9 @@ struct CompileConfig {
   bool use_llvm;
   bool verbose_kernel_launches;
   bool kernel_profiler;
+  // The number of the latest kernel profiling records to keep, all of them if
+  // negative. The per-kernel statistics always cover all the launches.
+  int kernel_profiler_max_records;
   bool timeline{false};
   bool verbose;
   bool fast_math;
@@ -56,8 +64,21 @@ struct CompileConfig {
   int saturating_grid_dim;
   int max_block_dim;
   int cpu_max_num_threads;
+  // The CPUs to pin the worker threads to, in the "cpulist" format of Linux,
+  // e.g., "0-15,32-47". No pinning when empty.
+  std::string cpu_affinity;
+  // Pins the worker threads to the CPUs NUMA node by node, unless
+  // cpu_affinity is set, and places the root and ndarray memory on the nodes
+  // of the threads working on it.
+  bool numa_aware;
   int random_seed;
 
+  // Offline cache options:
+  bool offline_cache;
+  // Defaults to ~/.taichi/ticache/llvm when empty
+  std::string offline_cache_path;
+  int offline_cache_max_size_MB;
+
   // LLVM backend options:
   bool print_struct_llvm_ir;
   bool print_kernel_llvm_ir;
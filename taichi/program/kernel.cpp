@@ -3,6 +3,7 @@
 #include "taichi/backends/cuda/cuda_driver.h"
 #include "taichi/codegen/codegen.h"
 #include "taichi/common/task.h"
+#include "taichi/ir/analysis.h"
 #include "taichi/ir/statements.h"
 #include "taichi/ir/transforms.h"
 #include "taichi/program/async_engine.h"
@@ -63,6 +64,16 @@ void Kernel::compile() {
   compiled_ = program->compile(*this);
 }
 
+std::pair<std::vector<SNode *>, std::vector<SNode *>>
+Kernel::get_snode_writes() {
+  if (!compiled_ && !lowered_) {
+    compile();
+  }
+  TI_ERROR_IF(!snode_writes_gathered,
+              "The SNodes written by kernel {} are unknown", name);
+  return {snode_writes, snode_atomic_writes};
+}
+
 void Kernel::lower(bool to_executable) {
   TI_ASSERT(!lowered_);
   TI_ASSERT(supports_lowering(arch));
@@ -91,6 +102,17 @@ void Kernel::lower(bool to_executable) {
         is_extension_supported(config.arch, Extension::bls) &&
             config.make_block_local,
         /*start_from_ast=*/ir_is_ast_);
+    activates_hash_snode =
+        !irpass::analysis::gather_statements(ir.get(), [](Stmt *stmt) {
+           if (auto lookup = stmt->cast<SNodeLookupStmt>()) {
+             return lookup->activate && lookup->snode->type == SNodeType::hash;
+           }
+           if (auto op = stmt->cast<SNodeOpStmt>()) {
+             return op->op_type == SNodeOpType::activate &&
+                    op->snode->type == SNodeType::hash;
+           }
+           return false;
+         }).empty();
   } else {
     irpass::compile_to_offloads(ir.get(), config, this, verbose, grad,
                                 /*ad_use_stack=*/true,
@@ -106,8 +128,10 @@ void Kernel::operator()(LaunchContextBuilder &ctx_builder) {
       compile();
     }
 
-    for (auto &offloaded : ir->as<Block>()->statements) {
-      account_for_offloaded(offloaded->as<OffloadedStmt>());
+    if (!from_offline_cache) {
+      for (auto &offloaded : ir->as<Block>()->statements) {
+        account_for_offloaded(offloaded->as<OffloadedStmt>());
+      }
     }
 
     compiled_(ctx_builder.get_context());
@@ -117,6 +141,11 @@ void Kernel::operator()(LaunchContextBuilder &ctx_builder) {
     if (program->config.debug && (arch_is_cpu(program->config.arch) ||
                                   program->config.arch == Arch::cuda)) {
       program->check_runtime_error();
+    } else if (activates_hash_snode && arch_is_cpu(arch) &&
+               arch_is_cpu(program->config.arch)) {
+      // Hash SNodes are CPU-only, where launches are synchronous, so a full
+      // hash table is reported even without debug mode
+      program->check_runtime_error();
     }
   } else {
     program->sync = false;
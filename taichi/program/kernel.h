@@ -21,6 +21,23 @@ class TI_DLL_EXPORT Kernel : public Callable {
   bool is_evaluator{false};
   bool grad{false};
 
+  // Set by the frontend when the offline cache is enabled. Kernels without a
+  // key are never cached.
+  std::string offline_cache_key;
+  // True if the compiled kernel was loaded from the offline cache, in which
+  // case |ir| is never lowered.
+  bool from_offline_cache{false};
+
+  // The SNodes written by the kernel, and those updated by atomic operations.
+  // Gathered when the kernel is lowered, or loaded from the offline cache.
+  std::vector<SNode *> snode_writes, snode_atomic_writes;
+  bool snode_writes_gathered{false};
+
+  // True if the kernel may insert cells into a hash SNode, which reports a
+  // full table through the runtime error code. Found when the kernel is
+  // lowered, or loaded from the offline cache.
+  bool activates_hash_snode{false};
+
   class LaunchContextBuilder {
    public:
     LaunchContextBuilder(Kernel *kernel, RuntimeContext *ctx);
@@ -86,6 +103,13 @@ class TI_DLL_EXPORT Kernel : public Callable {
 
   void compile();
 
+  /**
+   * Gets the SNodes written by the kernel, compiling it if necessary.
+   *
+   * @return: All the written SNodes, and those updated by atomic operations.
+   */
+  std::pair<std::vector<SNode *>, std::vector<SNode *>> get_snode_writes();
+
   /**
    * Lowers |ir| to CHI IR level
    *
@@ -0,0 +1,39 @@
+#include "taichi/program/kernel_graph.h"
+
+namespace taichi {
+namespace lang {
+
+Kernel::LaunchContextBuilder &KernelGraph::append(Kernel *kernel) {
+  record_arg_sizes_of_last_launch();
+  launches_.push_back(std::make_unique<Launch>(kernel));
+  return launches_.back()->ctx_builder;
+}
+
+void KernelGraph::run(int repeats) {
+  record_arg_sizes_of_last_launch();
+  for (int r = 0; r < repeats; r++) {
+    for (auto &launch : launches_) {
+      auto &args = launch->kernel->args;
+      for (int i = 0; i < (int)args.size(); i++) {
+        args[i].size = launch->arg_sizes[i];
+      }
+      (*launch->kernel)(launch->ctx_builder);
+    }
+  }
+}
+
+void KernelGraph::record_arg_sizes_of_last_launch() {
+  // The arguments of a launch are set right after it is appended, so they are
+  // complete once the next launch is appended or the graph is run.
+  if (launches_.empty() || launches_.back()->arg_sizes_recorded) {
+    return;
+  }
+  auto &launch = *launches_.back();
+  for (const auto &arg : launch.kernel->args) {
+    launch.arg_sizes.push_back(arg.size);
+  }
+  launch.arg_sizes_recorded = true;
+}
+
+}  // namespace lang
+}  // namespace taichi
@@ -0,0 +1,69 @@
+#pragma once
+
+#include <memory>
+#include <vector>
+
+#include "taichi/program/kernel.h"
+
+namespace taichi {
+namespace lang {
+
+/**
+ * A recorded sequence of kernel launches that can be replayed as a whole.
+ *
+ * Every launch keeps its own launch context, so the arguments are marshalled
+ * only once, when the launch is recorded. Replaying goes through
+ * Kernel::operator(), hence kernels are still dispatched to the async engine
+ * in async mode.
+ */
+class KernelGraph {
+ public:
+  /**
+   * Appends a launch of |kernel| to the graph.
+   *
+   * @return The launch context of the new launch. The caller fills in the
+   * arguments; the context lives as long as the graph.
+   */
+  Kernel::LaunchContextBuilder &append(Kernel *kernel);
+
+  /**
+   * Launches all the recorded kernels in order, |repeats| times.
+   */
+  void run(int repeats = 1);
+
+  std::size_t size() const {
+    return launches_.size();
+  }
+
+  /**
+   * Removes the last launch, e.g. when setting its arguments failed.
+   */
+  void pop_back() {
+    launches_.pop_back();
+  }
+
+  void clear() {
+    launches_.clear();
+  }
+
+ private:
+  struct Launch {
+    Kernel *kernel;
+    Kernel::LaunchContextBuilder ctx_builder;
+    // Kernel::Arg::size is written when an array argument is set. Keep the
+    // value of every launch, since other launches may overwrite it.
+    std::vector<std::size_t> arg_sizes;
+    bool arg_sizes_recorded{false};
+
+    explicit Launch(Kernel *kernel)
+        : kernel(kernel), ctx_builder(kernel->make_launch_context()) {
+    }
+  };
+
+  void record_arg_sizes_of_last_launch();
+
+  std::vector<std::unique_ptr<Launch>> launches_;
+};
+
+}  // namespace lang
+}  // namespace taichi
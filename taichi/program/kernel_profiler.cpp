@@ -5,6 +5,8 @@
 #include "taichi/backends/cuda/cuda_profiler.h"
 #include "taichi/system/timeline.h"
 
+#include <cmath>
+
 TLANG_NAMESPACE_BEGIN
 
 void KernelProfileStatisticalResult::insert_record(double t) {
@@ -16,6 +18,32 @@ void KernelProfileStatisticalResult::insert_record(double t) {
   min = std::min(min, t);
   max = std::max(max, t);
   total += t;
+  int bucket = 0;
+  if (t > kMinBucketTime) {
+    bucket = std::min(
+        kNumBuckets - 1,
+        int(std::log2(t / kMinBucketTime) * kNumBucketsPerOctave) + 1);
+  }
+  histogram[bucket]++;
+}
+
+double KernelProfileStatisticalResult::percentile(double q) const {
+  if (counter == 0) {
+    return 0;
+  }
+  const uint64 rank = uint64(std::ceil(std::clamp(q, 0.0, 1.0) * counter));
+  uint64 count = 0;
+  int bucket = 0;
+  for (; bucket < kNumBuckets - 1; bucket++) {
+    count += histogram[bucket];
+    if (count >= std::max(rank, uint64(1))) {
+      break;
+    }
+  }
+  // The geometric midpoint of the bucket, which is (lower, upper]
+  const double t =
+      kMinBucketTime * std::exp2((bucket - 0.5) / kNumBucketsPerOctave);
+  return std::clamp(t, min, max);
 }
 
 bool KernelProfileStatisticalResult::operator<(
@@ -61,6 +89,59 @@ void KernelProfilerBase::query(const std::string &kernel_name,
   }
 }
 
+void KernelProfilerBase::commit_records(std::size_t begin) {
+  for (auto i = begin; i < traced_records_.size(); i++) {
+    const auto &record = traced_records_[i];
+    auto it =
+        std::find_if(statistical_results_.begin(), statistical_results_.end(),
+                     [&](KernelProfileStatisticalResult &result) {
+                       return result.name == record.name;
+                     });
+    if (it == statistical_results_.end()) {
+      statistical_results_.emplace_back(record.name);
+      it = std::prev(statistical_results_.end());
+    }
+    it->insert_record(record.kernel_elapsed_time_in_ms);
+    total_time_ms_ += record.kernel_elapsed_time_in_ms;
+  }
+  if (max_traced_records_ == 0) {
+    traced_records_.clear();
+  } else if (max_traced_records_ > 0 &&
+             traced_records_.size() >= 2 * std::size_t(max_traced_records_)) {
+    // Dropped in batches so that each record is moved O(1) times
+    traced_records_.erase(traced_records_.begin(),
+                          traced_records_.end() - max_traced_records_);
+  }
+}
+
+std::vector<KernelProfileTracedRecord> KernelProfilerBase::get_traced_records()
+    const {
+  if (max_traced_records_ < 0 ||
+      traced_records_.size() <= std::size_t(max_traced_records_)) {
+    return traced_records_;
+  }
+  return std::vector<KernelProfileTracedRecord>(
+      traced_records_.end() - max_traced_records_, traced_records_.end());
+}
+
+void KernelProfilerBase::save_trace(const std::string &filename) const {
+  std::vector<TimelineEvent> events;
+  if (!(inserts_timeline_events() &&
+        Timelines::get_instance().get_enabled())) {
+    // Records without a start time are laid out back to back
+    float64 next_start_time = 0;
+    for (const auto &record : get_traced_records()) {
+      float64 start_time =
+          record.start_time > 0 ? record.start_time : next_start_time;
+      float64 end_time = start_time + record.kernel_elapsed_time_in_ms * 1e-3;
+      events.push_back({record.name, /*begin=*/true, start_time, "kernels"});
+      events.push_back({record.name, /*begin=*/false, end_time, "kernels"});
+      next_start_time = end_time;
+    }
+  }
+  Timelines::get_instance().save(filename, events);
+}
+
 double KernelProfilerBase::get_total_time() const {
   return total_time_ms_ / 1000.0;
 }
@@ -91,19 +172,10 @@ class DefaultProfiler : public KernelProfilerBase {
     KernelProfileTracedRecord record;
     record.name = event_name_;
     record.kernel_elapsed_time_in_ms = ms;
+    record.start_time = start_t_;
     traced_records_.push_back(record);
     // count record
-    auto it =
-        std::find_if(statistical_results_.begin(), statistical_results_.end(),
-                     [&](KernelProfileStatisticalResult &r) {
-                       return r.name == event_name_;
-                     });
-    if (it == statistical_results_.end()) {
-      statistical_results_.emplace_back(event_name_);
-      it = std::prev(statistical_results_.end());
-    }
-    it->insert_record(ms);
-    total_time_ms_ += ms;
+    commit_records(traced_records_.size() - 1);
   }
 
  private:
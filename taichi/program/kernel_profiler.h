@@ -4,6 +4,7 @@
 #include "taichi/lang_util.h"
 
 #include <algorithm>
+#include <array>
 #include <map>
 #include <string>
 #include <vector>
@@ -22,16 +23,25 @@ struct KernelProfileTracedRecord {
   // kernel time
   float kernel_elapsed_time_in_ms{0.0};
   float time_since_base{0.0};        // for Timeline
+  float64 start_time{0.0};           // in seconds, 0 if unknown
   std::string name;                  // kernel name
   std::vector<float> metric_values;  // user selected metrics
 };
 
 struct KernelProfileStatisticalResult {
+  // The kernel times are counted in buckets, whose bounds grow by a factor of
+  // 2^(1/kNumBucketsPerOctave) from kMinBucketTime ms, so that percentiles are
+  // estimated within a bounded relative error without keeping the times.
+  static constexpr int kNumBucketsPerOctave = 4;
+  static constexpr int kNumBuckets = 96;
+  static constexpr double kMinBucketTime = 1e-3;
+
   std::string name;
   int counter;
   double min;
   double max;
   double total;
+  std::array<uint64, kNumBuckets> histogram{};
 
   KernelProfileStatisticalResult(const std::string &name)
       : name(name), counter(0), min(0), max(0), total(0) {
@@ -40,14 +50,24 @@ struct KernelProfileStatisticalResult {
   void insert_record(double t);  // TODO replace `double time` with
                                  // `KernelProfileTracedRecord record`
 
+  // Estimates the time below which a fraction |q| of the kernel times are.
+  double percentile(double q) const;
+
   bool operator<(const KernelProfileStatisticalResult &o) const;
 };
 
 class KernelProfilerBase {
  protected:
+  // The latest records, up to |max_traced_records_| of them if it is not
+  // negative. At most twice as many are kept before the oldest are dropped.
   std::vector<KernelProfileTracedRecord> traced_records_;
   std::vector<KernelProfileStatisticalResult> statistical_results_;
   double total_time_ms_{0};
+  int max_traced_records_{-1};
+
+  // Counts the records from |begin| on, whose times are known, in the
+  // statistical results, then drops the records that are not to be kept.
+  void commit_records(std::size_t begin);
 
  public:
   // Needed for the CUDA backend since we need to know which task to "stop"
@@ -86,8 +106,27 @@ class KernelProfilerBase {
              double &max,
              double &avg);
 
-  std::vector<KernelProfileTracedRecord> get_traced_records() {
-    return traced_records_;
+  // Sets the number of the latest records to keep, all of them if negative.
+  // The statistical results always cover all the records.
+  void set_max_traced_records(int max_traced_records) {
+    max_traced_records_ = max_traced_records;
+  }
+
+  std::vector<KernelProfileTracedRecord> get_traced_records() const;
+
+  const std::vector<KernelProfileStatisticalResult> &get_statistical_results()
+      const {
+    return statistical_results_;
+  }
+
+  // Saves the kept records, together with the events of the timelines, in the
+  // Chrome trace event format.
+  void save_trace(const std::string &filename) const;
+
+  // Whether the records are also inserted into the timelines of
+  // taichi/system/timeline.h when they are enabled.
+  virtual bool inserts_timeline_events() const {
+    return false;
   }
 
   double get_total_time() const;
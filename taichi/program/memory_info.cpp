@@ -0,0 +1,48 @@
+#include "taichi/program/memory_info.h"
+
+#include "taichi/system/timer.h"
+
+#include <chrono>
+
+TLANG_NAMESPACE_BEGIN
+
+MemorySampler::MemorySampler(Device *device, float64 interval)
+    : device_(device), interval_(interval) {
+  TI_ASSERT(device_);
+  TI_ERROR_IF(interval_ <= 0, "The sampling interval must be positive.");
+  thread_ = std::thread([this]() {
+    std::unique_lock<std::mutex> lock(mut_);
+    while (!stopped_) {
+      append_sample();
+      cv_.wait_for(lock, std::chrono::duration<float64>(interval_),
+                   [this]() { return stopped_; });
+    }
+  });
+}
+
+MemorySampler::~MemorySampler() {
+  stop();
+}
+
+std::vector<MemorySample> MemorySampler::stop() {
+  {
+    std::lock_guard<std::mutex> _(mut_);
+    if (stopped_) {
+      return {};
+    }
+    stopped_ = true;
+  }
+  cv_.notify_all();
+  thread_.join();
+  // The last sample
+  append_sample();
+  return std::move(samples_);
+}
+
+void MemorySampler::append_sample() {
+  auto stats = device_->get_memory_stats();
+  samples_.push_back(
+      {Time::get_time(), stats.allocated_bytes, stats.cached_bytes});
+}
+
+TLANG_NAMESPACE_END
@@ -0,0 +1,82 @@
+#pragma once
+
+#include "taichi/backends/device.h"
+
+#include <condition_variable>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+TLANG_NAMESPACE_BEGIN
+
+// Memory of the node allocator of an SNode, which allocates the cells of its
+// children if it is a pointer, bitmasked, dynamic or hash SNode
+struct SNodeMemoryInfo {
+  int snode_id{0};
+  std::string name;
+  // Length of the list of the active cells
+  int num_active_elements{0};
+  uint64 element_size{0};
+  int num_chunks{0};
+  uint64 chunk_num_elements{0};
+  // Bytes of the chunks, which are never released, so this is also the peak
+  uint64 allocated_bytes{0};
+  // Cells in use, free for reuse and waiting for garbage collection
+  int num_used_elements{0};
+  int num_free_elements{0};
+  int num_recycled_elements{0};
+  // The most cells that have been in use at the same time
+  int peak_num_used_elements{0};
+  // Fraction of |allocated_bytes| not taken by the cells in use
+  float64 fragmentation{0};
+};
+
+struct SNodeTreeMemoryInfo {
+  int tree_id{0};
+  // Bytes of the root buffer, including the dense SNodes
+  uint64 root_bytes{0};
+  std::vector<SNodeMemoryInfo> snodes;
+};
+
+struct MemoryInfo {
+  // Only available on the LLVM backends
+  std::vector<SNodeTreeMemoryInfo> snode_trees;
+  // Bytes requested from the memory pool by the LLVM runtime, including the
+  // root buffers and the chunks of the node allocators
+  uint64 runtime_requested_bytes{0};
+  // Allocations of the compute device, e.g., ndarrays and memory pool buffers
+  Device::MemoryStats device;
+};
+
+struct MemorySample {
+  float64 time{0};  // in seconds
+  uint64 allocated_bytes{0};
+  uint64 cached_bytes{0};
+};
+
+// Samples the memory stats of a device periodically in a background thread,
+// which reads counters updated on the host, so that the running kernels are
+// neither synchronized nor slowed down.
+class MemorySampler {
+ public:
+  MemorySampler(Device *device, float64 interval);
+
+  ~MemorySampler();
+
+  // Stops sampling, and returns the samples
+  std::vector<MemorySample> stop();
+
+ private:
+  void append_sample();
+
+  Device *device_;
+  float64 interval_;
+  std::mutex mut_;
+  std::condition_variable cv_;
+  bool stopped_{false};
+  std::vector<MemorySample> samples_;
+  std::thread thread_;
+};
+
+TLANG_NAMESPACE_END
@@ -74,6 +74,8 @@ Program::Program(Arch desired_arch)
     config.check_out_of_bound = true;
 
   profiler = make_profiler(config.arch, config.kernel_profiler);
+  if (profiler)
+    profiler->set_max_traced_records(config.kernel_profiler_max_records);
   if (arch_uses_llvm(config.arch)) {
 #ifdef TI_WITH_LLVM
     program_impl_ = std::make_unique<LlvmProgramImpl>(config, profiler.get());
@@ -253,6 +255,17 @@ int Program::get_snode_tree_size() {
   return snode_trees_.size();
 }
 
+uint64 Program::get_snode_tree_host_ptr(int tree_id) {
+  TI_ASSERT(arch_is_cpu(config.arch) && arch_uses_llvm(config.arch));
+#ifdef TI_WITH_LLVM
+  auto ptr = get_snode_tree_device_ptr(tree_id);
+  return (uint64)get_llvm_program_impl()->get_ndarray_alloc_info_ptr(ptr) +
+         ptr.offset;
+#else
+  TI_NOT_IMPLEMENTED
+#endif
+}
+
 std::string capitalize_first(std::string s) {
   s[0] = std::toupper(s[0]);
   return s;
@@ -460,6 +473,8 @@ uint64 Program::fetch_result_uint64(int i) {
 
 void Program::finalize() {
   synchronize();
+  // Stopped before the device is destroyed
+  memory_sampler_ = nullptr;
   if (async_engine)
     async_engine = nullptr;  // Finalize the async engine threads before
                              // anything else gets destoried.
@@ -533,6 +548,46 @@ void Program::print_memory_profiler_info() {
 #endif
 }
 
+MemoryInfo Program::get_memory_info() {
+  MemoryInfo info;
+  if (auto device = get_compute_device()) {
+    info.device = device->get_memory_stats();
+  }
+#ifdef TI_WITH_LLVM
+  if (arch_uses_llvm(config.arch)) {
+    static_cast<LlvmProgramImpl *>(program_impl_.get())
+        ->get_memory_info(snode_trees_, result_buffer, info);
+  }
+#endif
+  return info;
+}
+
+std::vector<int> Program::get_thread_cpus() {
+#ifdef TI_WITH_LLVM
+  if (arch_is_cpu(config.arch)) {
+    return static_cast<LlvmProgramImpl *>(program_impl_.get())
+        ->get_thread_cpus();
+  }
+#endif
+  return {};
+}
+
+void Program::start_memory_sampling(float64 interval) {
+  auto device = get_compute_device();
+  TI_ERROR_IF(device == nullptr,
+              "Memory sampling is not supported on the {} backend.",
+              arch_name(config.arch));
+  TI_ERROR_IF(memory_sampler_ != nullptr, "Memory sampling already started.");
+  memory_sampler_ = std::make_unique<MemorySampler>(device, interval);
+}
+
+std::vector<MemorySample> Program::stop_memory_sampling() {
+  TI_ERROR_IF(memory_sampler_ == nullptr, "Memory sampling not started.");
+  auto samples = memory_sampler_->stop();
+  memory_sampler_ = nullptr;
+  return samples;
+}
+
 std::size_t Program::get_snode_num_dynamically_allocated(SNode *snode) {
   TI_ASSERT(arch_uses_llvm(config.arch) || config.arch == Arch::metal ||
             config.arch == Arch::vulkan || config.arch == Arch::opengl);
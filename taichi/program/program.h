@@ -19,6 +19,7 @@
 #include "taichi/program/function.h"
 #include "taichi/program/kernel.h"
 #include "taichi/program/kernel_profiler.h"
+#include "taichi/program/memory_info.h"
 #include "taichi/program/snode_expr_utils.h"
 #include "taichi/program/snode_rw_accessors_bank.h"
 #include "taichi/program/ndarray_rw_accessors_bank.h"
@@ -238,6 +239,18 @@ class TI_DLL_EXPORT Program {
   // it's exposed to python.
   void print_memory_profiler_info();
 
+  MemoryInfo get_memory_info();
+
+  // The CPU each thread of the CPU thread pool is pinned to, or -1 if it is
+  // not pinned. Empty if the backend has no CPU thread pool.
+  std::vector<int> get_thread_cpus();
+
+  // Samples the memory of the compute device every |interval| seconds while
+  // the kernels run, until stop_memory_sampling() returns the samples.
+  void start_memory_sampling(float64 interval);
+
+  std::vector<MemorySample> stop_memory_sampling();
+
   // Returns zero if the SNode is statically allocated
   std::size_t get_snode_num_dynamically_allocated(SNode *snode);
 
@@ -301,6 +314,14 @@ class TI_DLL_EXPORT Program {
     return program_impl_->get_snode_tree_device_ptr(tree_id);
   }
 
+  /**
+   * Gets the host address of the root buffer of a SNode tree.
+   *
+   * Only LLVM-based CPU backends are supported, where SNode memory lives on
+   * the host.
+   */
+  uint64 get_snode_tree_host_ptr(int tree_id);
+
   Device *get_compute_device() {
     return program_impl_->get_compute_device();
   }
@@ -336,6 +357,7 @@ class TI_DLL_EXPORT Program {
   std::unordered_map<FunctionKey, Function *> function_map_;
 
   std::unique_ptr<ProgramImpl> program_impl_;
+  std::unique_ptr<MemorySampler> memory_sampler_{nullptr};
   float64 total_compilation_time_{0.0};
   static std::atomic<int> num_instances_;
   bool finalized_{false};
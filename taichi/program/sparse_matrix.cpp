@@ -1,5 +1,7 @@
 #include "taichi/program/sparse_matrix.h"
 
+#include <algorithm>
+#include <atomic>
 #include <sstream>
 
 #include "Eigen/Dense"
@@ -8,11 +10,30 @@
 namespace taichi {
 namespace lang {
 
+namespace {
+
+// Number of 32-bit words taken by a triplet with a value of type T
+template <typename T>
+constexpr int triplet_num_words() {
+  return 2 + sizeof(T) / sizeof(uint32);
+}
+
+}  // namespace
+
 SparseMatrixBuilder::SparseMatrixBuilder(int rows,
                                          int cols,
-                                         int max_num_triplets)
-    : rows_(rows), cols_(cols), max_num_triplets_(max_num_triplets) {
-  data_.reserve(max_num_triplets * 3);
+                                         int max_num_triplets,
+                                         DataType dtype)
+    : rows_(rows),
+      cols_(cols),
+      max_num_triplets_(max_num_triplets),
+      dtype_(dtype) {
+  TI_ERROR_IF(dtype_ != PrimitiveType::f32 && dtype_ != PrimitiveType::f64,
+              "Sparse matrices of type {} are not supported",
+              data_type_name(dtype_));
+  data_.reserve(max_num_triplets * (dtype_ == PrimitiveType::f64
+                                        ? triplet_num_words<float64>()
+                                        : triplet_num_words<float32>()));
   data_base_ptr_ = get_data_base_ptr();
 }
 
@@ -20,112 +41,199 @@ void *SparseMatrixBuilder::get_data_base_ptr() {
   return data_.data();
 }
 
-void SparseMatrixBuilder::print_triplets() {
+template <typename T>
+void SparseMatrixBuilder::print_triplets_template() {
+  constexpr int num_words = triplet_num_words<T>();
   fmt::print("n={}, m={}, num_triplets={} (max={})", rows_, cols_,
              num_triplets_, max_num_triplets_);
   for (int64 i = 0; i < num_triplets_; i++) {
-    fmt::print("({}, {}) val={}", data_[i * 3], data_[i * 3 + 1],
-               taichi_union_cast<float32>(data_[i * 3 + 2]));
+    const uint32 *triplet = data_.data() + i * num_words;
+    fmt::print("({}, {}) val={}", triplet[0], triplet[1],
+               *reinterpret_cast<const T *>(triplet + 2));
   }
   fmt::print("\n");
 }
 
-SparseMatrix SparseMatrixBuilder::build() {
+void SparseMatrixBuilder::print_triplets() {
+  if (dtype_ == PrimitiveType::f64) {
+    print_triplets_template<float64>();
+  } else {
+    print_triplets_template<float32>();
+  }
+}
+
+template <typename T>
+std::unique_ptr<SparseMatrix> SparseMatrixBuilder::build_template() {
+  constexpr int num_words = triplet_num_words<T>();
+  using Triplet = Eigen::Triplet<T>;
+  std::vector<Triplet> triplets;
+  triplets.reserve(num_triplets_);
+  for (int64 i = 0; i < num_triplets_; i++) {
+    const uint32 *triplet = data_.data() + i * num_words;
+    triplets.push_back(Triplet(triplet[0], triplet[1],
+                               *reinterpret_cast<const T *>(triplet + 2)));
+  }
+  auto sm = std::make_unique<EigenSparseMatrix<Eigen::SparseMatrix<T>>>(
+      rows_, cols_);
+  sm->get_eigen_matrix().setFromTriplets(triplets.begin(), triplets.end());
+  return sm;
+}
+
+std::unique_ptr<SparseMatrix> SparseMatrixBuilder::build() {
   TI_ASSERT(built_ == false);
   built_ = true;
-  using T = Eigen::Triplet<float32>;
-  std::vector<T> triplets;
-  for (int i = 0; i < num_triplets_; i++) {
-    triplets.push_back(T(data_[i * 3], data_[i * 3 + 1],
-                         taichi_union_cast<float32>(data_[i * 3 + 2])));
+  std::unique_ptr<SparseMatrix> sm;
+  if (dtype_ == PrimitiveType::f64) {
+    sm = build_template<float64>();
+  } else {
+    sm = build_template<float32>();
   }
-  SparseMatrix sm(rows_, cols_);
-  sm.get_matrix().setFromTriplets(triplets.begin(), triplets.end());
   clear();
   return sm;
 }
 
+template <typename T>
+void SparseMatrixBuilder::refill_template(SparseMatrix &sm) {
+  constexpr int num_words = triplet_num_words<T>();
+  auto &matrix =
+      static_cast<EigenSparseMatrix<Eigen::SparseMatrix<T>> &>(sm)
+          .get_eigen_matrix();
+  matrix.makeCompressed();
+  const int *outer = matrix.outerIndexPtr();
+  const int *inner = matrix.innerIndexPtr();
+  T *values = matrix.valuePtr();
+  // Entries of each column are sorted by row, so each triplet is located by a
+  // binary search instead of sorting and merging all the triplets. All of them
+  // are located before any value is written, so that the matrix is left
+  // unchanged if one is invalid.
+  std::vector<int> slots(num_triplets_);
+  for (int64 i = 0; i < num_triplets_; i++) {
+    const uint32 *triplet = data_.data() + i * num_words;
+    int row = triplet[0];
+    int col = triplet[1];
+    TI_ERROR_IF(row < 0 || row >= rows_ || col < 0 || col >= cols_,
+                "Entry ({}, {}) is out of the bounds of the matrix", row, col);
+    const int *begin = inner + outer[col];
+    const int *end = inner + outer[col + 1];
+    const int *it = std::lower_bound(begin, end, row);
+    TI_ERROR_IF(it == end || *it != row,
+                "Entry ({}, {}) is not in the sparsity pattern of the matrix",
+                row, col);
+    slots[i] = it - inner;
+  }
+  std::fill(values, values + matrix.nonZeros(), T(0));
+  for (int64 i = 0; i < num_triplets_; i++) {
+    const uint32 *triplet = data_.data() + i * num_words;
+    values[slots[i]] += *reinterpret_cast<const T *>(triplet + 2);
+  }
+}
+
+void SparseMatrixBuilder::refill(SparseMatrix &sm) {
+  TI_ERROR_IF(sm.get_data_type() != dtype_,
+              "Cannot refill a sparse matrix of type {} with triplets of "
+              "type {}",
+              data_type_name(sm.get_data_type()), data_type_name(dtype_));
+  TI_ERROR_IF(sm.num_rows() != rows_ || sm.num_cols() != cols_,
+              "Cannot refill a {}x{} sparse matrix with triplets of a {}x{} "
+              "matrix",
+              sm.num_rows(), sm.num_cols(), rows_, cols_);
+  // The triplets are consumed even if they fail to refill the matrix
+  try {
+    if (dtype_ == PrimitiveType::f64) {
+      refill_template<float64>(sm);
+    } else {
+      refill_template<float32>(sm);
+    }
+  } catch (...) {
+    clear();
+    throw;
+  }
+  clear();
+}
+
 void SparseMatrixBuilder::clear() {
   built_ = false;
   num_triplets_ = 0;
 }
 
-SparseMatrix::SparseMatrix(Eigen::SparseMatrix<float32> &matrix) {
-  this->matrix_ = matrix;
+uint64 SparseMatrix::new_pattern_id() {
+  static std::atomic<uint64> next_id{1};
+  return next_id++;
 }
 
-SparseMatrix::SparseMatrix(int rows, int cols) : matrix_(rows, cols) {
-}
-
-const std::string SparseMatrix::to_string() const {
+template <class EigenMatrix>
+const std::string EigenSparseMatrix<EigenMatrix>::to_string() const {
   Eigen::IOFormat clean_fmt(4, 0, ", ", "\n", "[", "]");
   // Note that the code below first converts the sparse matrix into a dense one.
   // https://stackoverflow.com/questions/38553335/how-can-i-print-in-console-a-formatted-sparse-matrix-with-eigen
   std::ostringstream ostr;
-  ostr << Eigen::MatrixXf(matrix_).format(clean_fmt);
+  ostr << Eigen::Matrix<Scalar, Eigen::Dynamic, Eigen::Dynamic>(matrix_).format(
+      clean_fmt);
   return ostr.str();
 }
 
-const int SparseMatrix::num_rows() const {
-  return matrix_.rows();
-}
-const int SparseMatrix::num_cols() const {
-  return matrix_.cols();
-}
-
-Eigen::SparseMatrix<float32> &SparseMatrix::get_matrix() {
-  return matrix_;
-}
-
-const Eigen::SparseMatrix<float32> &SparseMatrix::get_matrix() const {
-  return matrix_;
-}
-
-SparseMatrix operator+(const SparseMatrix &sm1, const SparseMatrix &sm2) {
-  Eigen::SparseMatrix<float32> res(sm1.matrix_ + sm2.matrix_);
-  return SparseMatrix(res);
+template <class EigenMatrix>
+EigenSparseMatrix<EigenMatrix> EigenSparseMatrix<EigenMatrix>::matmul(
+    const EigenSparseMatrix &sm) {
+  return EigenSparseMatrix(EigenMatrix(matrix_ * sm.matrix_));
 }
 
-SparseMatrix operator-(const SparseMatrix &sm1, const SparseMatrix &sm2) {
-  Eigen::SparseMatrix<float32> res(sm1.matrix_ - sm2.matrix_);
-  return SparseMatrix(res);
-}
-
-SparseMatrix operator*(float scale, const SparseMatrix &sm) {
-  Eigen::SparseMatrix<float32> res(scale * sm.matrix_);
-  return SparseMatrix(res);
-}
-
-SparseMatrix operator*(const SparseMatrix &sm, float scale) {
-  return scale * sm;
-}
-
-SparseMatrix operator*(const SparseMatrix &sm1, const SparseMatrix &sm2) {
-  Eigen::SparseMatrix<float32> res(sm1.matrix_.cwiseProduct(sm2.matrix_));
-  return SparseMatrix(res);
-}
-
-SparseMatrix SparseMatrix::matmul(const SparseMatrix &sm) {
-  Eigen::SparseMatrix<float32> res(matrix_ * sm.matrix_);
-  return SparseMatrix(res);
-}
-
-Eigen::VectorXf SparseMatrix::mat_vec_mul(
-    const Eigen::Ref<const Eigen::VectorXf> &b) {
+template <class EigenMatrix>
+typename EigenSparseMatrix<EigenMatrix>::Vector
+EigenSparseMatrix<EigenMatrix>::mat_vec_mul(
+    const Eigen::Ref<const Vector> &b) {
   return matrix_ * b;
 }
 
-SparseMatrix SparseMatrix::transpose() {
-  Eigen::SparseMatrix<float32> res(matrix_.transpose());
-  return SparseMatrix(res);
+template <class EigenMatrix>
+EigenSparseMatrix<EigenMatrix> EigenSparseMatrix<EigenMatrix>::transpose() {
+  return EigenSparseMatrix(EigenMatrix(matrix_.transpose()));
 }
 
-float32 SparseMatrix::get_element(int row, int col) {
+template <class EigenMatrix>
+typename EigenSparseMatrix<EigenMatrix>::Scalar
+EigenSparseMatrix<EigenMatrix>::get_element(int row, int col) {
   return matrix_.coeff(row, col);
 }
 
-void SparseMatrix::set_element(int row, int col, float32 value) {
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::set_element(int row,
+                                                 int col,
+                                                 Scalar value) {
+  auto nnz = matrix_.nonZeros();
   matrix_.coeffRef(row, col) = value;
+  if (matrix_.nonZeros() != nnz) {
+    // A new entry is inserted
+    pattern_id_ = new_pattern_id();
+  }
+}
+
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::get_csr(Eigen::VectorXi &row_offsets,
+                                             Eigen::VectorXi &col_indices,
+                                             Vector &values) const {
+  Eigen::SparseMatrix<Scalar, Eigen::RowMajor, int> csr(matrix_);
+  csr.makeCompressed();
+  row_offsets = Eigen::Map<const Eigen::VectorXi>(csr.outerIndexPtr(),
+                                                  csr.outerSize() + 1);
+  col_indices =
+      Eigen::Map<const Eigen::VectorXi>(csr.innerIndexPtr(), csr.nonZeros());
+  values = Eigen::Map<const Vector>(csr.valuePtr(), csr.nonZeros());
+}
+
+template class EigenSparseMatrix<Eigen::SparseMatrix<float32>>;
+template class EigenSparseMatrix<Eigen::SparseMatrix<float64>>;
+
+std::unique_ptr<SparseMatrix> make_sparse_matrix(int rows,
+                                                 int cols,
+                                                 DataType dtype) {
+  if (dtype == PrimitiveType::f32) {
+    return std::make_unique<SparseMatrixF32>(rows, cols);
+  } else if (dtype == PrimitiveType::f64) {
+    return std::make_unique<SparseMatrixF64>(rows, cols);
+  }
+  TI_ERROR("Sparse matrices of type {} are not supported",
+           data_type_name(dtype));
 }
 
 }  // namespace lang
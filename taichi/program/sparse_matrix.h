@@ -2,6 +2,7 @@
 
 #include "taichi/common/core.h"
 #include "taichi/inc/constants.h"
+#include "taichi/ir/type_utils.h"
 #include "Eigen/Sparse"
 
 namespace taichi {
@@ -11,55 +12,161 @@ class SparseMatrix;
 
 class SparseMatrixBuilder {
  public:
-  SparseMatrixBuilder(int rows, int cols, int max_num_triplets);
+  SparseMatrixBuilder(int rows,
+                      int cols,
+                      int max_num_triplets,
+                      DataType dtype = PrimitiveType::f32);
 
   void *get_data_base_ptr();
 
   void print_triplets();
 
-  SparseMatrix build();
+  std::unique_ptr<SparseMatrix> build();
+
+  // Overwrites the values of |sm| with the triplets, keeping its sparsity
+  // pattern, which must contain all the triplets.
+  void refill(SparseMatrix &sm);
 
   void clear();
 
+  DataType get_data_type() const {
+    return dtype_;
+  }
+
  private:
+  template <typename T>
+  void print_triplets_template();
+
+  template <typename T>
+  std::unique_ptr<SparseMatrix> build_template();
+
+  template <typename T>
+  void refill_template(SparseMatrix &sm);
+
+  // |num_triplets_| and |data_base_ptr_| are accessed through the address of
+  // the builder by insert_triplet() in the runtime, keep them at the front.
   uint64 num_triplets_{0};
   void *data_base_ptr_{nullptr};
+  // Each triplet takes two 32-bit words for the indices, and one (f32) or two
+  // (f64) words for the value.
   std::vector<uint32> data_;
   int rows_{0};
   int cols_{0};
   uint64 max_num_triplets_{0};
   bool built_{false};
+  DataType dtype_{PrimitiveType::f32};
 };
 
 class SparseMatrix {
  public:
   SparseMatrix() = delete;
-  SparseMatrix(int rows, int cols);
-  SparseMatrix(Eigen::SparseMatrix<float32> &matrix);
-
-  const int num_rows() const;
-  const int num_cols() const;
-  const std::string to_string() const;
-  Eigen::SparseMatrix<float32> &get_matrix();
-  const Eigen::SparseMatrix<float32> &get_matrix() const;
-  float32 get_element(int row, int col);
-  void set_element(int row, int col, float32 value);
-
-  friend SparseMatrix operator+(const SparseMatrix &sm1,
-                                const SparseMatrix &sm2);
-  friend SparseMatrix operator-(const SparseMatrix &sm1,
-                                const SparseMatrix &sm2);
-  friend SparseMatrix operator*(float scale, const SparseMatrix &sm);
-  friend SparseMatrix operator*(const SparseMatrix &sm, float scale);
-  friend SparseMatrix operator*(const SparseMatrix &sm1,
-                                const SparseMatrix &sm2);
-  SparseMatrix matmul(const SparseMatrix &sm);
-  Eigen::VectorXf mat_vec_mul(const Eigen::Ref<const Eigen::VectorXf> &b);
-
-  SparseMatrix transpose();
+  SparseMatrix(int rows, int cols, DataType dtype)
+      : rows_(rows), cols_(cols), dtype_(dtype), pattern_id_(new_pattern_id()) {
+  }
+  virtual ~SparseMatrix() = default;
+
+  const int num_rows() const {
+    return rows_;
+  }
+  const int num_cols() const {
+    return cols_;
+  }
+  DataType get_data_type() const {
+    return dtype_;
+  }
+  // Matrices share the same id only if they have the same sparsity pattern,
+  // e.g., a matrix before and after its values are refilled.
+  uint64 get_pattern_id() const {
+    return pattern_id_;
+  }
+
+  virtual const std::string to_string() const = 0;
+
+  // Points to the underlying Eigen matrix, whose scalar type is |dtype_|.
+  virtual const void *get_matrix() const = 0;
+
+ protected:
+  static uint64 new_pattern_id();
+
+  int rows_{0};
+  int cols_{0};
+  DataType dtype_{PrimitiveType::f32};
+  uint64 pattern_id_{0};
+};
+
+template <class EigenMatrix>
+class EigenSparseMatrix : public SparseMatrix {
+ public:
+  using Scalar = typename EigenMatrix::Scalar;
+  using Vector = Eigen::Matrix<Scalar, Eigen::Dynamic, 1>;
+
+  EigenSparseMatrix(int rows, int cols)
+      : SparseMatrix(rows, cols, taichi::lang::get_data_type<Scalar>()),
+        matrix_(rows, cols) {
+  }
+  explicit EigenSparseMatrix(const EigenMatrix &matrix)
+      : SparseMatrix(matrix.rows(),
+                     matrix.cols(),
+                     taichi::lang::get_data_type<Scalar>()),
+        matrix_(matrix) {
+  }
+
+  const std::string to_string() const override;
+  const void *get_matrix() const override {
+    return &matrix_;
+  }
+  EigenMatrix &get_eigen_matrix() {
+    return matrix_;
+  }
+  const EigenMatrix &get_eigen_matrix() const {
+    return matrix_;
+  }
+
+  Scalar get_element(int row, int col);
+  void set_element(int row, int col, Scalar value);
+
+  friend EigenSparseMatrix operator+(const EigenSparseMatrix &sm1,
+                                     const EigenSparseMatrix &sm2) {
+    return EigenSparseMatrix(EigenMatrix(sm1.matrix_ + sm2.matrix_));
+  }
+  friend EigenSparseMatrix operator-(const EigenSparseMatrix &sm1,
+                                     const EigenSparseMatrix &sm2) {
+    return EigenSparseMatrix(EigenMatrix(sm1.matrix_ - sm2.matrix_));
+  }
+  friend EigenSparseMatrix operator*(Scalar scale,
+                                     const EigenSparseMatrix &sm) {
+    return EigenSparseMatrix(EigenMatrix(scale * sm.matrix_));
+  }
+  friend EigenSparseMatrix operator*(const EigenSparseMatrix &sm,
+                                     Scalar scale) {
+    return scale * sm;
+  }
+  friend EigenSparseMatrix operator*(const EigenSparseMatrix &sm1,
+                                     const EigenSparseMatrix &sm2) {
+    return EigenSparseMatrix(
+        EigenMatrix(sm1.matrix_.cwiseProduct(sm2.matrix_)));
+  }
+  EigenSparseMatrix matmul(const EigenSparseMatrix &sm);
+  Vector mat_vec_mul(const Eigen::Ref<const Vector> &b);
+
+  EigenSparseMatrix transpose();
+
+  // Gets the row offsets, column indices and values of the matrix in the
+  // compressed sparse row format.
+  void get_csr(Eigen::VectorXi &row_offsets,
+               Eigen::VectorXi &col_indices,
+               Vector &values) const;
 
  private:
-  Eigen::SparseMatrix<float32, Eigen::ColMajor> matrix_;
+  EigenMatrix matrix_;
 };
+
+using SparseMatrixF32 = EigenSparseMatrix<Eigen::SparseMatrix<float32>>;
+using SparseMatrixF64 = EigenSparseMatrix<Eigen::SparseMatrix<float64>>;
+
+std::unique_ptr<SparseMatrix> make_sparse_matrix(int rows,
+                                                 int cols,
+                                                 DataType dtype);
+
 }  // namespace lang
 }  // namespace taichi
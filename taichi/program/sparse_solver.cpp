@@ -2,14 +2,16 @@
 
 #include "sparse_solver.h"
 
+#include <algorithm>
 #include <unordered_map>
 
 #define MAKE_SOLVER(dt, type, order)                                           \
   {                                                                            \
     {#dt, #type, #order}, []() -> std::unique_ptr<SparseSolver> {              \
-      using T = Eigen::Simplicial##type<Eigen::SparseMatrix<dt>, Eigen::Lower, \
+      using M = Eigen::SparseMatrix<dt>;                                       \
+      using T = Eigen::Simplicial##type<M, Eigen::Lower,                       \
                                         Eigen::order##Ordering<int>>;          \
-      return std::make_unique<EigenSparseSolver<T>>();                         \
+      return std::make_unique<EigenSparseSolver<T, M>>();                      \
     }                                                                          \
   }
 
@@ -28,32 +30,97 @@ struct key_hash {
 namespace taichi {
 namespace lang {
 
-template <class EigenSolver>
-bool EigenSparseSolver<EigenSolver>::compute(const SparseMatrix &sm) {
-  solver_.compute(sm.get_matrix());
+template <class EigenSolver, class EigenMatrix>
+const EigenMatrix &EigenSparseSolver<EigenSolver, EigenMatrix>::get_matrix(
+    const SparseMatrix &sm) {
+  TI_ERROR_IF(sm.get_data_type() != get_data_type<Scalar>(),
+              "The sparse matrix is of type {}, but the solver is of type {}",
+              data_type_name(sm.get_data_type()),
+              data_type_name(get_data_type<Scalar>()));
+  return *static_cast<const EigenMatrix *>(sm.get_matrix());
+}
+
+template <class EigenSolver, class EigenMatrix>
+bool EigenSparseSolver<EigenSolver, EigenMatrix>::is_analyzed(
+    const SparseMatrix &sm,
+    const EigenMatrix &matrix) {
+  if (sm.get_pattern_id() == pattern_id_) {
+    return true;
+  }
+  // Matrices built separately may still share the pattern. Comparing the
+  // indices is much cheaper than computing the fill-reducing ordering again.
+  if (!matrix.isCompressed() ||
+      static_cast<size_t>(matrix.outerSize() + 1) != outer_indices_.size() ||
+      static_cast<size_t>(matrix.nonZeros()) != inner_indices_.size()) {
+    return false;
+  }
+  return std::equal(outer_indices_.begin(), outer_indices_.end(),
+                    matrix.outerIndexPtr()) &&
+         std::equal(inner_indices_.begin(), inner_indices_.end(),
+                    matrix.innerIndexPtr());
+}
+
+template <class EigenSolver, class EigenMatrix>
+void EigenSparseSolver<EigenSolver, EigenMatrix>::save_pattern(
+    const SparseMatrix &sm,
+    const EigenMatrix &matrix) {
+  pattern_id_ = sm.get_pattern_id();
+  if (matrix.isCompressed()) {
+    outer_indices_.assign(matrix.outerIndexPtr(),
+                          matrix.outerIndexPtr() + matrix.outerSize() + 1);
+    inner_indices_.assign(matrix.innerIndexPtr(),
+                          matrix.innerIndexPtr() + matrix.nonZeros());
+  } else {
+    outer_indices_.clear();
+    inner_indices_.clear();
+  }
+}
+
+template <class EigenSolver, class EigenMatrix>
+bool EigenSparseSolver<EigenSolver, EigenMatrix>::compute(
+    const SparseMatrix &sm) {
+  const EigenMatrix &matrix = get_matrix(sm);
+  // Only factorize matrices whose sparsity pattern is already analyzed
+  if (is_analyzed(sm, matrix)) {
+    pattern_id_ = sm.get_pattern_id();
+  } else {
+    solver_.analyzePattern(matrix);
+    save_pattern(sm, matrix);
+  }
+  solver_.factorize(matrix);
   if (solver_.info() != Eigen::Success) {
     return false;
   } else
     return true;
 }
-template <class EigenSolver>
-void EigenSparseSolver<EigenSolver>::analyze_pattern(const SparseMatrix &sm) {
-  solver_.analyzePattern(sm.get_matrix());
+template <class EigenSolver, class EigenMatrix>
+void EigenSparseSolver<EigenSolver, EigenMatrix>::analyze_pattern(
+    const SparseMatrix &sm) {
+  const EigenMatrix &matrix = get_matrix(sm);
+  solver_.analyzePattern(matrix);
+  save_pattern(sm, matrix);
 }
 
-template <class EigenSolver>
-void EigenSparseSolver<EigenSolver>::factorize(const SparseMatrix &sm) {
-  solver_.factorize(sm.get_matrix());
+template <class EigenSolver, class EigenMatrix>
+void EigenSparseSolver<EigenSolver, EigenMatrix>::factorize(
+    const SparseMatrix &sm) {
+  solver_.factorize(get_matrix(sm));
 }
 
-template <class EigenSolver>
-Eigen::VectorXf EigenSparseSolver<EigenSolver>::solve(
+template <class EigenSolver, class EigenMatrix>
+Eigen::VectorXf EigenSparseSolver<EigenSolver, EigenMatrix>::solve(
     const Eigen::Ref<const Eigen::VectorXf> &b) {
-  return solver_.solve(b);
+  return solver_.solve(b.template cast<Scalar>()).template cast<float32>();
+}
+
+template <class EigenSolver, class EigenMatrix>
+Eigen::VectorXd EigenSparseSolver<EigenSolver, EigenMatrix>::solve_f64(
+    const Eigen::Ref<const Eigen::VectorXd> &b) {
+  return solver_.solve(b.template cast<Scalar>()).template cast<float64>();
 }
 
-template <class EigenSolver>
-bool EigenSparseSolver<EigenSolver>::info() {
+template <class EigenSolver, class EigenMatrix>
+bool EigenSparseSolver<EigenSolver, EigenMatrix>::info() {
   return solver_.info() == Eigen::Success;
 }
 
@@ -65,7 +132,9 @@ std::unique_ptr<SparseSolver> make_sparse_solver(DataType dt,
   static const std::unordered_map<key_type, func_type, key_hash>
       solver_factory = {
           MAKE_SOLVER(float32, LLT, AMD), MAKE_SOLVER(float32, LLT, COLAMD),
-          MAKE_SOLVER(float32, LDLT, AMD), MAKE_SOLVER(float32, LDLT, COLAMD)};
+          MAKE_SOLVER(float32, LDLT, AMD), MAKE_SOLVER(float32, LDLT, COLAMD),
+          MAKE_SOLVER(float64, LLT, AMD), MAKE_SOLVER(float64, LLT, COLAMD),
+          MAKE_SOLVER(float64, LDLT, AMD), MAKE_SOLVER(float64, LDLT, COLAMD)};
   static const std::unordered_map<std::string, std::string> dt_map = {
       {"f32", "float32"}, {"f64", "float64"}};
   auto it = dt_map.find(taichi::lang::data_type_name(dt));
@@ -77,9 +146,12 @@ std::unique_ptr<SparseSolver> make_sparse_solver(DataType dt,
   if (solver_factory.find(solver_key) != solver_factory.end()) {
     auto solver_func = solver_factory.at(solver_key);
     return solver_func();
+  } else if (solver_type == "LU" && it->second == "float64") {
+    using M = Eigen::SparseMatrix<float64>;
+    return std::make_unique<EigenSparseSolver<Eigen::SparseLU<M>, M>>();
   } else if (solver_type == "LU") {
-    using LU = Eigen::SparseLU<Eigen::SparseMatrix<float32>>;
-    return std::make_unique<EigenSparseSolver<LU>>();
+    using M = Eigen::SparseMatrix<float32>;
+    return std::make_unique<EigenSparseSolver<Eigen::SparseLU<M>, M>>();
   } else
     TI_ERROR("Not supported sparse solver type: {}", solver_type);
 }
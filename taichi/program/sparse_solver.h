@@ -4,6 +4,8 @@
 
 #include "sparse_matrix.h"
 
+#include <vector>
+
 namespace taichi {
 namespace lang {
 
@@ -14,13 +16,25 @@ class SparseSolver {
   virtual void analyze_pattern(const SparseMatrix &sm) = 0;
   virtual void factorize(const SparseMatrix &sm) = 0;
   virtual Eigen::VectorXf solve(const Eigen::Ref<const Eigen::VectorXf> &b) = 0;
+  virtual Eigen::VectorXd solve_f64(
+      const Eigen::Ref<const Eigen::VectorXd> &b) = 0;
   virtual bool info() = 0;
 };
 
-template <class EigenSolver>
+template <class EigenSolver, class EigenMatrix>
 class EigenSparseSolver : public SparseSolver {
  private:
+  using Scalar = typename EigenMatrix::Scalar;
+
   EigenSolver solver_;
+  // Sparsity pattern of the last analyzed matrix
+  uint64 pattern_id_{0};
+  std::vector<int> outer_indices_;
+  std::vector<int> inner_indices_;
+
+  const EigenMatrix &get_matrix(const SparseMatrix &sm);
+  bool is_analyzed(const SparseMatrix &sm, const EigenMatrix &matrix);
+  void save_pattern(const SparseMatrix &sm, const EigenMatrix &matrix);
 
  public:
   ~EigenSparseSolver() override = default;
@@ -28,6 +42,8 @@ class EigenSparseSolver : public SparseSolver {
   void analyze_pattern(const SparseMatrix &sm) override;
   void factorize(const SparseMatrix &sm) override;
   Eigen::VectorXf solve(const Eigen::Ref<const Eigen::VectorXf> &b) override;
+  Eigen::VectorXd solve_f64(
+      const Eigen::Ref<const Eigen::VectorXd> &b) override;
   bool info() override;
 };
 
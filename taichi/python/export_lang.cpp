@@ -19,12 +19,14 @@
 #include "taichi/program/extension.h"
 #include "taichi/program/async_engine.h"
 #include "taichi/program/ndarray.h"
+#include "taichi/program/kernel_graph.h"
 #include "taichi/common/interface.h"
 #include "taichi/python/export.h"
 #include "taichi/gui/gui.h"
 #include "taichi/math/svd.h"
 #include "taichi/util/statistics.h"
 #include "taichi/util/action_recorder.h"
+#include "taichi/system/cpu_topology.h"
 #include "taichi/system/timeline.h"
 #include "taichi/python/snode_registry.h"
 #include "taichi/program/sparse_matrix.h"
@@ -141,6 +143,8 @@ void export_lang(py::module &m) {
       .def_readwrite("simplify_after_lower_access",
                      &CompileConfig::simplify_after_lower_access)
       .def_readwrite("lower_access", &CompileConfig::lower_access)
+      .def_readwrite("simd_width", &CompileConfig::simd_width)
+      .def_readwrite("cpu_loop_vectorize", &CompileConfig::cpu_loop_vectorize)
       .def_readwrite("move_loop_invariant_outside_if",
                      &CompileConfig::move_loop_invariant_outside_if)
       .def_readwrite("default_cpu_block_dim",
@@ -151,13 +155,21 @@ void export_lang(py::module &m) {
       .def_readwrite("saturating_grid_dim", &CompileConfig::saturating_grid_dim)
       .def_readwrite("max_block_dim", &CompileConfig::max_block_dim)
       .def_readwrite("cpu_max_num_threads", &CompileConfig::cpu_max_num_threads)
+      .def_readwrite("cpu_affinity", &CompileConfig::cpu_affinity)
+      .def_readwrite("numa_aware", &CompileConfig::numa_aware)
       .def_readwrite("random_seed", &CompileConfig::random_seed)
+      .def_readwrite("offline_cache", &CompileConfig::offline_cache)
+      .def_readwrite("offline_cache_path", &CompileConfig::offline_cache_path)
+      .def_readwrite("offline_cache_max_size_MB",
+                     &CompileConfig::offline_cache_max_size_MB)
       .def_readwrite("verbose_kernel_launches",
                      &CompileConfig::verbose_kernel_launches)
       .def_readwrite("verbose", &CompileConfig::verbose)
       .def_readwrite("demote_dense_struct_fors",
                      &CompileConfig::demote_dense_struct_fors)
       .def_readwrite("kernel_profiler", &CompileConfig::kernel_profiler)
+      .def_readwrite("kernel_profiler_max_records",
+                     &CompileConfig::kernel_profiler_max_records)
       .def_readwrite("timeline", &CompileConfig::timeline)
       .def_readwrite("default_fp", &CompileConfig::default_fp)
       .def_readwrite("default_ip", &CompileConfig::default_ip)
@@ -244,10 +256,69 @@ void export_lang(py::module &m) {
       .def_readwrite("kernel_time",
                      &KernelProfileTracedRecord::kernel_elapsed_time_in_ms)
       .def_readwrite("base_time", &KernelProfileTracedRecord::time_since_base)
+      .def_readwrite("start_time", &KernelProfileTracedRecord::start_time)
       .def_readwrite("name", &KernelProfileTracedRecord::name)
       .def_readwrite("metric_values",
                      &KernelProfileTracedRecord::metric_values);
 
+  py::class_<KernelProfileStatisticalResult>(m,
+                                             "KernelProfileStatisticalResult")
+      .def_readonly("name", &KernelProfileStatisticalResult::name)
+      .def_readonly("counter", &KernelProfileStatisticalResult::counter)
+      .def_readonly("min", &KernelProfileStatisticalResult::min)
+      .def_readonly("max", &KernelProfileStatisticalResult::max)
+      .def_readonly("total", &KernelProfileStatisticalResult::total)
+      .def("percentile", &KernelProfileStatisticalResult::percentile);
+
+  py::class_<SNodeMemoryInfo>(m, "SNodeMemoryInfo")
+      .def_readonly("snode_id", &SNodeMemoryInfo::snode_id)
+      .def_readonly("name", &SNodeMemoryInfo::name)
+      .def_readonly("num_active_elements",
+                    &SNodeMemoryInfo::num_active_elements)
+      .def_readonly("element_size", &SNodeMemoryInfo::element_size)
+      .def_readonly("num_chunks", &SNodeMemoryInfo::num_chunks)
+      .def_readonly("chunk_num_elements", &SNodeMemoryInfo::chunk_num_elements)
+      .def_readonly("allocated_bytes", &SNodeMemoryInfo::allocated_bytes)
+      .def_readonly("num_used_elements", &SNodeMemoryInfo::num_used_elements)
+      .def_readonly("num_free_elements", &SNodeMemoryInfo::num_free_elements)
+      .def_readonly("num_recycled_elements",
+                    &SNodeMemoryInfo::num_recycled_elements)
+      .def_readonly("peak_num_used_elements",
+                    &SNodeMemoryInfo::peak_num_used_elements)
+      .def_readonly("fragmentation", &SNodeMemoryInfo::fragmentation);
+
+  py::class_<SNodeTreeMemoryInfo>(m, "SNodeTreeMemoryInfo")
+      .def_readonly("tree_id", &SNodeTreeMemoryInfo::tree_id)
+      .def_readonly("root_bytes", &SNodeTreeMemoryInfo::root_bytes)
+      .def_readonly("snodes", &SNodeTreeMemoryInfo::snodes);
+
+  py::class_<Device::MemoryStats>(m, "DeviceMemoryStats")
+      .def_readonly("allocated_bytes", &Device::MemoryStats::allocated_bytes)
+      .def_readonly("peak_allocated_bytes",
+                    &Device::MemoryStats::peak_allocated_bytes)
+      .def_readonly("num_allocations", &Device::MemoryStats::num_allocations)
+      .def_readonly("cached_bytes", &Device::MemoryStats::cached_bytes);
+
+  py::class_<MemoryInfo>(m, "MemoryInfo")
+      .def_readonly("snode_trees", &MemoryInfo::snode_trees)
+      .def_readonly("runtime_requested_bytes",
+                    &MemoryInfo::runtime_requested_bytes)
+      .def_readonly("device", &MemoryInfo::device);
+
+  py::class_<MemorySample>(m, "MemorySample")
+      .def_readonly("time", &MemorySample::time)
+      .def_readonly("allocated_bytes", &MemorySample::allocated_bytes)
+      .def_readonly("cached_bytes", &MemorySample::cached_bytes);
+
+  py::class_<NumaNode>(m, "NumaNode")
+      .def_readonly("id", &NumaNode::id)
+      .def_readonly("cpus", &NumaNode::cpus);
+
+  py::class_<CpuTopology>(m, "CpuTopology")
+      .def_readonly("numa_nodes", &CpuTopology::numa_nodes);
+
+  m.def("detect_cpu_topology", detect_cpu_topology);
+
   py::enum_<SNodeAccessFlag>(m, "SNodeAccessFlag", py::arithmetic())
       .value("block_local", SNodeAccessFlag::block_local)
       .value("read_only", SNodeAccessFlag::read_only)
@@ -307,6 +378,14 @@ void export_lang(py::module &m) {
            [](Program *program) {
              return program->profiler->get_traced_records();
            })
+      .def("get_kernel_profiler_statistics",
+           [](Program *program) {
+             return program->profiler->get_statistical_results();
+           })
+      .def("save_kernel_profiler_trace",
+           [](Program *program, const std::string &filename) {
+             program->profiler->save_trace(filename);
+           })
       .def(
           "get_kernel_profiler_device_name",
           [](Program *program) { return program->profiler->get_device_name(); })
@@ -328,6 +407,10 @@ void export_lang(py::module &m) {
              Timelines::get_instance().save(fn);
            })
       .def("print_memory_profiler_info", &Program::print_memory_profiler_info)
+      .def("get_memory_info", &Program::get_memory_info)
+      .def("get_thread_cpus", &Program::get_thread_cpus)
+      .def("start_memory_sampling", &Program::start_memory_sampling)
+      .def("stop_memory_sampling", &Program::stop_memory_sampling)
       .def("finalize", &Program::finalize)
       .def("get_total_compilation_time", &Program::get_total_compilation_time)
       .def("visualize_layout", &Program::visualize_layout)
@@ -342,6 +425,7 @@ void export_lang(py::module &m) {
       .def("materialize_runtime", &Program::materialize_runtime)
       .def("make_aot_module_builder", &Program::make_aot_module_builder)
       .def("get_snode_tree_size", &Program::get_snode_tree_size)
+      .def("get_snode_tree_host_ptr", &Program::get_snode_tree_host_ptr)
       .def("get_snode_root", &Program::get_snode_root,
            py::return_value_policy::reference)
       .def("current_ast_builder", &Program::current_ast_builder,
@@ -357,16 +441,17 @@ void export_lang(py::module &m) {
       .def("create_function", &Program::create_function,
            py::return_value_policy::reference)
       .def("create_sparse_matrix_builder",
-           [](Program *program, int n, int m, uint64 max_num_entries) {
+           [](Program *program, int n, int m, uint64 max_num_entries,
+              DataType dtype) {
              TI_ERROR_IF(!arch_is_cpu(program->config.arch),
                          "SparseMatrix only supports CPU for now.");
-             return SparseMatrixBuilder(n, m, max_num_entries);
+             return SparseMatrixBuilder(n, m, max_num_entries, dtype);
            })
       .def("create_sparse_matrix",
-           [](Program *program, int n, int m) {
+           [](Program *program, int n, int m, DataType dtype) {
              TI_ERROR_IF(!arch_is_cpu(program->config.arch),
                          "SparseMatrix only supports CPU for now.");
-             return SparseMatrix(n, m);
+             return make_sparse_matrix(n, m, dtype);
            })
       .def(
           "dump_dot",
@@ -422,10 +507,7 @@ void export_lang(py::module &m) {
           (SNode & (SNode::*)(const std::vector<Axis> &,
                               const std::vector<int> &, bool))(&SNode::pointer),
           py::return_value_policy::reference)
-      .def("hash",
-           (SNode & (SNode::*)(const std::vector<Axis> &,
-                               const std::vector<int> &, bool))(&SNode::hash),
-           py::return_value_policy::reference)
+      .def("hash", &SNode::hash, py::return_value_policy::reference)
       .def("dynamic", &SNode::dynamic, py::return_value_policy::reference)
       .def("bitmasked",
            (SNode & (SNode::*)(const std::vector<Axis> &,
@@ -462,6 +544,11 @@ void export_lang(py::module &m) {
            })
       .def("num_active_indices",
            [](SNode *snode) { return snode->num_active_indices; })
+      .def("get_extractor_shape",
+           [](SNode *snode, int i) { return snode->extractors[i].shape; })
+      .def("get_extractor_acc_shape",
+           [](SNode *snode, int i) { return snode->extractors[i].acc_shape; })
+      .def("get_snode_tree_id", &SNode::get_snode_tree_id)
       .def_readonly("cell_size_bytes", &SNode::cell_size_bytes)
       .def_readonly("offset_bytes_in_parent_cell",
                     &SNode::offset_bytes_in_parent_cell)
@@ -492,8 +579,12 @@ void export_lang(py::module &m) {
       .def_readonly("shape", &Ndarray::shape);
 
   py::class_<Kernel>(m, "Kernel")
+      .def_readwrite("offline_cache_key", &Kernel::offline_cache_key)
+      .def_readonly("from_offline_cache", &Kernel::from_offline_cache)
       .def("get_ret_int", &Kernel::get_ret_int)
       .def("get_ret_float", &Kernel::get_ret_float)
+      .def("get_snode_writes", &Kernel::get_snode_writes,
+           py::return_value_policy::reference)
       .def("make_launch_context", &Kernel::make_launch_context)
       .def(
           "ast_builder",
@@ -518,6 +609,16 @@ void export_lang(py::module &m) {
       .def("set_extra_arg_int",
            &Kernel::LaunchContextBuilder::set_extra_arg_int);
 
+  py::class_<KernelGraph>(m, "KernelGraph")
+      .def(py::init<>())
+      .def("append", &KernelGraph::append,
+           py::return_value_policy::reference_internal)
+      .def("run", &KernelGraph::run, py::arg("repeats") = 1,
+           py::call_guard<py::gil_scoped_release>())
+      .def("size", &KernelGraph::size)
+      .def("pop_back", &KernelGraph::pop_back)
+      .def("clear", &KernelGraph::clear);
+
   py::class_<Function>(m, "Function")
       .def("set_function_body",
            py::overload_cast<const std::function<void()> &>(
@@ -912,30 +1013,50 @@ void export_lang(py::module &m) {
   py::class_<SparseMatrixBuilder>(m, "SparseMatrixBuilder")
       .def("print_triplets", &SparseMatrixBuilder::print_triplets)
       .def("build", &SparseMatrixBuilder::build)
+      .def("refill", &SparseMatrixBuilder::refill)
+      .def("get_data_type", &SparseMatrixBuilder::get_data_type)
       .def("get_addr", [](SparseMatrixBuilder *mat) { return uint64(mat); });
 
   py::class_<SparseMatrix>(m, "SparseMatrix")
       .def("to_string", &SparseMatrix::to_string)
-      .def(py::self + py::self, py::return_value_policy::reference_internal)
-      .def(py::self - py::self, py::return_value_policy::reference_internal)
-      .def(float() * py::self, py::return_value_policy::reference_internal)
-      .def(py::self * float(), py::return_value_policy::reference_internal)
-      .def(py::self * py::self, py::return_value_policy::reference_internal)
-      .def("matmul", &SparseMatrix::matmul,
-           py::return_value_policy::reference_internal)
-      .def("mat_vec_mul", &SparseMatrix::mat_vec_mul)
-      .def("transpose", &SparseMatrix::transpose,
-           py::return_value_policy::reference_internal)
-      .def("get_element", &SparseMatrix::get_element)
-      .def("set_element", &SparseMatrix::set_element)
       .def("num_rows", &SparseMatrix::num_rows)
-      .def("num_cols", &SparseMatrix::num_cols);
+      .def("num_cols", &SparseMatrix::num_cols)
+      .def("get_data_type", &SparseMatrix::get_data_type)
+      .def("get_pattern_id", &SparseMatrix::get_pattern_id);
+
+#define MAKE_SPARSE_MATRIX(TYPE, NAME)                                      \
+  py::class_<TYPE, SparseMatrix>(m, NAME)                                    \
+      .def(py::self + py::self, py::return_value_policy::reference_internal) \
+      .def(py::self - py::self, py::return_value_policy::reference_internal) \
+      .def(TYPE::Scalar() * py::self,                                        \
+           py::return_value_policy::reference_internal)                      \
+      .def(py::self * TYPE::Scalar(),                                        \
+           py::return_value_policy::reference_internal)                      \
+      .def(py::self * py::self, py::return_value_policy::reference_internal) \
+      .def("matmul", &TYPE::matmul,                                          \
+           py::return_value_policy::reference_internal)                      \
+      .def("mat_vec_mul", &TYPE::mat_vec_mul)                                \
+      .def("transpose", &TYPE::transpose,                                    \
+           py::return_value_policy::reference_internal)                      \
+      .def("get_element", &TYPE::get_element)                                \
+      .def("set_element", &TYPE::set_element)                                \
+      .def("get_csr", [](const TYPE &sm) {                                   \
+        Eigen::VectorXi row_offsets, col_indices;                            \
+        TYPE::Vector values;                                                 \
+        sm.get_csr(row_offsets, col_indices, values);                        \
+        return py::make_tuple(row_offsets, col_indices, values);             \
+      });
+
+  MAKE_SPARSE_MATRIX(SparseMatrixF32, "SparseMatrixF32");
+  MAKE_SPARSE_MATRIX(SparseMatrixF64, "SparseMatrixF64");
+#undef MAKE_SPARSE_MATRIX
 
   py::class_<SparseSolver>(m, "SparseSolver")
       .def("compute", &SparseSolver::compute)
       .def("analyze_pattern", &SparseSolver::analyze_pattern)
       .def("factorize", &SparseSolver::factorize)
       .def("solve", &SparseSolver::solve)
+      .def("solve_f64", &SparseSolver::solve_f64)
       .def("info", &SparseSolver::info);
 
   m.def("make_sparse_solver", &make_sparse_solver);
@@ -37,6 +37,24 @@ i32 insert_triplet(RuntimeContext *context,
   return 0;
 }
 
+i32 insert_triplet_f64(RuntimeContext *context,
+                       int64 base_ptr_,
+                       int i,
+                       int j,
+                       float64 value) {
+  auto base_ptr = (int64 *)base_ptr_;
+
+  int64 *num_triplets = base_ptr;
+  auto data_base_ptr = *(int32 **)(base_ptr + 1);
+
+  // Each triplet takes four words, so that the values are 8-byte aligned
+  auto triplet_id = atomic_add_i64(num_triplets, 1);
+  data_base_ptr[triplet_id * 4] = i;
+  data_base_ptr[triplet_id * 4 + 1] = j;
+  *(float64 *)(data_base_ptr + triplet_id * 4 + 2) = value;
+  return 0;
+}
+
 i32 test_internal_func_args(RuntimeContext *context,
                             float32 i,
                             float32 j,
@@ -0,0 +1,196 @@
+#pragma once
+
+// A hash node maps the active cells of its (possibly huge) domain to children
+// allocated on demand, using an open-addressing table with linear probing.
+//
+// Node layout: | lock (i32) | keys (i32 x capacity) | padding (i32) |
+//              | children (Ptr x capacity) |
+// The capacity is a power of two, so the children are 8-byte aligned.
+//
+// Keys are stored as cell indices plus one, so that the zero-initialized
+// memory of a new node is an empty table. A key is never removed: deactivating
+// a cell recycles its child and leaves a tombstone (a key with a null child),
+// which is reused by the next insertion that probes through it.
+//
+// Loops over a hash node (listgen and struct-fors) iterate over the slots of
+// its table instead of the cells of its domain, so that their cost is
+// proportional to the capacity. Hash_get_num_elements therefore returns the
+// capacity, and Hash_slot_to_index maps a slot back to its cell.
+
+// Specialized Attributes and functions
+struct HashMeta : public StructMeta {
+  int capacity;
+};
+
+STRUCT_FIELD(HashMeta, capacity);
+
+i32 Hash_get_num_elements(Ptr meta, Ptr node) {
+  return ((HashMeta *)meta)->capacity;
+}
+
+i32 *Hash_keys(Ptr node) {
+  return (i32 *)(node + 4);
+}
+
+Ptr *Hash_children(Ptr meta, Ptr node) {
+  return (Ptr *)(node + 8 + 4 * ((HashMeta *)meta)->capacity);
+}
+
+i32 Hash_first_slot(Ptr meta, int i) {
+  // The finalizer of MurmurHash3, which spreads strided indices
+  u32 h = (u32)i;
+  h ^= h >> 16;
+  h *= 0x85ebca6bu;
+  h ^= h >> 13;
+  h *= 0xc2b2ae35u;
+  h ^= h >> 16;
+  return (i32)(h & (u32)(((HashMeta *)meta)->capacity - 1));
+}
+
+// Returns the slot holding cell i, or -1 if it has never been inserted
+i32 Hash_find(Ptr meta, Ptr node, int i) {
+  auto capacity = ((HashMeta *)meta)->capacity;
+  volatile i32 *keys = Hash_keys(node);
+  auto slot = Hash_first_slot(meta, i);
+  for (int k = 0; k < capacity; k++) {
+    auto key = keys[slot];
+    if (key == i + 1)
+      return slot;
+    if (key == 0)
+      return -1;
+    slot = (slot + 1) & (capacity - 1);
+  }
+  return -1;
+}
+
+// Must be called with the node locked and cell i not in the table
+i32 Hash_insert(Ptr meta_, Ptr node, int i) {
+  auto meta = (HashMeta *)meta_;
+  auto capacity = meta->capacity;
+  auto keys = Hash_keys(node);
+  auto children = Hash_children(meta_, node);
+  auto slot = Hash_first_slot(meta_, i);
+  i32 tombstone = -1;
+  for (int k = 0; k < capacity && keys[slot] != 0; k++) {
+    if (tombstone == -1 && children[slot] == nullptr)
+      tombstone = slot;
+    slot = (slot + 1) & (capacity - 1);
+  }
+  if (tombstone != -1) {
+    slot = tombstone;
+  } else if (keys[slot] != 0) {
+    taichi_assert_runtime(meta->context->runtime, false,
+                          "Hash node is full. Please increase its capacity.");
+    return -1;
+  }
+  // Readers that find the key before its child is published see an inactive
+  // cell, just like with a pointer node
+  atomic_exchange_i32(&keys[slot], i + 1);
+  return slot;
+}
+
+i32 Hash_slot_to_index(Ptr meta, Ptr node, int slot) {
+  auto key = Hash_keys(node)[slot];
+  if (key == 0 || Hash_children(meta, node)[slot] == nullptr)
+    return -1;
+  return key - 1;
+}
+
+void Hash_activate(Ptr meta_, Ptr node, int i) {
+  auto meta = (HashMeta *)meta_;
+  volatile Ptr *children = Hash_children(meta_, node);
+  auto slot = Hash_find(meta_, node, i);
+  if (slot != -1 && children[slot] != nullptr)
+    return;
+  locked_task(node, [&] {
+    // The cell may have been inserted during lock contention
+    slot = Hash_find(meta_, node, i);
+    if (slot == -1)
+      slot = Hash_insert(meta_, node, i);
+    if (slot != -1 && children[slot] == nullptr) {
+      auto rt = meta->context->runtime;
+      auto alloc = rt->node_allocators[meta->snode_id];
+      atomic_exchange_u64((u64 *)&children[slot], (u64)alloc->allocate());
+    }
+  });
+}
+
+void Hash_deactivate(Ptr meta_, Ptr node, int i) {
+  auto meta = (HashMeta *)meta_;
+  auto children = Hash_children(meta_, node);
+  auto slot = Hash_find(meta_, node, i);
+  if (slot != -1 && children[slot] != nullptr) {
+    locked_task(node, [&] {
+      if (children[slot] != nullptr) {
+        auto rt = meta->context->runtime;
+        auto alloc = rt->node_allocators[meta->snode_id];
+        alloc->recycle(children[slot]);
+        children[slot] = nullptr;
+      }
+    });
+  }
+}
+
+i32 Hash_is_active(Ptr meta, Ptr node, int i) {
+  auto slot = Hash_find(meta, node, i);
+  return slot != -1 && Hash_children(meta, node)[slot] != nullptr;
+}
+
+Ptr Hash_lookup_element(Ptr meta, Ptr node, int i) {
+  volatile i32 *keys = Hash_keys(node);
+  volatile Ptr *children = Hash_children(meta, node);
+  auto slot = Hash_find(meta, node, i);
+  Ptr data_ptr = nullptr;
+  if (slot != -1) {
+    data_ptr = children[slot];
+    // The slot may have been reused by another cell after this one was
+    // deactivated
+    if (keys[slot] != i + 1)
+      data_ptr = nullptr;
+  }
+  if (data_ptr == nullptr) {
+    auto smeta = (StructMeta *)meta;
+    auto context = smeta->context;
+    data_ptr = (context->runtime)->ambient_elements[smeta->snode_id];
+  }
+  return data_ptr;
+}
+
+// The children of a hash node are listed by iterating over the slots of its
+// table, and only the cells in the loop bounds of its element are listed.
+void element_listgen_hash(LLVMRuntime *runtime,
+                          StructMeta *parent,
+                          StructMeta *child) {
+  auto parent_list = runtime->element_lists[parent->snode_id];
+  int num_parent_elements = parent_list->size();
+  auto child_list = runtime->element_lists[child->snode_id];
+  auto parent_refine_coordinates = parent->refine_coordinates;
+  auto child_get_num_elements = child->get_num_elements;
+  auto child_from_parent_element = child->from_parent_element;
+  for (int i = 0; i < num_parent_elements; i++) {
+    auto element = parent_list->get<Element>(i);
+    auto children = Hash_children((Ptr)parent, element.element);
+    for (int slot = element.loop_bounds[0]; slot < element.loop_bounds[1];
+         slot++) {
+      auto j = Hash_slot_to_index((Ptr)parent, element.element, slot);
+      if (j == -1)
+        continue;
+      PhysicalCoordinates refined_coord;
+      parent_refine_coordinates(&element.pcoord, &refined_coord, j);
+      auto ch_element = child_from_parent_element(children[slot]);
+      auto ch_num_elements = child_get_num_elements((Ptr)child, ch_element);
+      auto ch_element_size =
+          std::min(ch_num_elements, taichi_listgen_max_element_size);
+      for (int ch_lower = 0; ch_lower < ch_num_elements;
+           ch_lower += ch_element_size) {
+        Element elem;
+        elem.element = ch_element;
+        elem.loop_bounds[0] = ch_lower;
+        elem.loop_bounds[1] =
+            std::min(ch_lower + ch_element_size, ch_num_elements);
+        elem.pcoord = refined_coord;
+        child_list->append(&elem);
+      }
+    }
+  }
+}
@@ -35,6 +35,16 @@ using host_vsnprintf_type = int (*)(char *,
                                     std::va_list);
 using vm_allocator_type = void *(*)(void *, std::size_t, std::size_t);
 using RangeForTaskFunc = void(RuntimeContext *, const char *tls, int i);
+// The body of a range-for on CPU runs the iterations in [begin, end) of a
+// block, so that the loop over them can be vectorized
+using RangeForBlockFunc = void(RuntimeContext *,
+                               const char *tls,
+                               int begin,
+                               int end);
+using RangeForBlockFuncI64 = void(RuntimeContext *,
+                                  const char *tls,
+                                  int64_t begin,
+                                  int64_t end);
 using MeshForTaskFunc = void(RuntimeContext *, const char *tls, uint32_t i);
 using parallel_for_type = void (*)(void *thread_pool,
                                    int splits,
@@ -1337,7 +1347,7 @@ using mesh_for_xlogue = void (*)(RuntimeContext *,
 struct range_task_helper_context {
   RuntimeContext *context;
   range_for_xlogue prologue{nullptr};
-  RangeForTaskFunc *body{nullptr};
+  RangeForBlockFunc *body{nullptr};
   range_for_xlogue epilogue{nullptr};
   std::size_t tls_size{1};
   int begin;
@@ -1357,18 +1367,16 @@ void cpu_parallel_range_for_task(void *range_context,
 
   RuntimeContext this_thread_context = *ctx.context;
   this_thread_context.cpu_thread_id = thread_id;
+  // A reversed loop runs the blocks from the end, and the body runs the
+  // iterations of each block in reverse order
   if (ctx.step == 1) {
     int block_start = ctx.begin + task_id * ctx.block_size;
     int block_end = std::min(block_start + ctx.block_size, ctx.end);
-    for (int i = block_start; i < block_end; i++) {
-      ctx.body(&this_thread_context, tls_ptr, i);
-    }
+    ctx.body(&this_thread_context, tls_ptr, block_start, block_end);
   } else if (ctx.step == -1) {
-    int block_start = ctx.end - task_id * ctx.block_size;
-    int block_end = std::max(ctx.begin, block_start * ctx.block_size);
-    for (int i = block_start - 1; i >= block_end; i--) {
-      ctx.body(&this_thread_context, tls_ptr, i);
-    }
+    int block_end = ctx.end - task_id * ctx.block_size;
+    int block_start = std::max(ctx.begin, block_end - ctx.block_size);
+    ctx.body(&this_thread_context, tls_ptr, block_start, block_end);
   }
   if (ctx.epilogue)
     ctx.epilogue(ctx.context, tls_ptr);
@@ -1381,7 +1389,7 @@ void cpu_parallel_range_for(RuntimeContext *context,
                             int step,
                             int block_dim,
                             range_for_xlogue prologue,
-                            RangeForTaskFunc *body,
+                            RangeForBlockFunc *body,
                             range_for_xlogue epilogue,
                             std::size_t tls_size) {
   range_task_helper_context ctx;
@@ -1411,6 +1419,84 @@ void cpu_parallel_range_for(RuntimeContext *context,
                         &ctx, cpu_parallel_range_for_task);
 }
 
+// The range-for with 64-bit loop indices, for loops with more than 2^31
+// iterations. Only the loop indices are 64-bit, while the tasks of the thread
+// pool are still numbered by int.
+struct range_task_helper_context_i64 {
+  RuntimeContext *context;
+  range_for_xlogue prologue{nullptr};
+  RangeForBlockFuncI64 *body{nullptr};
+  range_for_xlogue epilogue{nullptr};
+  std::size_t tls_size{1};
+  i64 begin;
+  i64 end;
+  i64 block_size;
+  int step;
+};
+
+void cpu_parallel_range_for_task_i64(void *range_context,
+                                     int thread_id,
+                                     int task_id) {
+  auto ctx = *(range_task_helper_context_i64 *)range_context;
+  alignas(8) char tls_buffer[ctx.tls_size];
+  auto tls_ptr = &tls_buffer[0];
+  if (ctx.prologue)
+    ctx.prologue(ctx.context, tls_ptr);
+
+  RuntimeContext this_thread_context = *ctx.context;
+  this_thread_context.cpu_thread_id = thread_id;
+  if (ctx.step == 1) {
+    i64 block_start = ctx.begin + (i64)task_id * ctx.block_size;
+    i64 block_end = std::min(block_start + ctx.block_size, ctx.end);
+    ctx.body(&this_thread_context, tls_ptr, block_start, block_end);
+  } else if (ctx.step == -1) {
+    i64 block_end = ctx.end - (i64)task_id * ctx.block_size;
+    i64 block_start = std::max(ctx.begin, block_end - ctx.block_size);
+    ctx.body(&this_thread_context, tls_ptr, block_start, block_end);
+  }
+  if (ctx.epilogue)
+    ctx.epilogue(ctx.context, tls_ptr);
+}
+
+void cpu_parallel_range_for_i64(RuntimeContext *context,
+                                int num_threads,
+                                i64 begin,
+                                i64 end,
+                                int step,
+                                int block_dim,
+                                range_for_xlogue prologue,
+                                RangeForBlockFuncI64 *body,
+                                range_for_xlogue epilogue,
+                                std::size_t tls_size) {
+  range_task_helper_context_i64 ctx;
+  ctx.context = context;
+  ctx.prologue = prologue;
+  ctx.tls_size = tls_size;
+  ctx.body = body;
+  ctx.epilogue = epilogue;
+  ctx.begin = begin;
+  ctx.end = end;
+  ctx.step = step;
+  if (step != 1 && step != -1) {
+    taichi_printf(context->runtime, "step must not be %d\n", step);
+    exit(-1);
+  }
+  i64 num_items = end > begin ? end - begin : 0;
+  i64 block_size = block_dim;
+  if (block_size == 0) {
+    // adaptive block dim, see cpu_parallel_range_for
+    block_size = std::min((i64)512,
+                          std::max((i64)1, num_items / (num_threads * 32)));
+  }
+  // The number of tasks must fit in int
+  block_size = std::max(block_size, (num_items + (1 << 30) - 1) >> 30);
+  ctx.block_size = block_size;
+  auto runtime = context->runtime;
+  runtime->parallel_for(runtime->thread_pool,
+                        (int)((num_items + block_size - 1) / block_size),
+                        num_threads, &ctx, cpu_parallel_range_for_task_i64);
+}
+
 void gpu_parallel_range_for(RuntimeContext *context,
                             int begin,
                             int end,
@@ -1519,6 +1605,7 @@ i32 linear_thread_idx(RuntimeContext *context) {
 #include "node_dense.h"
 #include "node_dynamic.h"
 #include "node_pointer.h"
+#include "node_hash.h"
 #include "node_root.h"
 #include "node_bitmasked.h"
 
@@ -134,6 +134,15 @@ void StructCompilerLLVM::generate_types(SNode &snode) {
                                     snode.max_num_elements());
     body_type = llvm::ArrayType::get(llvm::PointerType::getInt8PtrTy(*ctx),
                                      snode.max_num_elements());
+  } else if (type == SNodeType::hash) {
+    TI_ERROR_IF(!arch_is_cpu(arch_), "hash SNodes are only supported on CPU.");
+    // mutex and keys
+    aux_type = llvm::StructType::get(
+        *ctx, {llvm::PointerType::getInt32Ty(*ctx),
+               llvm::ArrayType::get(llvm::PointerType::getInt32Ty(*ctx),
+                                    snode.hash_capacity)});
+    body_type = llvm::ArrayType::get(llvm::PointerType::getInt8PtrTy(*ctx),
+                                     snode.hash_capacity);
   } else if (type == SNodeType::dynamic) {
     // mutex and n (number of elements)
     aux_type =
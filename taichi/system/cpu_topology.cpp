@@ -0,0 +1,180 @@
+#include "taichi/system/cpu_topology.h"
+
+#include <algorithm>
+#include <filesystem>
+#include <fstream>
+
+#if defined(TI_PLATFORM_LINUX)
+#include <pthread.h>
+#include <sched.h>
+#elif defined(TI_PLATFORM_WINDOWS)
+#include "taichi/platform/windows/windows.h"
+#endif
+
+TI_NAMESPACE_BEGIN
+
+int CpuTopology::num_cpus() const {
+  int n = 0;
+  for (auto &node : numa_nodes) {
+    n += (int)node.cpus.size();
+  }
+  return n;
+}
+
+std::vector<int> parse_cpu_list(const std::string &cpu_list) {
+  std::vector<int> cpus;
+  for (auto &item : split_string(cpu_list, ",")) {
+    auto s = trim_string(item);
+    if (s.empty())
+      continue;
+    auto dash = s.find('-');
+    try {
+      if (dash == std::string::npos) {
+        cpus.push_back(std::stoi(s));
+      } else {
+        int first = std::stoi(s.substr(0, dash));
+        int last = std::stoi(s.substr(dash + 1));
+        TI_ERROR_IF(first > last, "Invalid CPU range \"{}\".", s);
+        for (int cpu = first; cpu <= last; cpu++) {
+          cpus.push_back(cpu);
+        }
+      }
+    } catch (const std::logic_error &) {
+      TI_ERROR("Invalid CPU list \"{}\".", cpu_list);
+    }
+  }
+  for (auto cpu : cpus) {
+    TI_ERROR_IF(cpu < 0, "Invalid CPU list \"{}\".", cpu_list);
+  }
+  return cpus;
+}
+
+CpuTopology detect_cpu_topology() {
+  CpuTopology topology;
+#if defined(TI_PLATFORM_LINUX)
+  namespace fs = std::filesystem;
+  std::error_code ec;
+  for (auto &entry :
+       fs::directory_iterator("/sys/devices/system/node", ec)) {
+    auto name = entry.path().filename().string();
+    if (name.rfind("node", 0) != 0 || name.size() == 4 ||
+        !std::all_of(name.begin() + 4, name.end(), ::isdigit))
+      continue;
+    std::ifstream ifs(entry.path() / "cpulist");
+    std::string cpu_list;
+    if (!std::getline(ifs, cpu_list))
+      continue;
+    NumaNode node;
+    node.id = std::stoi(name.substr(4));
+    node.cpus = parse_cpu_list(cpu_list);
+    // Memory-only nodes have no CPUs
+    if (!node.cpus.empty())
+      topology.numa_nodes.push_back(std::move(node));
+  }
+  std::sort(topology.numa_nodes.begin(), topology.numa_nodes.end(),
+            [](const NumaNode &a, const NumaNode &b) { return a.id < b.id; });
+#endif
+  if (topology.numa_nodes.empty()) {
+    NumaNode node;
+    int num_cpus = std::max(1, (int)std::thread::hardware_concurrency());
+    for (int i = 0; i < num_cpus; i++) {
+      node.cpus.push_back(i);
+    }
+    topology.numa_nodes.push_back(std::move(node));
+  }
+  return topology;
+}
+
+std::vector<int> get_allowed_cpus() {
+  std::vector<int> cpus;
+#if defined(TI_PLATFORM_LINUX)
+  // Also reflects the cpuset of the cgroup, e.g., of a container
+  cpu_set_t cpu_set;
+  CPU_ZERO(&cpu_set);
+  if (sched_getaffinity(0, sizeof(cpu_set), &cpu_set) == 0) {
+    for (int cpu = 0; cpu < CPU_SETSIZE; cpu++) {
+      if (CPU_ISSET(cpu, &cpu_set))
+        cpus.push_back(cpu);
+    }
+  }
+#endif
+  return cpus;
+}
+
+std::vector<int> interleave_numa_cpus(const CpuTopology &topology) {
+  std::vector<int> cpus;
+  for (std::size_t i = 0;; i++) {
+    bool done = true;
+    for (auto &node : topology.numa_nodes) {
+      if (i < node.cpus.size()) {
+        cpus.push_back(node.cpus[i]);
+        done = false;
+      }
+    }
+    if (done)
+      break;
+  }
+  return cpus;
+}
+
+std::vector<int> get_thread_cpus(const std::string &cpu_affinity,
+                                 bool numa_aware) {
+  auto allowed = get_allowed_cpus();
+  auto is_allowed = [&](int cpu) {
+    return allowed.empty() ||
+           std::find(allowed.begin(), allowed.end(), cpu) != allowed.end();
+  };
+  if (!cpu_affinity.empty()) {
+    std::vector<int> cpus;
+    for (auto cpu : parse_cpu_list(cpu_affinity)) {
+      if (is_allowed(cpu)) {
+        cpus.push_back(cpu);
+      } else {
+        TI_WARN("CPU {} in cpu_affinity is not available to this process.",
+                cpu);
+      }
+    }
+    if (cpus.empty()) {
+      TI_WARN("None of the CPUs in cpu_affinity is available to this "
+              "process, so the threads are not pinned.");
+    }
+    return cpus;
+  }
+  if (!numa_aware) {
+    return {};
+  }
+  auto topology = detect_cpu_topology();
+  for (auto &node : topology.numa_nodes) {
+    node.cpus.erase(std::remove_if(node.cpus.begin(), node.cpus.end(),
+                                   [&](int cpu) { return !is_allowed(cpu); }),
+                    node.cpus.end());
+  }
+  topology.numa_nodes.erase(
+      std::remove_if(topology.numa_nodes.begin(), topology.numa_nodes.end(),
+                     [](const NumaNode &node) { return node.cpus.empty(); }),
+      topology.numa_nodes.end());
+  return interleave_numa_cpus(topology);
+}
+
+bool pin_thread_to_cpu(std::thread &thread, int cpu) {
+#if defined(TI_PLATFORM_LINUX)
+  if (cpu >= CPU_SETSIZE)
+    return false;
+  cpu_set_t cpu_set;
+  CPU_ZERO(&cpu_set);
+  CPU_SET(cpu, &cpu_set);
+  return pthread_setaffinity_np(thread.native_handle(), sizeof(cpu_set),
+                                &cpu_set) == 0;
+#elif defined(TI_PLATFORM_WINDOWS)
+  // Only the processors of the current processor group can be selected
+  if (cpu >= 64)
+    return false;
+  return SetThreadAffinityMask(thread.native_handle(),
+                               (DWORD_PTR)1 << cpu) != 0;
+#else
+  // E.g., macOS does not support pinning threads to CPUs
+  return false;
+#endif
+}
+
+TI_NAMESPACE_END
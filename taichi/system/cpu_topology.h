@@ -0,0 +1,52 @@
+#pragma once
+
+#include "taichi/common/core.h"
+
+#include <string>
+#include <thread>
+#include <vector>
+
+TI_NAMESPACE_BEGIN
+
+struct NumaNode {
+  int id{0};
+  std::vector<int> cpus;
+};
+
+struct CpuTopology {
+  std::vector<NumaNode> numa_nodes;
+
+  int num_cpus() const;
+};
+
+// Detects the NUMA nodes and their CPUs. Without NUMA information (e.g., not
+// on Linux), all CPUs are reported as a single node.
+CpuTopology detect_cpu_topology();
+
+// Parses a list of CPUs in the "cpulist" format of Linux, e.g., "0-3,8,10-11".
+std::vector<int> parse_cpu_list(const std::string &cpu_list);
+
+// Returns the CPUs this process may run on, as restricted by, e.g., taskset or
+// the cpuset of a container. Returns an empty list if that is unknown.
+std::vector<int> get_allowed_cpus();
+
+// Lists the CPUs of the NUMA nodes in turn, i.e., the first CPU of each node,
+// then the second one of each node, and so on.
+std::vector<int> interleave_numa_cpus(const CpuTopology &topology);
+
+// Returns the CPUs to pin the threads of a ThreadPool to, where thread i is
+// pinned to the (i % size)-th CPU. Returns an empty list if the threads should
+// not be pinned. Only the CPUs allowed for this process are returned.
+//
+// With an explicit |cpu_affinity|, the threads are pinned to its CPUs in
+// order. Otherwise, with |numa_aware|, they are pinned to the CPUs of the NUMA
+// nodes in turn, so that even a few threads use the memory bandwidth of all
+// the nodes.
+std::vector<int> get_thread_cpus(const std::string &cpu_affinity,
+                                 bool numa_aware);
+
+// Pins the given thread to a CPU. Returns false if that is not supported on
+// this platform or failed.
+bool pin_thread_to_cpu(std::thread &thread, int cpu);
+
+TI_NAMESPACE_END
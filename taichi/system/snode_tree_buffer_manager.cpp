@@ -83,6 +83,7 @@ void SNodeTreeBufferManager::destroy(SNodeTree *snode_tree) {
   }
   Ptr ptr = roots_[snode_tree_id];
   merge_and_insert(ptr, size);
+  sizes_[snode_tree_id] = 0;
   TI_DEBUG("SNode tree {} destroyed.", snode_tree_id);
 }
 
@@ -27,12 +27,17 @@ class SNodeTreeBufferManager {
 
   void destroy(SNodeTree *snode_tree);
 
+  // Size of the root buffer of a live SNode tree, 0 if it is destroyed
+  std::size_t get_size(int snode_tree_id) const {
+    return sizes_[snode_tree_id];
+  }
+
  private:
   std::set<std::pair<std::size_t, Ptr>> size_set_;
   std::map<Ptr, std::size_t> ptr_map_;
   ProgramImpl *prog_;
   Ptr roots_[kMaxNumSnodeTreesLlvm];
-  std::size_t sizes_[kMaxNumSnodeTreesLlvm];
+  std::size_t sizes_[kMaxNumSnodeTreesLlvm]{};
 };
 
 TLANG_NAMESPACE_END
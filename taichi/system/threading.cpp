@@ -5,11 +5,18 @@
 
 #include "taichi/system/threading.h"
 
+#include "taichi/system/cpu_topology.h"
+
 #include <algorithm>
 #include <condition_variable>
 #include <thread>
 #include <vector>
 
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || \
+    defined(_M_IX86)
+#include <immintrin.h>
+#endif
+
 TI_NAMESPACE_BEGIN
 
 bool test_threading() {
@@ -26,18 +33,65 @@ bool test_threading() {
   return true;
 }
 
+namespace {
+
+// The bounds of the number of times an idle thread checks for work before
+// parking, which is about a few microseconds per 100 checks.
+constexpr int kMinSpins = 1 << 6;
+constexpr int kMaxSpins = 1 << 14;
+
+inline void cpu_relax() {
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || \
+    defined(_M_IX86)
+  _mm_pause();
+#elif defined(__aarch64__)
+  asm volatile("yield");
+#else
+  std::this_thread::yield();
+#endif
+}
+
+inline uint64 pack_range(int begin, int end) {
+  return ((uint64)(uint32)begin << 32) | (uint32)end;
+}
+
+inline int range_begin(uint64 range) {
+  return (int)(range >> 32);
+}
+
+inline int range_end(uint64 range) {
+  return (int)(uint32)range;
+}
+
+// The generation wraps around, which only needs to differ between
+// consecutive runs
+inline uint32 generation(uint64 state) {
+  return (uint32)(state >> 32);
+}
+
+inline bool is_new_run(uint64 state, uint32 last_generation) {
+  return generation(state) % 2 == 0 && generation(state) != last_generation;
+}
+
+}  // namespace
+
 ThreadPool::ThreadPool(int max_num_threads) : max_num_threads(max_num_threads) {
+  TI_ASSERT(max_num_threads > 0);
+  task_ranges = std::make_unique<TaskRange[]>((std::size_t)max_num_threads);
+  run_state = 1ULL << 32;
+  num_remaining_tasks = 0;
+  num_participants = 0;
+  num_parked_workers = 0;
+  master_parked = false;
   exiting = false;
-  started = false;
-  running_threads = 0;
-  timestamp = 1;
-  last_finished = 0;
-  task_head = 0;
-  task_tail = 0;
-  thread_counter = 0;
-  threads.resize((std::size_t)max_num_threads);
-  for (int i = 0; i < max_num_threads; i++) {
-    threads[i] = std::thread([this] { this->target(); });
+  stealing = true;
+  func = nullptr;
+  range_for_task_context = nullptr;
+  // The master thread is thread 0
+  thread_cpus.assign((std::size_t)max_num_threads, -1);
+  threads.resize((std::size_t)max_num_threads - 1);
+  for (int i = 0; i < max_num_threads - 1; i++) {
+    threads[i] = std::thread([this, i] { this->target(i + 1); });
   }
 }
 
@@ -45,84 +99,211 @@ void ThreadPool::run(int splits,
                      int desired_num_threads,
                      void *range_for_task_context,
                      RangeForTaskFunc *func) {
-  {
-    std::lock_guard _(mutex);
-    this->range_for_task_context = range_for_task_context;
-    this->func = func;
-    this->desired_num_threads = std::min(desired_num_threads, max_num_threads);
-    TI_ASSERT(this->desired_num_threads > 0);
-    // TI_P(this->desired_num_threads);
-    started = false;
-    task_head = 0;
-    task_tail = splits;
-    timestamp++;
-    TI_ASSERT(timestamp < (1LL << 62));  // avoid overflowing here
-  }
+  run_tasks(splits, desired_num_threads, range_for_task_context, func,
+            /*stealing=*/true);
+}
 
-  // wake up all slaves
-  slave_cv.notify_all();
-  {
-    std::unique_lock<std::mutex> lock(mutex);
-    // TODO: the workers may have finished before master waiting on master_cv
-    master_cv.wait(lock, [this] { return started && running_threads == 0; });
+void ThreadPool::run_on_each_thread(int desired_num_threads,
+                                    void *range_for_task_context,
+                                    RangeForTaskFunc *func) {
+  int num_threads = std::min(desired_num_threads, max_num_threads);
+  run_tasks(num_threads, num_threads, range_for_task_context, func,
+            /*stealing=*/false);
+}
+
+void ThreadPool::pin_threads(const std::vector<int> &cpus) {
+  if (cpus.empty())
+    return;
+  int num_failures = 0;
+  for (int i = 1; i < max_num_threads; i++) {
+    int cpu = cpus[i % cpus.size()];
+    if (pin_thread_to_cpu(threads[i - 1], cpu)) {
+      thread_cpus[i] = cpu;
+    } else {
+      num_failures++;
+    }
   }
-  TI_ASSERT(task_head >= task_tail);
+  TI_WARN_IF(num_failures > 0,
+             "Failed to pin {} of {} worker threads to their CPUs.",
+             num_failures, max_num_threads - 1);
 }
 
-void ThreadPool::target() {
-  uint64 last_timestamp = 0;
-  int thread_id;
-  {
+void ThreadPool::run_tasks(int splits,
+                           int desired_num_threads,
+                           void *range_for_task_context,
+                           RangeForTaskFunc *func,
+                           bool stealing) {
+  std::lock_guard _(run_mutex);
+  int num_threads = std::min(desired_num_threads, max_num_threads);
+  TI_ASSERT(num_threads > 0);
+  num_threads = std::min(num_threads, splits);
+  if (num_threads <= 1) {
+    // Not worth waking up any worker
+    for (int i = 0; i < splits; i++) {
+      func(range_for_task_context, 0, i);
+    }
+    return;
+  }
+
+  this->range_for_task_context = range_for_task_context;
+  this->func = func;
+  this->stealing = stealing;
+  num_participants.store(num_threads, std::memory_order_relaxed);
+  for (int i = 0; i < num_threads; i++) {
+    task_ranges[i].range.store(
+        pack_range((int)((int64)splits * i / num_threads),
+                   (int)((int64)splits * (i + 1) / num_threads)),
+        std::memory_order_relaxed);
+  }
+  num_remaining_tasks.store(splits, std::memory_order_relaxed);
+
+  // Open the run to the workers
+  uint32 open_generation = generation(run_state.load()) + 1;
+  run_state.store((uint64)open_generation << 32);
+  if (num_parked_workers.load() > 0) {
     std::lock_guard<std::mutex> lock(mutex);
-    thread_id = thread_counter++;
+    slave_cv.notify_all();
+  }
+
+  work(0);
+
+  bool finished = false;
+  for (int i = 0; i < kMaxSpins; i++) {
+    if (num_remaining_tasks.load() == 0) {
+      finished = true;
+      break;
+    }
+    cpu_relax();
   }
+  if (!finished) {
+    std::unique_lock<std::mutex> lock(mutex);
+    master_parked = true;
+    master_cv.wait(lock, [this] { return num_remaining_tasks.load() == 0; });
+    master_parked = false;
+  }
+
+  // Close the run once the workers have left it, which they do as soon as
+  // they find no tasks left
+  uint64 expected = (uint64)open_generation << 32;
+  uint64 closed = (uint64)(uint32)(open_generation + 1) << 32;
+  while (!run_state.compare_exchange_weak(expected, closed)) {
+    expected = (uint64)open_generation << 32;
+    cpu_relax();
+  }
+}
+
+bool ThreadPool::claim_tasks(int thread_id, int &begin, int &end) {
+  auto &range = task_ranges[thread_id].range;
+  auto num_threads = num_participants.load(std::memory_order_relaxed);
+  uint64 r = range.load(std::memory_order_acquire);
   while (true) {
-    {
-      std::unique_lock<std::mutex> lock(mutex);
-      slave_cv.wait(lock, [this, last_timestamp, thread_id] {
-        return (timestamp > last_timestamp &&
-                thread_id < desired_num_threads) ||
-               this->exiting;
-      });
-      last_timestamp = timestamp;
-      if (exiting) {
-        break;
-      } else {
-        if (last_finished >= last_timestamp) {
-          continue;
-          // This could happen when part of the desired threads wake up and
-          // finish all the task, and then this thread wake up finding nothing
-          // to do. Should skip this task directly.
-        } else {
-          started = true;
-          running_threads++;
-        }
-      }
+    int b = range_begin(r), e = range_end(r);
+    if (b >= e)
+      return false;
+    // Claim fewer tasks as the range shrinks, so that there are still tasks
+    // to steal when the other threads run out of tasks
+    int chunk = std::max(1, (e - b) / (2 * num_threads));
+    if (range.compare_exchange_weak(r, pack_range(b + chunk, e),
+                                    std::memory_order_acq_rel,
+                                    std::memory_order_acquire)) {
+      begin = b;
+      end = b + chunk;
+      return true;
     }
+  }
+}
 
+bool ThreadPool::steal_tasks(int thread_id) {
+  if (!stealing)
+    return false;
+  auto num_threads = num_participants.load(std::memory_order_relaxed);
+  for (int k = 1; k < num_threads; k++) {
+    auto &range = task_ranges[(thread_id + k) % num_threads].range;
+    uint64 r = range.load(std::memory_order_acquire);
     while (true) {
-      // For a single parallel task
-      int task_id;
-      {
-        task_id = task_head.fetch_add(1, std::memory_order_relaxed);
-        if (task_id >= task_tail)
-          break;
+      int b = range_begin(r), e = range_end(r);
+      if (b >= e)
+        break;
+      int mid = b + (e - b) / 2;
+      if (range.compare_exchange_weak(r, pack_range(b, mid),
+                                      std::memory_order_acq_rel,
+                                      std::memory_order_acquire)) {
+        // The own range is empty, so no thief is updating it. The stolen
+        // tasks can be stolen again from here.
+        task_ranges[thread_id].range.store(pack_range(mid, e),
+                                           std::memory_order_release);
+        return true;
       }
-
-      func(this->range_for_task_context, thread_id, task_id);
     }
+  }
+  return false;
+}
 
-    bool all_finished = false;
-    {
+void ThreadPool::work(int thread_id) {
+  while (true) {
+    int begin, end;
+    if (!claim_tasks(thread_id, begin, end)) {
+      if (steal_tasks(thread_id))
+        continue;
+      break;
+    }
+    for (int i = begin; i < end; i++) {
+      func(range_for_task_context, thread_id, i);
+    }
+    if (num_remaining_tasks.fetch_sub(end - begin) == end - begin &&
+        master_parked.load()) {
+      // This thread has finished the last tasks
       std::lock_guard<std::mutex> lock(mutex);
-      running_threads--;
-      if (running_threads == 0) {
-        all_finished = true;
-        last_finished = last_timestamp;
+      master_cv.notify_one();
+    }
+  }
+}
+
+void ThreadPool::target(int thread_id) {
+  uint32 last_generation = 0;
+  int num_spins = kMaxSpins;
+  while (true) {
+    uint64 state = run_state.load(std::memory_order_acquire);
+    bool woken = false;
+    for (int i = 0; i < num_spins; i++) {
+      if (is_new_run(state, last_generation) || exiting.load()) {
+        woken = true;
+        break;
       }
+      cpu_relax();
+      state = run_state.load(std::memory_order_acquire);
+    }
+    if (woken) {
+      num_spins = std::min(num_spins * 2, kMaxSpins);
+    } else {
+      // Park until the next run
+      num_spins = std::max(num_spins / 2, kMinSpins);
+      std::unique_lock<std::mutex> lock(mutex);
+      num_parked_workers++;
+      slave_cv.wait(lock, [&] {
+        state = run_state.load();
+        return is_new_run(state, last_generation) || exiting.load();
+      });
+      num_parked_workers--;
+    }
+    if (exiting.load())
+      break;
+
+    last_generation = generation(state);
+    if (thread_id >= num_participants.load(std::memory_order_relaxed))
+      continue;
+    // Join the run, unless it has been closed in the meantime
+    bool joined = false;
+    while (generation(state) == last_generation) {
+      if (run_state.compare_exchange_weak(state, state + 1)) {
+        joined = true;
+        break;
+      }
+    }
+    if (joined) {
+      work(thread_id);
+      run_state.fetch_sub(1);
     }
-    if (all_finished)
-      master_cv.notify_one();
   }
 }
 
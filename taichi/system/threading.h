@@ -10,34 +10,60 @@
 #include <atomic>
 #include <condition_variable>
 #include <functional>
+#include <memory>
 #include <thread>
+#include <vector>
 
 TI_NAMESPACE_BEGIN
 
 using RangeForTaskFunc = void(void *, int thread_id, int i);
 using ParallelFor = void(int n, int num_threads, void *, RangeForTaskFunc func);
 
+// A work-stealing thread pool.
+//
+// The tasks of a run are split evenly among the participating threads, one of
+// which is the calling (master) thread. Each thread claims chunks of its own
+// range of tasks, whose sizes decrease with the number of remaining tasks, and
+// steals the latter half of the range of another thread once its own range is
+// empty, so that imbalanced tasks are balanced dynamically.
+//
+// Idle workers spin for a while before parking, so that runs in quick
+// succession, e.g. the offloaded tasks of a kernel, do not pay the latency of
+// waking them up. The spinning time adapts to how often the workers have to
+// park.
 class ThreadPool {
  public:
+  // A range of task ids [begin, end) packed into 64 bits, so that both its
+  // owner and the thieves update it with a single CAS.
+  struct alignas(64) TaskRange {
+    std::atomic<uint64> range{0};
+  };
+
   std::vector<std::thread> threads;
+  std::unique_ptr<TaskRange[]> task_ranges;
   std::condition_variable slave_cv;
   std::condition_variable master_cv;
   std::mutex mutex;
-  std::atomic<int> task_head;
-  int task_tail;
-  int running_threads;
+  std::mutex run_mutex;
+  // The generation of the run in the upper 32 bits, and the number of workers
+  // taking part in it in the lower 32 bits. The generation is even while the
+  // run accepts workers, and odd otherwise.
+  std::atomic<uint64> run_state;
+  std::atomic<int> num_remaining_tasks;
+  std::atomic<int> num_participants;
+  std::atomic<int> num_parked_workers;
+  std::atomic<bool> master_parked;
+  std::atomic<bool> exiting;
+  // Whether the threads of the current run may steal tasks
+  bool stealing;
   int max_num_threads;
-  int desired_num_threads;
-  uint64 timestamp;
-  uint64 last_finished;
-  bool started;
-  bool exiting;
+  // The CPU each thread is pinned to, or -1 if it is not pinned
+  std::vector<int> thread_cpus;
   RangeForTaskFunc *func;
   void *range_for_task_context;  // Note: this is a pointer to a
                                  // range_task_helper_context defined in the
                                  // LLVM runtime, which is different from
                                  // taichi::lang::Context.
-  int thread_counter;
 
   ThreadPool(int max_num_threads);
 
@@ -46,6 +72,17 @@ class ThreadPool {
            void *range_for_task_context,
            RangeForTaskFunc *func);
 
+  // Runs task i on thread i for each of the participating threads, without
+  // stealing, i.e., with the static partitioning of the tasks of run(). This
+  // is used to place memory with the first-touch policy of the OS.
+  void run_on_each_thread(int desired_num_threads,
+                          void *range_for_task_context,
+                          RangeForTaskFunc *func);
+
+  // Pins worker thread i to cpus[i % cpus.size()]. The master thread, i.e.,
+  // the thread calling run(), is not pinned.
+  void pin_threads(const std::vector<int> &cpus);
+
   static void static_run(ThreadPool *pool,
                          int splits,
                          int desired_num_threads,
@@ -54,9 +91,22 @@ class ThreadPool {
     return pool->run(splits, desired_num_threads, range_for_task_context, func);
   }
 
-  void target();
+  void target(int thread_id);
 
   ~ThreadPool();
+
+ private:
+  void run_tasks(int splits,
+                 int desired_num_threads,
+                 void *range_for_task_context,
+                 RangeForTaskFunc *func,
+                 bool stealing);
+
+  void work(int thread_id);
+
+  bool claim_tasks(int thread_id, int &begin, int &end);
+
+  bool steal_tasks(int thread_id);
 };
 
 TI_NAMESPACE_END
@@ -79,7 +79,8 @@ void Timelines::clear() {
   }
 }
 
-void Timelines::save(const std::string &filename) {
+void Timelines::save(const std::string &filename,
+                     const std::vector<TimelineEvent> &extra_events) {
   std::lock_guard<std::mutex> _(mut_);
   std::sort(timelines_.begin(), timelines_.end(), [](Timeline *a, Timeline *b) {
     return a->get_name() < b->get_name();
@@ -93,14 +94,18 @@ void Timelines::save(const std::string &filename) {
   std::ofstream fout(filename);
   fout << "[";
   bool first = true;
-  for (auto &e : events_) {
-    if (first) {
-      first = false;
-    } else {
-      fout << ",";
+  auto write_events = [&](const std::vector<TimelineEvent> &events) {
+    for (auto e : events) {
+      if (first) {
+        first = false;
+      } else {
+        fout << ",";
+      }
+      fout << e.to_json() << std::endl;
     }
-    fout << e.to_json() << std::endl;
-  }
+  };
+  write_events(events_);
+  write_events(extra_events);
   fout << "]";
 }
 
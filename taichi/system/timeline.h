@@ -70,7 +70,10 @@ class Timelines {
 
   void clear();
 
-  void save(const std::string &filename);
+  // Saves the events of all the timelines, followed by |extra_events|, which
+  // are not kept, in the Chrome trace event format.
+  void save(const std::string &filename,
+            const std::vector<TimelineEvent> &extra_events = {});
 
   bool get_enabled();
 
@@ -750,6 +750,12 @@ class MakeAdjoint : public IRVisitor {
     auto adjoint_ptr = insert<GlobalPtrStmt>(snodes, dest->indices);
     auto load = insert<GlobalLoadStmt>(adjoint_ptr);
     accumulate(stmt->val, load);
+    // The value before the store does not contribute to the value after it,
+    // so the adjoint is cleared once consumed. This makes the gradients right
+    // for fields overwritten by later kernels, e.g., when ti.Tape replays
+    // them from checkpoints.
+    insert<GlobalStoreStmt>(adjoint_ptr,
+                            insert<ConstStmt>(TypedConstant(load->ret_type)));
     stmt->parent->erase(stmt);
   }
 
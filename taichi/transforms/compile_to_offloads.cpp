@@ -2,6 +2,7 @@
 #include "taichi/ir/transforms.h"
 #include "taichi/ir/analysis.h"
 #include "taichi/ir/pass.h"
+#include "taichi/ir/statements.h"
 #include "taichi/ir/visitors.h"
 #include "taichi/program/compile_config.h"
 #include "taichi/program/extension.h"
@@ -86,6 +87,26 @@ void compile_to_offloads(IRNode *ir,
     irpass::analysis::verify(ir);
   }
 
+  if (!grad) {
+    // Used by ti.Tape to checkpoint the fields written by the kernel
+    auto snode_writes = irpass::analysis::gather_snode_read_writes(ir).second;
+    kernel->snode_writes.assign(snode_writes.begin(), snode_writes.end());
+    std::unordered_set<SNode *> snode_atomic_writes;
+    irpass::analysis::gather_statements(ir, [&](Stmt *stmt) {
+      if (auto atomic = stmt->cast<AtomicOpStmt>()) {
+        if (auto global_ptr = atomic->dest->cast<GlobalPtrStmt>()) {
+          for (auto &snode : global_ptr->snodes.data) {
+            snode_atomic_writes.emplace(snode);
+          }
+        }
+      }
+      return false;
+    });
+    kernel->snode_atomic_writes.assign(snode_atomic_writes.begin(),
+                                       snode_atomic_writes.end());
+    kernel->snode_writes_gathered = true;
+  }
+
   if (is_extension_supported(config.arch, Extension::mesh)) {
     irpass::analysis::gather_meshfor_relation_types(ir);
   }
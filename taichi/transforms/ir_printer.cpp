@@ -547,6 +547,9 @@ class IRPrinter : public IRVisitor {
       details =
           fmt::format("range_for({}, {}) grid_dim={} block_dim={}", begin_str,
                       end_str, stmt->grid_dim, stmt->block_dim);
+      if (stmt->index_type->is_primitive(PrimitiveTypeID::i64)) {
+        details += " index_type=i64";
+      }
     } else if (stmt->task_type == OffloadedTaskType::struct_for) {
       details =
           fmt::format("struct_for({}) grid_dim={} block_dim={} bls={}",
@@ -217,7 +217,12 @@ class LowerAST : public IRVisitor {
       } else {
         // transform into a structure as
         // i = begin; while (1) { if (i >= end) break; original body; i += 1; }
-        fctx.push_back<AllocaStmt>(PrimitiveType::i32);
+        DataType index_type = PrimitiveType::i32;
+        if (begin->ret_type->is_primitive(PrimitiveTypeID::i64) ||
+            end->ret_type->is_primitive(PrimitiveTypeID::i64)) {
+          index_type = PrimitiveType::i64;
+        }
+        fctx.push_back<AllocaStmt>(index_type);
         auto loop_var = fctx.back_stmt();
         stmt->parent->local_var_to_stmt[stmt->loop_var_id[0]] = loop_var;
         fctx.push_back<LocalStoreStmt>(loop_var, begin->stmt);
@@ -238,8 +243,8 @@ class LowerAST : public IRVisitor {
         }
 
         VecStatement increase_and_store;
-        auto const_one =
-            increase_and_store.push_back<ConstStmt>(TypedConstant((int32)1));
+        auto const_one = increase_and_store.push_back<ConstStmt>(
+            TypedConstant(index_type, 1));
         auto loop_var_add_one = increase_and_store.push_back<BinaryOpStmt>(
             BinaryOpType::add, loop_var_load_stmt, const_one);
         increase_and_store.push_back<LocalStoreStmt>(loop_var,
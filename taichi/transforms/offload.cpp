@@ -100,9 +100,13 @@ class Offloader {
         } else {
           offloaded->block_dim = s->block_dim;
         }
+        offloaded->index_type = s->index_type();
+        TI_ERROR_IF(offloaded->index_type->is_primitive(PrimitiveTypeID::i64) &&
+                        !arch_is_cpu(arch),
+                    "64-bit loop indices are only supported on CPU.");
         if (auto val = s->begin->cast<ConstStmt>()) {
           offloaded->const_begin = true;
-          offloaded->begin_value = val->val[0].val_int32();
+          offloaded->begin_value = val->val[0].val_as_int64();
         } else {
           offloaded_ranges.begin_stmts.insert(
               std::make_pair(offloaded.get(), s->begin));
@@ -110,7 +114,7 @@ class Offloader {
 
         if (auto val = s->end->cast<ConstStmt>()) {
           offloaded->const_end = true;
-          offloaded->end_value = val->val[0].val_int32();
+          offloaded->end_value = val->val[0].val_as_int64();
         } else {
           if ((arch == Arch::opengl || arch == Arch::vulkan) &&
               demotable_axis_load(s->end)) {
@@ -194,6 +194,13 @@ class TypeCheck : public IRVisitor {
             stmt->name(), i);
         stmt->indices[i] =
             insert_type_cast_before(stmt, stmt->indices[i], PrimitiveType::i32);
+      } else if (stmt->indices[i]->ret_type->is_primitive(
+                     PrimitiveTypeID::i64) ||
+                 stmt->indices[i]->ret_type->is_primitive(
+                     PrimitiveTypeID::u64)) {
+        // SNode indices are 32-bit, e.g. for 64-bit loop indices
+        stmt->indices[i] =
+            insert_type_cast_before(stmt, stmt->indices[i], PrimitiveType::i32);
       }
       TI_ASSERT(stmt->indices[i]->width() == stmt->snodes.size());
     }
@@ -420,8 +427,15 @@ class TypeCheck : public IRVisitor {
   }
 
   void visit(LoopIndexStmt *stmt) override {
-    stmt->ret_type =
-        TypeFactory::create_vector_or_scalar_type(1, PrimitiveType::i32);
+    DataType index_type = PrimitiveType::i32;
+    if (auto range_for = stmt->loop->cast<RangeForStmt>()) {
+      index_type = range_for->index_type();
+    } else if (auto offload = stmt->loop->cast<OffloadedStmt>();
+               offload &&
+               offload->task_type == OffloadedStmt::TaskType::range_for) {
+      index_type = offload->index_type;
+    }
+    stmt->ret_type = TypeFactory::create_vector_or_scalar_type(1, index_type);
   }
 
   void visit(LoopLinearIndexStmt *stmt) override {
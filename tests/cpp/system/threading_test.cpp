@@ -0,0 +1,122 @@
+#include <algorithm>
+
+#include "gtest/gtest.h"
+
+#include "taichi/system/cpu_topology.h"
+#include "taichi/system/threading.h"
+
+namespace taichi {
+
+namespace {
+
+struct TaskCounter {
+  std::vector<std::atomic<int>> num_runs;
+  std::atomic<int> max_thread_id{0};
+
+  explicit TaskCounter(int n) : num_runs(n) {
+    for (auto &c : num_runs) {
+      c = 0;
+    }
+  }
+
+  static void count(void *counter_, int thread_id, int i) {
+    auto counter = (TaskCounter *)counter_;
+    counter->num_runs[i]++;
+    int max_id = counter->max_thread_id.load();
+    while (max_id < thread_id &&
+           !counter->max_thread_id.compare_exchange_weak(max_id, thread_id)) {
+    }
+  }
+};
+
+}  // namespace
+
+TEST(ThreadPool, RunsEachTaskOnce) {
+  ThreadPool pool(8);
+  for (int num_threads = 1; num_threads <= 8; num_threads++) {
+    for (int splits : {0, 1, 3, 8, 100, 1000}) {
+      TaskCounter counter(splits);
+      pool.run(splits, num_threads, &counter, TaskCounter::count);
+      for (int i = 0; i < splits; i++) {
+        EXPECT_EQ(counter.num_runs[i].load(), 1);
+      }
+      EXPECT_LT(counter.max_thread_id.load(), num_threads);
+    }
+  }
+}
+
+TEST(ThreadPool, ImbalancedTasks) {
+  ThreadPool pool(4);
+  const int n = 256;
+  std::vector<double> results(n, 0);
+  for (int k = 0; k < 10; k++) {
+    pool.run(n, 4, &results, [](void *results_, int thread_id, int i) {
+      // Only the first few tasks are expensive
+      double sum = 0;
+      for (int t = 0; t < (i < 8 ? 1000000 : 10); t++) {
+        sum += t * 1e-9;
+      }
+      (*(std::vector<double> *)results_)[i] = sum;
+    });
+    for (int i = 0; i < n; i++) {
+      EXPECT_GT(results[i], 0);
+      results[i] = 0;
+    }
+  }
+}
+
+TEST(ThreadPool, ManyShortRuns) {
+  ThreadPool pool(4);
+  std::atomic<int> total{0};
+  for (int k = 0; k < 10000; k++) {
+    pool.run(4, 4, &total, [](void *total, int thread_id, int i) {
+      (*(std::atomic<int> *)total)++;
+    });
+  }
+  EXPECT_EQ(total.load(), 40000);
+}
+
+TEST(ThreadPool, RunOnEachThread) {
+  ThreadPool pool(8);
+  for (int num_threads = 1; num_threads <= 8; num_threads++) {
+    std::atomic<int> num_mismatches{0};
+    pool.run_on_each_thread(num_threads, &num_mismatches,
+                            [](void *num_mismatches, int thread_id, int i) {
+                              if (thread_id != i) {
+                                (*(std::atomic<int> *)num_mismatches)++;
+                              }
+                            });
+    EXPECT_EQ(num_mismatches.load(), 0);
+  }
+}
+
+TEST(CpuTopology, ParseCpuList) {
+  EXPECT_EQ(parse_cpu_list("0-3,8, 10-11"),
+            (std::vector<int>{0, 1, 2, 3, 8, 10, 11}));
+  EXPECT_EQ(parse_cpu_list("5"), std::vector<int>{5});
+  EXPECT_TRUE(parse_cpu_list("").empty());
+}
+
+TEST(CpuTopology, InterleaveNumaCpus) {
+  CpuTopology topology;
+  topology.numa_nodes = {{0, {0, 1, 2, 3}}, {1, {4, 5}}};
+  EXPECT_EQ(interleave_numa_cpus(topology),
+            (std::vector<int>{0, 4, 1, 5, 2, 3}));
+}
+
+TEST(CpuTopology, ThreadCpusAllowed) {
+  auto allowed = get_allowed_cpus();
+  for (auto cpu : get_thread_cpus("", /*numa_aware=*/true)) {
+    EXPECT_TRUE(allowed.empty() ||
+                std::find(allowed.begin(), allowed.end(), cpu) !=
+                    allowed.end());
+  }
+}
+
+TEST(CpuTopology, Detect) {
+  auto topology = detect_cpu_topology();
+  EXPECT_FALSE(topology.numa_nodes.empty());
+  EXPECT_GT(topology.num_cpus(), 0);
+}
+
+}  // namespace taichi
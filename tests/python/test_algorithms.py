@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+@pytest.mark.parametrize('container', ['field', 'ndarray'])
+@pytest.mark.parametrize('n', [1, 1000, 256 * 256 + 3])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_scan(container, n):
+    arr = np.random.randint(0, 10, n).astype(np.int32)
+
+    x = test_utils.make_vector(container, ti.i32, arr)
+    ti.algorithms.exclusive_scan(x)
+    expected = np.cumsum(arr)
+    assert (x.to_numpy()[1:] == expected[:-1]).all()
+    assert x.to_numpy()[0] == 0
+
+    x = test_utils.make_vector(container, ti.i32, arr)
+    out = ti.ndarray(ti.i32, n)
+    ti.algorithms.inclusive_scan(x, out)
+    assert (out.to_numpy() == expected).all()
+    assert (x.to_numpy() == arr).all()
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_scan_mismatch():
+    with pytest.raises(ValueError):
+        ti.algorithms.exclusive_scan(ti.field(ti.i32, 4),
+                                     ti.field(ti.i32, 5))
+    with pytest.raises(TypeError):
+        ti.algorithms.inclusive_scan(ti.field(ti.i32, (2, 2)))
+
+
+@pytest.mark.parametrize('container', ['field', 'ndarray'])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_reduce(container):
+    n = 100003
+    arr = np.random.randint(-1000, 1000, n).astype(np.int32)
+    x = test_utils.make_vector(container, ti.i32, arr)
+    assert ti.algorithms.reduce(x) == arr.sum()
+    assert ti.algorithms.reduce(x, 'min') == arr.min()
+    assert ti.algorithms.reduce(x, 'max') == arr.max()
+    assert ti.algorithms.reduce(x, 'xor') == np.bitwise_xor.reduce(arr)
+
+    y = test_utils.make_vector(container, ti.f32,
+                               np.full(n, 0.5, dtype=np.float32))
+    assert ti.algorithms.reduce(y) == pytest.approx(n * 0.5)
+
+    with pytest.raises(ValueError):
+        ti.algorithms.reduce(x, 'mean')
+    with pytest.raises(ValueError):
+        ti.algorithms.reduce(ti.ndarray(ti.i32, 0))
+
+
+@pytest.mark.parametrize('container', ['field', 'ndarray'])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_compact(container):
+    n = 70001
+    arr = np.random.randint(0, 100, n).astype(np.int32)
+    mask = (arr % 3 == 0).astype(np.int32)
+    expected = arr[mask != 0]
+
+    x = test_utils.make_vector(container, ti.i32, arr)
+    out = ti.ndarray(ti.i32, n)
+    count = ti.algorithms.compact(
+        x, test_utils.make_vector(container, ti.i32, mask), out)
+    assert count == len(expected)
+    assert (out.to_numpy()[:count] == expected).all()
+
+    count = ti.algorithms.compact(
+        x, test_utils.make_vector(container, ti.i32, mask))
+    assert count == len(expected)
+    res = x.to_numpy()
+    assert (res[:count] == expected).all()
+    assert (res[count:] == arr[count:]).all()
+
+
+@pytest.mark.parametrize('container', ['field', 'ndarray'])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_unique(container):
+    arr = np.sort(np.random.randint(0, 500, 10000)).astype(np.int32)
+    expected = np.unique(arr)
+    x = test_utils.make_vector(container, ti.i32, arr)
+    count = ti.algorithms.unique(x)
+    assert count == len(expected)
+    assert (x.to_numpy()[:count] == expected).all()
+
+
+@pytest.mark.parametrize('container', ['field', 'ndarray'])
+@pytest.mark.parametrize('num_bins', [16, 5000])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_histogram(container, num_bins):
+    n = 100000
+    arr = np.random.randint(-10, num_bins + 10, n).astype(np.int32)
+    bins = test_utils.make_vector(container, ti.i32, arr)
+    counts = test_utils.make_vector(container, ti.i32,
+                                    np.full(num_bins, 7, dtype=np.int32))
+    ti.algorithms.histogram(bins, counts)
+    expected = np.bincount(arr[(arr >= 0) & (arr < num_bins)],
+                           minlength=num_bins)
+    assert (counts.to_numpy() == expected).all()
@@ -1,5 +1,5 @@
 import ast
-from collections import namedtuple
+from collections import ChainMap, namedtuple
 
 from taichi.lang.ast.symbol_resolver import ASTResolver
 
@@ -45,3 +45,10 @@ def test_ast_resolver_wrong_ti():
     ti = fake_ti(kernel='fake')
     node = ast.parse('ti.kernel', mode='eval').body
     assert not ASTResolver.resolve_to(node, taichi.kernel, locals())
+
+
+def test_ast_resolver_chain_map():
+    import taichi as ti
+    node = ast.parse('ti.lang.ops.atomic_add', mode='eval').body
+    scope = ChainMap({}, {'ti': ti})
+    assert ASTResolver.resolve_to(node, ti.atomic_add, scope)
@@ -0,0 +1,122 @@
+import os
+import re
+
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+def _test_saxpy(n):
+    x = ti.field(ti.f32, shape=n)
+    y = ti.field(ti.f32, shape=n)
+
+    @ti.kernel
+    def saxpy(a: ti.f32):
+        for i in range(n):
+            y[i] = a * x[i] + y[i]
+
+    xs = np.random.rand(n).astype(np.float32)
+    ys = np.random.rand(n).astype(np.float32)
+    x.from_numpy(xs)
+    y.from_numpy(ys)
+    saxpy(2.0)
+    assert np.allclose(y.to_numpy(), 2 * xs + ys)
+
+
+@pytest.mark.parametrize('n', [1, 7, 1000, 12345])
+@test_utils.test(arch=ti.cpu)
+def test_range_for_saxpy(n):
+    _test_saxpy(n)
+
+
+@pytest.mark.parametrize('n', [1, 7, 1000, 12345])
+@test_utils.test(arch=ti.cpu, cpu_loop_vectorize=False)
+def test_range_for_saxpy_scalar(n):
+    _test_saxpy(n)
+
+
+def _saxpy_optimized_llvm_ir(tmp_path):
+    x = ti.field(ti.f32, shape=1000)
+    y = ti.field(ti.f32, shape=1000)
+
+    @ti.kernel
+    def saxpy(a: ti.f32):
+        for i in range(1000):
+            y[i] = a * x[i] + y[i]
+
+    # The optimized IR of each module is written to the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        saxpy(2.0)
+    finally:
+        os.chdir(cwd)
+    modules = [path.read_text() for path in tmp_path.glob('*.ll')]
+    return ''.join(ir for ir in modules if 'saxpy' in ir)
+
+
+@test_utils.test(arch=ti.cpu,
+                 offline_cache=False,
+                 print_kernel_llvm_ir_optimized=True)
+def test_range_for_saxpy_ir(tmp_path):
+    assert re.search(r'<\d+ x float>', _saxpy_optimized_llvm_ir(tmp_path))
+
+
+@test_utils.test(arch=ti.cpu,
+                 offline_cache=False,
+                 print_kernel_llvm_ir_optimized=True,
+                 cpu_loop_vectorize=False)
+def test_range_for_saxpy_scalar_ir(tmp_path):
+    ir = _saxpy_optimized_llvm_ir(tmp_path)
+    assert 'saxpy' in ir
+    assert not re.search(r'<\d+ x float>', ir)
+
+
+@test_utils.test(arch=ti.cpu, simd_width=16)
+def test_range_for_continue():
+    n = 1001
+    x = ti.field(ti.i32, shape=n)
+
+    @ti.kernel
+    def fill():
+        for i in range(n):
+            if i % 3 == 0:
+                continue
+            x[i] = i
+
+    fill()
+    expected = np.arange(n)
+    expected[::3] = 0
+    assert np.array_equal(x.to_numpy(), expected)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_range_for_reduction():
+    n = 100003
+    x = ti.field(ti.f64, shape=n)
+
+    @ti.kernel
+    def total() -> ti.f64:
+        s = 0.0
+        for i in range(n):
+            s += x[i]
+        return s
+
+    x.from_numpy(np.ones(n))
+    assert total() == n
+
+
+@test_utils.test(arch=ti.cpu, demote_dense_struct_fors=False)
+def test_dense_struct_for():
+    x = ti.field(ti.f32, shape=(37, 129))
+
+    @ti.kernel
+    def fill():
+        for i, j in x:
+            x[i, j] = i * 1000 + j
+
+    fill()
+    i, j = np.meshgrid(np.arange(37), np.arange(129), indexing='ij')
+    assert np.array_equal(x.to_numpy(), i * 1000 + j)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from taichi.lang.misc import get_host_arch_list
+
+import taichi as ti
+from tests import test_utils
+
+
+@test_utils.test()
+def test_scalar_field_gather_scatter():
+    x = ti.field(ti.f32, shape=(8, 6), offset=(-2, 0))
+    x.from_numpy(np.arange(48, dtype=np.float32).reshape(8, 6))
+
+    indices = np.array([[-2, 0], [5, 5], [0, 3], [5, 5]])
+    assert (x.gather(indices) == [0, 47, 15, 47]).all()
+
+    x.scatter(indices[:3], np.array([-1, -2, -3]))
+    assert x[-2, 0] == -1
+    assert x[5, 5] == -2
+    assert x[0, 3] == -3
+
+    y = ti.field(ti.i32, shape=16)
+    y.scatter(np.arange(0, 16, 2), np.ones(8, dtype=np.int32))
+    assert (y.gather(np.arange(16)) == (np.arange(16) % 2 == 0)).all()
+
+    with pytest.raises(ValueError):
+        x.gather(np.arange(4))
+    with pytest.raises(ValueError):
+        x.scatter(indices, np.zeros(3))
+
+
+@test_utils.test()
+def test_matrix_field_gather_scatter():
+    m = ti.Matrix.field(2, 3, ti.f32, shape=5)
+    v = ti.Vector.field(3, ti.i32, shape=(4, 4))
+
+    values = np.random.rand(3, 2, 3).astype(np.float32)
+    m.scatter([4, 0, 2], values)
+    assert (m.gather([0, 2, 4]) == values[[1, 2, 0]]).all()
+    assert (m.to_numpy()[[4, 0, 2]] == values).all()
+
+    v.scatter([[1, 2], [3, 0]], np.array([[1, 2, 3], [4, 5, 6]]))
+    assert v.gather([[3, 0]]).shape == (1, 3)
+    assert v.gather([[3, 0]], keep_dims=True).shape == (1, 3, 1)
+    assert (v.gather([[1, 2], [0, 0]]) == [[1, 2, 3], [0, 0, 0]]).all()
+
+
+@test_utils.test()
+def test_struct_field_gather_scatter():
+    s = ti.Struct.field({'a': ti.i32, 'b': ti.types.vector(2, ti.f32)},
+                        shape=8)
+    s.scatter([1, 6], {'a': [10, 60], 'b': [[1, 1], [6, 6]]})
+    res = s.gather([6, 1, 0])
+    assert (res['a'] == [60, 10, 0]).all()
+    assert (res['b'] == [[6, 6], [1, 1], [0, 0]]).all()
+
+
+@pytest.mark.parametrize('layout', [ti.Layout.AOS, ti.Layout.SOA])
+@test_utils.test(arch=get_host_arch_list())
+def test_ndarray_gather_scatter(layout):
+    x = ti.ndarray(ti.i32, shape=(4, 5))
+    x.scatter([[0, 1], [3, 4]], [7, 8])
+    assert (x.gather([[3, 4], [0, 1], [2, 2]]) == [8, 7, 0]).all()
+
+    v = ti.Vector.ndarray(2, ti.f32, shape=6, layout=layout)
+    v.scatter([5, 1], [[1, 2], [3, 4]])
+    assert (v.gather([1, 5]) == [[3, 4], [1, 2]]).all()
+
+    m = ti.Matrix.ndarray(2, 2, ti.f32, shape=3, layout=layout)
+    m.scatter([2], [[[1, 2], [3, 4]]])
+    assert (m.gather([2, 0]) == [[[1, 2], [3, 4]], [[0, 0], [0, 0]]]).all()
@@ -30,3 +30,48 @@ def test_save_image_without_window(dtype):
         delta = (image - i).sum()
         assert delta == 0, "Expected image difference to be 0 but got {} instead.".format(
             delta)
+
+
+def _make_image_inputs(n, m):
+    rgb = np.random.randint(0, 256, size=(n, m, 3)).astype(np.uint8)
+    field = ti.Vector.field(3, ti.u8, shape=(n, m))
+    field.from_numpy(rgb)
+    channels = ti.field(ti.u8, shape=(n, m, 3))
+    channels.from_numpy(rgb)
+    # Offset by half a level, so that the fast GUI rounds them back to |rgb|
+    rgb_f32 = (rgb.astype(np.float32) + 0.5) / 255
+    ndarray = ti.Vector.ndarray(3, ti.f32, shape=(n, m))
+    ndarray.from_numpy(rgb_f32)
+    rgba = np.concatenate([rgb_f32, np.zeros((n, m, 1), np.float32)], axis=2)
+    return rgb, [rgb, rgba, field, channels, ndarray]
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_set_image_inputs():
+    n, m = 64, 32
+    rgb, inputs = _make_image_inputs(n, m)
+    gui = ti.GUI("Test", res=(n, m), show_gui=False)
+    expected = gui.cook_image(rgb)
+    for img in inputs:
+        gui.set_image(np.zeros((n, m), np.float32))
+        gui.set_image(img)
+        assert np.allclose(gui.get_image(), expected, atol=1 / 255)
+
+    gray = ti.ndarray(ti.u16, shape=(n, m))
+    gray_np = np.random.randint(0, 65536, size=(n, m)).astype(np.uint16)
+    gray.from_numpy(gray_np)
+    gui.set_image(gray)
+    assert np.allclose(gui.get_image(), gui.cook_image(gray_np), atol=1e-6)
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_set_image_fast_gui():
+    n, m = 64, 32
+    _, inputs = _make_image_inputs(n, m)
+    gui = ti.GUI("Test", res=(n, m), show_gui=False, fast_gui=True)
+    gui.set_image(inputs[0])
+    expected = gui.img.copy()
+    for img in inputs[1:]:
+        gui.img.fill(0)
+        gui.set_image(img)
+        assert np.array_equal(gui.img, expected)
@@ -0,0 +1,147 @@
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash():
+    x = ti.field(ti.i32)
+    s = ti.field(ti.i32, shape=())
+
+    n = 1 << 12
+    blk = ti.root.hash(ti.ij, n, capacity=64)
+    blk.dense(ti.ij, 4).place(x)
+
+    @ti.kernel
+    def count():
+        for i, j in x:
+            s[None] += 1
+
+    @ti.kernel
+    def total() -> ti.i32:
+        t = 0
+        for i, j in x:
+            t += x[i, j]
+        return t
+
+    @ti.kernel
+    def is_active(i: ti.i32, j: ti.i32) -> ti.i32:
+        return ti.is_active(blk, [i, j])
+
+    # All in different dense blocks
+    cells = [(0, 0), (5, 7), (n * 4 - 1, 3), (1234, n * 4 - 1), (9, 9)]
+    for k, (i, j) in enumerate(cells):
+        x[i, j] = k + 1
+
+    count()
+    assert s[None] == len(cells) * 16
+    assert total() == sum(range(1, len(cells) + 1))
+    for k, (i, j) in enumerate(cells):
+        assert x[i, j] == k + 1
+    assert x[100, 100] == 0
+    assert is_active(0, 0)
+    assert not is_active(4, 0)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash_leaf():
+    x = ti.field(ti.i32)
+    n = 1 << 20
+    blk = ti.root.hash(ti.i, n, capacity=16)
+    blk.place(x)
+
+    @ti.kernel
+    def activate(offset: ti.i32):
+        for k in range(16):
+            x[offset + k * 4099] = k + 1
+
+    @ti.kernel
+    def total() -> ti.i32:
+        t = 0
+        for i in x:
+            t += x[i]
+        return t
+
+    @ti.kernel
+    def deactivate():
+        for i in x:
+            ti.deactivate(blk, i)
+
+    @ti.kernel
+    def is_active(i: ti.i32) -> ti.i32:
+        return ti.is_active(blk, i)
+
+    activate(0)
+    assert total() == 136
+    assert x[4099] == 2
+    deactivate()
+    assert total() == 0
+    assert x[4099] == 0
+    # The tombstones left by the deactivated cells are reused
+    activate(7)
+    assert total() == 136
+    assert x[7 + 4099] == 2
+    assert not is_active(4099)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash_deactivate_all():
+    x = ti.field(ti.f32)
+    blk = ti.root.hash(ti.i, 1 << 16)
+    blk.dense(ti.i, 8).place(x)
+
+    @ti.kernel
+    def is_active(i: ti.i32) -> ti.i32:
+        return ti.is_active(blk, i)
+
+    x[3] = 1
+    x[1 << 18] = 2
+    assert is_active(3) and is_active(1 << 18)
+    ti.deactivate_all_snodes()
+    assert not is_active(3)
+    assert not is_active(1 << 18)
+    assert x[1 << 18] == 0
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash_full():
+    x = ti.field(ti.i32)
+    ti.root.hash(ti.i, 1024, capacity=4).place(x)
+
+    @ti.kernel
+    def fill(n: ti.i32):
+        for i in range(n):
+            x[i * 3] = 1
+
+    fill(4)
+    with pytest.raises(RuntimeError, match='Hash node is full'):
+        fill(5)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash_full_activate():
+    x = ti.field(ti.i32)
+    block = ti.root.hash(ti.i, 1024, capacity=4)
+    block.place(x)
+
+    @ti.kernel
+    def activate(n: ti.i32):
+        for i in range(n):
+            ti.activate(block, i * 3)
+
+    activate(4)
+    with pytest.raises(RuntimeError, match='Hash node is full'):
+        activate(5)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash_too_many_cells():
+    with pytest.raises(RuntimeError, match=r'fewer than 2\^31 - 1 cells'):
+        ti.root.hash(ti.ij, (65536, 65536), capacity=4096)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_hash_invalid_capacity():
+    with pytest.raises(RuntimeError, match='power of two'):
+        ti.root.hash(ti.i, 1024, capacity=12)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+@test_utils.test()
+def test_kernel_graph_replay():
+    x = ti.field(ti.f32, shape=8)
+
+    @ti.kernel
+    def add(a: ti.f32):
+        for i in x:
+            x[i] += a
+
+    @ti.kernel
+    def scale(f: ti.template(), s: ti.f32):
+        for i in f:
+            f[i] *= s
+
+    with ti.KernelGraph() as graph:
+        add(1.0)
+        scale(x, 2.0)
+    assert len(graph) == 2
+    # Recording does not launch the kernels
+    assert x[0] == 0
+
+    graph.run()
+    assert x[0] == 2
+    graph.run(repeats=2)
+    assert x[0] == 14
+
+
+@test_utils.test()
+def test_kernel_graph_append():
+    x = ti.field(ti.i32, shape=4)
+
+    @ti.kernel
+    def inc(a: ti.i32):
+        for i in x:
+            x[i] += a
+
+    graph = ti.KernelGraph()
+    graph.append(inc, 1)
+    graph.append(inc, 10)
+    graph.run(repeats=3)
+    for i in range(4):
+        assert x[i] == 33
+
+
+@test_utils.test(arch=ti.cpu)
+def test_kernel_graph_external_arrays():
+    a = np.zeros(4, dtype=np.int32)
+    b = np.zeros(8, dtype=np.int32)
+
+    @ti.kernel
+    def inc(arr: ti.ext_arr()):
+        for i in arr:
+            arr[i] += 1
+
+    # Two launches of the same kernel with arrays of different sizes
+    with ti.KernelGraph() as graph:
+        inc(a)
+        inc(b)
+    graph.run(repeats=2)
+    assert (a == 2).all()
+    assert (b == 2).all()
+
+
+@test_utils.test()
+def test_kernel_graph_python_scope_ops():
+    x = ti.field(ti.f32, shape=4)
+    a = ti.ndarray(ti.f32, 4)
+
+    @ti.kernel
+    def fill():
+        for i in x:
+            x[i] = 1
+
+    with ti.KernelGraph() as graph:
+        fill()
+        # These would not see the recorded launch
+        for op in (x.to_numpy, lambda: x.fill(2), lambda: x[0],
+                   lambda: x.from_numpy(np.zeros(4, dtype=np.float32)),
+                   a.to_numpy, lambda: a.__setitem__(0, 1)):
+            with pytest.raises(ti.TaichiRuntimeError,
+                               match='recording a kernel graph'):
+                op()
+    assert len(graph) == 1
+    graph.run()
+    assert (x.to_numpy() == 1).all()
+
+
+@test_utils.test()
+def test_kernel_graph_return_value():
+    @ti.kernel
+    def get() -> ti.i32:
+        return 1
+
+    with pytest.raises(ti.TaichiRuntimeError):
+        with ti.KernelGraph():
+            get()
+
+
+@test_utils.test()
+def test_kernel_graph_nested():
+    with ti.KernelGraph():
+        with pytest.raises(ti.TaichiRuntimeError):
+            with ti.KernelGraph():
+                pass
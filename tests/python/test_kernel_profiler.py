@@ -0,0 +1,89 @@
+import json
+
+import taichi as ti
+from tests import test_utils
+
+n = 1024
+num_launches = 10
+
+
+def _launch(num):
+    x = ti.field(ti.f32, shape=n)
+
+    @ti.kernel
+    def fill():
+        for i in x:
+            x[i] = i
+
+    ti.profiler.clear_kernel_profiler_info()
+    for _ in range(num):
+        fill()
+    return fill
+
+
+def _traced_records(kernel):
+    profiler = ti.profiler.kernel_profiler.get_default_kernel_profiler()
+    profiler._update_records()
+    return [
+        record for record in profiler._traced_records
+        if record.name.startswith(kernel.__name__)
+    ]
+
+
+@test_utils.test(arch=ti.cpu, kernel_profiler=True)
+def test_kernel_profiler_all_records():
+    fill = _launch(num_launches)
+    assert len(_traced_records(fill)) == num_launches
+    result = ti.profiler.query_kernel_profiler_info(fill.__name__)
+    assert result.counter == num_launches
+
+
+def _check_max_records(max_records):
+    fill = _launch(num_launches)
+    assert len(_traced_records(fill)) == max_records
+    # The statistics still cover all the launches
+    result = ti.profiler.query_kernel_profiler_info(fill.__name__)
+    assert result.counter == num_launches
+    assert result.min <= result.avg <= result.max
+    profiler = ti.profiler.kernel_profiler.get_default_kernel_profiler()
+    profiler._update_records()
+    profiler._count_statistics()
+    stats = [
+        res for res in profiler._statistical_results.values()
+        if res.name.startswith(fill.__name__)
+    ]
+    assert len(stats) == 1
+    assert stats[0].min_time <= stats[0].median_time <= stats[0].p99_time
+    assert stats[0].p99_time <= stats[0].max_time
+
+
+@test_utils.test(arch=ti.cpu,
+                 kernel_profiler=True,
+                 kernel_profiler_max_records=0)
+def test_kernel_profiler_statistics_only():
+    _check_max_records(0)
+
+
+@test_utils.test(arch=ti.cpu,
+                 kernel_profiler=True,
+                 kernel_profiler_max_records=3)
+def test_kernel_profiler_max_records():
+    _check_max_records(3)
+
+
+@test_utils.test(arch=ti.cpu,
+                 kernel_profiler=True,
+                 kernel_profiler_max_records=4)
+def test_kernel_profiler_export_trace(tmp_path):
+    fill = _launch(num_launches)
+    filename = str(tmp_path / 'trace.json')
+    ti.profiler.export_kernel_profiler_trace(filename)
+    with open(filename) as f:
+        events = json.load(f)
+    kernel_events = [
+        e for e in events
+        if e['tid'] == 'kernels' and e['name'].startswith(fill.__name__)
+    ]
+    assert [e['ph'] for e in kernel_events] == ['B', 'E'] * 4
+    timestamps = [int(e['ts']) for e in kernel_events]
+    assert timestamps == sorted(timestamps)
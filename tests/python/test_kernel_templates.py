@@ -127,3 +127,25 @@ def test_func_template2():
     for i in range(16):
         for j in range(16):
             assert b[i, j] == 1.0
+
+
+@test_utils.test()
+def test_kernel_template_repeated_launch():
+    x = ti.field(ti.i32, shape=4)
+    y = ti.field(ti.i32, shape=4)
+
+    @ti.kernel
+    def inc(a: ti.template(), b: ti.i32):
+        for i in a:
+            a[i] += b
+
+    # Alternate between instantiations and repeat each of them, so that the
+    # cached instantiation of the last call is both hit and missed.
+    for _ in range(3):
+        inc(x, 1)
+        inc(x, 2)
+        inc(y, 10)
+
+    for i in range(4):
+        assert x[i] == 9
+        assert y[i] == 30
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+def _make_matrix(n, dtype, upwind):
+    # A diagonally dominant tridiagonal matrix, non-symmetric if upwind != 0
+    builder = ti.linalg.SparseMatrixBuilder(n, n, 3 * n, dtype=dtype)
+
+    @ti.kernel
+    def fill(A: ti.linalg.sparse_matrix_builder(dtype=dtype)):
+        for i in range(n):
+            A[i, i] += 3.0
+            if i > 0:
+                A[i, i - 1] += -1.0 - upwind
+            if i < n - 1:
+                A[i, i + 1] += -1.0 + upwind
+
+    fill(builder)
+    dense = np.diag(np.full(n, 3.0)) + np.diag(
+        np.full(n - 1, -1.0 - upwind), -1) + np.diag(
+            np.full(n - 1, -1.0 + upwind), 1)
+    return builder.build(), dense
+
+
+@pytest.mark.parametrize('solver', ['cg', 'bicgstab'])
+@pytest.mark.parametrize('precond', [None, 'jacobi'])
+@pytest.mark.parametrize('container', ['field', 'ndarray'])
+@test_utils.test(arch=ti.cpu)
+def test_krylov_sparse_matrix(solver, precond, container):
+    n = 100
+    A, dense = _make_matrix(n, ti.f32, 0.0 if solver == 'cg' else 0.5)
+    b_np = np.random.rand(n).astype(np.float32)
+    b = test_utils.make_vector(container, ti.f32, b_np)
+    x = test_utils.make_vector(container, ti.f32,
+                               np.zeros(n, dtype=np.float32))
+    converged, num_iterations = getattr(ti.linalg, solver)(A,
+                                                           b,
+                                                           x,
+                                                           M=precond,
+                                                           tol=1e-6,
+                                                           check_every=5)
+    assert converged
+    assert 0 < num_iterations <= n
+    assert np.allclose(x.to_numpy(), np.linalg.solve(dense, b_np), atol=1e-4)
+    assert (b.to_numpy() == b_np).all()
+
+
+@test_utils.test(arch=ti.cpu, default_fp=ti.f64)
+def test_krylov_f64():
+    n = 50
+    A, dense = _make_matrix(n, ti.f64, 0.0)
+    b_np = np.random.rand(n)
+    b = test_utils.make_vector('ndarray', ti.f64, b_np)
+    x = test_utils.make_vector('ndarray', ti.f64, np.ones(n))
+    converged, _ = ti.linalg.cg(A, b, x, tol=1e-12)
+    assert converged
+    assert np.allclose(x.to_numpy(), np.linalg.solve(dense, b_np), atol=1e-10)
+
+
+@pytest.mark.parametrize('solver', ['cg', 'bicgstab'])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_krylov_linear_operator(solver):
+    n = 200
+
+    @ti.kernel
+    def laplacian(u: ti.any_arr(), v: ti.any_arr()):
+        for i in range(n):
+            res = 2.5 * u[i]
+            if i > 0:
+                res -= u[i - 1]
+            if i < n - 1:
+                res -= u[i + 1]
+            v[i] = res
+
+    @ti.kernel
+    def jacobi(r: ti.any_arr(), z: ti.any_arr()):
+        for i in range(n):
+            z[i] = r[i] / 2.5
+
+    dense = np.diag(np.full(n, 2.5)) - np.diag(np.ones(n - 1), -1) - np.diag(
+        np.ones(n - 1), 1)
+    b_np = np.random.rand(n).astype(np.float32)
+    b = test_utils.make_vector('ndarray', ti.f32, b_np)
+    x = test_utils.make_vector('field', ti.f32, np.zeros(n, dtype=np.float32))
+    converged, _ = getattr(ti.linalg, solver)(laplacian,
+                                              b,
+                                              x,
+                                              M=jacobi,
+                                              tol=1e-6)
+    assert converged
+    assert np.allclose(x.to_numpy(), np.linalg.solve(dense, b_np), atol=1e-4)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_krylov_not_converged():
+    n = 100
+    A, _ = _make_matrix(n, ti.f32, 0.0)
+    b = test_utils.make_vector('ndarray', ti.f32, np.ones(n, dtype=np.float32))
+    x = ti.ndarray(ti.f32, n)
+    converged, num_iterations = ti.linalg.cg(A, b, x, tol=1e-6, max_iter=3)
+    assert not converged
+    assert num_iterations == 3
+
+
+@test_utils.test(arch=ti.cpu)
+def test_krylov_invalid_arguments():
+    n = 4
+    A, _ = _make_matrix(n, ti.f32, 0.0)
+    b = ti.ndarray(ti.f32, n)
+    with pytest.raises(ValueError):
+        ti.linalg.cg(A, b, ti.ndarray(ti.f32, n + 1))
+    with pytest.raises(TypeError):
+        ti.linalg.cg(A, b, ti.ndarray(ti.f64, n))
+    with pytest.raises(TypeError):
+        ti.linalg.cg(np.eye(n), b, ti.ndarray(ti.f32, n))
+    with pytest.raises(ValueError):
+        ti.linalg.cg(lambda u, v: None, b, ti.ndarray(ti.f32, n), M='jacobi')
+    with pytest.raises(ValueError):
+        ti.linalg.cg(A, b, ti.ndarray(ti.f32, n), M='ilu')
@@ -0,0 +1,68 @@
+import taichi as ti
+from tests import test_utils
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_memory_info_pointer():
+    x = ti.field(ti.f32)
+    ptr = ti.root.pointer(ti.i, 64)
+    ptr.dense(ti.i, 16).place(x)
+
+    @ti.kernel
+    def activate(n: ti.i32):
+        for i in range(n):
+            x[i] = i
+
+    activate(16 * 8)
+    info = ti.profiler.get_memory_info()
+    tree = info['snode_trees'][-1]
+    assert tree['root_bytes'] > 0
+    snode = [s for s in tree['snodes'] if s['id'] == ptr.ptr.id][0]
+    assert snode['num_used_elements'] == 8
+    assert snode['peak_num_used_elements'] == 8
+    assert snode['allocated_bytes'] >= 8 * snode['element_size'] > 0
+    assert 0 <= snode['fragmentation'] < 1
+    assert info['runtime_requested_bytes'] >= tree['root_bytes']
+
+    ti.deactivate_all_snodes()
+    ti.sync()
+    activate(16 * 4)
+    info = ti.profiler.get_memory_info()
+    snode = [
+        s for s in info['snode_trees'][-1]['snodes'] if s['id'] == ptr.ptr.id
+    ][0]
+    assert snode['num_used_elements'] == 4
+    assert snode['peak_num_used_elements'] == 8
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda, ti.vulkan])
+def test_memory_info_ndarray():
+    n = 1024 * 1024
+    before = ti.profiler.get_memory_info()['device']
+    a = ti.ndarray(ti.f32, n)
+    after = ti.profiler.get_memory_info()['device']
+    assert after['allocated_bytes'] - before['allocated_bytes'] >= 4 * n
+    assert after['num_allocations'] == before['num_allocations'] + 1
+    assert after['peak_allocated_bytes'] >= after['allocated_bytes']
+    del a
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda, ti.vulkan])
+def test_memory_sampling():
+    n = 1024 * 1024
+    ti.profiler.start_memory_sampling(interval=1e-4)
+    a = ti.ndarray(ti.f32, n)
+
+    @ti.kernel
+    def fill(a: ti.any_arr()):
+        for i in range(n):
+            a[i] = i
+
+    for _ in range(10):
+        fill(a)
+    ti.sync()
+    samples = ti.profiler.stop_memory_sampling()
+    assert len(samples) >= 2
+    times = [s['time'] for s in samples]
+    assert times == sorted(times)
+    assert samples[-1]['allocated_bytes'] >= 4 * n
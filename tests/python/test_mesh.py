@@ -1,6 +1,8 @@
 import os
+from unittest.mock import patch
 
 import numpy as np
+from taichi.lang import _mesh_patcher
 
 import taichi as ti
 from tests import test_utils
@@ -342,3 +344,133 @@ def test_multiple_mesh_major_relations():
     sum1 = model.verts.s.to_numpy().sum()
     sum2 = model.verts.s_.to_numpy().sum()
     assert sum1 == sum2
+
+
+@test_utils.test(require=ti.extension.mesh)
+def test_mesh_binary_meta(tmp_path):
+    binary_file_path = str(tmp_path / 'ell.timesh')
+    ti.Mesh.convert_meta(model_file_path, binary_file_path)
+    json_meta = ti.Mesh.load_meta(model_file_path)
+    binary_meta = ti.Mesh.load_meta(binary_file_path)
+
+    assert binary_meta.num_patches == json_meta.num_patches
+    assert binary_meta.num_elements == json_meta.num_elements
+    assert binary_meta.max_num_per_patch == json_meta.max_num_per_patch
+    for element_type, fields in json_meta.element_fields.items():
+        for key, field in fields.items():
+            assert np.array_equal(
+                binary_meta.element_fields[element_type][key].to_numpy(),
+                field.to_numpy())
+    for rel_type, fields in json_meta.relation_fields.items():
+        for key, field in fields.items():
+            assert np.array_equal(
+                binary_meta.relation_fields[rel_type][key].to_numpy(),
+                field.to_numpy())
+    assert np.array_equal(binary_meta.attrs['x'], json_meta.attrs['x'])
+
+    mesh_builder = ti.Mesh.Tet()
+    mesh_builder.verts.place({'x': ti.types.vector(3, ti.f32)})
+    model = mesh_builder.build(binary_meta)
+    assert np.allclose(model.verts.x.to_numpy(), json_meta.attrs['x'])
+
+
+def _grid_tets(n):
+    # Each cube of an n^3 grid is split into 6 tetrahedra around its diagonal
+    idx = np.arange((n + 1)**3).reshape(n + 1, n + 1, n + 1)
+    cells = []
+    for tet in [(0, 1, 3, 7), (0, 1, 5, 7), (0, 2, 3, 7), (0, 2, 6, 7),
+                (0, 4, 5, 7), (0, 4, 6, 7)]:
+        corners = []
+        for k in tet:
+            i, j, l = (k >> 2) & 1, (k >> 1) & 1, k & 1
+            corners.append(idx[i:i + n, j:j + n, l:l + n].ravel())
+        cells.append(np.stack(corners, axis=1))
+    verts = np.stack(np.meshgrid(*[np.arange(n + 1)] * 3, indexing='ij'),
+                     axis=-1).reshape(-1, 3)
+    return verts.astype(np.float64), np.concatenate(cells)
+
+
+@test_utils.test(require=ti.extension.mesh)
+def test_mesh_from_arrays(tmp_path):
+    verts, cells = _grid_tets(3)
+    meta = ti.Mesh.from_arrays(verts,
+                               cells,
+                               patch_size=8,
+                               cache_dir=str(tmp_path))
+    assert meta.num_patches == (len(cells) + 7) // 8
+    assert len(os.listdir(tmp_path)) == 1
+    # Loaded from the cache
+    cached_meta = ti.Mesh.from_arrays(verts,
+                                      cells,
+                                      patch_size=8,
+                                      cache_dir=str(tmp_path))
+    for element_type, fields in meta.element_fields.items():
+        for key, field in fields.items():
+            assert np.array_equal(
+                cached_meta.element_fields[element_type][key].to_numpy(),
+                field.to_numpy())
+
+    mesh_builder = ti.Mesh.Tet()
+    mesh_builder.verts.place({'x': ti.types.vector(3, ti.f32), 't': ti.i32})
+    mesh_builder.cells.place({'t': ti.i32})
+    mesh_builder.cells.link(mesh_builder.verts)
+    mesh_builder.verts.link(mesh_builder.cells)
+    mesh_builder.verts.link(mesh_builder.verts)
+    model = mesh_builder.build(meta)
+    assert np.allclose(model.verts.x.to_numpy(), verts)
+
+    @ti.kernel
+    def cell_vert():
+        for c in model.cells:
+            for j in range(c.verts.size):
+                c.t += c.verts[j].id
+
+    cell_vert()
+    assert np.array_equal(model.cells.t.to_numpy(), cells.sum(axis=1))
+
+    @ti.kernel
+    def vert_cell():
+        for v in model.verts:
+            for j in range(v.cells.size):
+                v.t += v.cells[j].id
+
+    vert_cell()
+    expected = np.zeros(len(verts), dtype=np.int64)
+    np.add.at(expected, cells.ravel(), np.repeat(np.arange(len(cells)), 4))
+    assert np.array_equal(model.verts.t.to_numpy(), expected)
+    model.verts.t.fill(0)
+
+    @ti.kernel
+    def vert_vert():
+        for v in model.verts:
+            v.t = v.verts.size
+
+    vert_vert()
+    edges = {
+        tuple(sorted((c[a], c[b])))
+        for c in cells.tolist() for a in range(4) for b in range(a + 1, 4)
+    }
+    expected = np.zeros(len(verts), dtype=np.int64)
+    for a, b in edges:
+        expected[a] += 1
+        expected[b] += 1
+    assert np.array_equal(model.verts.t.to_numpy(), expected)
+
+
+@test_utils.test(require=ti.extension.mesh)
+def test_mesh_from_arrays_parallel():
+    verts, cells = _grid_tets(3)
+    serial = _mesh_patcher.build_metadata(verts, cells, 4, num_workers=1)
+    # Builds the patches of the small mesh in several threads
+    with patch.object(_mesh_patcher, '_MIN_PATCHES_PER_WORKER', 2):
+        assert len(_mesh_patcher._split(serial['num_patches'], 4)) > 1
+        parallel = _mesh_patcher.build_metadata(verts,
+                                                cells,
+                                                4,
+                                                num_workers=4)
+    assert parallel['num_patches'] == serial['num_patches']
+    for a, b in zip(parallel['elements'] + parallel['relations'],
+                    serial['elements'] + serial['relations']):
+        assert a.keys() == b.keys()
+        for key in a:
+            assert np.array_equal(a[key], b[key])
@@ -0,0 +1,65 @@
+import os
+import platform
+
+import numpy as np
+
+import taichi as ti
+from tests import test_utils
+
+# Pinning only succeeds for a CPU that this process may run on
+_pinned_cpu = min(os.sched_getaffinity(0)) if hasattr(
+    os, 'sched_getaffinity') else 0
+
+
+@test_utils.test(arch=ti.cpu, numa_aware=True, cpu_max_num_threads=4)
+def test_numa_aware_memory():
+    n = 1 << 20
+    x = ti.field(ti.i32, shape=n)
+    y = ti.field(ti.f32, shape=(64, 64))
+    a = ti.ndarray(ti.i32, n)
+
+    @ti.kernel
+    def fill(a: ti.any_arr()):
+        for i in range(n):
+            x[i] = i
+            a[i] = x[i] * 2
+        for i, j in y:
+            y[i, j] = i + j
+
+    x[1] = 5
+    assert x[0] == 0 and x[1] == 5
+    assert a[n - 1] == 0
+    fill(a)
+    assert np.array_equal(x.to_numpy(), np.arange(n))
+    assert np.array_equal(a.to_numpy(), np.arange(n) * 2)
+    assert y[63, 63] == 126
+
+
+@test_utils.test(arch=ti.cpu, cpu_affinity=[_pinned_cpu],
+                 cpu_max_num_threads=4)
+def test_cpu_affinity():
+    topology = ti.profiler.get_cpu_topology()
+    cpus = sum([node['cpus'] for node in topology['numa_nodes']], [])
+    assert len(cpus) > 0
+    assert len(set(cpus)) == len(cpus)
+    thread_cpus = topology['thread_cpus']
+    assert len(thread_cpus) == 4
+    # The Python thread is not pinned
+    assert thread_cpus[0] == -1
+    if platform.system() == 'Linux':
+        assert thread_cpus[1:] == [_pinned_cpu] * 3
+
+    x = ti.field(ti.i32, shape=1024)
+
+    @ti.kernel
+    def fill():
+        for i in x:
+            x[i] = i
+
+    fill()
+    assert x[1023] == 1023
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4)
+def test_cpu_threads_not_pinned():
+    assert ti.profiler.get_cpu_topology()['thread_cpus'] == [-1] * 4
@@ -1,6 +1,8 @@
 import numpy as np
+import pytest
 
 import taichi as ti
+from taichi.lang.misc import get_host_arch_list
 from tests import test_utils
 
 
@@ -160,3 +162,100 @@ def test_numpy_io_example():
     assert arr.shape == (n, m, 3, 4)
 
     # For PyTorch tensors, use to_torch/from_torch instead
+
+
+@test_utils.test()
+def test_to_numpy_out():
+    n = 4
+    m = 7
+    val = ti.field(ti.i32, shape=(n, m))
+    mat = ti.Matrix.field(2, 3, ti.f32, shape=n)
+
+    @ti.kernel
+    def fill():
+        for i, j in val:
+            val[i, j] = i + j * 3
+        for i in mat:
+            mat[i] = ti.Matrix([[i, 1, 2], [3, 4, i * 0.5]])
+
+    fill()
+    out = np.empty((n, m), dtype=np.int32)
+    assert val.to_numpy(out=out) is out
+    assert (out == val.to_numpy()).all()
+
+    # Values are converted to the dtype of the output array
+    out = np.empty((n, m), dtype=np.float64)
+    val.to_numpy(out=out)
+    assert (out == val.to_numpy()).all()
+
+    out = np.empty((n, 2, 3), dtype=np.float32)
+    assert mat.to_numpy(out=out) is out
+    assert (out == mat.to_numpy()).all()
+
+    with pytest.raises(ValueError):
+        val.to_numpy(out=np.empty((m, n), dtype=np.int32))
+    with pytest.raises(ValueError):
+        val.to_numpy(out=np.empty((n, m * 2), dtype=np.int32)[:, ::2])
+    with pytest.raises(ValueError):
+        val.to_numpy(dtype=np.int64, out=np.empty((n, m), dtype=np.int32))
+
+
+@test_utils.test()
+def test_to_numpy_out_sparse():
+    x = ti.field(ti.i32)
+    ti.root.pointer(ti.i, 2).dense(ti.i, 4).place(x)
+    x[1] = 5
+
+    out = np.full(8, 7, dtype=np.int32)
+    x.to_numpy(out=out)
+    assert out[1] == 5
+    assert (out[4:] == 0).all()
+
+
+@test_utils.test()
+def test_from_numpy_unchecked():
+    n = 4
+    val = ti.field(ti.f32, shape=n)
+    vec = ti.Vector.field(3, ti.f32, shape=n)
+
+    val.from_numpy(np.arange(n, dtype=np.int64), check=False)
+    vec.from_numpy(np.ones((n, 3), dtype=np.float64), check=False)
+    for i in range(n):
+        assert val[i] == i
+        assert vec[i][2] == 1
+
+
+@test_utils.test()
+def test_struct_to_numpy_out():
+    n = 4
+    s = ti.Struct.field({'a': ti.i32, 'b': ti.types.vector(2, ti.f32)},
+                        shape=n)
+    arrs = {
+        'a': np.arange(n, dtype=np.int32),
+        'b': np.ones((n, 2), dtype=np.float32)
+    }
+    s.from_numpy(arrs, check=False)
+    out = {
+        'a': np.empty(n, dtype=np.int32),
+        'b': np.empty((n, 2), dtype=np.float32)
+    }
+    res = s.to_numpy(out=out)
+    assert res['a'] is out['a']
+    assert (out['a'] == np.arange(n)).all()
+    assert (out['b'] == 1).all()
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_ndarray_to_numpy_out():
+    n = 4
+    x = ti.ndarray(ti.i32, shape=n)
+    v = ti.Vector.ndarray(3, ti.f32, shape=n)
+    x.from_numpy(np.arange(n, dtype=np.int32), check=False)
+    v.from_numpy(np.full((n, 3), 2, dtype=np.float32))
+
+    out = np.empty(n, dtype=np.int32)
+    assert x.to_numpy(out=out) is out
+    assert (out == np.arange(n)).all()
+    out = np.empty((n, 3), dtype=np.float32)
+    v.to_numpy(out=out)
+    assert (out == 2).all()
@@ -0,0 +1,116 @@
+import gc
+
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+@test_utils.test(arch=ti.cpu)
+def test_numpy_view_scalar():
+    x = ti.field(ti.f32, shape=(4, 7))
+
+    @ti.kernel
+    def fill():
+        for i, j in x:
+            x[i, j] = i + j * 3
+
+    @ti.kernel
+    def total() -> ti.f32:
+        s = 0.0
+        for i, j in x:
+            s += x[i, j]
+        return s
+
+    fill()
+    view = x.numpy_view()
+    assert view.shape == (4, 7)
+    assert (view == x.to_numpy()).all()
+
+    view[1, 2] = 100
+    assert x[1, 2] == 100
+    view.fill(1)
+    assert total() == 28
+
+
+@test_utils.test(arch=ti.cpu)
+def test_numpy_view_interleaved():
+    a = ti.field(ti.i32)
+    b = ti.field(ti.f64)
+    ti.root.dense(ti.i, 3).dense(ti.j, 5).place(a, b)
+
+    for i in range(3):
+        for j in range(5):
+            a[i, j] = i * 5 + j
+            b[i, j] = i - j
+
+    assert (a.numpy_view() == a.to_numpy()).all()
+    assert (b.numpy_view() == b.to_numpy()).all()
+
+
+@test_utils.test(arch=ti.cpu)
+def test_numpy_view_transposed():
+    x = ti.field(ti.i32)
+    ti.root.dense(ti.j, 6).dense(ti.i, 4).place(x)
+
+    for i in range(4):
+        for j in range(6):
+            x[i, j] = i * 10 + j
+
+    view = x.to_numpy(copy=False)
+    assert view.shape == (4, 6)
+    assert (view == x.to_numpy()).all()
+
+
+@pytest.mark.parametrize('layout', [ti.Layout.AOS, ti.Layout.SOA])
+@test_utils.test(arch=ti.cpu)
+def test_numpy_view_matrix(layout):
+    m = ti.Matrix.field(2, 3, ti.f32, shape=5, layout=layout)
+    v = ti.Vector.field(3, ti.i32, shape=(2, 4), layout=layout)
+
+    @ti.kernel
+    def fill():
+        for i in m:
+            m[i] = ti.Matrix([[i, i + 1, i + 2], [i * 2, i * 3, i * 4]])
+        for i, j in v:
+            v[i, j] = ti.Vector([i, j, i + j])
+
+    fill()
+    assert m.numpy_view().shape == (5, 2, 3)
+    assert (m.numpy_view() == m.to_numpy()).all()
+    assert v.numpy_view().shape == (2, 4, 3)
+    assert v.numpy_view(keep_dims=True).shape == (2, 4, 3, 1)
+    assert (v.to_numpy(copy=False) == v.to_numpy()).all()
+
+    v.numpy_view()[1, 2] = [7, 8, 9]
+    assert v[1, 2][2] == 9
+
+
+@test_utils.test(arch=ti.cpu)
+def test_numpy_view_unsupported():
+    x = ti.field(ti.i32)
+    ti.root.pointer(ti.i, 4).dense(ti.i, 4).place(x)
+    x[3] = 1
+
+    with pytest.raises(ti.TaichiRuntimeError):
+        x.numpy_view()
+    arr = x.to_numpy(copy=False)
+    assert arr[3] == 1
+    arr[3] = 2
+    assert x[3] == 1
+
+
+@test_utils.test(arch=ti.cpu)
+def test_numpy_view_blocks_destroy():
+    fb = ti.FieldsBuilder()
+    x = ti.field(ti.i32)
+    fb.dense(ti.i, 8).place(x)
+    tree = fb.finalize()
+
+    view = x.numpy_view()
+    with pytest.raises(ti.TaichiRuntimeError):
+        tree.destroy()
+    del view
+    gc.collect()
+    tree.destroy()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+import taichi as ti
+from tests import test_utils
+
+
+def _run_saxpy(arch, tmpdir, a):
+    ti.init(arch=arch, offline_cache=True, offline_cache_path=tmpdir)
+    x = ti.field(ti.f32, shape=16)
+    y = ti.field(ti.f32, shape=16)
+
+    @ti.kernel
+    def saxpy(a: ti.f32):
+        for i in x:
+            y[i] = a * x[i] + y[i]
+
+    @ti.kernel
+    def fill():
+        for i in x:
+            x[i] = i
+            y[i] = 1
+
+    fill()
+    saxpy(a)
+    result = y.to_numpy()
+    hits = [k._primal.kernel_cpp.from_offline_cache for k in (fill, saxpy)]
+    ti.reset()
+    return result, hits
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_offline_cache_hit():
+    arch = ti.lang.impl.current_cfg().arch
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first, hits = _run_saxpy(arch, tmpdir, 2.0)
+        assert hits == [False, False]
+        assert os.path.exists(os.path.join(tmpdir, 'ticache.tcb'))
+        num_files = len(os.listdir(tmpdir))
+        assert num_files > 1
+
+        # The second run loads both kernels from the cache
+        second, hits = _run_saxpy(arch, tmpdir, 2.0)
+        assert hits == [True, True]
+        assert len(os.listdir(tmpdir)) == num_files
+        assert (first == second).all()
+        for i in range(16):
+            assert second[i] == 2 * i + 1
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_offline_cache_size_limit():
+    arch = ti.lang.impl.current_cfg().arch
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ti.init(arch=arch,
+                offline_cache=True,
+                offline_cache_path=tmpdir,
+                offline_cache_max_size_MB=0)
+        x = ti.field(ti.i32, shape=4)
+
+        @ti.kernel
+        def inc():
+            for i in x:
+                x[i] += 1
+
+        inc()
+        assert x[0] == 1
+        ti.reset()
+        # Every entry is evicted since the cache cannot hold anything
+        assert not any(f.endswith('.bc') for f in os.listdir(tmpdir))
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_offline_cache_tape_checkpoint():
+    arch = ti.lang.impl.current_cfg().arch
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for _ in range(2):
+            # The second run loads the kernels, with the SNodes they write,
+            # from the cache
+            ti.init(arch=arch, offline_cache=True, offline_cache_path=tmpdir)
+            x = ti.field(ti.f32, shape=4, needs_grad=True)
+            y = ti.field(ti.f32, shape=4, needs_grad=True)
+            loss = ti.field(ti.f32, shape=(), needs_grad=True)
+
+            @ti.kernel
+            def square():
+                for i in x:
+                    y[i] = x[i]**2
+
+            @ti.kernel
+            def compute_loss():
+                for i in y:
+                    loss[None] += y[i]
+
+            for i in range(4):
+                x[i] = i
+            with ti.Tape(loss, checkpoint_every=1):
+                square()
+                compute_loss()
+            for i in range(4):
+                assert x.grad[i] == 2 * i
+            ti.reset()
@@ -1,3 +1,5 @@
+from taichi.lang.misc import get_host_arch_list
+
 import taichi as ti
 from tests import test_utils
 
@@ -20,3 +22,70 @@ def test_parallel_range_for():
     val_np = val.to_numpy()
     for i in range(n):
         assert val_np[i] == i
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_range_for_i64_bounds():
+    s = ti.field(ti.i64, shape=())
+    m = ti.field(ti.i64, shape=())
+
+    @ti.kernel
+    def count():
+        for i in range(2**31 - 4, 2**31 + 4):
+            s[None] += i
+            ti.atomic_max(m[None], i)
+
+    count()
+    assert s[None] == sum(range(2**31 - 4, 2**31 + 4))
+    assert m[None] == 2**31 + 3
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_range_for_i64_arg():
+    s = ti.field(ti.i64, shape=())
+
+    @ti.kernel
+    def count(begin: ti.i64, end: ti.i64):
+        for i in range(begin, end):
+            s[None] += i - begin
+
+    count(2**40, 2**40 + 100)
+    assert s[None] == sum(range(100))
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_ndrange_i64():
+    s = ti.field(ti.i64, shape=())
+
+    @ti.kernel
+    def count():
+        for i, j in ti.ndrange((2**32, 2**32 + 3), 4):
+            s[None] += i * 4 + j
+
+    count()
+    assert s[None] == sum(i * 4 + j for i in range(2**32, 2**32 + 3)
+                          for j in range(4))
+
+
+@test_utils.test(arch=get_host_arch_list())
+def test_range_for_ndarray_over_2_31_elements():
+    rows, cols = 1 << 16, (1 << 15) + 1
+    a = ti.ndarray(ti.i8, shape=(rows, cols))
+
+    @ti.kernel
+    def fill(a: ti.any_arr()):
+        for k in range(rows * cols):
+            a[k // cols, k % cols] = ti.cast((k // cols + k % cols) % 100,
+                                             ti.i8)
+
+    @ti.kernel
+    def count(a: ti.any_arr()) -> ti.i64:
+        t = ti.cast(0, ti.i64)
+        for i, j in ti.ndrange(rows, cols):
+            if a[i, j] == (i + j) % 100:
+                t += 1
+        return t
+
+    fill(a)
+    assert count(a) == rows * cols
+    assert a[rows - 1, cols - 1] == (rows + cols - 2) % 100
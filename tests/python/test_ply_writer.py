@@ -0,0 +1,94 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import taichi as ti
+from taichi.tools import np2ply
+from tests import test_utils
+
+
+def _make_writer():
+    writer = ti.PLYWriter(num_vertices=4, num_faces=2, face_type="tri")
+    writer.add_vertex_pos(np.arange(4.0), np.ones(4), np.zeros(4))
+    writer.add_vertex_id()
+    writer.add_faces(np.array([0, 1, 2, 1, 2, 3]))
+    writer.add_face_channel("weight", "double", np.array([0.25, -1.5]))
+    return writer
+
+
+def _read_binary(path):
+    with open(path, "rb") as f:
+        content = f.read()
+    header, body = content.split(b"end_header\n")
+    return header.decode(), body
+
+
+@test_utils.test(arch=ti.cpu)
+def test_ply_writer_binary():
+    writer = _make_writer()
+    path = test_utils.make_temp_file(suffix=".ply")
+    writer.export(path)
+    header, body = _read_binary(path)
+    os.remove(path)
+
+    assert f"format binary_{sys.byteorder}_endian 1.0" in header
+    assert "property list uchar int vertex_indices" in header
+    vertices = np.frombuffer(body[:4 * 16],
+                             dtype=[("x", np.float32), ("y", np.float32),
+                                    ("z", np.float32), ("id", np.int32)])
+    assert (vertices["x"] == np.arange(4)).all()
+    assert (vertices["id"] == np.arange(4)).all()
+    faces = np.frombuffer(body[4 * 16:],
+                          dtype=[("count", np.uint8),
+                                 ("indices", np.int32, (3, )),
+                                 ("weight", np.float64)])
+    assert (faces["count"] == 3).all()
+    assert (faces["indices"] == [[0, 1, 2], [1, 2, 3]]).all()
+    assert (faces["weight"] == [0.25, -1.5]).all()
+
+
+@test_utils.test(arch=ti.cpu)
+def test_ply_writer_ascii():
+    writer = _make_writer()
+    path = test_utils.make_temp_file(suffix=".ply")
+    writer.export_ascii(path)
+    with open(path) as f:
+        lines = f.read().split("end_header\n")[1].splitlines()
+    os.remove(path)
+
+    assert lines[1] == "1 1 0 1"
+    assert lines[5] == "3 1 2 3 -1.5"
+
+
+@test_utils.test(arch=ti.cpu)
+def test_ply_writer_background():
+    writer = _make_writer()
+    prefix = test_utils.make_temp_file(suffix=".ply")
+    writer.export_frame(1, prefix, background=True)
+    # Pending frames are not affected by later changes
+    writer.face_indices[:] = 0
+    writer.wait()
+    real_path = prefix[:-4] + "_000001.ply"
+    _, body = _read_binary(real_path)
+    os.remove(real_path)
+    os.remove(prefix)
+    assert np.frombuffer(body[-12:-8], dtype=np.int32)[0] == 3
+
+
+@test_utils.test(arch=ti.cpu)
+def test_ply_writer_background_error():
+    writer = _make_writer()
+    prefix = test_utils.make_temp_file(suffix=".ply")
+    bad_prefix = os.path.join(prefix, "frame")
+    # The failure of the first frame is reported once the number of pending
+    # frames makes a later export wait for it
+    with pytest.raises(OSError):
+        for i in range(np2ply._MAX_PENDING_FRAMES + 1):
+            writer.export_frame(i, bad_prefix if i == 0 else prefix,
+                                background=True)
+    writer.wait()
+    for i in range(1, np2ply._MAX_PENDING_FRAMES):
+        os.remove(prefix[:-4] + f"_{i:06d}.ply")
+    os.remove(prefix)
@@ -61,12 +61,16 @@ init_args = {
     'simplify_after_lower_access': [True, TF],
     'print_benchmark_stat': [False, TF],
     'kernel_profiler': [False, TF],
+    'kernel_profiler_max_records': [-1, [0, 16]],
     'check_out_of_bound': [False, TF],
     'print_accessor_ir': [False, TF],
     'print_evaluator_ir': [False, TF],
     'print_struct_llvm_ir': [False, TF],
     'print_kernel_llvm_ir': [False, TF],
     'print_kernel_llvm_ir_optimized': [False, TF],
+    'cpu_affinity': ['', ['0', '0-1']],
+    'numa_aware': [False, TF],
+    'cpu_loop_vectorize': [True, TF],
     # FIXME: figure out why these two failed test:
     #'device_memory_fraction': [0.0, [0.5, 1, 0]],
     #'device_memory_GB': [1.0, [0.5, 1, 1.5, 2]],
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 import taichi as ti
 from tests import test_utils
 
@@ -31,3 +34,87 @@ def test_sort():
     test_sort_for_dtype(ti.f32, 1)
     test_sort_for_dtype(ti.f32, 256)
     test_sort_for_dtype(ti.f32, 100001)
+
+
+def _check_sorted(keys, values, keys_host, perm):
+    assert (np.diff(keys) >= 0).all()
+    assert (np.sort(keys_host, kind='stable') == keys).all()
+    # Equal keys keep their order
+    assert (perm == np.argsort(keys_host, kind='stable')).all()
+    assert (values == perm).all()
+
+
+@pytest.mark.parametrize('dtype', [ti.i32, ti.u32, ti.f32])
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_radix_sort_field(dtype):
+    n = 100001
+    keys = ti.field(dtype, n)
+    values = ti.field(ti.i32, n)
+    keys_host = np.random.randint(-1000, 1000, n)
+    if dtype == ti.u32:
+        keys_host = np.abs(keys_host)
+    if dtype == ti.f32:
+        keys_host = keys_host * 0.37
+    keys_host = keys_host.astype(ti.lang.util.to_numpy_type(dtype))
+    keys.from_numpy(keys_host)
+    values.from_numpy(np.arange(n, dtype=np.int32))
+
+    ti.algorithms.radix_sort(keys, values)
+    res = values.to_numpy()
+    _check_sorted(keys.to_numpy(), res, keys_host, res)
+
+
+@pytest.mark.parametrize('dtype', [ti.i64, ti.f64])
+@test_utils.test(arch=[ti.cpu, ti.cuda], require=ti.extension.data64)
+def test_radix_sort_ndarray_64bit(dtype):
+    n = 4097
+    keys = ti.ndarray(dtype, n)
+    values = ti.ndarray(ti.i32, n)
+    keys_host = np.random.randint(-2**40, 2**40, n)
+    if dtype == ti.f64:
+        keys_host = keys_host * -1.5e-3
+    keys_host = keys_host.astype(ti.lang.util.to_numpy_type(dtype))
+    keys.from_numpy(keys_host)
+    values.from_numpy(np.arange(n, dtype=np.int32))
+
+    ti.algorithms.radix_sort(keys, values)
+    res = values.to_numpy()
+    _check_sorted(keys.to_numpy(), res, keys_host, res)
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_radix_sort_special_floats():
+    keys_host = np.array([0.5, -0.0, np.inf, -1e30, 0.0, -np.inf, 1e-40, -2],
+                         dtype=np.float32)
+    keys = ti.ndarray(ti.f32, len(keys_host))
+    keys.from_numpy(keys_host)
+    ti.algorithms.radix_sort(keys)
+    assert (keys.to_numpy() == np.sort(keys_host)).all()
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_segmented_sort():
+    n = 1000
+    offsets = np.array([0, 10, 10, 500, 501, 1000])
+    keys_host = np.random.randint(0, 100, n).astype(np.int32)
+    keys = ti.field(ti.i32, n)
+    values = ti.ndarray(ti.i32, n)
+    keys.from_numpy(keys_host)
+    values.from_numpy(np.arange(n, dtype=np.int32))
+
+    ti.algorithms.segmented_sort(keys, offsets, values)
+    keys_res = keys.to_numpy()
+    values_res = values.to_numpy()
+    for begin, end in zip(offsets[:-1], offsets[1:]):
+        _check_sorted(keys_res[begin:end], values_res[begin:end] - begin,
+                      keys_host[begin:end], values_res[begin:end] - begin)
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_radix_sort_invalid():
+    with pytest.raises(TypeError):
+        ti.algorithms.radix_sort(ti.field(ti.i8, 4))
+    with pytest.raises(TypeError):
+        ti.algorithms.radix_sort(ti.field(ti.i32, (2, 2)))
+    with pytest.raises(ValueError):
+        ti.algorithms.radix_sort(ti.field(ti.i32, 4), ti.field(ti.i32, 5))
@@ -30,17 +30,20 @@ res = np.array([
 ])
 
 
-@pytest.mark.parametrize("dtype", [ti.f32])
+@pytest.mark.parametrize("dtype", [ti.f32, ti.f64])
 @pytest.mark.parametrize("solver_type", ["LLT", "LDLT", "LU"])
 @pytest.mark.parametrize("ordering", ["AMD", "COLAMD"])
 @test_utils.test(arch=ti.cpu)
 def test_sparse_LLT_solver(dtype, solver_type, ordering):
     n = 4
-    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+    Abuilder = ti.linalg.SparseMatrixBuilder(n,
+                                             n,
+                                             max_num_triplets=100,
+                                             dtype=dtype)
     b = ti.field(ti.f32, shape=n)
 
     @ti.kernel
-    def fill(Abuilder: ti.linalg.sparse_matrix_builder(),
+    def fill(Abuilder: ti.linalg.sparse_matrix_builder(dtype=dtype),
              InputArray: ti.ext_arr(), b: ti.template()):
         for i, j in ti.ndrange(n, n):
             Abuilder[i, j] += InputArray[i, j]
@@ -57,3 +60,32 @@ def test_sparse_LLT_solver(dtype, solver_type, ordering):
     x = solver.solve(b)
     for i in range(n):
         assert x[i] == test_utils.approx(res[i])
+
+
+@pytest.mark.parametrize("solver_type", ["LLT", "LU"])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_solver_refill(solver_type):
+    n = 4
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+    b = ti.field(ti.f32, shape=n)
+
+    @ti.kernel
+    def fill(Abuilder: ti.linalg.sparse_matrix_builder(),
+             InputArray: ti.ext_arr(), scale: ti.f32):
+        for i, j in ti.ndrange(n, n):
+            Abuilder[i, j] += InputArray[i, j] * scale
+        for i in range(n):
+            b[i] = i + 1
+
+    solver = ti.linalg.SparseSolver(solver_type=solver_type)
+    fill(Abuilder, Aarray, 1)
+    A = Abuilder.build()
+    solver.compute(A)
+    for scale in [2, 4]:
+        # The pattern is analyzed once, only the values are factorized again
+        fill(Abuilder, Aarray, scale)
+        Abuilder.refill(A)
+        solver.compute(A)
+        x = solver.solve(b)
+        for i in range(n):
+            assert x[i] == test_utils.approx(res[i] / scale)
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 import taichi as ti
 from tests import test_utils
 
@@ -213,3 +216,119 @@ def test_sparse_matrix_nonsymmetric_multiplication():
     for i in range(n):
         for j in range(m):
             assert C[i, j] == GT[i][j]
+
+
+@test_utils.test(arch=ti.cpu, default_fp=ti.f64)
+def test_sparse_matrix_f64():
+    n = 4
+    Abuilder = ti.linalg.SparseMatrixBuilder(n,
+                                             n,
+                                             max_num_triplets=100,
+                                             dtype=ti.f64)
+
+    @ti.kernel
+    def fill(Abuilder: ti.linalg.sparse_matrix_builder(dtype=ti.f64)):
+        for i in range(n):
+            Abuilder[i, i] += 1.0 + 1e-12 * i
+
+    fill(Abuilder)
+    A = Abuilder.build()
+    assert A.dtype == ti.f64
+    # Differences below the precision of f32 are kept
+    assert A[3, 3] - 1.0 == pytest.approx(3e-12, rel=1e-3)
+    B = (A + A) * 0.5
+    assert B[3, 3] - 1.0 == pytest.approx(3e-12, rel=1e-3)
+
+    @ti.kernel
+    def fill_f32(Abuilder: ti.linalg.sparse_matrix_builder()):
+        pass
+
+    with pytest.raises(ValueError):
+        fill_f32(Abuilder)
+
+
+@pytest.mark.parametrize('dtype', [ti.f32, ti.f64])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_spmv(dtype):
+    n, m = 50, 40
+    Abuilder = ti.linalg.SparseMatrixBuilder(n,
+                                             m,
+                                             max_num_triplets=1000,
+                                             dtype=dtype)
+
+    @ti.kernel
+    def fill(Abuilder: ti.linalg.sparse_matrix_builder(dtype=dtype)):
+        for i in range(n):
+            for k in range(3):
+                Abuilder[i, (i * 7 + k * 13) % m] += i - k
+
+    fill(Abuilder)
+    A = Abuilder.build()
+    dense = np.zeros((n, m))
+    for i in range(n):
+        for k in range(3):
+            dense[i, (i * 7 + k * 13) % m] += i - k
+    x_host = np.random.rand(m)
+
+    x = ti.field(dtype, m)
+    x.from_numpy(x_host)
+    y = ti.ndarray(dtype, n)
+    A.spmv(x, y)
+    assert y.to_numpy() == test_utils.approx(dense @ x_host, rel=1e-5)
+    assert A @ x == test_utils.approx(dense @ x_host, rel=1e-5)
+
+    # Modified matrices are multiplied with their new values
+    A[0, 0] = 100.0
+    dense[0, 0] = 100.0
+    z = ti.field(dtype, n)
+    A.spmv(x, z)
+    assert z.to_numpy() == test_utils.approx(dense @ x_host, rel=1e-5)
+
+    with pytest.raises(ValueError):
+        A.spmv(y, z)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_builder_refill():
+    n = 8
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+
+    @ti.kernel
+    def fill(Abuilder: ti.linalg.sparse_matrix_builder(), scale: ti.f32):
+        for i in range(n):
+            Abuilder[i, i] += scale
+            Abuilder[i, (i + 1) % n] += scale * 2
+            Abuilder[i, i] += scale
+
+    fill(Abuilder, 1)
+    A = Abuilder.build()
+    pattern_id = A.matrix.get_pattern_id()
+    x = ti.field(ti.f32, n)
+    x.fill(1)
+    assert (A @ x == 4).all()
+
+    fill(Abuilder, 3)
+    Abuilder.refill(A)
+    assert A.matrix.get_pattern_id() == pattern_id
+    assert A[0, 0] == 6
+    assert A[0, 1] == 6
+    assert A[0, 2] == 0
+    assert (A @ x == 12).all()
+
+    @ti.kernel
+    def fill_outside(Abuilder: ti.linalg.sparse_matrix_builder()):
+        Abuilder[0, 5] += 1
+
+    # Valid triplets come before the invalid one, which must not be applied
+    fill(Abuilder, 5)
+    fill_outside(Abuilder)
+    with pytest.raises(RuntimeError):
+        Abuilder.refill(A)
+    assert A[0, 0] == 6
+    assert A[0, 1] == 6
+    assert (A @ x == 12).all()
+
+    # The failed refill also consumed the triplets
+    fill(Abuilder, 1)
+    Abuilder.refill(A)
+    assert (A @ x == 4).all()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+n = 8
+steps = 20
+
+
+def _coef(t):
+    return 1.0 + 0.01 * (t + 1) * (np.arange(n) % 3)
+
+
+def _reference_grad(s0):
+    states = [s0]
+    for t in range(steps):
+        s = states[-1]
+        states.append(s * _coef(t) + 0.1 * np.sin(s))
+    grad = 2 * states[-1]
+    for t in reversed(range(steps)):
+        grad = grad * (_coef(t) + 0.1 * np.cos(states[t]))
+    return states[-1], grad
+
+
+# With 2 rows, the states are overwritten every other step, which the tape
+# handles by checkpointing them like the fields without gradients
+@pytest.mark.parametrize('num_rows', [steps + 1, 2])
+@pytest.mark.parametrize('checkpoint_every', [1, 3, 7, 100])
+@test_utils.test()
+def test_tape_checkpoint(checkpoint_every, num_rows):
+    s = ti.field(ti.f32, shape=(num_rows, n), needs_grad=True)
+    # Overwritten at every step, which the tape only handles by checkpointing
+    coef = ti.field(ti.f32, shape=n)
+    loss = ti.field(ti.f32, shape=(), needs_grad=True)
+
+    @ti.kernel
+    def load_coef(t: ti.i32):
+        for i in coef:
+            coef[i] = 1.0 + 0.01 * (t + 1) * (i % 3)
+
+    @ti.kernel
+    def step(t: ti.i32):
+        for i in range(n):
+            cur = s[t % num_rows, i]
+            s[(t + 1) % num_rows, i] = cur * coef[i] + 0.1 * ti.sin(cur)
+
+    @ti.kernel
+    def compute_loss():
+        for i in range(n):
+            loss[None] += s[steps % num_rows, i]**2
+
+    s0 = np.random.rand(n).astype(np.float32)
+    for i in range(n):
+        s[0, i] = s0[i]
+
+    with ti.Tape(loss, checkpoint_every=checkpoint_every):
+        for t in range(steps):
+            load_coef(t)
+            step(t)
+        compute_loss()
+
+    final, grad = _reference_grad(s0.astype(np.float64))
+    # The fields are left in their final states
+    assert s.to_numpy()[steps % num_rows] == pytest.approx(final, rel=1e-4)
+    assert loss[None] == pytest.approx((final**2).sum(), rel=1e-4)
+    assert coef.to_numpy() == pytest.approx(_coef(steps - 1), rel=1e-6)
+    assert s.grad.to_numpy()[0] == pytest.approx(grad, rel=1e-3)
+
+
+@test_utils.test()
+def test_tape_checkpoint_invalid():
+    loss = ti.field(ti.f32, shape=(), needs_grad=True)
+    with pytest.raises(ValueError):
+        ti.Tape(loss, checkpoint_every=0)
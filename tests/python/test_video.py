@@ -0,0 +1,28 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+import taichi as ti
+from tests import test_utils
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None,
+                    reason='ffmpeg is not installed')
+@test_utils.test(arch=ti.cpu)
+def test_video_manager_streaming():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video_manager = ti.VideoManager(output_dir=tmpdir,
+                                        framerate=24,
+                                        streaming=True)
+        for i in range(10):
+            img = np.full((64, 48, 3), i / 10, dtype=np.float32)
+            video_manager.write_frame(img)
+        with pytest.raises(ValueError):
+            video_manager.write_frame(np.zeros((32, 32), dtype=np.uint8))
+        video_manager.make_video(gif=False)
+
+        assert os.path.getsize(video_manager.get_output_filename('.mp4')) > 0
+        assert not os.path.exists(video_manager.get_frame_directory())
@@ -58,6 +58,17 @@ def make_temp_file(*args, **kwargs):
     return name
 
 
+def make_vector(container, dtype, arr):
+    '''Create a 1-D field or ndarray, as given by `container`, holding the elements of `arr`'''
+
+    if container == 'field':
+        res = ti.field(dtype, arr.shape[0])
+    else:
+        res = ti.ndarray(dtype, arr.shape[0])
+    res.from_numpy(arr)
+    return res
+
+
 class TestParam:
     def __init__(self, value, required_extensions):
         self._value = value